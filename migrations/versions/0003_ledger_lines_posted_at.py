@@ -0,0 +1,50 @@
+"""ledger_lines.posted_at: denormalized from ledger_entries + covering aggregate index
+
+Revision ID: 0003_ledger_lines_posted_at
+Revises: 0002_improvements
+Create Date: 2026-03-02 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_ledger_lines_posted_at"
+down_revision = "0002_improvements"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("ledger_lines", sa.Column("posted_at", sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill from the owning entry; lines are immutable so a single pass is enough.
+    op.execute("""
+        UPDATE ledger_lines AS l
+        SET posted_at = e.posted_at
+        FROM ledger_entries AS e
+        WHERE l.entry_id = e.id AND l.posted_at IS NULL
+        """)
+
+    op.alter_column(
+        "ledger_lines",
+        "posted_at",
+        nullable=False,
+        server_default=sa.text("now()"),
+    )
+
+    # Balance and revenue aggregates filter on (tenant_id, account, posted_at) and read only
+    # side/amount, so they can be answered by an index-only scan without touching entries.
+    op.create_index(
+        "ix_ledger_lines_tenant_account_currency_posted",
+        "ledger_lines",
+        ["tenant_id", "account", "currency", "posted_at"],
+        postgresql_include=["side", "amount"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ledger_lines_tenant_account_currency_posted", table_name="ledger_lines")
+    op.drop_column("ledger_lines", "posted_at")
@@ -0,0 +1,220 @@
+"""ledger_entries / ledger_lines: monthly range partitioning on posted_at
+
+Revision ID: 0004_ledger_partitioning
+Revises: 0003_ledger_lines_posted_at
+Create Date: 2026-03-09 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_ledger_partitioning"
+down_revision = "0003_ledger_lines_posted_at"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+# Entries before lines: lines reference entries.
+PARTITIONED_TABLES = ("ledger_entries", "ledger_lines")
+
+
+def _month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(value: date, months: int) -> date:
+    idx = value.year * 12 + (value.month - 1) + months
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def _create_month_partition(table: str, start: date) -> None:
+    end = _add_months(start, 1)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') "
+        f"TO ('{end.isoformat()} 00:00:00+00')"
+    )
+
+
+def _create_partitioned_tables() -> None:
+    op.create_table(
+        "ledger_entries",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column(
+            "payment_intent_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("payment_intents.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "posted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")
+        ),
+        sa.PrimaryKeyConstraint("id", "posted_at", name="ledger_entries_pkey"),
+        postgresql_partition_by="RANGE (posted_at)",
+    )
+    op.create_table(
+        "ledger_lines",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("entry_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("side", sa.String(length=16), nullable=False),
+        sa.Column("account", sa.String(length=64), nullable=False),
+        sa.Column("amount", sa.Numeric(18, 2), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False, server_default="BRL"),
+        sa.Column(
+            "posted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")
+        ),
+        sa.PrimaryKeyConstraint("id", "posted_at", name="ledger_lines_pkey"),
+        sa.ForeignKeyConstraint(
+            ["entry_id", "posted_at"],
+            ["ledger_entries.id", "ledger_entries.posted_at"],
+            name="fk_ledger_lines_entry",
+        ),
+        postgresql_partition_by="RANGE (posted_at)",
+    )
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_ledger_entries_tenant_id", "ledger_entries", ["tenant_id"])
+    op.create_index("ix_ledger_lines_tenant_id", "ledger_lines", ["tenant_id"])
+    op.create_index("ix_ledger_lines_entry_id", "ledger_lines", ["entry_id"])
+    op.create_index(
+        "ix_ledger_lines_tenant_account_currency_posted",
+        "ledger_lines",
+        ["tenant_id", "account", "currency", "posted_at"],
+        postgresql_include=["side", "amount"],
+    )
+
+
+def _drop_indexes() -> None:
+    op.drop_index("ix_ledger_lines_tenant_account_currency_posted", table_name="ledger_lines")
+    op.drop_index("ix_ledger_lines_entry_id", table_name="ledger_lines")
+    op.drop_index("ix_ledger_lines_tenant_id", table_name="ledger_lines")
+    op.drop_index("ix_ledger_entries_tenant_id", table_name="ledger_entries")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Move the plain tables aside; their indexes/constraints would collide with the new names.
+    _drop_indexes()
+    op.rename_table("ledger_lines", "ledger_lines_legacy")
+    op.rename_table("ledger_entries", "ledger_entries_legacy")
+    op.execute(
+        "ALTER TABLE ledger_lines_legacy RENAME CONSTRAINT ledger_lines_pkey TO ledger_lines_legacy_pkey"
+    )
+    op.execute(
+        "ALTER TABLE ledger_entries_legacy RENAME CONSTRAINT ledger_entries_pkey TO ledger_entries_legacy_pkey"
+    )
+
+    _create_partitioned_tables()
+
+    current = _month_start(datetime.now(timezone.utc))
+    oldest = bind.execute(sa.text("SELECT min(posted_at) FROM ledger_entries_legacy")).scalar()
+    first = _month_start(oldest) if oldest is not None else current
+    last = _add_months(current, MONTHS_AHEAD)
+    for table in PARTITIONED_TABLES:
+        month = first
+        while month <= last:
+            _create_month_partition(table, month)
+            month = _add_months(month, 1)
+
+    op.execute("""
+        INSERT INTO ledger_entries (id, tenant_id, payment_intent_id, posted_at)
+        SELECT id, tenant_id, payment_intent_id, posted_at FROM ledger_entries_legacy
+        """)
+    op.execute("""
+        INSERT INTO ledger_lines (id, tenant_id, entry_id, side, account, amount, currency, posted_at)
+        SELECT id, tenant_id, entry_id, side, account, amount, currency, posted_at
+        FROM ledger_lines_legacy
+        """)
+
+    op.drop_table("ledger_lines_legacy")
+    op.drop_table("ledger_entries_legacy")
+
+    _create_indexes()
+
+
+def downgrade() -> None:
+    _drop_indexes()
+    op.rename_table("ledger_lines", "ledger_lines_partitioned")
+    op.rename_table("ledger_entries", "ledger_entries_partitioned")
+    op.execute(
+        "ALTER TABLE ledger_lines_partitioned RENAME CONSTRAINT ledger_lines_pkey TO ledger_lines_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE ledger_entries_partitioned RENAME CONSTRAINT ledger_entries_pkey TO ledger_entries_partitioned_pkey"
+    )
+
+    op.create_table(
+        "ledger_entries",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column(
+            "payment_intent_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("payment_intents.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "posted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")
+        ),
+    )
+    op.create_table(
+        "ledger_lines",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column(
+            "entry_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("ledger_entries.id"),
+            nullable=False,
+        ),
+        sa.Column("side", sa.String(length=16), nullable=False),
+        sa.Column("account", sa.String(length=64), nullable=False),
+        sa.Column("amount", sa.Numeric(18, 2), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False, server_default="BRL"),
+        sa.Column(
+            "posted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")
+        ),
+    )
+    op.execute("""
+        INSERT INTO ledger_entries (id, tenant_id, payment_intent_id, posted_at)
+        SELECT id, tenant_id, payment_intent_id, posted_at FROM ledger_entries_partitioned
+        """)
+    op.execute("""
+        INSERT INTO ledger_lines (id, tenant_id, entry_id, side, account, amount, currency, posted_at)
+        SELECT id, tenant_id, entry_id, side, account, amount, currency, posted_at
+        FROM ledger_lines_partitioned
+        """)
+    op.drop_table("ledger_lines_partitioned")
+    op.drop_table("ledger_entries_partitioned")
+
+    _create_indexes()
@@ -0,0 +1,31 @@
+"""ledger_entries: allow manual journal entries (no payment intent) with a description
+
+Revision ID: 0005_manual_journal_entries
+Revises: 0004_ledger_partitioning
+Create Date: 2026-03-16 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_manual_journal_entries"
+down_revision = "0004_ledger_partitioning"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column("ledger_entries", "payment_intent_id", nullable=True)
+    op.add_column("ledger_entries", sa.Column("description", sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ledger_entries", "description")
+    op.execute(
+        "DELETE FROM ledger_lines WHERE entry_id IN (SELECT id FROM ledger_entries WHERE payment_intent_id IS NULL)"
+    )
+    op.execute("DELETE FROM ledger_entries WHERE payment_intent_id IS NULL")
+    op.alter_column("ledger_entries", "payment_intent_id", nullable=False)
@@ -0,0 +1,136 @@
+"""ledger_entries: per-tenant hash chain, chain heads and verification checkpoints
+
+Revision ID: 0006_ledger_hash_chain
+Revises: 0005_manual_journal_entries
+Create Date: 2026-03-23 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+import sqlalchemy as sa
+from alembic import op
+
+from src.domain.ledger_hash import GENESIS_HASH, compute_entry_hash
+
+revision = "0006_ledger_hash_chain"
+down_revision = "0005_manual_journal_entries"
+branch_labels = None
+depends_on = None
+
+PAGE_SIZE = 5000
+
+
+def _backfill_tenant(conn: sa.Connection, tenant_id: str) -> tuple[int, str]:
+    """Chain existing entries in (posted_at, id) order; returns the resulting head."""
+    seq, prev = 0, GENESIS_HASH
+    cursor = None
+    while True:
+        params: dict[str, object] = {"t": tenant_id, "n": PAGE_SIZE}
+        where = "tenant_id = :t"
+        if cursor is not None:
+            where += " AND (posted_at, id) > (:p, :i)"
+            params.update(p=cursor[0], i=cursor[1])
+        entries = conn.execute(
+            sa.text(
+                "SELECT id, posted_at, payment_intent_id, description FROM ledger_entries "
+                f"WHERE {where} ORDER BY posted_at, id LIMIT :n"
+            ),
+            params,
+        ).all()
+        if not entries:
+            return seq, prev
+        lines = defaultdict(list)
+        for row in conn.execute(
+            sa.text(
+                "SELECT entry_id, side, account, amount, currency FROM ledger_lines "
+                "WHERE tenant_id = :t AND entry_id = ANY(:ids)"
+            ),
+            {"t": tenant_id, "ids": [e.id for e in entries]},
+        ):
+            lines[row.entry_id].append((row.side, row.account, row.amount, row.currency))
+        updates = []
+        for e in entries:
+            seq += 1
+            entry_hash = compute_entry_hash(
+                prev,
+                tenant_id,
+                seq,
+                e.id,
+                e.posted_at,
+                e.payment_intent_id,
+                e.description,
+                lines[e.id],
+            )
+            updates.append(
+                {"id": e.id, "posted_at": e.posted_at, "seq": seq, "prev": prev, "hash": entry_hash}
+            )
+            prev = entry_hash
+        conn.execute(
+            sa.text(
+                "UPDATE ledger_entries SET chain_seq = :seq, prev_hash = :prev, entry_hash = :hash "
+                "WHERE id = :id AND posted_at = :posted_at"
+            ),
+            updates,
+        )
+        cursor = (entries[-1].posted_at, entries[-1].id)
+
+
+def upgrade() -> None:
+    op.add_column("ledger_entries", sa.Column("chain_seq", sa.BigInteger(), nullable=True))
+    op.add_column("ledger_entries", sa.Column("prev_hash", sa.String(length=64), nullable=True))
+    op.add_column("ledger_entries", sa.Column("entry_hash", sa.String(length=64), nullable=True))
+    op.create_table(
+        "ledger_chain_heads",
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), primary_key=True),
+        sa.Column("last_seq", sa.BigInteger(), nullable=False),
+        sa.Column("last_hash", sa.String(length=64), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.create_table(
+        "ledger_chain_checkpoints",
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), primary_key=True),
+        sa.Column("chain_seq", sa.BigInteger(), nullable=False),
+        sa.Column("entry_hash", sa.String(length=64), nullable=False),
+        sa.Column(
+            "verified_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+    conn = op.get_bind()
+    tenants = conn.execute(sa.text("SELECT DISTINCT tenant_id FROM ledger_entries")).scalars().all()
+    for tenant_id in tenants:
+        last_seq, last_hash = _backfill_tenant(conn, tenant_id)
+        conn.execute(
+            sa.text(
+                "INSERT INTO ledger_chain_heads (tenant_id, last_seq, last_hash) "
+                "VALUES (:t, :s, :h)"
+            ),
+            {"t": tenant_id, "s": last_seq, "h": last_hash},
+        )
+
+    op.alter_column("ledger_entries", "chain_seq", nullable=False)
+    op.alter_column("ledger_entries", "prev_hash", nullable=False)
+    op.alter_column("ledger_entries", "entry_hash", nullable=False)
+    op.create_index(
+        "ix_ledger_entries_tenant_chain_seq", "ledger_entries", ["tenant_id", "chain_seq"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ledger_entries_tenant_chain_seq", table_name="ledger_entries")
+    op.drop_table("ledger_chain_checkpoints")
+    op.drop_table("ledger_chain_heads")
+    op.drop_column("ledger_entries", "entry_hash")
+    op.drop_column("ledger_entries", "prev_hash")
+    op.drop_column("ledger_entries", "chain_seq")
@@ -0,0 +1,48 @@
+"""ledger_daily_rollups and per-tenant rollup watermarks
+
+Revision ID: 0007_ledger_daily_rollups
+Revises: 0006_ledger_hash_chain
+Create Date: 2026-03-30 00:00:00.000000
+
+History is not copied here; run ``python -m src.worker.rollups backfill`` after upgrading.
+Until then reports read the ledger directly, since every entry is above the (missing) watermark.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_ledger_daily_rollups"
+down_revision = "0006_ledger_hash_chain"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ledger_daily_rollups",
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("account", sa.String(length=64), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("debits_total", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.Column("credits_total", sa.Numeric(18, 2), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("tenant_id", "day", "account", "currency"),
+    )
+    op.create_table(
+        "ledger_rollup_watermarks",
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), primary_key=True),
+        sa.Column("last_chain_seq", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ledger_rollup_watermarks")
+    op.drop_table("ledger_daily_rollups")
@@ -0,0 +1,50 @@
+"""tenant_revenue_totals for the cross-tenant revenue report
+
+Revision ID: 0009_tenant_revenue_totals
+Revises: 0008_report_jobs
+Create Date: 2026-04-13 00:00:00.000000
+
+Seeded from ledger_daily_rollups; tenants whose rollups have not been backfilled yet are filled
+in by ``python -m src.worker.rollups backfill``.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_tenant_revenue_totals"
+down_revision = "0008_report_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenant_revenue_totals",
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("total", sa.Numeric(20, 2), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.PrimaryKeyConstraint("tenant_id", "currency"),
+    )
+    op.create_index(
+        "ix_tenant_revenue_totals_currency_total", "tenant_revenue_totals", ["currency", "total"]
+    )
+    op.execute("""
+        INSERT INTO tenant_revenue_totals (tenant_id, currency, total, updated_at)
+        SELECT tenant_id, currency, SUM(credits_total), now()
+        FROM ledger_daily_rollups
+        WHERE account = 'REVENUE'
+        GROUP BY tenant_id, currency
+        """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tenant_revenue_totals_currency_total", table_name="tenant_revenue_totals")
+    op.drop_table("tenant_revenue_totals")
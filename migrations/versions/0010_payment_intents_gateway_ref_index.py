@@ -0,0 +1,28 @@
+"""payment_intents (tenant_id, gateway_ref) index for set-based reconciliation
+
+Revision ID: 0010_payment_intents_gateway_ref
+Revises: 0009_tenant_revenue_totals
+Create Date: 2026-04-20 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0010_payment_intents_gateway_ref"
+down_revision = "0009_tenant_revenue_totals"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_payment_intents_tenant_gateway_ref",
+        "payment_intents",
+        ["tenant_id", "gateway_ref"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_intents_tenant_gateway_ref", table_name="payment_intents")
@@ -0,0 +1,57 @@
+"""reconciliation_runs: scheduled, resumable reconciliation runs
+
+Revision ID: 0011_reconciliation_runs
+Revises: 0010_payment_intents_gateway_ref
+Create Date: 2026-04-27 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0011_reconciliation_runs"
+down_revision = "0010_payment_intents_gateway_ref"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reconciliation_runs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("trigger", sa.String(length=16), nullable=False, server_default="scheduled"),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="PENDING"),
+        sa.Column("checkpoint", sa.String(length=255), nullable=True),
+        sa.Column("items_processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "discrepancy_counts",
+            postgresql.JSONB(),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column("error", sa.String(length=500), nullable=True),
+        sa.Column("locked_by", sa.String(length=64), nullable=True),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_reconciliation_runs_tenant_created", "reconciliation_runs", ["tenant_id", "created_at"]
+    )
+    op.create_index("ix_reconciliation_runs_status", "reconciliation_runs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reconciliation_runs_status", table_name="reconciliation_runs")
+    op.drop_index("ix_reconciliation_runs_tenant_created", table_name="reconciliation_runs")
+    op.drop_table("reconciliation_runs")
@@ -0,0 +1,40 @@
+"""incremental reconciliation: run mode/watermarks and payment_intents (tenant_id, updated_at)
+
+Revision ID: 0012_incremental_reconciliation
+Revises: 0011_reconciliation_runs
+Create Date: 2026-05-04 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0012_incremental_reconciliation"
+down_revision = "0011_reconciliation_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "reconciliation_runs",
+        sa.Column("mode", sa.String(length=16), nullable=False, server_default="full"),
+    )
+    op.add_column(
+        "reconciliation_runs", sa.Column("since", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column(
+        "reconciliation_runs", sa.Column("watermark", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index(
+        "ix_payment_intents_tenant_updated_at", "payment_intents", ["tenant_id", "updated_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_intents_tenant_updated_at", table_name="payment_intents")
+    op.drop_column("reconciliation_runs", "watermark")
+    op.drop_column("reconciliation_runs", "since")
+    op.drop_column("reconciliation_runs", "mode")
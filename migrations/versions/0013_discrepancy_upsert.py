@@ -0,0 +1,90 @@
+"""reconciliation_discrepancies: one row per (tenant, gateway_ref, type) with occurrence counts
+
+Revision ID: 0013_discrepancy_upsert
+Revises: 0012_incremental_reconciliation
+Create Date: 2026-05-11 00:00:00.000000
+
+Existing duplicates are folded into their oldest row: occurrences becomes the number of rows,
+last_seen_at the newest created_at, and the finding stays open if any duplicate was open.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0013_discrepancy_upsert"
+down_revision = "0012_incremental_reconciliation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "reconciliation_discrepancies",
+        sa.Column(
+            "last_seen_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.add_column(
+        "reconciliation_discrepancies",
+        sa.Column("occurrences", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.execute("""
+        WITH grouped AS (
+            SELECT id,
+                   row_number() OVER w AS rn,
+                   count(*) OVER w AS n,
+                   max(created_at) OVER w AS last_seen,
+                   bool_and(resolved) OVER w AS all_resolved
+            FROM reconciliation_discrepancies
+            WHERE gateway_ref IS NOT NULL
+            WINDOW w AS (PARTITION BY tenant_id, gateway_ref, discrepancy_type
+                         ORDER BY created_at, id
+                         ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+        ),
+        kept AS (
+            UPDATE reconciliation_discrepancies AS d
+            SET occurrences = g.n, last_seen_at = g.last_seen, resolved = g.all_resolved
+            FROM grouped AS g
+            WHERE d.id = g.id AND g.rn = 1
+        )
+        DELETE FROM reconciliation_discrepancies AS d
+        USING grouped AS g
+        WHERE d.id = g.id AND g.rn > 1
+        """)
+    op.execute(
+        "UPDATE reconciliation_discrepancies SET last_seen_at = created_at WHERE occurrences = 1"
+    )
+    op.create_index(
+        "uq_reconciliation_discrepancies_key",
+        "reconciliation_discrepancies",
+        ["tenant_id", "gateway_ref", "discrepancy_type"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_reconciliation_discrepancies_tenant_created",
+        "reconciliation_discrepancies",
+        ["tenant_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_reconciliation_discrepancies_tenant_type_resolved",
+        "reconciliation_discrepancies",
+        ["tenant_id", "discrepancy_type", "resolved"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_reconciliation_discrepancies_tenant_type_resolved",
+        table_name="reconciliation_discrepancies",
+    )
+    op.drop_index(
+        "ix_reconciliation_discrepancies_tenant_created", table_name="reconciliation_discrepancies"
+    )
+    op.drop_index("uq_reconciliation_discrepancies_key", table_name="reconciliation_discrepancies")
+    op.drop_column("reconciliation_discrepancies", "occurrences")
+    op.drop_column("reconciliation_discrepancies", "last_seen_at")
@@ -0,0 +1,41 @@
+"""payment_intents.refunded_amount: running total of an intent's refunds
+
+Revision ID: 0014_refunded_amount
+Revises: 0013_discrepancy_upsert
+Create Date: 2026-05-18 00:00:00.000000
+
+Backfilled from refunds here; ``python -m src.worker.refund_totals verify`` compares the
+column with the refunds table afterwards and ``backfill`` repairs any drift.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0014_refunded_amount"
+down_revision = "0013_discrepancy_upsert"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "payment_intents",
+        sa.Column("refunded_amount", sa.Numeric(18, 2), nullable=False, server_default="0"),
+    )
+    op.execute("""
+        UPDATE payment_intents AS pi
+        SET refunded_amount = r.total
+        FROM (
+            SELECT payment_intent_id, SUM(amount) AS total
+            FROM refunds
+            WHERE status IN ('PENDING', 'PROCESSING', 'COMPLETED')
+            GROUP BY payment_intent_id
+        ) AS r
+        WHERE r.payment_intent_id = pi.id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_column("payment_intents", "refunded_amount")
@@ -0,0 +1,44 @@
+"""refunds: worker pipeline state (attempts, scheduling, lock, error)
+
+Revision ID: 0015_refund_pipeline
+Revises: 0014_refunded_amount
+Create Date: 2026-05-25 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0015_refund_pipeline"
+down_revision = "0014_refunded_amount"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "refunds", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0")
+    )
+    op.add_column(
+        "refunds",
+        sa.Column(
+            "available_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.add_column("refunds", sa.Column("locked_by", sa.String(length=64), nullable=True))
+    op.add_column("refunds", sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("refunds", sa.Column("error", sa.String(length=500), nullable=True))
+    op.add_column("refunds", sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE refunds SET finished_at = created_at WHERE status = 'COMPLETED'")
+    op.create_index("ix_refunds_status_available_at", "refunds", ["status", "available_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refunds_status_available_at", table_name="refunds")
+    for column in ("finished_at", "error", "locked_at", "locked_by", "available_at", "attempts"):
+        op.drop_column("refunds", column)
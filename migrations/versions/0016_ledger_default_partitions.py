@@ -0,0 +1,30 @@
+"""ledger_entries / ledger_lines: DEFAULT partitions for months not created yet
+
+Revision ID: 0016_ledger_default_partitions
+Revises: 0015_refund_pipeline
+Create Date: 2026-05-28 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0016_ledger_default_partitions"
+down_revision = "0015_refund_pipeline"
+branch_labels = None
+depends_on = None
+
+# Entries before lines on create, lines before entries on detach: lines reference entries.
+PARTITIONED_TABLES = ("ledger_entries", "ledger_lines")
+
+
+def upgrade() -> None:
+    for table in PARTITIONED_TABLES:
+        op.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+
+
+def downgrade() -> None:
+    # Detached, not dropped: rows for months without a partition stay in <table>_default.
+    for table in reversed(PARTITIONED_TABLES):
+        op.execute(f"ALTER TABLE {table} DETACH PARTITION {table}_default")
@@ -0,0 +1,37 @@
+"""reconciliation runs: phase and gateway listing cursor for MISSING_LOCAL checks
+
+Revision ID: 0017_reconciliation_run_phases
+Revises: 0016_ledger_default_partitions
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0017_reconciliation_run_phases"
+down_revision = "0016_ledger_default_partitions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "reconciliation_runs",
+        sa.Column("phase", sa.String(length=16), nullable=False, server_default="intents"),
+    )
+    op.add_column(
+        "reconciliation_runs",
+        sa.Column("gateway_cursor", sa.String(length=255), nullable=True),
+    )
+    # Runs that already finished have nothing left to list.
+    op.execute(
+        "UPDATE reconciliation_runs SET phase = 'done' WHERE status IN ('SUCCEEDED', 'FAILED')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("reconciliation_runs", "gateway_cursor")
+    op.drop_column("reconciliation_runs", "phase")
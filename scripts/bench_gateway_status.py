@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Benchmark reconciliation status lookups: one call at a time vs. the concurrent fan-out.
+
+Usage: python scripts/bench_gateway_status.py [refs] [latency_ms] [concurrency] [rate_per_second]
+
+Runs against FakeGatewayAdapter with a simulated round-trip latency, so no database or
+gateway credentials are needed. A rate of 0 disables the rate limiter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.application.gateway_status import RateLimiter, StatusFetcher
+from src.infrastructure.gateway.fake import FakeGatewayAdapter
+
+
+async def _seed(gateway: FakeGatewayAdapter, n: int) -> list[str]:
+    refs = []
+    for i in range(n):
+        result = await gateway.authorize("bench", Decimal("10.00"), "BRL", "c", f"bench-{i}")
+        refs.append(result.gateway_ref)
+    return refs
+
+
+def _report(name: str, n: int, seconds: float) -> None:
+    print(f"{name:<12} refs={n:<6} total={seconds:8.2f}s throughput={n / seconds:10.1f}/s")
+
+
+def main() -> int:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50.0) / 1000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+
+    gateway = FakeGatewayAdapter(latency=latency)  # only get_status is slowed down
+    refs = asyncio.run(_seed(gateway, n))
+
+    sequential = StatusFetcher(gateway, concurrency=1)
+    start = time.perf_counter()
+    sequential.fetch_sync(refs)
+    _report("sequential", n, time.perf_counter() - start)
+
+    fan_out = StatusFetcher(gateway, concurrency=concurrency, limiter=RateLimiter(rate))
+    start = time.perf_counter()
+    fan_out.fetch_sync(refs)
+    _report(f"fan-out x{concurrency}", n, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
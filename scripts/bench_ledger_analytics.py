@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark the in-memory analytics engine against the SQL reports.
+
+Usage: DATABASE_URL=... python scripts/bench_ledger_analytics.py [tenant_id] [iterations]
+
+Loads the tenant's ledger into a LedgerFrame once (timed), then runs revenue by month/week
+and account balances both through src.application.reports and through the vectorized
+queries, checks that the answers match and reports per-call latency (p50/p95).
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.application.ledger_analytics import (
+    LedgerFrame,
+    account_balances,
+    from_minor,
+    load_frame,
+    revenue_by_period,
+)
+from src.application.reports import account_balances_report, revenue_report
+from src.infrastructure.db.session import init_db, session_scope
+from src.shared.config import load_settings
+
+
+def _sql_revenue(tenant_id: str, granularity: str) -> list[tuple[str, str, Decimal]]:
+    with session_scope() as session:
+        items = revenue_report(session, tenant_id, None, None, granularity)
+    return [(i.period, i.currency, Decimal(i.total)) for i in items]
+
+
+def _frame_revenue(frame: LedgerFrame, granularity: str) -> list[tuple[str, str, Decimal]]:
+    return [
+        (r["period"].isoformat(), r["currency"], from_minor(r["total"]))
+        for r in revenue_by_period(frame, granularity)
+    ]
+
+
+def _sql_balances(tenant_id: str) -> list[tuple[str, str, Decimal]]:
+    with session_scope() as session:
+        items = account_balances_report(session, tenant_id, None, None)
+    return [(i.account, i.currency, Decimal(i.balance)) for i in items]
+
+
+def _frame_balances(frame: LedgerFrame) -> list[tuple[str, str, Decimal]]:
+    return [
+        (r["account"], r["currency"], from_minor(r["balance"])) for r in account_balances(frame)
+    ]
+
+
+def _measure(name: str, fn: Callable[[], Any], n: int) -> Any:
+    timings: list[float] = []
+    out = None
+    for _ in range(n):
+        start = time.perf_counter()
+        out = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) >= 2 else timings[0]
+    print(f"{name:<22} p50={statistics.median(timings):9.3f}ms p95={p95:9.3f}ms")
+    return out
+
+
+def main() -> int:
+    tenant_id = sys.argv[1] if len(sys.argv) > 1 else "tenant_demo"
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    init_db(load_settings())
+    start = time.perf_counter()
+    with session_scope() as session:
+        frame = load_frame(session, tenant_id)
+    print(f"loaded {len(frame)} lines in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    mismatches = 0
+    for granularity in ("month", "week"):
+        sql = _measure(
+            f"sql revenue/{granularity}",
+            lambda g=granularity: _sql_revenue(tenant_id, g),
+            iterations,
+        )
+        vec = _measure(
+            f"numpy revenue/{granularity}",
+            lambda g=granularity: _frame_revenue(frame, g),
+            iterations,
+        )
+        mismatches += sql != vec
+    sql = _measure("sql balances", lambda: _sql_balances(tenant_id), iterations)
+    vec = _measure("numpy balances", lambda: _frame_balances(frame), iterations)
+    mismatches += sql != vec
+
+    print("results match" if not mismatches else f"{mismatches} result set(s) differ")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark GET /v1/ledger/entries: joinedload path vs. the lean two-select path.
+
+Usage: DATABASE_URL=... python scripts/bench_ledger_entries.py [tenant_id] [iterations]
+
+Reports per-call latency (p50/p95) and peak traced allocations for each path against an
+already-populated database (run ./scripts/seed.sh and ./scripts/smoke.sh first).
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from src.application.ledger import (
+    LedgerEntryDTO,
+    LedgerLineDTO,
+    list_ledger_entries,
+)
+from src.infrastructure.db.models import LedgerEntry
+from src.infrastructure.db.session import init_db, session_scope
+from src.shared.config import load_settings
+
+
+def _joinedload_path(session: Session, tenant_id: str) -> list[LedgerEntryDTO]:
+    q = (
+        select(LedgerEntry)
+        .options(joinedload(LedgerEntry.lines))
+        .where(LedgerEntry.tenant_id == tenant_id)
+        .order_by(LedgerEntry.posted_at.desc())
+        .limit(200)
+    )
+    rows = session.execute(q).unique().scalars().all()
+    return [
+        LedgerEntryDTO(
+            id=str(e.id),
+            payment_intent_id=str(e.payment_intent_id),
+            posted_at=e.posted_at.isoformat(),
+            lines=[
+                LedgerLineDTO(
+                    side=line.side,
+                    account=line.account,
+                    amount=str(line.amount),
+                    currency=line.currency,
+                )
+                for line in e.lines
+            ],
+        )
+        for e in rows
+    ]
+
+
+def _lean_path(session: Session, tenant_id: str) -> list[LedgerEntryDTO]:
+    return list_ledger_entries(session, tenant_id, None, None)
+
+
+def _measure(
+    name: str, fn: Callable[[Session, str], list[LedgerEntryDTO]], tenant_id: str, n: int
+) -> None:
+    timings: list[float] = []
+    peaks: list[int] = []
+    for _ in range(n):
+        with session_scope() as session:
+            tracemalloc.start()
+            start = time.perf_counter()
+            out = fn(session, tenant_id)
+            timings.append((time.perf_counter() - start) * 1000)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peaks.append(peak)
+    p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) >= 2 else timings[0]
+    print(
+        f"{name:<12} entries={len(out):<4} "
+        f"p50={statistics.median(timings):8.2f}ms p95={p95:8.2f}ms "
+        f"peak_alloc={statistics.median(peaks) / 1024:8.1f}KiB"
+    )
+
+
+def main() -> int:
+    tenant_id = sys.argv[1] if len(sys.argv) > 1 else "tenant_demo"
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    init_db(load_settings())
+    _measure("joinedload", _joinedload_path, tenant_id, iterations)
+    _measure("lean", _lean_path, tenant_id, iterations)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
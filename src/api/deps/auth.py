@@ -51,3 +51,10 @@ def require_permission(permission: str):
         return principal
 
     return _dep
+
+
+def require_global_admin(principal: Principal = Depends(get_principal)) -> Principal:
+    """Cross-tenant endpoints: only a token for every tenant (tid "*") with the admin role."""
+    if principal.tid != "*" or "admin" not in principal.roles:
+        raise http_problem(403, "Forbidden", "Global admin required", instance="authz")
+    return principal
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from fastapi import Request
+
+from src.application.ports.payment_gateway import PaymentGatewayPort
+
+
+def get_gateway(request: Request) -> PaymentGatewayPort:
+    gateway: PaymentGatewayPort = request.app.state.gateway
+    return gateway
@@ -3,6 +3,7 @@ from __future__ import annotations
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.infrastructure.gateway.factory import create_gateway
 from src.shared.config import load_settings
 from src.shared.logging import configure_logging, get_logger
 from src.api.middlewares import CorrelationIdMiddleware, RateLimitMiddleware, ChaosMiddleware
@@ -23,6 +24,7 @@ def create_app() -> FastAPI:
         redoc_url=None,
     )
     app.state.settings = settings
+    app.state.gateway = create_gateway(settings)
 
     app.add_middleware(CorrelationIdMiddleware)
     app.add_middleware(ChaosMiddleware)
@@ -54,11 +56,13 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     def _startup() -> None:
+        from src.application.account_cache import init_account_cache
         from src.infrastructure.db.session import init_db
         from src.infrastructure.redis.client import init_redis
 
         init_db(settings)
         init_redis(settings)
+        init_account_cache(settings)
         log.info("startup complete")
 
     return app
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from src.api.deps.auth import enforce_tenant, require_permission
 from src.api.deps.db import get_db
 from src.application.accounts import AccountConfigDTO, create_account, list_accounts
+from src.application.statements import (
+    STATEMENT_MAX_PAGE_SIZE,
+    STATEMENT_PAGE_SIZE,
+    AccountStatementDTO,
+    account_statement,
+)
 
 router = APIRouter(prefix="/v1", tags=["accounts"])
 
@@ -34,3 +43,29 @@ def list_(
     _: object = Depends(require_permission("ledger:read")),
 ):
     return list_accounts(db, tenant_id)
+
+
+@router.get("/accounts/{code}/statement", response_model=AccountStatementDTO)
+def statement(
+    request: Request,
+    code: str,
+    currency: str = Query(default="BRL", min_length=3, max_length=3),
+    from_: Optional[str] = Query(default=None, alias="from"),
+    to: Optional[str] = Query(default=None, alias="to"),
+    limit: int = Query(default=STATEMENT_PAGE_SIZE, ge=1, le=STATEMENT_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("ledger:read")),
+) -> AccountStatementDTO:
+    return account_statement(
+        db,
+        tenant_id,
+        code,
+        currency,
+        datetime.fromisoformat(from_) if from_ else None,
+        datetime.fromisoformat(to) if to else None,
+        request.app.state.settings.jwt_secret,
+        limit,
+        cursor,
+    )
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
 import json
-from fastapi import APIRouter, Depends, Request
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
 from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
 
-from src.api.deps.auth import enforce_tenant, require_permission
+from src.api.deps.auth import enforce_tenant, require_global_admin, require_permission
+from src.api.deps.db import get_db
+from src.application.fx import ExchangeRateInput, record_exchange_rates
+from src.application.ledger_chain import ChainVerificationDTO, verify_chain
+from src.application.ledger_integrity import LedgerIntegrityReportDTO, verify_ledger
+from src.application.refunds import RefundedAmountReportDTO, verify_refunded_amounts
 from src.infrastructure.redis.client import get_redis
+from src.shared.problem import http_problem
 
 router = APIRouter(prefix="/v1/admin", tags=["admin"])
 
@@ -37,3 +47,64 @@ def set_chaos(
     r = get_redis()
     r.set(f"chaos:{tenant_id}", cfg.model_dump_json())
     return cfg
+
+
+def _parse_month(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        year, month = value.split("-", 1)
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise http_problem(
+            400,
+            "Bad Request",
+            f"invalid month {value} (expected YYYY-MM)",
+            instance="/v1/admin/ledger/verify",
+        )
+
+
+@router.post("/ledger/verify", response_model=LedgerIntegrityReportDTO)
+def verify_tenant_ledger(
+    request: Request,
+    from_: Optional[str] = Query(default=None, alias="from"),
+    to: Optional[str] = Query(default=None, alias="to"),
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("admin:write")),
+) -> LedgerIntegrityReportDTO:
+    return verify_ledger(
+        db,
+        request.app.state.settings,
+        tenant_ids=[tenant_id],
+        from_month=_parse_month(from_),
+        to_month=_parse_month(to),
+    )
+
+
+@router.post("/ledger/chain/verify", response_model=ChainVerificationDTO)
+def verify_tenant_ledger_chain(
+    full: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("admin:write")),
+) -> ChainVerificationDTO:
+    return verify_chain(db, tenant_id, full=full)
+
+
+@router.post("/refunds/verify", response_model=RefundedAmountReportDTO)
+def verify_tenant_refunded_amounts(
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("admin:write")),
+) -> RefundedAmountReportDTO:
+    return verify_refunded_amounts(db, [tenant_id])
+
+
+@router.post("/fx-rates", status_code=201)
+def add_exchange_rates(
+    rates: list[ExchangeRateInput],
+    db: Session = Depends(get_db),
+    _: object = Depends(require_global_admin),
+) -> dict[str, int]:
+    return {"inserted": record_exchange_rates(db, rates)}
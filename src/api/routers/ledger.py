@@ -3,21 +3,34 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Request
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from src.api.deps.auth import enforce_tenant, require_permission
 from src.api.deps.db import get_db
 from src.application.ledger import (
+    JOURNAL_BATCH_MAX_ENTRIES,
     AccountBalanceDTO,
+    JournalBatchResultDTO,
+    JournalEntryInput,
     LedgerEntryDTO,
     get_ledger_balances,
     list_ledger_entries,
+    post_journal_entries,
 )
+from src.infrastructure.redis.client import get_redis
+from src.infrastructure.redis.idempotency import IdempotencyStore
+from src.infrastructure.redis.response_cache import ResponseCache
+from src.shared.problem import http_problem
 
 router = APIRouter(prefix="/v1", tags=["ledger"])
 
 
+class JournalBatchRequest(BaseModel):
+    entries: list[JournalEntryInput] = Field(min_length=1, max_length=JOURNAL_BATCH_MAX_ENTRIES)
+
+
 def _parse_dt(value: Optional[str]) -> Optional[datetime]:
     if not value:
         return None
@@ -37,10 +50,43 @@ def list_entries(
 
 @router.get("/ledger/balances", response_model=list[AccountBalanceDTO])
 def balances(
+    request: Request,
     from_: Optional[str] = Query(default=None, alias="from"),
     to: Optional[str] = Query(default=None, alias="to"),
     db: Session = Depends(get_db),
     tenant_id: str = Depends(enforce_tenant),
     _: object = Depends(require_permission("ledger:read")),
 ):
-    return get_ledger_balances(db, tenant_id, _parse_dt(from_), _parse_dt(to))
+    cache = ResponseCache(get_redis(), request.app.state.settings.report_cache_ttl_seconds)
+    from_dt, to_dt = _parse_dt(from_), _parse_dt(to)
+    return cache.get_or_compute(
+        tenant_id,
+        "ledger.balances",
+        {"from": from_dt, "to": to_dt},
+        lambda: [i.model_dump() for i in get_ledger_balances(db, tenant_id, from_dt, to_dt)],
+    )
+
+
+@router.post("/ledger/entries:batch", response_model=JournalBatchResultDTO, status_code=201)
+def post_entries_batch(
+    req: JournalBatchRequest,
+    request: Request,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("admin:write")),
+) -> JournalBatchResultDTO:
+    if not idempotency_key:
+        raise http_problem(
+            400, "Bad Request", "Missing Idempotency-Key", instance="/v1/ledger/entries:batch"
+        )
+    ttl = request.app.state.settings.idempotency_ttl_seconds
+    store = IdempotencyStore(get_redis(), ttl_seconds=ttl)
+    idem_key = f"idem:{tenant_id}:journal-batch:{idempotency_key}"
+    hit = store.get(idem_key)
+    if hit.hit and hit.value:
+        return JournalBatchResultDTO(**hit.value)
+
+    dto = post_journal_entries(db, tenant_id, req.entries)
+    store.set(idem_key, dto.model_dump())
+    return dto
@@ -8,12 +8,18 @@ from sqlalchemy.orm import Session
 
 from src.api.deps.auth import enforce_tenant, require_permission
 from src.api.deps.db import get_db
+from src.api.deps.gateway import get_gateway
 from src.application.payments import (
+    PAYMENT_INTENT_BATCH_MAX_ITEMS,
+    PaymentIntentBatchResultDTO,
     PaymentIntentDTO,
+    PaymentIntentItemInput,
     confirm_payment_intent,
     create_payment_intent,
+    create_payment_intents_batch,
     get_payment_intent,
 )
+from src.application.ports.payment_gateway import PaymentGatewayPort
 from src.infrastructure.redis.client import get_redis
 from src.infrastructure.redis.idempotency import IdempotencyStore
 from src.shared.problem import http_problem
@@ -27,6 +33,12 @@ class CreatePaymentIntentRequest(BaseModel):
     customer_ref: str = Field(min_length=1, max_length=128)
 
 
+class CreatePaymentIntentBatchRequest(BaseModel):
+    items: list[PaymentIntentItemInput] = Field(
+        min_length=1, max_length=PAYMENT_INTENT_BATCH_MAX_ITEMS
+    )
+
+
 @router.post("/payment-intents", response_model=PaymentIntentDTO)
 def create(
     req: CreatePaymentIntentRequest,
@@ -55,6 +67,35 @@ def create(
     return dto
 
 
+@router.post("/payment-intents:batch", response_model=PaymentIntentBatchResultDTO)
+def create_batch(
+    req: CreatePaymentIntentBatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("payments:write")),
+) -> PaymentIntentBatchResultDTO:
+    ttl = request.app.state.settings.idempotency_ttl_seconds
+    store = IdempotencyStore(get_redis(), ttl_seconds=ttl)
+    # Same keys as POST /v1/payment-intents, so an item retried singly is not created twice.
+    keys = {
+        item.idempotency_key: f"idem:{tenant_id}:create:{item.idempotency_key}"
+        for item in req.items
+    }
+    hits = dict(zip(keys, store.get_many(list(keys.values()))))
+    replayed = {k: PaymentIntentDTO(**h.value) for k, h in hits.items() if h.hit and h.value}
+
+    result = create_payment_intents_batch(db, tenant_id, req.items, replayed)
+    store.set_many(
+        {
+            keys[item.idempotency_key]: item.payment_intent.model_dump()
+            for item in result.items
+            if item.status == 201 and item.payment_intent is not None
+        }
+    )
+    return result
+
+
 @router.get("/payment-intents/{pid}", response_model=PaymentIntentDTO)
 def get_one(
     pid: uuid.UUID,
@@ -71,9 +112,10 @@ def confirm(
     request: Request,
     idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
+    gateway: PaymentGatewayPort = Depends(get_gateway),
     tenant_id: str = Depends(enforce_tenant),
     _: object = Depends(require_permission("payments:write")),
-):
+) -> PaymentIntentDTO:
     if not idempotency_key:
         raise http_problem(
             400,
@@ -88,6 +130,6 @@ def confirm(
     if hit.hit and hit.value:
         return PaymentIntentDTO(**hit.value)
 
-    dto = confirm_payment_intent(db, tenant_id, pid)
+    dto = confirm_payment_intent(db, tenant_id, pid, gateway)
     store.set(idem_key, dto.model_dump())
     return dto
@@ -3,28 +3,53 @@ from __future__ import annotations
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
 from src.api.deps.auth import enforce_tenant, require_permission
 from src.api.deps.db import get_db
 from src.application.reconciliation import (
+    DISCREPANCY_PAGE_SIZE,
     DiscrepancyDTO,
+    DiscrepancySummaryItem,
+    discrepancy_summary,
     list_discrepancies,
     resolve_discrepancy,
 )
+from src.application.reconciliation_runs import (
+    ReconciliationRunDTO,
+    get_run,
+    list_runs,
+    start_run,
+)
 
 router = APIRouter(prefix="/v1", tags=["reconciliation"])
 
 
 @router.get("/reconciliation/discrepancies", response_model=list[DiscrepancyDTO])
 def list_(
+    response: Response,
     resolved: Optional[bool] = Query(default=None),
+    limit: int = Query(default=DISCREPANCY_PAGE_SIZE, ge=1, le=1000),
+    cursor: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     tenant_id: str = Depends(enforce_tenant),
     _: object = Depends(require_permission("admin:write")),
-):
-    return list_discrepancies(db, tenant_id, resolved)
+) -> list[DiscrepancyDTO]:
+    page = list_discrepancies(db, tenant_id, resolved, limit, cursor)
+    # The body stays a plain list; the cursor for the next page travels in a header.
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
+
+
+@router.get("/reconciliation/discrepancies/summary", response_model=list[DiscrepancySummaryItem])
+def summary(
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("admin:write")),
+) -> list[DiscrepancySummaryItem]:
+    return discrepancy_summary(db, tenant_id)
 
 
 @router.post("/reconciliation/discrepancies/{disc_id}/resolve", response_model=DiscrepancyDTO)
@@ -35,3 +60,33 @@ def resolve(
     _: object = Depends(require_permission("admin:write")),
 ):
     return resolve_discrepancy(db, tenant_id, disc_id)
+
+
+@router.post("/reconciliation/runs", response_model=ReconciliationRunDTO, status_code=202)
+def create_run(
+    mode: str = Query(default="incremental", regex="^(incremental|full)$"),
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("admin:write")),
+) -> ReconciliationRunDTO:
+    return start_run(db, tenant_id, mode)
+
+
+@router.get("/reconciliation/runs", response_model=list[ReconciliationRunDTO])
+def runs(
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("admin:write")),
+) -> list[ReconciliationRunDTO]:
+    return list_runs(db, tenant_id, limit)
+
+
+@router.get("/reconciliation/runs/{run_id}", response_model=ReconciliationRunDTO)
+def run_status(
+    run_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("admin:write")),
+) -> ReconciliationRunDTO:
+    return get_run(db, tenant_id, run_id)
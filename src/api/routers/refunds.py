@@ -9,7 +9,15 @@ from sqlalchemy.orm import Session
 
 from src.api.deps.auth import enforce_tenant, require_permission
 from src.api.deps.db import get_db
-from src.application.refunds import RefundDTO, create_refund, list_refunds
+from src.application.refunds import (
+    REFUND_BATCH_MAX_ITEMS,
+    RefundBatchResultDTO,
+    RefundDTO,
+    RefundItemInput,
+    create_refund,
+    create_refunds_batch,
+    list_refunds,
+)
 from src.infrastructure.redis.client import get_redis
 from src.infrastructure.redis.idempotency import IdempotencyStore
 from src.shared.problem import http_problem
@@ -22,7 +30,11 @@ class CreateRefundRequest(BaseModel):
     reason: str | None = Field(default=None, max_length=500)
 
 
-@router.post("/payment-intents/{pid}/refund", response_model=RefundDTO)
+class RefundBatchRequest(BaseModel):
+    items: list[RefundItemInput] = Field(min_length=1, max_length=REFUND_BATCH_MAX_ITEMS)
+
+
+@router.post("/payment-intents/{pid}/refund", response_model=RefundDTO, status_code=202)
 def refund(
     pid: uuid.UUID,
     req: CreateRefundRequest,
@@ -49,6 +61,31 @@ def refund(
     return dto
 
 
+@router.post("/refunds:batch", response_model=RefundBatchResultDTO)
+def refund_batch(
+    req: RefundBatchRequest,
+    request: Request,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("payments:write")),
+) -> RefundBatchResultDTO:
+    if not idempotency_key:
+        raise http_problem(
+            400, "Bad Request", "Missing Idempotency-Key", instance="/v1/refunds:batch"
+        )
+    ttl = request.app.state.settings.idempotency_ttl_seconds
+    store = IdempotencyStore(get_redis(), ttl_seconds=ttl)
+    idem_key = f"idem:{tenant_id}:refund-batch:{idempotency_key}"
+    hit = store.get(idem_key)
+    if hit.hit and hit.value:
+        return RefundBatchResultDTO(**hit.value)
+
+    dto = create_refunds_batch(db, tenant_id, req.items)
+    store.set(idem_key, dto.model_dump())
+    return dto
+
+
 @router.get("/payment-intents/{pid}/refunds", response_model=list[RefundDTO])
 def list_(
     pid: uuid.UUID,
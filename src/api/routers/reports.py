@@ -1,17 +1,35 @@
 from __future__ import annotations
 
+import uuid
 from datetime import datetime
-from decimal import Decimal
-from typing import Optional
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, Query
-from pydantic import BaseModel
-from sqlalchemy import case, func, select
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 
-from src.api.deps.auth import enforce_tenant, require_permission
+from src.api.deps.auth import enforce_tenant, require_global_admin, require_permission
 from src.api.deps.db import get_db
-from src.infrastructure.db.models import LedgerEntry, LedgerLine
+from src.application.fx import get_fx_cache
+from src.application.report_jobs import (
+    ReportJobDTO,
+    ReportJobRequest,
+    cancel_report_job,
+    ensure_inline_size,
+    get_report_job,
+    submit_report_job,
+)
+from src.application.reports import (
+    TENANT_REVENUE_SORTS,
+    AccountBalanceReportItem,
+    RevenueReportItem,
+    TenantRevenueItem,
+    account_balances_report,
+    revenue_report,
+    tenant_revenue_report,
+)
+from src.infrastructure.redis.client import get_redis
+from src.infrastructure.redis.response_cache import ResponseCache
+from src.shared.problem import http_problem
 
 
 router = APIRouter(prefix="/v1", tags=["reports"])
@@ -23,115 +41,124 @@ def _parse_dt(value: Optional[str]) -> Optional[datetime]:
     return datetime.fromisoformat(value)
 
 
-class RevenueReportItem(BaseModel):
-    period: str
-    currency: str
-    total: str
-
-
-class TenantRevenueItem(BaseModel):
-    tenant_id: str
-    currency: str
-    total: str
-
-
-class AccountBalanceReportItem(BaseModel):
-    account: str
-    currency: str
-    debits_total: str
-    credits_total: str
-    balance: str
+def _fx_params(db: Session, target_currency: Optional[str]) -> dict[str, str]:
+    # Converted reports also depend on the rate table, which postings do not invalidate.
+    if not target_currency:
+        return {}
+    return {"target_currency": target_currency, "fx": get_fx_cache().version(db)}
 
 
 @router.get("/reports/revenue", response_model=list[RevenueReportItem])
 def revenue_by_period(
+    request: Request,
     from_: Optional[str] = Query(default=None, alias="from"),
     to: Optional[str] = Query(default=None, alias="to"),
     granularity: str = Query(default="month", regex="^(day|week|month)$"),
+    target_currency: Optional[str] = Query(default=None, min_length=3, max_length=3),
     db: Session = Depends(get_db),
     tenant_id: str = Depends(enforce_tenant),
     _: object = Depends(require_permission("ledger:read")),
 ):
-    trunc_map = {"day": "day", "week": "week", "month": "month"}
-    trunc = trunc_map[granularity]
-
-    period_col = func.date_trunc(trunc, LedgerEntry.posted_at).label("period")
-    total_col = func.coalesce(func.sum(LedgerLine.amount), 0).label("total")
-
-    q = (
-        select(period_col, LedgerLine.currency, total_col)
-        .join(LedgerEntry, LedgerLine.entry_id == LedgerEntry.id)
-        .where(
-            LedgerEntry.tenant_id == tenant_id,
-            LedgerLine.side == "CREDIT",
-            LedgerLine.account == "REVENUE",
-        )
-        .group_by(period_col, LedgerLine.currency)
-        .order_by(period_col)
-    )
-
     from_dt, to_dt = _parse_dt(from_), _parse_dt(to)
-    if from_dt:
-        q = q.where(LedgerEntry.posted_at >= from_dt)
-    if to_dt:
-        q = q.where(LedgerEntry.posted_at <= to_dt)
-
-    rows = db.execute(q).all()
-    return [
-        RevenueReportItem(
-            period=row.period.isoformat() if row.period else "",
-            currency=row.currency,
-            total=str(row.total),
-        )
-        for row in rows
-    ]
+    ensure_inline_size(
+        db,
+        tenant_id,
+        ReportJobRequest.model_validate(
+            {"kind": "revenue", "from": from_dt, "to": to_dt, "granularity": granularity}
+        ),
+        "/v1/reports/revenue",
+    )
+    cache = ResponseCache(get_redis(), request.app.state.settings.report_cache_ttl_seconds)
+    return cache.get_or_compute(
+        tenant_id,
+        "reports.revenue",
+        {
+            "from": from_dt,
+            "to": to_dt,
+            "granularity": granularity,
+            **_fx_params(db, target_currency),
+        },
+        lambda: [
+            i.model_dump()
+            for i in revenue_report(db, tenant_id, from_dt, to_dt, granularity, target_currency)
+        ],
+    )
 
 
 @router.get("/reports/account-balances", response_model=list[AccountBalanceReportItem])
-def account_balances_report(
+def account_balances(
+    request: Request,
     from_: Optional[str] = Query(default=None, alias="from"),
     to: Optional[str] = Query(default=None, alias="to"),
+    target_currency: Optional[str] = Query(default=None, min_length=3, max_length=3),
     db: Session = Depends(get_db),
     tenant_id: str = Depends(enforce_tenant),
     _: object = Depends(require_permission("ledger:read")),
-):
-    debit_sum = func.coalesce(
-        func.sum(case((LedgerLine.side == "DEBIT", LedgerLine.amount), else_=Decimal(0))),
-        Decimal(0),
+) -> Any:
+    from_dt, to_dt = _parse_dt(from_), _parse_dt(to)
+    ensure_inline_size(
+        db,
+        tenant_id,
+        ReportJobRequest.model_validate({"kind": "account_balances", "from": from_dt, "to": to_dt}),
+        "/v1/reports/account-balances",
     )
-    credit_sum = func.coalesce(
-        func.sum(case((LedgerLine.side == "CREDIT", LedgerLine.amount), else_=Decimal(0))),
-        Decimal(0),
+    cache = ResponseCache(get_redis(), request.app.state.settings.report_cache_ttl_seconds)
+    return cache.get_or_compute(
+        tenant_id,
+        "reports.account_balances",
+        {"from": from_dt, "to": to_dt, **_fx_params(db, target_currency)},
+        lambda: [
+            i.model_dump()
+            for i in account_balances_report(db, tenant_id, from_dt, to_dt, target_currency)
+        ],
     )
 
-    q = (
-        select(
-            LedgerLine.account,
-            LedgerLine.currency,
-            debit_sum.label("debits_total"),
-            credit_sum.label("credits_total"),
-            (credit_sum - debit_sum).label("balance"),
-        )
-        .join(LedgerEntry, LedgerLine.entry_id == LedgerEntry.id)
-        .where(LedgerEntry.tenant_id == tenant_id)
-        .group_by(LedgerLine.account, LedgerLine.currency)
-        .order_by(LedgerLine.account, LedgerLine.currency)
-    )
 
-    from_dt, to_dt = _parse_dt(from_), _parse_dt(to)
-    if from_dt:
-        q = q.where(LedgerEntry.posted_at >= from_dt)
-    if to_dt:
-        q = q.where(LedgerEntry.posted_at <= to_dt)
-
-    rows = db.execute(q).all()
-    return [
-        AccountBalanceReportItem(
-            account=row.account,
-            currency=row.currency,
-            debits_total=str(row.debits_total),
-            credits_total=str(row.credits_total),
-            balance=str(row.balance),
+@router.get("/reports/tenants/revenue", response_model=list[TenantRevenueItem])
+def revenue_by_tenant(
+    currency: Optional[str] = Query(default=None, min_length=3, max_length=3),
+    sort: str = Query(default="-total"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+    _: object = Depends(require_global_admin),
+) -> list[TenantRevenueItem]:
+    if sort not in TENANT_REVENUE_SORTS:
+        raise http_problem(
+            400, "Bad Request", f"invalid sort {sort}", instance="/v1/reports/tenants/revenue"
         )
-        for row in rows
-    ]
+    return tenant_revenue_report(db, currency, sort, limit, offset)
+
+
+@router.post("/reports/jobs", response_model=ReportJobDTO, status_code=202)
+def create_report_job(
+    req: ReportJobRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("ledger:read")),
+) -> ReportJobDTO:
+    job, inline = submit_report_job(db, tenant_id, req)
+    if inline:
+        response.status_code = 200
+    return job
+
+
+@router.get("/reports/jobs/{job_id}", response_model=ReportJobDTO)
+def report_job_status(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("ledger:read")),
+) -> ReportJobDTO:
+    return get_report_job(db, tenant_id, job_id)
+
+
+@router.post("/reports/jobs/{job_id}/cancel", response_model=ReportJobDTO)
+def cancel_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(enforce_tenant),
+    _: object = Depends(require_permission("ledger:read")),
+) -> ReportJobDTO:
+    return cancel_report_job(db, tenant_id, job_id)
@@ -0,0 +1,137 @@
+"""In-process cache of each tenant's chart of accounts for the posting paths.
+
+Settlements and refunds resolve two account codes per posting; without the cache each one is a
+SELECT on ``account_configs``. A miss loads every code of the tenant in one query, entries
+expire after ``ttl_seconds`` and the least recently used tenant is dropped beyond
+``max_tenants``.
+
+``create_account`` and callers of ``seed_default_accounts`` call ``publish_account_change``
+after their commit: it drops the tenant in this process and publishes the tenant id on
+``accounts:invalidate``, where ``listen_for_account_changes`` drops it in every other API and
+worker process. A process that loses its subscription clears the whole cache on reconnect,
+and the TTL bounds staleness if a message is lost anyway.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.infrastructure.db.models import AccountConfig
+from src.infrastructure.redis.client import get_redis
+from src.shared.config import Settings
+from src.shared.logging import get_logger
+from src.shared.metrics import ACCOUNT_CACHE_REQUESTS_TOTAL
+
+log = get_logger(__name__)
+
+INVALIDATION_CHANNEL = "accounts:invalidate"
+
+
+class AccountConfigCache:
+    def __init__(self, ttl_seconds: float = 60.0, max_tenants: int = 10_000) -> None:
+        self._lock = threading.Lock()
+        self._ttl = ttl_seconds
+        self._max_tenants = max(1, max_tenants)
+        self._entries: OrderedDict[str, tuple[float, dict[str, str]]] = OrderedDict()
+        # Bumped by invalidate() so a load that raced with it is not stored.
+        self._generation = 0
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if tenant_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(tenant_id, None)
+
+    def accounts(self, session: Session, tenant_id: str) -> dict[str, str]:
+        """The tenant's configured accounts by code."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None and now - entry[0] < self._ttl:
+                self._entries.move_to_end(tenant_id)
+                ACCOUNT_CACHE_REQUESTS_TOTAL.labels("hit").inc()
+                return entry[1]
+            generation = self._generation
+        ACCOUNT_CACHE_REQUESTS_TOTAL.labels("miss").inc()
+        accounts = {
+            code: code
+            for code in session.execute(
+                select(AccountConfig.code).where(AccountConfig.tenant_id == tenant_id)
+            ).scalars()
+        }
+        with self._lock:
+            if generation != self._generation:
+                return accounts
+            self._entries[tenant_id] = (now, accounts)
+            self._entries.move_to_end(tenant_id)
+            while len(self._entries) > self._max_tenants:
+                self._entries.popitem(last=False)
+        return accounts
+
+    def resolve(self, session: Session, tenant_id: str, code: str) -> str:
+        """Ledger account for ``code``; codes the tenant did not configure post as is."""
+        return self.accounts(session, tenant_id).get(code, code)
+
+
+_cache = AccountConfigCache()
+
+
+def get_account_cache() -> AccountConfigCache:
+    return _cache
+
+
+def resolve_account(session: Session, tenant_id: str, code: str) -> str:
+    return _cache.resolve(session, tenant_id, code)
+
+
+def publish_account_change(tenant_id: str) -> None:
+    """Drop the tenant's accounts here and in every subscribed process, after commit.
+
+    Publish failures are logged, not raised: the change already committed and other processes
+    pick it up when their entry expires.
+    """
+    _cache.invalidate(tenant_id)
+    try:
+        get_redis().publish(INVALIDATION_CHANNEL, tenant_id)
+    except Exception:
+        log.warning("account cache invalidation failed", extra={"tenant_id": tenant_id})
+
+
+def listen_for_account_changes(reconnect_delay: float = 5.0) -> None:
+    """Apply invalidations published by other processes; runs forever in a daemon thread."""
+    while True:
+        try:
+            # redis-py leaves pubsub() unannotated.
+            redis: Any = get_redis()
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Changes published while we were not subscribed are lost, so start clean.
+            _cache.invalidate()
+            for message in pubsub.listen():
+                data = message.get("data")
+                if message.get("type") != "message" or not data:
+                    continue
+                _cache.invalidate(str(data))
+        except Exception:
+            log.exception("account cache subscription lost")
+        time.sleep(reconnect_delay)
+
+
+def init_account_cache(settings: Settings) -> None:
+    """Size the cache from settings and start listening for invalidations."""
+    global _cache
+    _cache = AccountConfigCache(
+        ttl_seconds=settings.account_cache_ttl_seconds,
+        max_tenants=settings.account_cache_max_tenants,
+    )
+    threading.Thread(
+        target=listen_for_account_changes, name="account-cache-invalidation", daemon=True
+    ).start()
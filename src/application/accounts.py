@@ -4,6 +4,7 @@ from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from src.application.account_cache import publish_account_change
 from src.infrastructure.db.models import AccountConfig
 from src.shared.logging import get_logger
 from src.shared.problem import http_problem
@@ -68,13 +69,20 @@ def create_account(
         session.add(acc)
         session.flush()
 
+    publish_account_change(tenant_id)
     return AccountConfigDTO(
         id=str(acc.id), code=acc.code, label=acc.label,
         account_type=acc.account_type, is_default=acc.is_default,
     )
 
 
-def seed_default_accounts(session: Session, tenant_id: str) -> None:
+def seed_default_accounts(session: Session, tenant_id: str) -> bool:
+    """Add the missing default accounts; runs in the caller's transaction.
+
+    Returns whether anything was added, in which case the caller calls
+    ``publish_account_change`` once it committed.
+    """
+    added = False
     defaults = [
         ("CASH", "Cash", "ASSET", True),
         ("REVENUE", "Revenue", "REVENUE", True),
@@ -97,3 +105,5 @@ def seed_default_accounts(session: Session, tenant_id: str) -> None:
                     is_default=is_default,
                 )
             )
+            added = True
+    return added
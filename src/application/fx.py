@@ -0,0 +1,176 @@
+"""As-of FX conversion backed by an in-process cache of ``exchange_rates``.
+
+The rate for a pair at time t is the most recent row with ``effective_at <= t``; a pair missing
+from the table is served by inverting the opposite pair. Each pair's history is held as two
+sorted NumPy arrays (epoch microseconds, rate), so converting a whole result set is one
+``searchsorted`` plus a multiply. The table is append-only in practice; every
+``check_interval`` seconds the cache compares a cheap fingerprint (row count, latest
+``effective_at``) and drops all histories when it changed. ``record_exchange_rates``
+invalidates this process immediately.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from src.infrastructure.db.models import ExchangeRate
+from src.shared.logging import get_logger
+
+log = get_logger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class ExchangeRateInput(BaseModel):
+    from_currency: str = Field(min_length=3, max_length=3)
+    to_currency: str = Field(min_length=3, max_length=3)
+    rate: Decimal = Field(gt=0)
+    effective_at: datetime
+
+
+def to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class FxRateMissing(LookupError):
+    def __init__(self, base: str, quote: str, at: Optional[int] = None) -> None:
+        when = "" if at is None else f" at {datetime.fromtimestamp(at / 1e6, timezone.utc)}"
+        super().__init__(f"no exchange rate {base}->{quote}{when}")
+        self.base, self.quote = base, quote
+
+
+class FxRateCache:
+    def __init__(self, check_interval: float = 30.0) -> None:
+        self._lock = threading.Lock()
+        self._check_interval = check_interval
+        self._histories: dict[tuple[str, str], tuple[np.ndarray, np.ndarray]] = {}
+        self._fingerprint: Optional[tuple[int, Optional[datetime]]] = None
+        self._checked_at = float("-inf")
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._histories.clear()
+            self._fingerprint = None
+            self._checked_at = float("-inf")
+
+    def version(self, session: Session) -> str:
+        """Fingerprint of the rate table, reloading histories when it has changed."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self._check_interval and self._fingerprint is not None:
+                return self._format(self._fingerprint)
+        count, latest = session.execute(
+            select(func.count(), func.max(ExchangeRate.effective_at))
+        ).one()
+        fingerprint = (int(count), latest)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                if self._fingerprint is not None:
+                    log.info("exchange rates changed, reloading", extra={"rates": count})
+                self._histories.clear()
+                self._fingerprint = fingerprint
+            self._checked_at = now
+        return self._format(fingerprint)
+
+    @staticmethod
+    def _format(fingerprint: tuple[int, Optional[datetime]]) -> str:
+        count, latest = fingerprint
+        return f"{count}:{to_micros(latest) if latest else 0}"
+
+    def history(self, session: Session, base: str, quote: str) -> tuple[np.ndarray, np.ndarray]:
+        """Sorted (effective_at µs, rate) arrays for base->quote."""
+        self.version(session)
+        with self._lock:
+            cached = self._histories.get((base, quote))
+        if cached is not None:
+            return cached
+        rows = session.execute(
+            select(ExchangeRate.from_currency, ExchangeRate.effective_at, ExchangeRate.rate)
+            .where(
+                or_(
+                    (ExchangeRate.from_currency == base) & (ExchangeRate.to_currency == quote),
+                    (ExchangeRate.from_currency == quote) & (ExchangeRate.to_currency == base),
+                )
+            )
+            .order_by(ExchangeRate.effective_at)
+        ).all()
+        direct = [r for r in rows if r.from_currency == base]
+        # Prefer the pair as quoted; fall back to inverting the opposite direction.
+        chosen, invert = (direct, False) if direct else (rows, True)
+        if not chosen:
+            raise FxRateMissing(base, quote)
+        times = np.fromiter((to_micros(r.effective_at) for r in chosen), dtype=np.int64)
+        rates = np.array([float(r.rate) for r in chosen], dtype=np.float64)
+        entry = (times, 1.0 / rates if invert else rates)
+        with self._lock:
+            self._histories[(base, quote)] = entry
+        return entry
+
+    def rates_at(self, session: Session, base: str, quote: str, at: np.ndarray) -> np.ndarray:
+        """Rate in effect at each timestamp (epoch µs) of ``at``."""
+        times, rates = self.history(session, base, quote)
+        idx = np.searchsorted(times, at, side="right") - 1
+        if len(idx) and idx.min() < 0:
+            raise FxRateMissing(base, quote, int(at[np.argmin(idx)]))
+        return rates[idx]
+
+    def change_points(
+        self, session: Session, base: str, quote: str, start: int, end: int
+    ) -> np.ndarray:
+        """Effective times of the pair's rates in (start, end)."""
+        times, _ = self.history(session, base, quote)
+        return times[(times > start) & (times < end)]
+
+
+_cache = FxRateCache()
+
+
+def get_fx_cache() -> FxRateCache:
+    return _cache
+
+
+def convert_minor(
+    session: Session, base: str, quote: str, at: np.ndarray, amounts: np.ndarray
+) -> np.ndarray:
+    """Convert int64 minor-unit ``amounts`` posted at ``at`` (epoch µs) into ``quote``.
+
+    The multiply is done in float64 and rounded half-to-even to minor units; float64 keeps
+    that accurate to the minor unit for amounts below ~10^13 minor units.
+    """
+    if base == quote:
+        return amounts
+    rates = get_fx_cache().rates_at(session, base, quote, at)
+    converted: np.ndarray = np.rint(amounts * rates).astype(np.int64)
+    return converted
+
+
+def record_exchange_rates(session: Session, rates: Sequence[ExchangeRateInput]) -> int:
+    with session.begin():
+        session.add_all(
+            ExchangeRate(
+                from_currency=r.from_currency.upper(),
+                to_currency=r.to_currency.upper(),
+                rate=r.rate,
+                effective_at=(
+                    r.effective_at
+                    if r.effective_at.tzinfo
+                    else r.effective_at.replace(tzinfo=timezone.utc)
+                ),
+            )
+            for r in rates
+        )
+    get_fx_cache().invalidate()
+    return len(rates)
@@ -0,0 +1,134 @@
+"""Bulk gateway status lookups for reconciliation.
+
+``StatusFetcher`` fans ``get_status`` calls out over asyncio with at most ``concurrency`` in
+flight and paces them through a per-provider ``RateLimiter``. Results come back in input order
+so the caller can checkpoint on the last ref of a batch. Pages of a tenant's gateway
+transactions (``list_transactions``) go through the same limiter. Retries and backoff are left to the
+gateway adapter (``StripeAdapter`` retries transient errors behind its circuit breaker), so a
+failure is retried in one place only.
+
+Runner threads each drive their own event loop, so the limiter is a thread-safe token bucket
+shared per provider: the provider's rate limit holds across all runs in the process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Optional
+
+from src.application.ports.payment_gateway import (
+    GatewayResult,
+    GatewayTransactionPage,
+    PaymentGatewayPort,
+)
+from src.shared.logging import get_logger
+from src.shared.metrics import GATEWAY_REQUEST_DURATION_SECONDS, GATEWAY_REQUESTS_TOTAL
+
+log = get_logger(__name__)
+
+DEFAULT_CONCURRENCY = 16
+
+
+class RateLimiter:
+    """Token bucket of ``burst`` tokens refilled at ``rate_per_second``; ``rate <= 0`` is off."""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None) -> None:
+        self._rate = rate_per_second
+        self._capacity = float(burst or max(1, int(rate_per_second)))
+        self._tokens = self._capacity
+        self._ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, possibly on credit; returns how long to wait before using it."""
+        if self._rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._ts) * self._rate)
+            self._ts = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, rate_per_second: float) -> RateLimiter:
+    """Process-wide limiter for a gateway provider (created on first use)."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = RateLimiter(rate_per_second)
+        return limiter
+
+
+class StatusFetcher:
+    """Concurrent, rate-limited ``get_status`` over many gateway refs, plus transaction listing."""
+
+    def __init__(
+        self,
+        gateway: PaymentGatewayPort,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self._gateway = gateway
+        self._concurrency = max(1, concurrency)
+        self._limiter = limiter or RateLimiter(0)
+
+    async def _get_status(self, ref: str, slots: asyncio.Semaphore) -> GatewayResult:
+        async with slots:
+            await self._limiter.acquire()
+            started = time.perf_counter()
+            try:
+                result = await self._gateway.get_status(ref)
+            except Exception:
+                GATEWAY_REQUESTS_TOTAL.labels("get_status", "error").inc()
+                raise
+            finally:
+                GATEWAY_REQUEST_DURATION_SECONDS.labels("get_status").observe(
+                    time.perf_counter() - started
+                )
+        outcome = "success" if result.success else "failed"
+        GATEWAY_REQUESTS_TOTAL.labels("get_status", outcome).inc()
+        return result
+
+    async def fetch(self, refs: Sequence[str]) -> list[GatewayResult]:
+        """Statuses for ``refs``, in the same order."""
+        slots = asyncio.Semaphore(self._concurrency)
+        return list(await asyncio.gather(*(self._get_status(ref, slots) for ref in refs)))
+
+    def fetch_sync(self, refs: Sequence[str]) -> list[GatewayResult]:
+        return asyncio.run(self.fetch(refs))
+
+    async def list_transactions(
+        self, tenant_id: str, since: Optional[datetime], until: datetime, cursor: Optional[str]
+    ) -> GatewayTransactionPage:
+        await self._limiter.acquire()
+        started = time.perf_counter()
+        try:
+            page = await self._gateway.list_transactions(tenant_id, since, until, cursor)
+        except Exception:
+            GATEWAY_REQUESTS_TOTAL.labels("list_transactions", "error").inc()
+            raise
+        finally:
+            GATEWAY_REQUEST_DURATION_SECONDS.labels("list_transactions").observe(
+                time.perf_counter() - started
+            )
+        GATEWAY_REQUESTS_TOTAL.labels("list_transactions", "success").inc()
+        return page
+
+    def list_transactions_sync(
+        self, tenant_id: str, since: Optional[datetime], until: datetime, cursor: Optional[str]
+    ) -> GatewayTransactionPage:
+        return asyncio.run(self.list_transactions(tenant_id, since, until, cursor))
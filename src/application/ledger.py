@@ -1,14 +1,28 @@
 from __future__ import annotations
 
-from datetime import datetime
+import uuid
+from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Optional
 
+import numpy as np
 from pydantic import BaseModel
-from sqlalchemy import case, func, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session
 
-from src.infrastructure.db.models import LedgerEntry, LedgerLine
+from src.application.ledger_chain import lock_chain_head, next_link
+from src.domain.money import SUPPORTED_CURRENCIES
+from src.infrastructure.db.models import LedgerEntry, LedgerLine, PaymentIntent
+from src.infrastructure.db.partitions import first_open_month, month_start
+from src.infrastructure.redis.response_cache import invalidate_tenant_cache
+from src.shared.problem import http_problem
+
+LEDGER_ENTRIES_PAGE_SIZE = 200
+
+# Upper bound for POST /v1/ledger/entries:batch; larger loads are split client-side.
+JOURNAL_BATCH_MAX_ENTRIES = 5000
+# Amounts are Numeric(18, 2).
+MAX_AMOUNT_CENTS = 10**18
 
 
 class LedgerLineDTO(BaseModel):
@@ -20,9 +34,30 @@ class LedgerLineDTO(BaseModel):
 
 class LedgerEntryDTO(BaseModel):
     id: str
-    payment_intent_id: str
+    payment_intent_id: str | None
     posted_at: str
     lines: list[LedgerLineDTO]
+    description: str | None = None
+
+
+class JournalLineInput(BaseModel):
+    side: str
+    account: str
+    amount: Decimal
+    currency: str = "BRL"
+
+
+class JournalEntryInput(BaseModel):
+    lines: list[JournalLineInput]
+    posted_at: Optional[datetime] = None
+    payment_intent_id: Optional[uuid.UUID] = None
+    description: Optional[str] = None
+
+
+class JournalBatchResultDTO(BaseModel):
+    entries_posted: int
+    lines_posted: int
+    entry_ids: list[str]
 
 
 class AccountBalanceDTO(BaseModel):
@@ -36,37 +71,64 @@ class AccountBalanceDTO(BaseModel):
 def list_ledger_entries(
     session: Session, tenant_id: str, from_dt: Optional[datetime], to_dt: Optional[datetime]
 ) -> list[LedgerEntryDTO]:
-    q = (
-        select(LedgerEntry)
-        .options(joinedload(LedgerEntry.lines))
-        .where(LedgerEntry.tenant_id == tenant_id)
-    )
+    # Two lean column selects instead of joinedload + LIMIT: the joined form returns one row
+    # per line and materialises ORM objects for every entry and line before the DTOs are built.
+    q = select(
+        LedgerEntry.id,
+        LedgerEntry.payment_intent_id,
+        LedgerEntry.posted_at,
+        LedgerEntry.description,
+    ).where(LedgerEntry.tenant_id == tenant_id)
     if from_dt:
         q = q.where(LedgerEntry.posted_at >= from_dt)
     if to_dt:
         q = q.where(LedgerEntry.posted_at <= to_dt)
-    q = q.order_by(LedgerEntry.posted_at.desc()).limit(200)
-    rows = session.execute(q).scalars().all()
-    out: list[LedgerEntryDTO] = []
-    for e in rows:
-        out.append(
-            LedgerEntryDTO(
-                id=str(e.id),
-                payment_intent_id=str(e.payment_intent_id),
-                posted_at=e.posted_at.isoformat(),
-                lines=[
-                    LedgerLineDTO(side=line.side, account=line.account, amount=str(line.amount), currency=line.currency)
-                    for line in e.lines
-                ],
+    q = q.order_by(LedgerEntry.posted_at.desc()).limit(LEDGER_ENTRIES_PAGE_SIZE)
+    entries = session.execute(q).all()
+    if not entries:
+        return []
+
+    lines_by_entry: dict[uuid.UUID, list[LedgerLineDTO]] = {e.id: [] for e in entries}
+    # Entries come back newest first; bounding posted_at lets the planner prune line partitions.
+    line_rows = session.execute(
+        select(
+            LedgerLine.entry_id,
+            LedgerLine.side,
+            LedgerLine.account,
+            LedgerLine.amount,
+            LedgerLine.currency,
+        ).where(
+            LedgerLine.tenant_id == tenant_id,
+            LedgerLine.posted_at >= entries[-1].posted_at,
+            LedgerLine.posted_at <= entries[0].posted_at,
+            LedgerLine.entry_id.in_(list(lines_by_entry)),
+        )
+    ).all()
+    for line in line_rows:
+        lines_by_entry[line.entry_id].append(
+            LedgerLineDTO(
+                side=line.side,
+                account=line.account,
+                amount=str(line.amount),
+                currency=line.currency,
             )
         )
-    return out
+
+    return [
+        LedgerEntryDTO(
+            id=str(e.id),
+            payment_intent_id=str(e.payment_intent_id) if e.payment_intent_id else None,
+            posted_at=e.posted_at.isoformat(),
+            lines=lines_by_entry[e.id],
+            description=e.description,
+        )
+        for e in entries
+    ]
 
 
 def get_ledger_balances(
     session: Session, tenant_id: str, from_dt: Optional[datetime], to_dt: Optional[datetime]
 ) -> list[AccountBalanceDTO]:
-    
     debit_sum = func.coalesce(
         func.sum(case((LedgerLine.side == "DEBIT", LedgerLine.amount), else_=Decimal(0))),
         Decimal(0),
@@ -84,16 +146,15 @@ def get_ledger_balances(
             credit_sum.label("credits_total"),
             (credit_sum - debit_sum).label("balance"),
         )
-        .join(LedgerEntry, LedgerLine.entry_id == LedgerEntry.id)
-        .where(LedgerEntry.tenant_id == tenant_id)
+        .where(LedgerLine.tenant_id == tenant_id)
         .group_by(LedgerLine.account, LedgerLine.currency)
         .order_by(LedgerLine.account, LedgerLine.currency)
     )
 
     if from_dt:
-        q = q.where(LedgerEntry.posted_at >= from_dt)
+        q = q.where(LedgerLine.posted_at >= from_dt)
     if to_dt:
-        q = q.where(LedgerEntry.posted_at <= to_dt)
+        q = q.where(LedgerLine.posted_at <= to_dt)
 
     rows = session.execute(q).all()
     return [
@@ -106,3 +167,159 @@ def get_ledger_balances(
         )
         for row in rows
     ]
+
+
+def validate_journal_entries(entries: list[JournalEntryInput]) -> list[str]:
+    """Validate a whole batch with array operations; returns human-readable errors.
+
+    Line fields are gathered into NumPy arrays once and every rule is one mask over all lines.
+    Amounts are compared in integer cents and the net of each (entry, currency) group is summed
+    with one ``np.add.at``, so debits == credits is exact.
+    """
+    errors: list[str] = []
+    line_counts = np.fromiter((len(e.lines) for e in entries), dtype=np.int64, count=len(entries))
+    errors.extend(
+        f"entry {idx}: at least two lines are required" for idx in np.flatnonzero(line_counts < 2)
+    )
+    lines = [line for entry in entries for line in entry.lines]
+    if not lines:
+        return errors
+
+    n = len(lines)
+    entry_idx = np.repeat(np.arange(len(entries)), line_counts)
+    sides = np.array([line.side for line in lines])
+    currencies = np.array([line.currency for line in lines])
+    has_account = np.fromiter((bool(line.account) for line in lines), bool, n)
+    scaled = [line.amount * 100 for line in lines]
+    exact = np.fromiter(
+        (0 < c < MAX_AMOUNT_CENTS and c == c.to_integral_value() for c in scaled), bool, n
+    )
+    whole = [int(c) if ok else 0 for c, ok in zip(scaled, exact)]
+    # Group sums stay exact in int64 unless the batch total could overflow it.
+    cents = np.array(whole, dtype=np.int64 if sum(whole) < 2**63 else object)
+
+    bad_side = ~np.isin(sides, ("DEBIT", "CREDIT"))
+    bad_currency = ~bad_side & ~np.isin(currencies, SUPPORTED_CURRENCIES)
+    bad_account = ~(bad_side | bad_currency) & ~has_account
+    bad_amount = ~(bad_side | bad_currency | bad_account) & ~exact
+    for i in np.flatnonzero(bad_side | bad_currency | bad_account | bad_amount):
+        if bad_side[i]:
+            reason = f"invalid side {sides[i]}"
+        elif bad_currency[i]:
+            reason = f"unsupported currency {currencies[i]}"
+        elif bad_account[i]:
+            reason = "account is required"
+        else:
+            reason = "amount must be > 0 with at most 2 decimals"
+        errors.append(f"entry {entry_idx[i]}: {reason}")
+
+    valid = ~(bad_side | bad_currency | bad_account | bad_amount)
+    codes, currency_idx = np.unique(currencies[valid], return_inverse=True)
+    groups = entry_idx[valid] * len(codes) + currency_idx
+    net = np.zeros(len(entries) * len(codes), dtype=cents.dtype)
+    np.add.at(net, groups, np.where(sides[valid] == "DEBIT", cents[valid], -cents[valid]))
+    for group in np.flatnonzero(net):
+        idx, code = divmod(int(group), len(codes))
+        errors.append(f"entry {idx}: debits != credits for {codes[code]}")
+    return errors
+
+
+def post_journal_entries(
+    session: Session, tenant_id: str, entries: list[JournalEntryInput]
+) -> JournalBatchResultDTO:
+    instance = "/v1/ledger/entries:batch"
+    if not entries:
+        raise http_problem(400, "Bad Request", "entries must not be empty", instance=instance)
+    if len(entries) > JOURNAL_BATCH_MAX_ENTRIES:
+        raise http_problem(
+            400,
+            "Bad Request",
+            f"at most {JOURNAL_BATCH_MAX_ENTRIES} entries per batch",
+            instance=instance,
+        )
+    errors = validate_journal_entries(entries)
+    if errors:
+        raise http_problem(422, "Unprocessable Entity", "; ".join(errors[:20]), instance=instance)
+
+    now = datetime.now(timezone.utc)
+    prepared: list[tuple[uuid.UUID, datetime, JournalEntryInput]] = []
+    for entry in entries:
+        posted_at = entry.posted_at or now
+        if posted_at.tzinfo is None:
+            posted_at = posted_at.replace(tzinfo=timezone.utc)
+        prepared.append((uuid.uuid4(), posted_at, entry))
+
+    entry_rows: list[dict[str, object]] = []
+    line_rows: list[dict[str, object]] = []
+    with session.begin():
+        # Months without a partition go to the DEFAULT one; archived months are closed.
+        open_from = first_open_month(session)
+        problems = [
+            f"entry {idx}: month {posted_at:%Y-%m} is archived"
+            for idx, (_, posted_at, _) in enumerate(prepared)
+            if open_from is not None and month_start(posted_at) < open_from
+        ]
+        intent_ids = {e.payment_intent_id for e in entries if e.payment_intent_id is not None}
+        if intent_ids:
+            own = set(
+                session.execute(
+                    select(PaymentIntent.id).where(
+                        PaymentIntent.tenant_id == tenant_id, PaymentIntent.id.in_(intent_ids)
+                    )
+                ).scalars()
+            )
+            problems.extend(
+                f"entry {idx}: payment intent {entry.payment_intent_id} not found"
+                for idx, entry in enumerate(entries)
+                if entry.payment_intent_id is not None and entry.payment_intent_id not in own
+            )
+        if problems:
+            raise http_problem(
+                422, "Unprocessable Entity", "; ".join(problems[:20]), instance=instance
+            )
+        # Entries are chained in request order under the tenant's head lock.
+        head = lock_chain_head(session, tenant_id)
+        for entry_id, posted_at, entry in prepared:
+            link = next_link(
+                head,
+                entry_id,
+                posted_at,
+                entry.payment_intent_id,
+                entry.description,
+                [(ln.side, ln.account, ln.amount, ln.currency) for ln in entry.lines],
+            )
+            entry_rows.append(
+                {
+                    "id": entry_id,
+                    "tenant_id": tenant_id,
+                    "payment_intent_id": entry.payment_intent_id,
+                    "description": entry.description,
+                    "posted_at": posted_at,
+                    "chain_seq": link.chain_seq,
+                    "prev_hash": link.prev_hash,
+                    "entry_hash": link.entry_hash,
+                }
+            )
+            line_rows.extend(
+                {
+                    "id": uuid.uuid4(),
+                    "tenant_id": tenant_id,
+                    "entry_id": entry_id,
+                    "side": line.side,
+                    "account": line.account,
+                    "amount": line.amount,
+                    "currency": line.currency,
+                    "posted_at": posted_at,
+                }
+                for line in entry.lines
+            )
+        # executemany over insert() is sent as multi-row INSERT ... VALUES pages.
+        session.execute(insert(LedgerEntry), entry_rows)
+        session.execute(insert(LedgerLine), line_rows)
+    invalidate_tenant_cache(tenant_id)
+
+    return JournalBatchResultDTO(
+        entries_posted=len(entry_rows),
+        lines_posted=len(line_rows),
+        entry_ids=[str(r["id"]) for r in entry_rows],
+    )
@@ -0,0 +1,361 @@
+"""In-memory, vectorized analytics over a tenant's ledger lines.
+
+A ``LedgerFrame`` holds one row per ledger line as parallel NumPy columns: timestamps as
+int64 microseconds since the epoch, amounts as int64 minor units (the ledger stores two
+decimal places), and strings dictionary-encoded into int32 codes. Frames are loaded once,
+either from Postgres through a server-side cursor or from a snapshot written by
+``src.worker.ledger_export``; every query afterwards is pure array arithmetic and never
+touches the OLTP database.
+
+Loading snapshots needs pyarrow, from the optional ``analytics`` extra.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from sqlalchemy import BigInteger, SmallInteger, and_, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from src.application.reports import GRANULARITIES, REVENUE_ACCOUNT
+from src.infrastructure.db.models import LedgerEntry, LedgerLine, PaymentIntent
+
+AMOUNT_SCALE = 100  # ledger amounts are Numeric(18, 2)
+REFUND_ACCOUNT = "REFUND_EXPENSE"
+LOAD_BATCH_SIZE = 50_000
+
+_US_PER_DAY = 86_400_000_000
+
+
+@dataclass(frozen=True)
+class LedgerFrame:
+    posted_at: np.ndarray  # int64 µs since epoch, UTC
+    chain_seq: np.ndarray  # int64
+    sign: np.ndarray  # int8: +1 debit, -1 credit
+    amount: np.ndarray  # int64 minor units, always positive
+    account: np.ndarray  # int32 codes into ``accounts``
+    currency: np.ndarray  # int32 codes into ``currencies``
+    customer_ref: np.ndarray  # int32 codes into ``customer_refs``; "" for manual entries
+    accounts: tuple[str, ...]
+    currencies: tuple[str, ...]
+    customer_refs: tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def code(self, dictionary: str, value: str) -> int:
+        """Code of ``value`` in one of the dictionaries, or -1 when it never occurs."""
+        values: tuple[str, ...] = getattr(self, dictionary)
+        return values.index(value) if value in values else -1
+
+    def debits(self) -> np.ndarray:
+        return np.where(self.sign > 0, self.amount, 0)
+
+    def credits(self) -> np.ndarray:
+        return np.where(self.sign < 0, self.amount, 0)
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.codes: dict[str, int] = {}
+
+    def encode(self, values: Sequence[str]) -> np.ndarray:
+        codes = self.codes
+        return np.fromiter(
+            (codes.setdefault(v, len(codes)) for v in values), dtype=np.int32, count=len(values)
+        )
+
+    def values(self) -> tuple[str, ...]:
+        return tuple(self.codes)
+
+
+def load_frame(
+    session: Session,
+    tenant_id: str,
+    from_dt: Optional[datetime] = None,
+    to_dt: Optional[datetime] = None,
+    batch_size: int = LOAD_BATCH_SIZE,
+) -> LedgerFrame:
+    """Load ``[from_dt, to_dt)`` of the tenant's lines; conversions happen in SQL."""
+    q = (
+        select(
+            cast(func.extract("epoch", LedgerLine.posted_at) * 1_000_000, BigInteger),
+            LedgerEntry.chain_seq,
+            cast(case((LedgerLine.side == "DEBIT", 1), else_=-1), SmallInteger),
+            cast(LedgerLine.amount * AMOUNT_SCALE, BigInteger),
+            LedgerLine.account,
+            LedgerLine.currency,
+            func.coalesce(PaymentIntent.customer_ref, ""),
+        )
+        .join(
+            LedgerEntry,
+            and_(
+                LedgerEntry.id == LedgerLine.entry_id,
+                LedgerEntry.posted_at == LedgerLine.posted_at,
+            ),
+        )
+        .outerjoin(PaymentIntent, PaymentIntent.id == LedgerEntry.payment_intent_id)
+        .where(LedgerLine.tenant_id == tenant_id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    if from_dt is not None:
+        q = q.where(LedgerLine.posted_at >= from_dt)
+    if to_dt is not None:
+        q = q.where(LedgerLine.posted_at < to_dt)
+
+    accounts, currencies, customers = _Encoder(), _Encoder(), _Encoder()
+    chunks: list[tuple[np.ndarray, ...]] = []
+    with session.begin():
+        for rows in session.execute(q).partitions():
+            ts, seq, sign, amount, account, currency, customer = zip(*rows)
+            chunks.append(
+                (
+                    np.array(ts, dtype=np.int64),
+                    np.array(seq, dtype=np.int64),
+                    np.array(sign, dtype=np.int8),
+                    np.array(amount, dtype=np.int64),
+                    accounts.encode(account),
+                    currencies.encode(currency),
+                    customers.encode(customer),
+                )
+            )
+    dtypes = (np.int64, np.int64, np.int8, np.int64, np.int32, np.int32, np.int32)
+    columns = [
+        np.concatenate([c[i] for c in chunks]) if chunks else np.empty(0, dtype=dt)
+        for i, dt in enumerate(dtypes)
+    ]
+    return LedgerFrame(
+        posted_at=columns[0],
+        chain_seq=columns[1],
+        sign=columns[2],
+        amount=columns[3],
+        account=columns[4],
+        currency=columns[5],
+        customer_ref=columns[6],
+        accounts=accounts.values(),
+        currencies=currencies.values(),
+        customer_refs=customers.values(),
+    )
+
+
+def load_snapshot(root: Path, tenant_id: str) -> LedgerFrame:
+    """Load a tenant's lines from a ``src.worker.ledger_export`` Parquet snapshot."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    base = root / f"tenant_id={tenant_id}"
+    lines = pq.read_table(
+        base / "ledger_lines",
+        columns=["chain_seq", "posted_at", "side", "account", "amount", "currency"],
+    )
+    entries = pq.read_table(base / "ledger_entries", columns=["chain_seq", "customer_ref"])
+
+    def encode(col: Any) -> tuple[np.ndarray, tuple[str, ...]]:
+        values = pc.unique(col)
+        codes = pc.index_in(col, value_set=values).to_numpy(zero_copy_only=False)
+        return codes.astype(np.int32), tuple(values.to_pylist())
+
+    account, accounts = encode(lines["account"])
+    currency, currencies = encode(lines["currency"])
+    customer_ref, customer_refs = encode(pc.fill_null(entries["customer_ref"], ""))
+
+    # Lines carry their entry's chain_seq: map each line to its entry's customer_ref.
+    entry_seq = entries["chain_seq"].to_numpy()
+    order = np.argsort(entry_seq)
+    line_seq = lines["chain_seq"].to_numpy()
+    position = order[np.searchsorted(entry_seq[order], line_seq)]
+
+    minor = pc.multiply(lines["amount"], pa.scalar(Decimal(AMOUNT_SCALE)))
+    return LedgerFrame(
+        posted_at=lines["posted_at"].cast(pa.int64()).to_numpy(),
+        chain_seq=line_seq,
+        sign=np.where(
+            pc.equal(lines["side"], "DEBIT").to_numpy(zero_copy_only=False), 1, -1
+        ).astype(np.int8),
+        amount=pc.cast(minor, pa.int64()).to_numpy(),
+        account=account,
+        currency=currency,
+        customer_ref=customer_ref[position],
+        accounts=accounts,
+        currencies=currencies,
+        customer_refs=customer_refs,
+    )
+
+
+def time_bucket(posted_at: np.ndarray, granularity: str) -> np.ndarray:
+    """Start of the UTC day/ISO week/month of each timestamp, as ``datetime64[us]``."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"unsupported granularity {granularity}")
+    days = posted_at // _US_PER_DAY
+    if granularity == "week":
+        # 1970-01-01 was a Thursday; ISO weeks start on Monday.
+        days = days - (days + 3) % 7
+    elif granularity == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[us]")
+    return days.astype("datetime64[D]").astype("datetime64[us]")
+
+
+def group_sum(
+    keys: Sequence[np.ndarray], values: np.ndarray
+) -> tuple[list[np.ndarray], np.ndarray]:
+    """Sum integer ``values`` per distinct key tuple.
+
+    Each key column is factorized, the factors are combined into one int64 group id, and
+    the sums are accumulated with ``np.add.at`` so minor-unit totals stay exact. Returns the
+    key columns of each group (sorted) and the group sums.
+    """
+    uniques: list[np.ndarray] = []
+    group = np.zeros(len(values), dtype=np.int64)
+    for key in keys:
+        u, inverse = np.unique(key, return_inverse=True)
+        uniques.append(u)
+        group = group * max(len(u), 1) + inverse
+    ids, index = np.unique(group, return_inverse=True)
+    sums = np.zeros(len(ids), dtype=np.int64)
+    np.add.at(sums, index, values)
+
+    columns: list[np.ndarray] = []
+    rest = ids
+    for u in reversed(uniques):
+        columns.append(u[rest % max(len(u), 1)])
+        rest = rest // max(len(u), 1)
+    return columns[::-1], sums
+
+
+def _decode(codes: np.ndarray, values: tuple[str, ...]) -> list[str]:
+    return [values[c] for c in codes.tolist()]
+
+
+def _period(bucket: np.datetime64) -> datetime:
+    period: datetime = bucket.astype("datetime64[us]").item()
+    return period.replace(tzinfo=timezone.utc)
+
+
+def _sorted(rows: list[dict[str, Any]], *keys: str) -> list[dict[str, Any]]:
+    # Groups come out in code order; callers expect the SQL reports' string order.
+    return sorted(rows, key=lambda r: tuple(r[k] for k in keys))
+
+
+def revenue_by_period(frame: LedgerFrame, granularity: str = "month") -> list[dict[str, Any]]:
+    """Credits to the revenue account per (period, currency), like ``revenue_report``."""
+    mask = (frame.account == frame.code("accounts", REVENUE_ACCOUNT)) & (frame.sign < 0)
+    (bucket, currency), total = group_sum(
+        [time_bucket(frame.posted_at[mask], granularity), frame.currency[mask]],
+        frame.amount[mask],
+    )
+    rows = [
+        {"period": _period(b), "currency": c, "total": int(t)}
+        for b, c, t in zip(bucket, _decode(currency, frame.currencies), total)
+        if t
+    ]
+    return _sorted(rows, "period", "currency")
+
+
+def account_balances(frame: LedgerFrame) -> list[dict[str, Any]]:
+    """Debit/credit totals and credit-minus-debit balance per (account, currency)."""
+    keys = [frame.account, frame.currency]
+    (account, currency), debits = group_sum(keys, frame.debits())
+    _, credits = group_sum(keys, frame.credits())
+    rows = [
+        {"account": a, "currency": c, "debits": int(d), "credits": int(cr), "balance": int(cr - d)}
+        for a, c, d, cr in zip(
+            _decode(account, frame.accounts), _decode(currency, frame.currencies), debits, credits
+        )
+    ]
+    return _sorted(rows, "account", "currency")
+
+
+def revenue_by_customer_prefix(frame: LedgerFrame, prefix_len: int) -> list[dict[str, Any]]:
+    """Revenue per (customer_ref prefix, currency); manual entries fall under ""."""
+    mask = (frame.account == frame.code("accounts", REVENUE_ACCOUNT)) & (frame.sign < 0)
+    # Prefixes are computed on the (small) dictionary, then mapped onto the codes.
+    prefixes, prefix_of = np.unique(
+        np.array([ref[:prefix_len] for ref in frame.customer_refs] or [""], dtype=object),
+        return_inverse=True,
+    )
+    (prefix, currency), total = group_sum(
+        [prefix_of[frame.customer_ref[mask]], frame.currency[mask]], frame.amount[mask]
+    )
+    rows = [
+        {"prefix": str(prefixes[p]), "currency": c, "total": int(t)}
+        for p, c, t in zip(prefix, _decode(currency, frame.currencies), total)
+    ]
+    return _sorted(rows, "prefix", "currency")
+
+
+def refund_ratio_by_period(frame: LedgerFrame, granularity: str = "week") -> list[dict[str, Any]]:
+    """Refunded over captured amount per (period, currency)."""
+    revenue = (frame.account == frame.code("accounts", REVENUE_ACCOUNT)) & (frame.sign < 0)
+    refunds = (frame.account == frame.code("accounts", REFUND_ACCOUNT)) & (frame.sign > 0)
+    mask = revenue | refunds
+    keys = [time_bucket(frame.posted_at[mask], granularity), frame.currency[mask]]
+    (bucket, currency), captured = group_sum(keys, np.where(revenue[mask], frame.amount[mask], 0))
+    _, refunded = group_sum(keys, np.where(refunds[mask], frame.amount[mask], 0))
+    ratio = np.divide(
+        refunded, captured, out=np.zeros(len(captured), dtype=np.float64), where=captured > 0
+    )
+    rows = [
+        {
+            "period": _period(b),
+            "currency": c,
+            "captured": int(cap),
+            "refunded": int(ref),
+            "ratio": round(float(r), 6),
+        }
+        for b, c, cap, ref, r in zip(
+            bucket, _decode(currency, frame.currencies), captured, refunded, ratio
+        )
+    ]
+    return _sorted(rows, "period", "currency")
+
+
+def currency_mix(frame: LedgerFrame) -> list[dict[str, Any]]:
+    """Share of revenue lines and of revenue amount per currency.
+
+    Shares of amount compare minor units across currencies as-is; convert first when the
+    mix should be in a single currency.
+    """
+    mask = (frame.account == frame.code("accounts", REVENUE_ACCOUNT)) & (frame.sign < 0)
+    (currency,), total = group_sum([frame.currency[mask]], frame.amount[mask])
+    (_,), count = group_sum([frame.currency[mask]], np.ones(int(mask.sum()), dtype=np.int64))
+    grand, lines = int(total.sum()), int(count.sum())
+    rows = [
+        {
+            "currency": c,
+            "total": int(t),
+            "lines": int(n),
+            "amount_share": round(int(t) / grand, 6) if grand else 0.0,
+            "line_share": round(int(n) / lines, 6) if lines else 0.0,
+        }
+        for c, t, n in zip(_decode(currency, frame.currencies), total, count)
+    ]
+    return _sorted(rows, "currency")
+
+
+def running_balance(
+    frame: LedgerFrame, account: str, currency: str, granularity: str = "day"
+) -> list[dict[str, Any]]:
+    """Per-period net movement (credits minus debits) of one account and its running total."""
+    mask = (frame.account == frame.code("accounts", account)) & (
+        frame.currency == frame.code("currencies", currency)
+    )
+    (bucket,), net = group_sum(
+        [time_bucket(frame.posted_at[mask], granularity)],
+        -frame.sign[mask].astype(np.int64) * frame.amount[mask],
+    )
+    running = np.cumsum(net)
+    return [
+        {"period": _period(b), "net": int(n), "balance": int(r)}
+        for b, n, r in zip(bucket, net, running)
+    ]
+
+
+def from_minor(amount: int) -> Decimal:
+    return Decimal(amount).scaleb(-2)
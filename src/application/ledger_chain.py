@@ -0,0 +1,254 @@
+"""Per-tenant ledger hash chain: sealing at posting time and incremental verification.
+
+Every posting locks the tenant's ``ledger_chain_heads`` row, numbers the new entries and
+chains their hashes to the head. The verifier resumes from the tenant's last checkpoint and
+only rehashes entries posted since, so its cost follows new activity rather than history.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from decimal import Decimal
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, NamedTuple, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.domain.ledger_hash import GENESIS_HASH, LineTuple, compute_entry_hash
+from src.infrastructure.db.models import (
+    LedgerChainCheckpoint,
+    LedgerChainHead,
+    LedgerEntry,
+    LedgerLine,
+)
+from src.shared.logging import get_logger
+from src.shared.metrics import LEDGER_CHAIN_BREAKS_TOTAL, LEDGER_CHAIN_ENTRIES_VERIFIED_TOTAL
+
+log = get_logger(__name__)
+
+STREAM_BATCH_SIZE = 5000
+
+
+class ChainLink(NamedTuple):
+    chain_seq: int
+    prev_hash: str
+    entry_hash: str
+
+
+class ChainCheckOutcome(NamedTuple):
+    intact: bool
+    entries: int
+    last_seq: int
+    last_hash: str
+    broken_at_seq: int | None = None
+    reason: str | None = None
+
+
+class ChainVerificationDTO(BaseModel):
+    tenant_id: str
+    from_seq: int
+    to_seq: int
+    head_seq: int
+    entries_verified: int
+    intact: bool
+    broken_at_seq: int | None = None
+    reason: str | None = None
+    elapsed_seconds: float
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def lock_chain_head(session: Session, tenant_id: str) -> LedgerChainHead:
+    """Return the tenant's chain head locked FOR UPDATE, creating it on first use.
+
+    Must run inside the transaction that inserts the entries, so postings for one tenant are
+    numbered one after another and the head commits together with them.
+    """
+    session.execute(
+        pg_insert(LedgerChainHead)
+        .values(tenant_id=tenant_id, last_seq=0, last_hash=GENESIS_HASH, updated_at=_utcnow())
+        .on_conflict_do_nothing(index_elements=["tenant_id"])
+    )
+    return session.execute(
+        select(LedgerChainHead).where(LedgerChainHead.tenant_id == tenant_id).with_for_update()
+    ).scalar_one()
+
+
+def next_link(
+    head: LedgerChainHead,
+    entry_id: uuid.UUID,
+    posted_at: datetime,
+    payment_intent_id: Optional[uuid.UUID],
+    description: Optional[str],
+    lines: Iterable[LineTuple],
+) -> ChainLink:
+    """Hash the next entry onto ``head`` and advance it."""
+    seq = head.last_seq + 1
+    prev = head.last_hash
+    entry_hash = compute_entry_hash(
+        prev, head.tenant_id, seq, entry_id, posted_at, payment_intent_id, description, lines
+    )
+    head.last_seq = seq
+    head.last_hash = entry_hash
+    head.updated_at = _utcnow()
+    return ChainLink(seq, prev, entry_hash)
+
+
+def seal_entry(head: LedgerChainHead, entry: LedgerEntry) -> None:
+    """Assign chain fields to an ORM entry whose id, posted_at and lines are already set."""
+    link = next_link(
+        head,
+        entry.id,
+        entry.posted_at,
+        entry.payment_intent_id,
+        entry.description,
+        [(ln.side, ln.account, Decimal(ln.amount), ln.currency) for ln in entry.lines],
+    )
+    entry.chain_seq, entry.prev_hash, entry.entry_hash = link
+
+
+def verify_chain(session: Session, tenant_id: str, full: bool = False) -> ChainVerificationDTO:
+    """Rehash the tenant's entries after the last checkpoint (or from genesis when ``full``).
+
+    The checkpoint only advances when every new entry checks out and the walk ends exactly at
+    the chain head, which also catches entries deleted from the tail.
+    """
+    started = time.monotonic()
+    with session.begin():
+        # Read the head first: everything at or below it was committed with it.
+        head = session.execute(
+            select(LedgerChainHead.last_seq, LedgerChainHead.last_hash).where(
+                LedgerChainHead.tenant_id == tenant_id
+            )
+        ).first()
+        head_seq, head_hash = (head.last_seq, head.last_hash) if head else (0, GENESIS_HASH)
+
+        checkpoint = None
+        if not full:
+            checkpoint = session.execute(
+                select(LedgerChainCheckpoint.chain_seq, LedgerChainCheckpoint.entry_hash).where(
+                    LedgerChainCheckpoint.tenant_id == tenant_id
+                )
+            ).first()
+        from_seq, prev_hash = (
+            (checkpoint.chain_seq, checkpoint.entry_hash) if checkpoint else (0, GENESIS_HASH)
+        )
+
+        q = (
+            select(
+                LedgerEntry.chain_seq,
+                LedgerEntry.id,
+                LedgerEntry.posted_at,
+                LedgerEntry.payment_intent_id,
+                LedgerEntry.description,
+                LedgerEntry.prev_hash,
+                LedgerEntry.entry_hash,
+                LedgerLine.side,
+                LedgerLine.account,
+                LedgerLine.amount,
+                LedgerLine.currency,
+            )
+            .outerjoin(
+                LedgerLine,
+                and_(
+                    LedgerLine.entry_id == LedgerEntry.id,
+                    LedgerLine.posted_at == LedgerEntry.posted_at,
+                ),
+            )
+            .where(
+                LedgerEntry.tenant_id == tenant_id,
+                LedgerEntry.chain_seq > from_seq,
+                LedgerEntry.chain_seq <= head_seq,
+            )
+            .order_by(LedgerEntry.chain_seq)
+            .execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+        )
+        outcome = check_chain(tenant_id, from_seq, prev_hash, session.execute(q))
+        if outcome.intact and (outcome.last_seq, outcome.last_hash) != (head_seq, head_hash):
+            outcome = outcome._replace(
+                intact=False,
+                broken_at_seq=outcome.last_seq + 1,
+                reason="chain ends before the recorded head",
+            )
+
+        if outcome.intact and outcome.last_seq > from_seq:
+            stmt = pg_insert(LedgerChainCheckpoint).values(
+                tenant_id=tenant_id,
+                chain_seq=outcome.last_seq,
+                entry_hash=outcome.last_hash,
+                verified_at=_utcnow(),
+            )
+            session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["tenant_id"],
+                    set_={
+                        "chain_seq": stmt.excluded.chain_seq,
+                        "entry_hash": stmt.excluded.entry_hash,
+                        "verified_at": stmt.excluded.verified_at,
+                    },
+                )
+            )
+
+    LEDGER_CHAIN_ENTRIES_VERIFIED_TOTAL.inc(outcome.entries)
+    if not outcome.intact:
+        LEDGER_CHAIN_BREAKS_TOTAL.labels(tenant_id).inc()
+        log.warning(
+            "ledger hash chain broken",
+            extra={"tenant_id": tenant_id, "seq": outcome.broken_at_seq, "reason": outcome.reason},
+        )
+    return ChainVerificationDTO(
+        tenant_id=tenant_id,
+        from_seq=from_seq,
+        to_seq=outcome.last_seq,
+        head_seq=head_seq,
+        entries_verified=outcome.entries,
+        intact=outcome.intact,
+        broken_at_seq=outcome.broken_at_seq,
+        reason=outcome.reason,
+        elapsed_seconds=round(time.monotonic() - started, 3),
+    )
+
+
+def check_chain(
+    tenant_id: str, from_seq: int, prev_hash: str, rows: Iterable[Any]
+) -> ChainCheckOutcome:
+    """Walk entry/line rows ordered by chain_seq and stop at the first broken link.
+
+    Rows carry one line each; an entry without lines arrives as one row of NULL line columns.
+    """
+    last_seq, last_hash, entries = from_seq, prev_hash, 0
+    for seq, group in groupby(rows, key=attrgetter("chain_seq")):
+        rows_of_entry = list(group)
+        entry = rows_of_entry[0]
+        lines = [(r.side, r.account, r.amount, r.currency) for r in rows_of_entry if r.side]
+        reason = None
+        if seq != last_seq + 1:
+            reason = f"expected seq {last_seq + 1}, found {seq}"
+        elif any(r.id != entry.id for r in rows_of_entry):
+            reason = "several entries share this seq"
+        elif entry.prev_hash != last_hash:
+            reason = "prev_hash does not match the preceding entry"
+        elif entry.entry_hash != compute_entry_hash(
+            last_hash,
+            tenant_id,
+            seq,
+            entry.id,
+            entry.posted_at,
+            entry.payment_intent_id,
+            entry.description,
+            lines,
+        ):
+            reason = "entry content does not match its hash"
+        if reason:
+            return ChainCheckOutcome(False, entries, last_seq, last_hash, seq, reason)
+        last_seq, last_hash, entries = seq, entry.entry_hash, entries + 1
+    return ChainCheckOutcome(True, entries, last_seq, last_hash)
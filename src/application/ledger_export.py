@@ -0,0 +1,340 @@
+"""Columnar ledger export for analytics.
+
+Writes a tenant's ``ledger_entries`` and ``ledger_lines`` to Parquet (or Arrow IPC) files laid
+out as ``<out>/tenant_id=<id>/<table>/month=YYYY-MM/part-<first>-<last>.<ext>``. Rows are read
+through server-side cursors and written as record batches of at most ``batch_size`` rows, so
+memory stays bounded regardless of the range exported.
+
+Each run exports entries whose ``chain_seq`` lies between the tenant's export state and the
+chain head read at the start of the run, then advances the state file. The state file is only
+replaced after every part is in place, so an interrupted run is simply redone.
+
+pyarrow is an optional dependency (``pip install .[export]``) and is imported lazily.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from src.infrastructure.db.models import LedgerChainHead, LedgerEntry, LedgerLine, PaymentIntent
+from src.infrastructure.db.partitions import add_months
+from src.shared.logging import get_logger
+from src.shared.metrics import LEDGER_EXPORT_ROWS_TOTAL
+
+log = get_logger(__name__)
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+STATE_FILE = "_export_state.json"
+EXPORT_BATCH_SIZE = 50_000
+
+ENTRY_COLUMNS = (
+    "id",
+    "chain_seq",
+    "posted_at",
+    "payment_intent_id",
+    "customer_ref",
+    "description",
+    "prev_hash",
+    "entry_hash",
+)
+LINE_COLUMNS = ("id", "entry_id", "chain_seq", "posted_at", "side", "account", "amount", "currency")
+
+
+class LedgerExportDTO(BaseModel):
+    tenant_id: str
+    format: str
+    from_seq: int
+    to_seq: int
+    entries: int
+    lines: int
+    files: list[str]
+    elapsed_seconds: float
+
+
+def _require_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise RuntimeError(
+            "ledger export requires pyarrow; install it with `pip install .[export]`"
+        ) from exc
+    return pyarrow
+
+
+def _schemas(pa: Any) -> dict[str, Any]:
+    ts = pa.timestamp("us", tz="UTC")
+    return {
+        "ledger_entries": pa.schema(
+            [
+                ("id", pa.string()),
+                ("chain_seq", pa.int64()),
+                ("posted_at", ts),
+                ("payment_intent_id", pa.string()),
+                ("customer_ref", pa.string()),
+                ("description", pa.string()),
+                ("prev_hash", pa.string()),
+                ("entry_hash", pa.string()),
+            ]
+        ),
+        "ledger_lines": pa.schema(
+            [
+                ("id", pa.string()),
+                ("entry_id", pa.string()),
+                ("chain_seq", pa.int64()),
+                ("posted_at", ts),
+                ("side", pa.string()),
+                ("account", pa.string()),
+                ("amount", pa.decimal128(18, 2)),
+                ("currency", pa.string()),
+            ]
+        ),
+    }
+
+
+def month_key(posted_at: datetime) -> str:
+    return posted_at.astimezone(timezone.utc).strftime("%Y-%m")
+
+
+def tenant_dir(out_dir: Path, tenant_id: str) -> Path:
+    return out_dir / f"tenant_id={tenant_id}"
+
+
+def read_state(directory: Path) -> dict[str, Any]:
+    path = directory / STATE_FILE
+    if not path.exists():
+        return {"last_chain_seq": 0, "from": None, "to": None}
+    state: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    return state
+
+
+def write_state(directory: Path, state: dict[str, Any]) -> None:
+    """Replace the state file atomically so a crash never leaves it half-written."""
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f"{STATE_FILE}.tmp"
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, directory / STATE_FILE)
+
+
+def group_by_month(
+    rows: Sequence[Sequence[Any]], columns: Sequence[str]
+) -> dict[str, dict[str, list[Any]]]:
+    """Pivot rows into per-month column lists, stringifying UUIDs for the Arrow schema."""
+    posted_idx = columns.index("posted_at")
+    out: dict[str, dict[str, list[Any]]] = {}
+    for row in rows:
+        cols = out.setdefault(month_key(row[posted_idx]), {c: [] for c in columns})
+        for name, value in zip(columns, row):
+            if name in ("id", "entry_id", "payment_intent_id") and value is not None:
+                value = str(value)
+            cols[name].append(value)
+    return out
+
+
+class _MonthWriters:
+    """One open writer per (table, month); parts are renamed into place on close."""
+
+    def __init__(
+        self, pa: Any, root: Path, table: str, fmt: str, first_seq: int, last_seq: int
+    ) -> None:
+        self._pa = pa
+        self._root = root / table
+        self._schema = _schemas(pa)[table]
+        self._fmt = fmt
+        self._name = f"part-{first_seq:012d}-{last_seq:012d}{EXPORT_FORMATS[fmt]}"
+        self._writers: dict[str, tuple[Any, Path, Path]] = {}
+
+    def _open(self, month: str) -> Any:
+        directory = self._root / f"month={month}"
+        directory.mkdir(parents=True, exist_ok=True)
+        final = directory / self._name
+        tmp = directory / f"{self._name}.tmp"
+        if self._fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            writer = pq.ParquetWriter(str(tmp), self._schema, compression="zstd")
+        else:
+            writer = self._pa.ipc.new_file(str(tmp), self._schema)
+        self._writers[month] = (writer, tmp, final)
+        return writer
+
+    def write(self, month: str, columns: dict[str, list[Any]]) -> None:
+        entry = self._writers.get(month)
+        writer = entry[0] if entry else self._open(month)
+        writer.write_batch(self._pa.RecordBatch.from_pydict(columns, schema=self._schema))
+
+    def close(self) -> list[Path]:
+        finished: list[Path] = []
+        for writer, tmp, final in self._writers.values():
+            writer.close()
+            os.replace(tmp, final)
+            finished.append(final)
+        self._writers.clear()
+        return finished
+
+    def abort(self) -> None:
+        for writer, tmp, _ in self._writers.values():
+            try:
+                writer.close()
+            finally:
+                tmp.unlink(missing_ok=True)
+        self._writers.clear()
+
+
+def _stream(
+    session: Session, q: Any, columns: Sequence[str], batch_size: int
+) -> Iterable[dict[str, dict[str, list[Any]]]]:
+    result = session.execute(q.execution_options(stream_results=True, yield_per=batch_size))
+    for rows in result.partitions():
+        yield group_by_month(rows, columns)
+
+
+def _range_filter(from_month: Optional[date], to_month: Optional[date]) -> list[Any]:
+    conds: list[Any] = []
+    if from_month is not None:
+        conds.append(
+            LedgerEntry.posted_at
+            >= datetime(from_month.year, from_month.month, 1, tzinfo=timezone.utc)
+        )
+    if to_month is not None:
+        end = add_months(to_month, 1)
+        conds.append(LedgerEntry.posted_at < datetime(end.year, end.month, 1, tzinfo=timezone.utc))
+    return conds
+
+
+def export_ledger(
+    session: Session,
+    tenant_id: str,
+    out_dir: Path,
+    fmt: str = "parquet",
+    from_month: Optional[date] = None,
+    to_month: Optional[date] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> LedgerExportDTO:
+    """Export everything posted since the previous run into month-partitioned files.
+
+    The optional month range restricts what is written and is recorded in the state file;
+    resuming with a different range would leave gaps, so it is rejected.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format {fmt}")
+    pa = _require_pyarrow()
+    started = time.monotonic()
+    root = tenant_dir(out_dir, tenant_id)
+    state = read_state(root)
+    rng = {
+        "from": from_month.strftime("%Y-%m") if from_month else None,
+        "to": to_month.strftime("%Y-%m") if to_month else None,
+    }
+    if state["last_chain_seq"] and (state["from"], state["to"]) != (rng["from"], rng["to"]):
+        raise ValueError(
+            f"{root} was exported for range {state['from']}..{state['to']}; "
+            "use a separate output directory for a different range"
+        )
+    from_seq = int(state["last_chain_seq"])
+
+    with session.begin():
+        head_seq = (
+            session.execute(
+                select(LedgerChainHead.last_seq).where(LedgerChainHead.tenant_id == tenant_id)
+            ).scalar()
+            or 0
+        )
+    if head_seq <= from_seq:
+        return LedgerExportDTO(
+            tenant_id=tenant_id,
+            format=fmt,
+            from_seq=from_seq,
+            to_seq=from_seq,
+            entries=0,
+            lines=0,
+            files=[],
+            elapsed_seconds=round(time.monotonic() - started, 3),
+        )
+
+    seq_filter = [
+        LedgerEntry.tenant_id == tenant_id,
+        LedgerEntry.chain_seq > from_seq,
+        LedgerEntry.chain_seq <= head_seq,
+        *_range_filter(from_month, to_month),
+    ]
+    entries_q = (
+        select(
+            LedgerEntry.id,
+            LedgerEntry.chain_seq,
+            LedgerEntry.posted_at,
+            LedgerEntry.payment_intent_id,
+            PaymentIntent.customer_ref,
+            LedgerEntry.description,
+            LedgerEntry.prev_hash,
+            LedgerEntry.entry_hash,
+        )
+        .outerjoin(PaymentIntent, PaymentIntent.id == LedgerEntry.payment_intent_id)
+        .where(*seq_filter)
+        .order_by(LedgerEntry.chain_seq)
+    )
+    lines_q = (
+        select(
+            LedgerLine.id,
+            LedgerLine.entry_id,
+            LedgerEntry.chain_seq,
+            LedgerLine.posted_at,
+            LedgerLine.side,
+            LedgerLine.account,
+            LedgerLine.amount,
+            LedgerLine.currency,
+        )
+        .join(
+            LedgerEntry,
+            and_(
+                LedgerLine.entry_id == LedgerEntry.id,
+                LedgerLine.posted_at == LedgerEntry.posted_at,
+            ),
+        )
+        .where(*seq_filter)
+        .order_by(LedgerEntry.chain_seq)
+    )
+
+    files: list[Path] = []
+    counts = {"ledger_entries": 0, "ledger_lines": 0}
+    for table, q, columns in (
+        ("ledger_entries", entries_q, ENTRY_COLUMNS),
+        ("ledger_lines", lines_q, LINE_COLUMNS),
+    ):
+        writers = _MonthWriters(pa, root, table, fmt, from_seq + 1, head_seq)
+        try:
+            with session.begin():
+                for months in _stream(session, q, columns, batch_size):
+                    for month, cols in months.items():
+                        writers.write(month, cols)
+                        counts[table] += len(cols["id"])
+        except BaseException:
+            writers.abort()
+            raise
+        files.extend(writers.close())
+        LEDGER_EXPORT_ROWS_TOTAL.labels(table).inc(counts[table])
+
+    write_state(root, {"last_chain_seq": head_seq, **rng})
+    log.info(
+        "ledger export finished",
+        extra={"tenant_id": tenant_id, "to_seq": head_seq, "files": len(files)},
+    )
+    return LedgerExportDTO(
+        tenant_id=tenant_id,
+        format=fmt,
+        from_seq=from_seq,
+        to_seq=head_seq,
+        entries=counts["ledger_entries"],
+        lines=counts["ledger_lines"],
+        files=[str(p.relative_to(out_dir)) for p in files],
+        elapsed_seconds=round(time.monotonic() - started, 3),
+    )
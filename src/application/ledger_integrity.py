@@ -0,0 +1,402 @@
+"""Full-ledger integrity verification.
+
+Work is split into (tenant, month) units that line up with the ledger partitions. Each unit
+streams its lines through a server-side cursor ordered by entry and checks that every entry
+balances per currency. The same unit then compares its ``ledger_daily_rollups`` days with the
+lines folded into them (entries up to the tenant's rollup watermark), and ``verify_ledger``
+checks each tenant's ``tenant_revenue_totals`` against its rollups. Units are spread across a
+process pool by ``verify_ledger``.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Optional, cast
+
+from pydantic import BaseModel
+from sqlalchemy import Date, and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from src.infrastructure.db.models import (
+    LedgerDailyRollup,
+    LedgerEntry,
+    LedgerLine,
+    LedgerRollupWatermark,
+    TenantRevenueTotal,
+)
+from src.infrastructure.db.partitions import add_months, month_start, partitions_between
+from src.shared.config import Settings
+from src.shared.logging import get_logger
+from src.shared.metrics import LEDGER_VERIFY_LINES_PER_SECOND, LEDGER_VERIFY_VIOLATIONS_TOTAL
+
+log = get_logger(__name__)
+
+STREAM_BATCH_SIZE = 5000
+MAX_REPORTED_VIOLATIONS = 1000
+
+
+class LedgerViolationDTO(BaseModel):
+    tenant_id: str
+    kind: str
+    entry_id: str | None
+    detail: str
+
+
+class LedgerIntegrityReportDTO(BaseModel):
+    tenants: int
+    units: int
+    entries_checked: int
+    lines_checked: int
+    violation_count: int
+    violations_by_kind: dict[str, int]
+    violations: list[LedgerViolationDTO]
+    elapsed_seconds: float
+    lines_per_second: float
+
+
+@dataclass
+class _UnitResult:
+    entries: int = 0
+    lines: int = 0
+    violation_count: int = 0
+    by_kind: dict[str, int] = field(default_factory=dict)
+    violations: list[LedgerViolationDTO] = field(default_factory=list)
+
+    def add(self, v: LedgerViolationDTO) -> None:
+        self.violation_count += 1
+        self.by_kind[v.kind] = self.by_kind.get(v.kind, 0) + 1
+        if len(self.violations) < MAX_REPORTED_VIOLATIONS:
+            self.violations.append(v)
+
+    def merge(self, other: _UnitResult) -> None:
+        self.entries += other.entries
+        self.lines += other.lines
+        self.violation_count += other.violation_count
+        for kind, n in other.by_kind.items():
+            self.by_kind[kind] = self.by_kind.get(kind, 0) + n
+        room = MAX_REPORTED_VIOLATIONS - len(self.violations)
+        self.violations.extend(other.violations[: max(0, room)])
+
+
+# (entry_id, side, amount, currency); the line columns are NULL for an entry without lines.
+_LineRow = tuple[uuid.UUID, Optional[str], Optional[Decimal], Optional[str]]
+
+
+def check_entries(tenant_id: str, rows: Iterable[_LineRow]) -> _UnitResult:
+    """Check (entry_id, side, amount, currency) rows sorted by entry_id.
+
+    An entry with no lines arrives as a single row of NULLs from the outer join.
+    """
+    result = _UnitResult()
+    current: uuid.UUID | None = None
+    net: dict[str, Decimal] = {}
+    has_lines = False
+
+    def _close() -> None:
+        if current is None:
+            return
+        result.entries += 1
+        if not has_lines:
+            result.add(_violation(tenant_id, "EMPTY_ENTRY", current, "entry has no lines"))
+        for currency, diff in net.items():
+            if diff != 0:
+                result.add(
+                    _violation(
+                        tenant_id, "UNBALANCED_ENTRY", current, f"{currency} debits-credits={diff}"
+                    )
+                )
+
+    for entry_id, side, amount, currency in rows:
+        if entry_id != current:
+            _close()
+            current, net, has_lines = entry_id, {}, False
+        if side is None:
+            continue
+        has_lines = True
+        result.lines += 1
+        if side not in ("DEBIT", "CREDIT") or amount is None or amount <= 0:
+            result.add(
+                _violation(tenant_id, "INVALID_LINE", entry_id, f"side={side} amount={amount}")
+            )
+            continue
+        key = currency or ""
+        net[key] = net.get(key, Decimal(0)) + (amount if side == "DEBIT" else -amount)
+    _close()
+    return result
+
+
+def _month_bounds(month: date) -> tuple[datetime, datetime]:
+    end_month = add_months(month, 1)
+    return (
+        datetime(month.year, month.month, 1, tzinfo=timezone.utc),
+        datetime(end_month.year, end_month.month, 1, tzinfo=timezone.utc),
+    )
+
+
+def verify_unit(session: Session, tenant_id: str, month: date) -> _UnitResult:
+    start, end = _month_bounds(month)
+    q = (
+        select(LedgerEntry.id, LedgerLine.side, LedgerLine.amount, LedgerLine.currency)
+        .outerjoin(
+            LedgerLine,
+            and_(
+                LedgerLine.entry_id == LedgerEntry.id,
+                LedgerLine.posted_at == LedgerEntry.posted_at,
+            ),
+        )
+        .where(
+            LedgerEntry.tenant_id == tenant_id,
+            LedgerEntry.posted_at >= start,
+            LedgerEntry.posted_at < end,
+        )
+        .order_by(LedgerEntry.id)
+        .execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+    )
+    result = check_entries(tenant_id, cast(Iterable[_LineRow], session.execute(q).tuples()))
+    result.merge(check_rollups(session, tenant_id, month))
+    return result
+
+
+def check_rollups(session: Session, tenant_id: str, month: date) -> _UnitResult:
+    """Rollup days of the month that disagree with the lines folded into them.
+
+    Only entries up to the watermark are counted; the watermark is read in the same statement
+    as both sides, so a concurrent refresh cannot show up as a mismatch.
+    """
+    result = _UnitResult()
+    watermark = (
+        select(LedgerRollupWatermark.last_chain_seq)
+        .where(LedgerRollupWatermark.tenant_id == tenant_id)
+        .scalar_subquery()
+    )
+    if session.execute(select(watermark)).scalar() is None:
+        return result  # rollups not built (or a backfill is still running)
+
+    start, end = _month_bounds(month)
+    day = func.timezone("UTC", LedgerLine.posted_at).cast(Date)
+    lines = (
+        select(
+            day.label("day"),
+            LedgerLine.account,
+            LedgerLine.currency,
+            func.sum(case((LedgerLine.side == "DEBIT", LedgerLine.amount), else_=Decimal(0))).label(
+                "debits"
+            ),
+            func.sum(
+                case((LedgerLine.side == "CREDIT", LedgerLine.amount), else_=Decimal(0))
+            ).label("credits"),
+        )
+        .join(
+            LedgerEntry,
+            and_(
+                LedgerEntry.id == LedgerLine.entry_id,
+                LedgerEntry.posted_at == LedgerLine.posted_at,
+            ),
+        )
+        .where(
+            LedgerLine.tenant_id == tenant_id,
+            LedgerLine.posted_at >= start,
+            LedgerLine.posted_at < end,
+            LedgerEntry.tenant_id == tenant_id,
+            LedgerEntry.posted_at >= start,
+            LedgerEntry.posted_at < end,
+            LedgerEntry.chain_seq <= watermark,
+        )
+        .group_by(day, LedgerLine.account, LedgerLine.currency)
+        .subquery()
+    )
+    r = LedgerDailyRollup
+    rollups = (
+        select(r.day, r.account, r.currency, r.debits_total, r.credits_total)
+        .where(r.tenant_id == tenant_id, r.day >= month, r.day < add_months(month, 1))
+        .subquery()
+    )
+    zero = Decimal(0)
+    q = (
+        select(
+            func.coalesce(lines.c.day, rollups.c.day).label("day"),
+            func.coalesce(lines.c.account, rollups.c.account).label("account"),
+            func.coalesce(lines.c.currency, rollups.c.currency).label("currency"),
+            func.coalesce(lines.c.debits, zero),
+            func.coalesce(lines.c.credits, zero),
+            func.coalesce(rollups.c.debits_total, zero),
+            func.coalesce(rollups.c.credits_total, zero),
+        )
+        .select_from(
+            lines.join(
+                rollups,
+                and_(
+                    lines.c.day == rollups.c.day,
+                    lines.c.account == rollups.c.account,
+                    lines.c.currency == rollups.c.currency,
+                ),
+                full=True,
+            )
+        )
+        .where(
+            or_(
+                func.coalesce(lines.c.debits, zero) != func.coalesce(rollups.c.debits_total, zero),
+                func.coalesce(lines.c.credits, zero)
+                != func.coalesce(rollups.c.credits_total, zero),
+            )
+        )
+        .order_by("day", "account", "currency")
+    )
+    for d, account, currency, debits, credits, r_debits, r_credits in session.execute(q).all():
+        result.add(
+            _violation(
+                tenant_id,
+                "ROLLUP_MISMATCH",
+                None,
+                f"{d} {account} {currency} rollup debits={r_debits} credits={r_credits}, "
+                f"lines debits={debits} credits={credits}",
+            )
+        )
+    return result
+
+
+def check_tenant_totals(session: Session, tenant_id: str) -> _UnitResult:
+    """Currencies whose ``tenant_revenue_totals`` row disagrees with the REVENUE rollups."""
+    from src.application.reports import REVENUE_ACCOUNT
+
+    result = _UnitResult()
+    r, t = LedgerDailyRollup, TenantRevenueTotal
+    expected = (
+        select(r.currency, func.sum(r.credits_total).label("total"))
+        .where(r.tenant_id == tenant_id, r.account == REVENUE_ACCOUNT)
+        .group_by(r.currency)
+        .subquery()
+    )
+    totals = select(t.currency, t.total).where(t.tenant_id == tenant_id).subquery()
+    zero = Decimal(0)
+    q = (
+        select(
+            func.coalesce(expected.c.currency, totals.c.currency).label("currency"),
+            func.coalesce(expected.c.total, zero),
+            func.coalesce(totals.c.total, zero),
+        )
+        .select_from(expected.join(totals, expected.c.currency == totals.c.currency, full=True))
+        .where(func.coalesce(expected.c.total, zero) != func.coalesce(totals.c.total, zero))
+        .order_by("currency")
+    )
+    for currency, rollup_total, total in session.execute(q).all():
+        result.add(
+            _violation(
+                tenant_id,
+                "TENANT_TOTAL_MISMATCH",
+                None,
+                f"{currency} tenant total={total}, rollups={rollup_total}",
+            )
+        )
+    return result
+
+
+def _verify_unit_in_worker(tenant_id: str, month: date) -> _UnitResult:
+    from src.infrastructure.db.session import session_scope
+
+    with session_scope() as session:
+        return verify_unit(session, tenant_id, month)
+
+
+def _init_worker(settings: Settings) -> None:
+    from src.infrastructure.db.session import init_db
+
+    init_db(settings)
+
+
+def list_units(
+    session: Session,
+    tenant_ids: list[str] | None,
+    from_month: date | None = None,
+    to_month: date | None = None,
+) -> list[tuple[str, date]]:
+    """(tenant, month) units from each tenant's first to last posting month, clipped to bounds.
+
+    Both ends come from the tenant's own entries, so future-dated journal entries are covered
+    and tenants that started late get no empty leading units.
+    """
+    q = select(
+        LedgerEntry.tenant_id, func.min(LedgerEntry.posted_at), func.max(LedgerEntry.posted_at)
+    ).group_by(LedgerEntry.tenant_id)
+    if tenant_ids is not None:
+        q = q.where(LedgerEntry.tenant_id.in_(tenant_ids))
+    units: list[tuple[str, date]] = []
+    for tenant_id, oldest, newest in session.execute(q.order_by(LedgerEntry.tenant_id)).all():
+        first = max(month_start(oldest), from_month or date.min)
+        last = min(month_start(newest), to_month or date.max)
+        units.extend(
+            (tenant_id, p.start) for p in partitions_between("ledger_entries", first, last)
+        )
+    return units
+
+
+def verify_ledger(
+    session: Session,
+    settings: Settings,
+    tenant_ids: list[str] | None = None,
+    workers: int = 1,
+    from_month: date | None = None,
+    to_month: date | None = None,
+) -> LedgerIntegrityReportDTO:
+    """Verify every (tenant, month) unit, in-process or across ``workers`` processes.
+
+    Rollup and tenant-total mismatches are reported with the line checks, as their own kinds.
+    """
+    units = list_units(session, tenant_ids, from_month, to_month)
+    started = time.monotonic()
+    if workers <= 1:
+        results = [verify_unit(session, t, m) for t, m in units]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(settings,)
+        ) as pool:
+            results = list(pool.map(_verify_unit_in_worker, *zip(*units))) if units else []
+
+    merged = _UnitResult()
+    for r in results:
+        merged.merge(r)
+    for tenant_id in sorted({t for t, _ in units}):
+        merged.merge(check_tenant_totals(session, tenant_id))
+    elapsed = time.monotonic() - started
+    throughput = merged.lines / elapsed if elapsed > 0 else 0.0
+
+    LEDGER_VERIFY_LINES_PER_SECOND.set(throughput)
+    for kind, n in merged.by_kind.items():
+        LEDGER_VERIFY_VIOLATIONS_TOTAL.labels(kind).inc(n)
+    log.info(
+        "ledger verification finished",
+        extra={
+            "units": len(units),
+            "lines": merged.lines,
+            "violations": merged.violation_count,
+            "lines_per_second": round(throughput, 1),
+        },
+    )
+    return LedgerIntegrityReportDTO(
+        tenants=len({t for t, _ in units}),
+        units=len(units),
+        entries_checked=merged.entries,
+        lines_checked=merged.lines,
+        violation_count=merged.violation_count,
+        violations_by_kind=merged.by_kind,
+        violations=merged.violations,
+        elapsed_seconds=round(elapsed, 3),
+        lines_per_second=round(throughput, 1),
+    )
+
+
+def _violation(
+    tenant_id: str, kind: str, entry_id: uuid.UUID | None, detail: str
+) -> LedgerViolationDTO:
+    return LedgerViolationDTO(
+        tenant_id=tenant_id,
+        kind=kind,
+        entry_id=str(entry_id) if entry_id else None,
+        detail=detail,
+    )
@@ -1,22 +1,109 @@
 from __future__ import annotations
 
+import asyncio
+import time
 import uuid
+from collections.abc import Coroutine
 from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
 
-from pydantic import BaseModel
-from sqlalchemy import select
+from pydantic import BaseModel, Field
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 
-from src.infrastructure.db.models import AccountConfig, LedgerEntry, LedgerLine, OutboxEvent, PaymentIntent
-from src.shared.metrics import PAYMENT_INTENTS_CONFIRMED_TOTAL, PAYMENT_INTENTS_CREATED_TOTAL
+from src.application.account_cache import resolve_account
+from src.application.ledger_chain import lock_chain_head, seal_entry
+from src.application.ports.payment_gateway import (
+    GatewayResult,
+    GatewayStatus,
+    PaymentGatewayPort,
+)
+from src.domain.money import SUPPORTED_CURRENCIES, quantize_amount
+from src.infrastructure.db.models import LedgerEntry, LedgerLine, OutboxEvent, PaymentIntent
+from src.infrastructure.redis.response_cache import invalidate_tenant_cache
+from src.shared.logging import get_logger
+from src.shared.metrics import (
+    GATEWAY_REQUEST_DURATION_SECONDS,
+    GATEWAY_REQUESTS_TOTAL,
+    PAYMENT_INTENTS_CONFIRMED_TOTAL,
+    PAYMENT_INTENTS_CREATED_TOTAL,
+)
 from src.shared.problem import http_problem
 from src.shared.correlation import get_correlation_id
 
+log = get_logger(__name__)
+
+
+# Upper bound for POST /v1/payment-intents:batch; larger invoice runs are split client-side.
+PAYMENT_INTENT_BATCH_MAX_ITEMS = 1000
+
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+class GatewayUnavailableError(RuntimeError):
+    pass
+
+
+def _gateway_call(operation: str, call: Coroutine[Any, Any, GatewayResult]) -> GatewayResult:
+    """Run one gateway call from sync code; an exception comes back as a retryable failure."""
+    started = time.perf_counter()
+    try:
+        result = asyncio.run(call)
+    except Exception as exc:
+        log.warning("gateway call error", extra={"operation": operation, "error": str(exc)})
+        result = GatewayResult(
+            success=False,
+            gateway_ref="",
+            status=GatewayStatus.FAILED,
+            error_code="gateway_error",
+            error_message=str(exc),
+            is_retryable=True,
+        )
+    finally:
+        GATEWAY_REQUEST_DURATION_SECONDS.labels(operation).observe(time.perf_counter() - started)
+    GATEWAY_REQUESTS_TOTAL.labels(operation, "success" if result.success else "failed").inc()
+    return result
+
+
+def authorize_payment(
+    gateway: PaymentGatewayPort,
+    tenant_id: str,
+    amount: Decimal,
+    currency: str,
+    customer_ref: str,
+    idempotency_key: str,
+) -> GatewayResult:
+    return _gateway_call(
+        "authorize", gateway.authorize(tenant_id, amount, currency, customer_ref, idempotency_key)
+    )
+
+
+def payment_failed_event(pi: PaymentIntent, result: GatewayResult) -> OutboxEvent:
+    """``payment.failed`` for an intent the gateway declined; carries the order like settle."""
+    order_id = ""
+    if pi.customer_ref.startswith("order:"):
+        order_id = pi.customer_ref.removeprefix("order:").strip()
+    return OutboxEvent(
+        tenant_id=pi.tenant_id,
+        event_type="payment.failed",
+        aggregate_type="PaymentIntent",
+        aggregate_id=str(pi.id),
+        payload={
+            "order_id": order_id,
+            "tenant_id": pi.tenant_id,
+            "payment_intent_id": str(pi.id),
+            "amount": str(pi.amount),
+            "currency": pi.currency,
+            "customer_ref": pi.customer_ref,
+            "error_code": result.error_code,
+            "correlation_id": get_correlation_id(),
+        },
+    )
+
+
 class PaymentIntentDTO(BaseModel):
     id: str
     amount: str
@@ -28,14 +115,26 @@ class PaymentIntentDTO(BaseModel):
     updated_at: str
 
 
-def _resolve_account(session: Session, tenant_id: str, code: str) -> str:
-    cfg = session.execute(
-        select(AccountConfig).where(
-            AccountConfig.tenant_id == tenant_id,
-            AccountConfig.code == code,
-        )
-    ).scalar_one_or_none()
-    return cfg.code if cfg else code
+class PaymentIntentItemInput(BaseModel):
+    idempotency_key: str = Field(min_length=1, max_length=128)
+    amount: Decimal
+    currency: str = Field(min_length=3, max_length=8)
+    customer_ref: str = Field(min_length=1, max_length=128)
+
+
+class PaymentIntentBatchItemResult(BaseModel):
+    idempotency_key: str
+    # 201 created, 200 replayed from an earlier request or item with the same key, 400 invalid
+    status: int
+    payment_intent: PaymentIntentDTO | None = None
+    error: str | None = None
+
+
+class PaymentIntentBatchResultDTO(BaseModel):
+    created: int
+    replayed: int
+    rejected: int
+    items: list[PaymentIntentBatchItemResult]
 
 
 def create_payment_intent(
@@ -43,7 +142,7 @@ def create_payment_intent(
 ) -> PaymentIntentDTO:
     if amount <= 0:
         raise http_problem(400, "Bad Request", "amount must be > 0", instance="/v1/payment-intents")
-    if currency not in ("BRL", "USD", "EUR"):
+    if currency not in SUPPORTED_CURRENCIES:
         raise http_problem(
             400, "Bad Request", "unsupported currency", instance="/v1/payment-intents"
         )
@@ -82,6 +181,114 @@ def create_payment_intent(
     return _to_dto(pi)
 
 
+def create_payment_intents_batch(
+    session: Session,
+    tenant_id: str,
+    items: list[PaymentIntentItemInput],
+    replayed: dict[str, PaymentIntentDTO],
+) -> PaymentIntentBatchResultDTO:
+    """Create many intents with one INSERT for intents and one for their outbox events.
+
+    ``replayed`` maps idempotency keys already answered by earlier requests to their stored
+    result; those items, and repeats of a key within the batch, return the existing intent.
+    """
+    instance = "/v1/payment-intents:batch"
+    if not items:
+        raise http_problem(400, "Bad Request", "items must not be empty", instance=instance)
+    if len(items) > PAYMENT_INTENT_BATCH_MAX_ITEMS:
+        raise http_problem(
+            400,
+            "Bad Request",
+            f"at most {PAYMENT_INTENT_BATCH_MAX_ITEMS} items per batch",
+            instance=instance,
+        )
+
+    now = _utcnow()
+    correlation_id = get_correlation_id()
+    seen = dict(replayed)
+    results: list[PaymentIntentBatchItemResult] = []
+    intent_rows: list[dict[str, object]] = []
+    event_rows: list[dict[str, object]] = []
+    for item in items:
+        key = item.idempotency_key
+        if key in seen:
+            results.append(
+                PaymentIntentBatchItemResult(
+                    idempotency_key=key, status=200, payment_intent=seen[key]
+                )
+            )
+            continue
+        if item.amount <= 0:
+            error = "amount must be > 0"
+        elif item.currency not in SUPPORTED_CURRENCIES:
+            error = "unsupported currency"
+        else:
+            error = None
+        if error:
+            results.append(
+                PaymentIntentBatchItemResult(idempotency_key=key, status=400, error=error)
+            )
+            continue
+
+        pid = uuid.uuid4()
+        # The DTO shows the amount as stored, the same as a later GET returns it.
+        amount = quantize_amount(item.amount)
+        intent_rows.append(
+            {
+                "id": pid,
+                "tenant_id": tenant_id,
+                "amount": amount,
+                "currency": item.currency,
+                "status": "CREATED",
+                "customer_ref": item.customer_ref,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        event_rows.append(
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant_id,
+                "event_type": "payment.intent.created",
+                "aggregate_type": "PaymentIntent",
+                "aggregate_id": str(pid),
+                "payload": {
+                    "payment_intent_id": str(pid),
+                    "amount": str(amount),
+                    "currency": item.currency,
+                    "customer_ref": item.customer_ref,
+                    "correlation_id": correlation_id,
+                },
+            }
+        )
+        seen[key] = PaymentIntentDTO(
+            id=str(pid),
+            amount=str(amount),
+            currency=item.currency,
+            status="CREATED",
+            customer_ref=item.customer_ref,
+            created_at=now.isoformat(),
+            updated_at=now.isoformat(),
+        )
+        results.append(
+            PaymentIntentBatchItemResult(idempotency_key=key, status=201, payment_intent=seen[key])
+        )
+
+    if intent_rows:
+        with session.begin():
+            # executemany over insert() is sent as multi-row INSERT ... VALUES pages.
+            session.execute(insert(PaymentIntent), intent_rows)
+            session.execute(insert(OutboxEvent), event_rows)
+        PAYMENT_INTENTS_CREATED_TOTAL.labels(tenant_id).inc(len(intent_rows))
+
+    return PaymentIntentBatchResultDTO(
+        created=len(intent_rows),
+        replayed=sum(r.status == 200 for r in results),
+        rejected=sum(r.status == 400 for r in results),
+        items=results,
+    )
+
+
 def _to_dto(pi: PaymentIntent) -> PaymentIntentDTO:
     return PaymentIntentDTO(
         id=str(pi.id),
@@ -106,7 +313,10 @@ def get_payment_intent(session: Session, tenant_id: str, pid: uuid.UUID) -> Paym
     return _to_dto(pi)
 
 
-def confirm_payment_intent(session: Session, tenant_id: str, pid: uuid.UUID) -> PaymentIntentDTO:
+def confirm_payment_intent(
+    session: Session, tenant_id: str, pid: uuid.UUID, gateway: PaymentGatewayPort
+) -> PaymentIntentDTO:
+    instance = f"/v1/payment-intents/{pid}/confirm"
     with session.begin():
         pi = session.execute(
             select(PaymentIntent)
@@ -114,24 +324,39 @@ def confirm_payment_intent(session: Session, tenant_id: str, pid: uuid.UUID) ->
             .with_for_update()
         ).scalar_one_or_none()
         if not pi:
-            raise http_problem(
-                404,
-                "Not Found",
-                "payment intent not found",
-                instance=f"/v1/payment-intents/{pid}/confirm",
-            )
+            raise http_problem(404, "Not Found", "payment intent not found", instance=instance)
         if pi.status in ("SETTLED", "FAILED"):
             return _to_dto(pi)
         if pi.status != "CREATED":
             raise http_problem(
-                409,
-                "Conflict",
-                f"cannot confirm status {pi.status}",
-                instance=f"/v1/payment-intents/{pid}/confirm",
+                409, "Conflict", f"cannot confirm status {pi.status}", instance=instance
             )
 
-        pi.status = "AUTHORIZED"
+        # The row lock is held across the call, so concurrent confirms authorize once; the
+        # idempotency key makes a confirm retried after an error reuse the same authorization.
+        result = authorize_payment(
+            gateway,
+            tenant_id,
+            Decimal(pi.amount),
+            pi.currency,
+            pi.customer_ref,
+            f"authorize:{pi.id}",
+        )
+        if not result.success and result.is_retryable:
+            raise http_problem(
+                502,
+                "Bad Gateway",
+                f"payment gateway unavailable: {result.error_code}",
+                instance=instance,
+            )
         pi.updated_at = _utcnow()
+        if not result.success:
+            pi.status = "FAILED"
+            session.add(payment_failed_event(pi, result))
+            return _to_dto(pi)
+
+        pi.status = "AUTHORIZED"
+        pi.gateway_ref = result.gateway_ref
 
         session.add(
             OutboxEvent(
@@ -153,7 +378,9 @@ def confirm_payment_intent(session: Session, tenant_id: str, pid: uuid.UUID) ->
     return _to_dto(pi)
 
 
-def post_ledger_for_authorized_payment(session: Session, tenant_id: str, pid: uuid.UUID) -> None:
+def post_ledger_for_authorized_payment(
+    session: Session, tenant_id: str, pid: uuid.UUID, gateway: PaymentGatewayPort
+) -> None:
     with session.begin():
         pi = session.execute(
             select(PaymentIntent)
@@ -164,15 +391,47 @@ def post_ledger_for_authorized_payment(session: Session, tenant_id: str, pid: uu
             raise http_problem(404, "Not Found", "payment intent not found", instance="worker")
         if pi.status != "AUTHORIZED":
             return
-
-        debit_account = _resolve_account(session, tenant_id, "CASH")
-        credit_account = _resolve_account(session, tenant_id, "REVENUE")
-
-        entry = LedgerEntry(tenant_id=tenant_id, payment_intent_id=pi.id, posted_at=_utcnow())
+        # Intents authorized before the gateway integration have no reference to capture.
+        if pi.gateway_ref:
+            result = _gateway_call(
+                "capture", gateway.capture(pi.gateway_ref, Decimal(pi.amount), f"capture:{pi.id}")
+            )
+            if not result.success and result.is_retryable:
+                raise GatewayUnavailableError(
+                    f"capture of {pi.gateway_ref} failed: {result.error_code}"
+                )
+            if not result.success:
+                pi.status = "FAILED"
+                pi.updated_at = _utcnow()
+                session.add(payment_failed_event(pi, result))
+                return
+
+        debit_account = resolve_account(session, tenant_id, "CASH")
+        credit_account = resolve_account(session, tenant_id, "REVENUE")
+
+        posted_at = _utcnow()
+        entry = LedgerEntry(
+            id=uuid.uuid4(), tenant_id=tenant_id, payment_intent_id=pi.id, posted_at=posted_at
+        )
         entry.lines = [
-            LedgerLine(tenant_id=tenant_id, side="DEBIT", account=debit_account, amount=pi.amount, currency=pi.currency),
-            LedgerLine(tenant_id=tenant_id, side="CREDIT", account=credit_account, amount=pi.amount, currency=pi.currency),
+            LedgerLine(
+                tenant_id=tenant_id,
+                side="DEBIT",
+                account=debit_account,
+                amount=pi.amount,
+                currency=pi.currency,
+                posted_at=posted_at,
+            ),
+            LedgerLine(
+                tenant_id=tenant_id,
+                side="CREDIT",
+                account=credit_account,
+                amount=pi.amount,
+                currency=pi.currency,
+                posted_at=posted_at,
+            ),
         ]
+        seal_entry(lock_chain_head(session, tenant_id), entry)
         session.add(entry)
 
         pi.status = "SETTLED"
@@ -199,3 +458,5 @@ def post_ledger_for_authorized_payment(session: Session, tenant_id: str, pid: uu
                 },
             )
         )
+
+    invalidate_tenant_cache(tenant_id)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Protocol
+from typing import Optional, Protocol
 
 
 class GatewayStatus(str, Enum):
@@ -13,6 +14,8 @@ class GatewayStatus(str, Enum):
     REFUNDED = "REFUNDED"
     PARTIALLY_REFUNDED = "PARTIALLY_REFUNDED"
     NOT_FOUND = "NOT_FOUND"
+    # Accepted by the gateway but not settled yet; look it up again later.
+    PENDING = "PENDING"
 
 
 @dataclass(frozen=True)
@@ -25,6 +28,22 @@ class GatewayResult:
     is_retryable: bool = False
 
 
+@dataclass(frozen=True)
+class GatewayTransaction:
+    gateway_ref: str
+    amount: Decimal
+    currency: str
+    status: GatewayStatus
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class GatewayTransactionPage:
+    transactions: list[GatewayTransaction]
+    # Pass back to list_transactions for the next page; None on the last one.
+    next_cursor: Optional[str] = None
+
+
 class PaymentGatewayPort(Protocol):
     async def authorize(
         self, tenant_id: str, amount: Decimal, currency: str, customer_ref: str, idempotency_key: str
@@ -39,3 +58,12 @@ class PaymentGatewayPort(Protocol):
     ) -> GatewayResult: ...
 
     async def get_status(self, gateway_ref: str) -> GatewayResult: ...
+
+    # One page of the tenant's transactions created in (since, until].
+    async def list_transactions(
+        self,
+        tenant_id: str,
+        since: Optional[datetime],
+        until: datetime,
+        cursor: Optional[str] = None,
+    ) -> GatewayTransactionPage: ...
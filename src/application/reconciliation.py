@@ -1,21 +1,46 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import csv
+import json
 import uuid
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any
+from pathlib import Path
+from typing import Any, Optional
 
 from pydantic import BaseModel
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    String,
+    any_,
+    bindparam,
+    cast,
+    column,
+    exists,
+    false,
+    func,
+    literal,
+    select,
+    table,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
 
 from src.infrastructure.db.models import (
     OutboxEvent,
     PaymentIntent,
     ReconciliationDiscrepancy,
 )
+from src.infrastructure.db.session import rowcount
 from src.shared.correlation import get_correlation_id
 from src.shared.logging import get_logger
+from src.shared.metrics import RECONCILIATION_DISCREPANCIES_TOTAL
+from src.shared.problem import http_problem
 
 log = get_logger(__name__)
 
@@ -36,134 +61,483 @@ class DiscrepancyDTO(BaseModel):
     actual_status: str | None
     resolved: bool
     created_at: str
+    last_seen_at: str | None = None
+    occurrences: int = 1
 
 
-def reconcile_transactions(
-    session: Session,
-    tenant_id: str,
-    gateway_transactions: list[dict[str, Any]],
-) -> list[DiscrepancyDTO]:
-    """Compare gateway transactions with local PaymentIntents.
+class DiscrepancyPageDTO(BaseModel):
+    items: list[DiscrepancyDTO]
+    next_cursor: str | None
 
-    gateway_transactions: list of dicts with keys:
-        gateway_ref, amount, currency, status
-    """
-    discrepancies: list[DiscrepancyDTO] = []
 
-    with session.begin():
-        for gtx in gateway_transactions:
-            gw_ref = gtx["gateway_ref"]
-            gw_amount = Decimal(str(gtx["amount"]))
-            gw_status = gtx["status"]
-
-            pi = session.execute(
-                select(PaymentIntent).where(
-                    PaymentIntent.tenant_id == tenant_id,
-                    PaymentIntent.gateway_ref == gw_ref,
+class DiscrepancySummaryItem(BaseModel):
+    discrepancy_type: str
+    open: int
+    resolved: int
+
+
+class ReconciliationSummaryDTO(BaseModel):
+    tenant_id: str
+    transactions: int
+    discrepancies: int
+    by_type: dict[str, int]
+
+
+LOOKUP_BATCH_SIZE = 50_000
+STREAM_BATCH_SIZE = 10_000
+FILE_CHUNK_SIZE = 10_000
+SETTLEMENT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+SETTLEMENT_FIELDS = ("gateway_ref", "amount", "status")
+DISCREPANCY_KEY = ("tenant_id", "gateway_ref", "discrepancy_type")
+# Rows per multi-row upsert statement (about 15 bind parameters each).
+UPSERT_BATCH_SIZE = 1000
+DISCREPANCY_PAGE_SIZE = 100
+
+# Session-local staging table for the refs seen in a streamed file, dropped on commit.
+_STAGED_REFS = table("reconciliation_staged_refs", column("gateway_ref"))
+
+# Gateway statuses that agree with each local PaymentIntent status.
+STATUS_MAP: dict[str, list[str]] = {
+    "AUTHORIZED": ["requires_capture", "requires_confirmation"],
+    "SETTLED": ["succeeded"],
+    "FAILED": ["canceled", "requires_payment_method"],
+}
+
+
+def discrepancy_row(tenant_id: str, discrepancy_type: str, **fields: Any) -> dict[str, Any]:
+    row: dict[str, Any] = {
+        "id": uuid.uuid4(),
+        "tenant_id": tenant_id,
+        "payment_intent_id": None,
+        "discrepancy_type": discrepancy_type,
+        "gateway_ref": None,
+        "expected_amount": None,
+        "actual_amount": None,
+        "expected_status": None,
+        "actual_status": None,
+        "resolved": False,
+        "details": {},
+    }
+    row.update(fields)
+    row["created_at"] = row["last_seen_at"] = _utcnow()
+    row["occurrences"] = 1
+    return row
+
+
+def _on_conflict_bump(stmt: Any) -> Any:
+    """Re-observed findings refresh their details, count the sighting and reopen if resolved."""
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=list(DISCREPANCY_KEY),
+        set_={
+            "payment_intent_id": excluded.payment_intent_id,
+            "expected_amount": excluded.expected_amount,
+            "actual_amount": excluded.actual_amount,
+            "expected_status": excluded.expected_status,
+            "actual_status": excluded.actual_status,
+            "details": excluded.details,
+            "last_seen_at": excluded.last_seen_at,
+            "occurrences": ReconciliationDiscrepancy.occurrences + excluded.occurrences,
+            "resolved": false(),
+        },
+    )
+
+
+def upsert_discrepancies(
+    session: Session, rows: list[dict[str, Any]], returning: bool = False
+) -> list[ReconciliationDiscrepancy]:
+    """Write discrepancy rows keyed by (tenant, gateway_ref, type) with ``INSERT ... ON CONFLICT``.
+
+    Rows sharing a key are folded first: one statement may not touch the same row twice.
+    """
+    merged: dict[tuple[Any, ...], dict[str, Any]] = {}
+    for row in rows:
+        key = tuple(row[k] for k in DISCREPANCY_KEY)
+        seen = merged.get(key)
+        merged[key] = {**row, "occurrences": seen["occurrences"] + 1} if seen else row
+    batch_rows = list(merged.values())
+    out: list[ReconciliationDiscrepancy] = []
+    for i in range(0, len(batch_rows), UPSERT_BATCH_SIZE):
+        stmt = _on_conflict_bump(
+            pg_insert(ReconciliationDiscrepancy).values(batch_rows[i : i + UPSERT_BATCH_SIZE])
+        )
+        if returning:
+            out.extend(
+                session.scalars(
+                    stmt.returning(ReconciliationDiscrepancy),
+                    execution_options={"populate_existing": True},
                 )
-            ).scalar_one_or_none()
+            )
+        else:
+            session.execute(stmt)
+    return out
+
+
+def load_local_intents(session: Session, tenant_id: str, refs: list[str]) -> dict[str, Any]:
+    """Local intents keyed by gateway_ref, one ``= ANY(:refs)`` query per batch of refs."""
+    local: dict[str, Any] = {}
+    for i in range(0, len(refs), LOOKUP_BATCH_SIZE):
+        batch = refs[i : i + LOOKUP_BATCH_SIZE]
+        rows = session.execute(
+            select(
+                PaymentIntent.id,
+                PaymentIntent.gateway_ref,
+                PaymentIntent.amount,
+                PaymentIntent.status,
+            ).where(
+                PaymentIntent.tenant_id == tenant_id,
+                PaymentIntent.gateway_ref == any_(bindparam("refs", batch, type_=ARRAY(String))),
+            )
+        ).all()
+        for r in rows:
+            local.setdefault(r.gateway_ref, r)
+    return local
 
-            if not pi:
-                disc = ReconciliationDiscrepancy(
-                    tenant_id=tenant_id,
-                    discrepancy_type="MISSING_LOCAL",
+
+def compare_transactions(
+    tenant_id: str, gateway_transactions: list[dict[str, Any]], local: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """Hash-join gateway transactions against ``local`` (gateway_ref -> intent row)."""
+    rows: list[dict[str, Any]] = []
+    for gtx in gateway_transactions:
+        gw_ref = gtx["gateway_ref"]
+        gw_amount = Decimal(str(gtx["amount"]))
+        gw_status = gtx["status"]
+
+        pi = local.get(gw_ref)
+        if pi is None:
+            rows.append(
+                discrepancy_row(
+                    tenant_id,
+                    "MISSING_LOCAL",
                     gateway_ref=gw_ref,
                     actual_amount=gw_amount,
                     actual_status=gw_status,
                     details={"gateway_transaction": gtx},
                 )
-                session.add(disc)
-                session.flush()
-                discrepancies.append(_to_dto(disc))
-                continue
-
-            if pi.amount != gw_amount:
-                disc = ReconciliationDiscrepancy(
-                    tenant_id=tenant_id,
+            )
+            continue
+
+        if pi.amount != gw_amount:
+            rows.append(
+                discrepancy_row(
+                    tenant_id,
+                    "AMOUNT_MISMATCH",
                     payment_intent_id=pi.id,
-                    discrepancy_type="AMOUNT_MISMATCH",
                     gateway_ref=gw_ref,
                     expected_amount=pi.amount,
                     actual_amount=gw_amount,
                     details={"local_amount": str(pi.amount), "gateway_amount": str(gw_amount)},
                 )
-                session.add(disc)
-                session.flush()
-                discrepancies.append(_to_dto(disc))
-
-            status_map = {
-                "AUTHORIZED": ["requires_capture", "requires_confirmation"],
-                "SETTLED": ["succeeded"],
-                "FAILED": ["canceled", "requires_payment_method"],
-            }
-            expected_gw_statuses = status_map.get(pi.status, [])
-            if gw_status not in expected_gw_statuses and expected_gw_statuses:
-                disc = ReconciliationDiscrepancy(
-                    tenant_id=tenant_id,
+            )
+
+        expected_gw_statuses = STATUS_MAP.get(pi.status, [])
+        if gw_status not in expected_gw_statuses and expected_gw_statuses:
+            rows.append(
+                discrepancy_row(
+                    tenant_id,
+                    "STATUS_MISMATCH",
                     payment_intent_id=pi.id,
-                    discrepancy_type="STATUS_MISMATCH",
                     gateway_ref=gw_ref,
                     expected_status=pi.status,
                     actual_status=gw_status,
                     details={"expected_gateway_statuses": expected_gw_statuses},
                 )
-                session.add(disc)
-                session.flush()
-                discrepancies.append(_to_dto(disc))
-
-        local_with_ref = session.execute(
-            select(PaymentIntent).where(
-                PaymentIntent.tenant_id == tenant_id,
-                PaymentIntent.gateway_ref.isnot(None),
             )
-        ).scalars().all()
+    return rows
 
-        gw_refs = {gtx["gateway_ref"] for gtx in gateway_transactions}
-        for pi in local_with_ref:
-            if pi.gateway_ref and pi.gateway_ref not in gw_refs:
-                disc = ReconciliationDiscrepancy(
-                    tenant_id=tenant_id,
-                    payment_intent_id=pi.id,
-                    discrepancy_type="MISSING_REMOTE",
-                    gateway_ref=pi.gateway_ref,
-                    expected_amount=pi.amount,
-                    expected_status=pi.status,
-                    details={"payment_intent_id": str(pi.id)},
-                )
-                session.add(disc)
-                session.flush()
-                discrepancies.append(_to_dto(disc))
-
-        if discrepancies:
-            session.add(
-                OutboxEvent(
-                    tenant_id=tenant_id,
-                    event_type="reconciliation.discrepancy_found",
-                    aggregate_type="Reconciliation",
-                    aggregate_id=str(uuid.uuid4()),
-                    payload={
-                        "tenant_id": tenant_id,
-                        "discrepancy_count": len(discrepancies),
-                        "types": list({d.discrepancy_type for d in discrepancies}),
-                        "correlation_id": get_correlation_id(),
-                    },
-                )
-            )
 
-    return discrepancies
+def _missing_remote(session: Session, tenant_id: str, gw_refs: set[str]) -> list[dict[str, Any]]:
+    result = session.execute(
+        select(
+            PaymentIntent.id,
+            PaymentIntent.gateway_ref,
+            PaymentIntent.amount,
+            PaymentIntent.status,
+        )
+        .where(PaymentIntent.tenant_id == tenant_id, PaymentIntent.gateway_ref.isnot(None))
+        .execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+    )
+    return [
+        discrepancy_row(
+            tenant_id,
+            "MISSING_REMOTE",
+            payment_intent_id=pi.id,
+            gateway_ref=pi.gateway_ref,
+            expected_amount=pi.amount,
+            expected_status=pi.status,
+            details={"payment_intent_id": str(pi.id)},
+        )
+        for pi in result
+        if pi.gateway_ref not in gw_refs
+    ]
 
 
-def list_discrepancies(
-    session: Session, tenant_id: str, resolved: bool | None = None
+def reconcile_transactions(
+    session: Session,
+    tenant_id: str,
+    gateway_transactions: list[dict[str, Any]],
 ) -> list[DiscrepancyDTO]:
-    q = select(ReconciliationDiscrepancy).where(
-        ReconciliationDiscrepancy.tenant_id == tenant_id
+    """Compare gateway transactions with local PaymentIntents.
+
+    gateway_transactions: list of dicts with keys:
+        gateway_ref, amount, currency, status
+
+    Local intents are fetched in bulk and joined in memory; discrepancies are upserted
+    with multi-row statements at the end.
+    """
+    gw_refs = {gtx["gateway_ref"] for gtx in gateway_transactions}
+
+    with session.begin():
+        local = load_local_intents(session, tenant_id, sorted(gw_refs))
+        rows = compare_transactions(tenant_id, gateway_transactions, local)
+        rows.extend(_missing_remote(session, tenant_id, gw_refs))
+
+        discrepancies = upsert_discrepancies(session, rows, returning=True)
+        by_type = count_types(rows)
+        record_findings(session, tenant_id, by_type)
+        log.info(
+            "reconciliation finished",
+            extra={"transactions": len(gateway_transactions), "discrepancies": len(rows)},
+        )
+
+    return [_to_dto(d) for d in discrepancies]
+
+
+def count_types(
+    rows: Iterable[dict[str, Any]], into: Optional[dict[str, int]] = None
+) -> dict[str, int]:
+    counts = into if into is not None else {}
+    for r in rows:
+        counts[r["discrepancy_type"]] = counts.get(r["discrepancy_type"], 0) + 1
+    return counts
+
+
+def record_findings(
+    session: Session, tenant_id: str, by_type: dict[str, int], **payload: Any
+) -> None:
+    """Announce a run's discrepancies on the outbox and count them in metrics."""
+    if not by_type:
+        return
+    for dtype, count in by_type.items():
+        RECONCILIATION_DISCREPANCIES_TOTAL.labels(tenant_id=tenant_id, type=dtype).inc(count)
+    session.add(
+        OutboxEvent(
+            tenant_id=tenant_id,
+            event_type="reconciliation.discrepancy_found",
+            aggregate_type="Reconciliation",
+            aggregate_id=str(uuid.uuid4()),
+            payload={
+                "tenant_id": tenant_id,
+                "discrepancy_count": sum(by_type.values()),
+                "types": sorted(by_type),
+                "correlation_id": get_correlation_id(),
+                **payload,
+            },
+        )
+    )
+
+
+def read_settlement_file(
+    path: Path, fmt: Optional[str] = None, chunk_size: int = FILE_CHUNK_SIZE
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield a settlement file as chunks of gateway transactions.
+
+    ``fmt`` is ``csv`` (with a header row) or ``ndjson``; by default it follows the file
+    suffix. Only one chunk is held in memory at a time.
+    """
+    fmt = fmt or SETTLEMENT_FORMATS.get(path.suffix.lower())
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"unsupported settlement file format for {path}")
+    with path.open(newline="", encoding="utf-8") as fh:
+        records: Iterable[dict[str, Any]]
+        if fmt == "csv":
+            records = csv.DictReader(fh)
+        else:
+            records = (json.loads(line) for line in fh if line.strip())
+        chunk: list[dict[str, Any]] = []
+        for n, record in enumerate(records, start=1):
+            missing = [f for f in SETTLEMENT_FIELDS if record.get(f) in (None, "")]
+            if missing:
+                raise ValueError(f"{path}: record {n} is missing {', '.join(missing)}")
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _stage_refs(session: Session, refs: list[str]) -> None:
+    session.execute(
+        text(
+            "INSERT INTO reconciliation_staged_refs (gateway_ref) "
+            "SELECT unnest(:refs) ON CONFLICT DO NOTHING"
+        ).bindparams(bindparam("refs", type_=ARRAY(String))),
+        {"refs": refs},
+    )
+
+
+def _insert_missing_remote(session: Session, tenant_id: str) -> int:
+    """Anti-join local intents against the staged refs, upserting MISSING_REMOTE rows."""
+    sibling = aliased(PaymentIntent)
+    missing = (
+        select(
+            func.gen_random_uuid(),
+            PaymentIntent.tenant_id,
+            PaymentIntent.id,
+            literal("MISSING_REMOTE"),
+            PaymentIntent.gateway_ref,
+            PaymentIntent.amount,
+            PaymentIntent.status,
+            false(),
+            func.jsonb_build_object("payment_intent_id", cast(PaymentIntent.id, String)),
+            func.now(),
+            func.now(),
+            literal(1),
+        )
+        .where(
+            PaymentIntent.tenant_id == tenant_id,
+            PaymentIntent.gateway_ref.isnot(None),
+            ~exists().where(_STAGED_REFS.c.gateway_ref == PaymentIntent.gateway_ref),
+            # At most one row per key, or ON CONFLICT would hit the same row twice.
+            ~exists().where(
+                sibling.tenant_id == tenant_id,
+                sibling.gateway_ref == PaymentIntent.gateway_ref,
+                sibling.id < PaymentIntent.id,
+            ),
+        )
+    )
+    stmt = pg_insert(ReconciliationDiscrepancy).from_select(
+        [
+            "id",
+            "tenant_id",
+            "payment_intent_id",
+            "discrepancy_type",
+            "gateway_ref",
+            "expected_amount",
+            "expected_status",
+            "resolved",
+            "details",
+            "created_at",
+            "last_seen_at",
+            "occurrences",
+        ],
+        missing,
     )
+    return rowcount(session.execute(_on_conflict_bump(stmt)))
+
+
+def reconcile_stream(
+    session: Session, tenant_id: str, chunks: Iterable[list[dict[str, Any]]]
+) -> ReconciliationSummaryDTO:
+    """Reconcile a settlement feed chunk by chunk, keeping memory flat in the feed size.
+
+    Each chunk is staged into a temp table, joined against the intents it references and
+    its discrepancies are inserted before the next chunk is read. MISSING_REMOTE is then a
+    single ``NOT EXISTS`` anti-join between payment_intents and the staged refs.
+    """
+    transactions = 0
+    by_type: dict[str, int] = {}
+    with session.begin():
+        session.execute(
+            text(
+                "CREATE TEMP TABLE reconciliation_staged_refs "
+                "(gateway_ref varchar(255) PRIMARY KEY) ON COMMIT DROP"
+            )
+        )
+        for chunk in chunks:
+            refs = sorted({str(gtx["gateway_ref"]) for gtx in chunk})
+            _stage_refs(session, refs)
+            rows = compare_transactions(tenant_id, chunk, load_local_intents(session, tenant_id, refs))
+            upsert_discrepancies(session, rows)
+            count_types(rows, by_type)
+            transactions += len(chunk)
+
+        # Temp tables are never auto-analyzed; give the planner real row counts.
+        session.execute(text("ANALYZE reconciliation_staged_refs"))
+        missing_remote = _insert_missing_remote(session, tenant_id)
+        if missing_remote:
+            by_type["MISSING_REMOTE"] = missing_remote
+        record_findings(session, tenant_id, by_type)
+
+    summary = ReconciliationSummaryDTO(
+        tenant_id=tenant_id,
+        transactions=transactions,
+        discrepancies=sum(by_type.values()),
+        by_type=by_type,
+    )
+    log.info("streaming reconciliation finished", extra=summary.model_dump())
+    return summary
+
+
+def reconcile_file(
+    session: Session,
+    tenant_id: str,
+    path: Path,
+    fmt: Optional[str] = None,
+    chunk_size: int = FILE_CHUNK_SIZE,
+) -> ReconciliationSummaryDTO:
+    return reconcile_stream(session, tenant_id, read_settlement_file(path, fmt, chunk_size))
+
+
+def _encode_cursor(created_at: datetime, disc_id: uuid.UUID) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(disc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["c"]), uuid.UUID(data["i"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise http_problem(
+            400, "Bad Request", "invalid cursor", instance="/v1/reconciliation/discrepancies"
+        )
+
+
+def list_discrepancies(
+    session: Session,
+    tenant_id: str,
+    resolved: bool | None = None,
+    limit: int = DISCREPANCY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> DiscrepancyPageDTO:
+    """Newest first, paged on (created_at, id) so later pages cost the same as the first."""
+    d = ReconciliationDiscrepancy
+    q = select(d).where(d.tenant_id == tenant_id)
     if resolved is not None:
-        q = q.where(ReconciliationDiscrepancy.resolved == resolved)
-    q = q.order_by(ReconciliationDiscrepancy.created_at.desc()).limit(200)
-    rows = session.execute(q).scalars().all()
-    return [_to_dto(r) for r in rows]
+        q = q.where(d.resolved == resolved)
+    if cursor:
+        q = q.where(tuple_(d.created_at, d.id) < tuple_(*_decode_cursor(cursor)))
+    rows = session.execute(
+        q.order_by(d.created_at.desc(), d.id.desc()).limit(limit + 1)
+    ).scalars().all()
+    page = rows[:limit]
+    next_cursor = (
+        _encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    )
+    return DiscrepancyPageDTO(items=[_to_dto(r) for r in page], next_cursor=next_cursor)
+
+
+def discrepancy_summary(session: Session, tenant_id: str) -> list[DiscrepancySummaryItem]:
+    """Open/resolved counts per type, an index-only scan of (tenant_id, type, resolved)."""
+    d = ReconciliationDiscrepancy
+    counts: dict[str, DiscrepancySummaryItem] = {}
+    for dtype, resolved, n in session.execute(
+        select(d.discrepancy_type, d.resolved, func.count())
+        .where(d.tenant_id == tenant_id)
+        .group_by(d.discrepancy_type, d.resolved)
+    ):
+        item = counts.setdefault(
+            dtype, DiscrepancySummaryItem(discrepancy_type=dtype, open=0, resolved=0)
+        )
+        if resolved:
+            item.resolved = n
+        else:
+            item.open = n
+    return [counts[k] for k in sorted(counts)]
 
 
 def resolve_discrepancy(session: Session, tenant_id: str, disc_id: uuid.UUID) -> DiscrepancyDTO:
@@ -175,7 +549,6 @@ def resolve_discrepancy(session: Session, tenant_id: str, disc_id: uuid.UUID) ->
             )
         ).scalar_one_or_none()
         if not disc:
-            from src.shared.problem import http_problem
             raise http_problem(
                 404, "Not Found", "discrepancy not found",
                 instance=f"/v1/reconciliation/{disc_id}",
@@ -197,4 +570,6 @@ def _to_dto(d: ReconciliationDiscrepancy) -> DiscrepancyDTO:
         actual_status=d.actual_status,
         resolved=d.resolved,
         created_at=d.created_at.isoformat(),
+        last_seen_at=d.last_seen_at.isoformat() if d.last_seen_at else None,
+        occurrences=d.occurrences or 1,
     )
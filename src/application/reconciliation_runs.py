@@ -0,0 +1,521 @@
+"""Scheduled, resumable reconciliation runs against the payment gateway.
+
+A run has two phases. First it walks one tenant's payment intents that have a ``gateway_ref``
+in ``gateway_ref`` order (served by ``ix_payment_intents_tenant_gateway_ref``), asks the
+gateway for each batch's statuses (fanned out concurrently by ``StatusFetcher``) and records
+MISSING_REMOTE and STATUS_MISMATCH findings. Then it pages through the gateway's own
+transactions created in the run's window and anti-joins each page against the local intents,
+the way ``reconcile_stream`` does for settlement files: a transaction no intent knows about is
+MISSING_LOCAL, one with another amount is AMOUNT_MISMATCH.
+
+Every batch or page commits its discrepancies together with the run's checkpoint (last
+gateway_ref, or the gateway's page cursor) and counters, so a run whose worker died is picked
+up again from that checkpoint once its lock goes stale, without redoing or double-counting
+work.
+
+Scheduled runs are incremental: they only check intents whose ``updated_at`` falls between the
+previous successful run's watermark (minus ``WATERMARK_OVERLAP``, to catch transactions that
+committed late) and their own watermark, fixed when the run first starts. A full sweep runs
+instead once the tenant has had none for ``reconciliation_full_sweep_days``.
+
+The worker schedules a run per tenant every ``reconciliation_interval_minutes`` and executes
+up to ``reconciliation_max_concurrency`` runs at once across all workers.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, case, exists, func, insert, literal, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, aliased
+
+from src.application.gateway_status import StatusFetcher
+from src.application.ports.payment_gateway import (
+    GatewayResult,
+    GatewayStatus,
+    GatewayTransaction,
+)
+from src.application.reconciliation import (
+    count_types,
+    discrepancy_row,
+    load_local_intents,
+    record_findings,
+    upsert_discrepancies,
+)
+from src.infrastructure.db.models import (
+    PaymentIntent,
+    ReconciliationRun,
+    Tenant,
+)
+from src.infrastructure.db.session import rowcount
+from src.shared.logging import get_logger
+from src.shared.metrics import (
+    RECONCILIATION_RUN_DURATION_SECONDS,
+    RECONCILIATION_RUN_ITEMS_TOTAL,
+    RECONCILIATION_RUN_THROUGHPUT,
+    RECONCILIATION_RUNS_TOTAL,
+)
+from src.shared.problem import http_problem
+
+log = get_logger(__name__)
+
+RUN_BATCH_SIZE = 500
+# RUNNING runs not checkpointed for this long are assumed orphaned and resumed.
+STALE_RUN_SECONDS = 600
+ACTIVE_STATUSES = ("PENDING", "RUNNING")
+RUN_MODES = ("incremental", "full")
+# Incremental windows start this far before the previous watermark; intents updated by
+# transactions still in flight when that run started would otherwise be skipped.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Gateway statuses that agree with each local PaymentIntent status.
+GATEWAY_STATUS_MAP: dict[str, tuple[GatewayStatus, ...]] = {
+    "AUTHORIZED": (GatewayStatus.AUTHORIZED,),
+    "SETTLED": (GatewayStatus.CAPTURED,),
+    "FAILED": (GatewayStatus.FAILED,),
+    "PARTIALLY_REFUNDED": (GatewayStatus.PARTIALLY_REFUNDED,),
+    "REFUNDED": (GatewayStatus.REFUNDED,),
+}
+
+
+class GatewayStatusError(RuntimeError):
+    pass
+
+
+class ReconciliationRunDTO(BaseModel):
+    id: str
+    tenant_id: str
+    trigger: str
+    mode: str
+    since: str | None
+    watermark: str | None
+    status: str
+    phase: str
+    checkpoint: str | None
+    items_processed: int
+    discrepancies_found: int
+    discrepancy_counts: dict[str, int]
+    duration_seconds: float | None
+    throughput_per_second: float | None
+    error: str | None = None
+    created_at: str
+    started_at: str | None = None
+    finished_at: str | None = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _duration(run: ReconciliationRun) -> Optional[float]:
+    if run.started_at is None:
+        return None
+    return max(0.0, ((run.finished_at or _utcnow()) - run.started_at).total_seconds())
+
+
+def _to_dto(run: ReconciliationRun) -> ReconciliationRunDTO:
+    duration = _duration(run)
+    return ReconciliationRunDTO(
+        id=str(run.id),
+        tenant_id=run.tenant_id,
+        trigger=run.trigger,
+        mode=run.mode,
+        since=run.since.isoformat() if run.since else None,
+        watermark=run.watermark.isoformat() if run.watermark else None,
+        status=run.status,
+        phase=run.phase,
+        checkpoint=run.checkpoint,
+        items_processed=run.items_processed,
+        discrepancies_found=sum(run.discrepancy_counts.values()),
+        discrepancy_counts=run.discrepancy_counts,
+        duration_seconds=round(duration, 3) if duration is not None else None,
+        throughput_per_second=round(run.items_processed / duration, 3) if duration else None,
+        error=run.error,
+        created_at=run.created_at.isoformat(),
+        started_at=run.started_at.isoformat() if run.started_at else None,
+        finished_at=run.finished_at.isoformat() if run.finished_at else None,
+    )
+
+
+def schedule_due_runs(session: Session, interval_minutes: int, full_sweep_days: int = 7) -> int:
+    """Queue a run for every tenant without an active run or one created within the interval.
+
+    The run is a full sweep when the tenant has no successful full run in ``full_sweep_days``.
+    """
+    now = _utcnow()
+    due_before = now - timedelta(minutes=interval_minutes)
+    r = ReconciliationRun
+    last_full = aliased(ReconciliationRun)
+    mode = case(
+        (
+            exists().where(
+                last_full.tenant_id == Tenant.id,
+                last_full.mode == "full",
+                last_full.status == "SUCCEEDED",
+                last_full.created_at > now - timedelta(days=full_sweep_days),
+            ),
+            literal("incremental"),
+        ),
+        else_=literal("full"),
+    )
+    due = select(
+        func.gen_random_uuid(),
+        Tenant.id,
+        literal("scheduled"),
+        mode,
+        literal("PENDING"),
+        literal("intents"),
+        literal(0),
+        literal({}, JSONB),
+        func.now(),
+    ).where(
+        ~exists().where(
+            r.tenant_id == Tenant.id,
+            or_(r.status.in_(ACTIVE_STATUSES), r.created_at > due_before),
+        )
+    )
+    with session.begin():
+        result = session.execute(
+            insert(r).from_select(
+                [
+                    "id",
+                    "tenant_id",
+                    "trigger",
+                    "mode",
+                    "status",
+                    "phase",
+                    "items_processed",
+                    "discrepancy_counts",
+                    "created_at",
+                ],
+                due,
+            )
+        )
+    scheduled = rowcount(result)
+    if scheduled:
+        RECONCILIATION_RUNS_TOTAL.labels("scheduled").inc(scheduled)
+        log.info("reconciliation runs scheduled", extra={"runs": scheduled})
+    return scheduled
+
+
+def start_run(session: Session, tenant_id: str, mode: str = "incremental") -> ReconciliationRunDTO:
+    if mode not in RUN_MODES:
+        raise http_problem(
+            400, "Bad Request", f"invalid mode {mode}", instance="/v1/reconciliation/runs"
+        )
+    with session.begin():
+        active = session.execute(
+            select(ReconciliationRun.id)
+            .where(
+                ReconciliationRun.tenant_id == tenant_id,
+                ReconciliationRun.status.in_(ACTIVE_STATUSES),
+            )
+            .limit(1)
+        ).scalar()
+        if active is not None:
+            raise http_problem(
+                409,
+                "Conflict",
+                f"reconciliation run {active} is already in progress",
+                instance="/v1/reconciliation/runs",
+            )
+        run = ReconciliationRun(
+            tenant_id=tenant_id,
+            trigger="manual",
+            mode=mode,
+            status="PENDING",
+            phase="intents",
+            items_processed=0,
+            discrepancy_counts={},
+            created_at=_utcnow(),
+        )
+        session.add(run)
+        session.flush()
+    RECONCILIATION_RUNS_TOTAL.labels("manual").inc()
+    return _to_dto(run)
+
+
+def list_runs(session: Session, tenant_id: str, limit: int = 50) -> list[ReconciliationRunDTO]:
+    runs = session.execute(
+        select(ReconciliationRun)
+        .where(ReconciliationRun.tenant_id == tenant_id)
+        .order_by(ReconciliationRun.created_at.desc())
+        .limit(limit)
+    ).scalars()
+    return [_to_dto(r) for r in runs]
+
+
+def get_run(session: Session, tenant_id: str, run_id: uuid.UUID) -> ReconciliationRunDTO:
+    run = session.execute(
+        select(ReconciliationRun).where(
+            ReconciliationRun.tenant_id == tenant_id, ReconciliationRun.id == run_id
+        )
+    ).scalar_one_or_none()
+    if not run:
+        raise http_problem(
+            404,
+            "Not Found",
+            "reconciliation run not found",
+            instance=f"/v1/reconciliation/runs/{run_id}",
+        )
+    return _to_dto(run)
+
+
+def claim_run(session: Session, worker_id: str, max_concurrency: int) -> Optional[uuid.UUID]:
+    """Claim the oldest pending (or orphaned) run, unless the global concurrency cap is hit."""
+    now = _utcnow()
+    stale_before = now - timedelta(seconds=STALE_RUN_SECONDS)
+    r = ReconciliationRun
+    with session.begin():
+        # Serialize claims so the running count below cannot be raced past the cap.
+        session.execute(select(func.pg_advisory_xact_lock(func.hashtext("reconciliation-claim"))))
+        running = session.execute(
+            select(func.count()).where(r.status == "RUNNING", r.locked_at >= stale_before)
+        ).scalar_one()
+        if running >= max_concurrency:
+            return None
+        run = session.execute(
+            select(r)
+            .where(
+                or_(
+                    r.status == "PENDING",
+                    and_(r.status == "RUNNING", r.locked_at < stale_before),
+                )
+            )
+            .order_by(r.created_at)
+            .with_for_update(skip_locked=True)
+            .limit(1)
+        ).scalar_one_or_none()
+        if not run:
+            return None
+        if run.status == "RUNNING":
+            RECONCILIATION_RUNS_TOTAL.labels("resumed").inc()
+            log.info(
+                "resuming reconciliation run",
+                extra={"run_id": str(run.id), "checkpoint": run.checkpoint},
+            )
+        elif run.watermark is None:
+            _fix_window(session, run, now)
+        run.status = "RUNNING"
+        run.locked_by = worker_id
+        run.locked_at = now
+        run.started_at = run.started_at or now
+        return run.id
+
+
+def _fix_window(session: Session, run: ReconciliationRun, now: datetime) -> None:
+    """Pin the run's [since, watermark] window on first start, so a resume reuses it."""
+    run.watermark = now
+    if run.mode != "incremental":
+        return
+    previous = session.execute(
+        select(func.max(ReconciliationRun.watermark)).where(
+            ReconciliationRun.tenant_id == run.tenant_id,
+            ReconciliationRun.status == "SUCCEEDED",
+        )
+    ).scalar()
+    if previous is None:
+        run.mode = "full"  # nothing to be incremental from
+    else:
+        run.since = previous - WATERMARK_OVERLAP
+
+
+def compare_gateway_statuses(
+    tenant_id: str, intents: Sequence[Any], results: Sequence[GatewayResult]
+) -> list[dict[str, Any]]:
+    """Discrepancy rows for intents whose gateway status disagrees or is unknown remotely."""
+    rows: list[dict[str, Any]] = []
+    for pi, result in zip(intents, results, strict=True):
+        if result.status == GatewayStatus.NOT_FOUND:
+            rows.append(
+                discrepancy_row(
+                    tenant_id,
+                    "MISSING_REMOTE",
+                    payment_intent_id=pi.id,
+                    gateway_ref=pi.gateway_ref,
+                    expected_amount=pi.amount,
+                    expected_status=pi.status,
+                    details={"payment_intent_id": str(pi.id)},
+                )
+            )
+            continue
+        if not result.success:
+            raise GatewayStatusError(
+                f"gateway status for {pi.gateway_ref} failed: {result.error_code}"
+            )
+        expected = GATEWAY_STATUS_MAP.get(pi.status)
+        if expected and result.status not in expected:
+            rows.append(
+                discrepancy_row(
+                    tenant_id,
+                    "STATUS_MISMATCH",
+                    payment_intent_id=pi.id,
+                    gateway_ref=pi.gateway_ref,
+                    expected_status=pi.status,
+                    actual_status=result.status.value,
+                    details={"expected_gateway_statuses": [s.value for s in expected]},
+                )
+            )
+    return rows
+
+
+def compare_gateway_transactions(
+    tenant_id: str, transactions: Sequence[GatewayTransaction], local: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """Discrepancy rows for gateway transactions missing locally or with another amount."""
+    rows: list[dict[str, Any]] = []
+    for tx in transactions:
+        pi = local.get(tx.gateway_ref)
+        if pi is None:
+            rows.append(
+                discrepancy_row(
+                    tenant_id,
+                    "MISSING_LOCAL",
+                    gateway_ref=tx.gateway_ref,
+                    actual_amount=tx.amount,
+                    actual_status=tx.status.value,
+                    details={
+                        "currency": tx.currency,
+                        "gateway_created_at": tx.created_at.isoformat(),
+                    },
+                )
+            )
+        elif pi.amount != tx.amount:
+            rows.append(
+                discrepancy_row(
+                    tenant_id,
+                    "AMOUNT_MISMATCH",
+                    payment_intent_id=pi.id,
+                    gateway_ref=tx.gateway_ref,
+                    expected_amount=pi.amount,
+                    actual_amount=tx.amount,
+                    details={"local_amount": str(pi.amount), "gateway_amount": str(tx.amount)},
+                )
+            )
+    return rows
+
+
+def _next_batch(
+    session: Session,
+    tenant_id: str,
+    window: tuple[Optional[datetime], Optional[datetime]],
+    checkpoint: Optional[str],
+    batch_size: int,
+) -> list[Any]:
+    since, watermark = window
+    q = select(
+        PaymentIntent.id, PaymentIntent.gateway_ref, PaymentIntent.amount, PaymentIntent.status
+    ).where(PaymentIntent.tenant_id == tenant_id, PaymentIntent.gateway_ref.isnot(None))
+    if since is not None:
+        q = q.where(PaymentIntent.updated_at > since)
+    if watermark is not None:
+        q = q.where(PaymentIntent.updated_at <= watermark)
+    if checkpoint is not None:
+        q = q.where(PaymentIntent.gateway_ref > checkpoint)
+    with session.begin():
+        return list(session.execute(q.order_by(PaymentIntent.gateway_ref).limit(batch_size)).all())
+
+
+def _locked_run(session: Session, run_id: uuid.UUID, worker_id: str) -> Optional[ReconciliationRun]:
+    """The run, locked, while ``worker_id`` still holds its claim.
+
+    A run reclaimed as stale is RUNNING under another worker; the original one must not
+    advance its checkpoint or finish it.
+    """
+    run = session.get(ReconciliationRun, run_id, with_for_update=True, populate_existing=True)
+    if run is None or run.status != "RUNNING" or run.locked_by != worker_id:
+        return None
+    return run
+
+
+def run_reconciliation(
+    session: Session,
+    run_id: uuid.UUID,
+    worker_id: str,
+    fetcher: StatusFetcher,
+    batch_size: int = RUN_BATCH_SIZE,
+) -> str:
+    """Execute a run claimed by ``worker_id`` from its checkpoint; returns its final status."""
+    with session.begin():
+        run = session.get(ReconciliationRun, run_id)
+        if run is None:
+            return "MISSING"
+        tenant_id, checkpoint, phase = run.tenant_id, run.checkpoint, run.phase
+        gateway_cursor = run.gateway_cursor
+        since, watermark = window = (run.since, run.watermark)
+
+    try:
+        while phase == "intents":
+            intents = _next_batch(session, tenant_id, window, checkpoint, batch_size)
+            # The gateway is called outside any transaction; nothing is held open meanwhile.
+            results = fetcher.fetch_sync([pi.gateway_ref for pi in intents]) if intents else []
+            rows = compare_gateway_statuses(tenant_id, intents, results)
+            with session.begin():
+                run = _locked_run(session, run_id, worker_id)
+                if run is None:
+                    log.info("reconciliation run stopped", extra={"run_id": str(run_id)})
+                    return "STOPPED"
+                if not intents:
+                    phase = run.phase = "transactions"
+                    break
+                upsert_discrepancies(session, rows)
+                checkpoint = intents[-1].gateway_ref
+                run.checkpoint = checkpoint
+                run.items_processed += len(intents)
+                run.discrepancy_counts = count_types(rows, dict(run.discrepancy_counts))
+                run.locked_at = _utcnow()
+            RECONCILIATION_RUN_ITEMS_TOTAL.labels(tenant_id).inc(len(intents))
+
+        assert watermark is not None  # fixed by claim_run before the run starts
+        while phase == "transactions":
+            page = fetcher.list_transactions_sync(tenant_id, since, watermark, gateway_cursor)
+            refs = sorted({tx.gateway_ref for tx in page.transactions})
+            with session.begin():
+                local = load_local_intents(session, tenant_id, refs)
+            rows = compare_gateway_transactions(tenant_id, page.transactions, local)
+            with session.begin():
+                run = _locked_run(session, run_id, worker_id)
+                if run is None:
+                    log.info("reconciliation run stopped", extra={"run_id": str(run_id)})
+                    return "STOPPED"
+                upsert_discrepancies(session, rows)
+                gateway_cursor = run.gateway_cursor = page.next_cursor
+                if gateway_cursor is None:
+                    phase = run.phase = "done"
+                run.items_processed += len(page.transactions)
+                run.discrepancy_counts = count_types(rows, dict(run.discrepancy_counts))
+                run.locked_at = _utcnow()
+            RECONCILIATION_RUN_ITEMS_TOTAL.labels(tenant_id).inc(len(page.transactions))
+
+        with session.begin():
+            run = _locked_run(session, run_id, worker_id)
+            if run is None:
+                return "STOPPED"
+            run.status = "SUCCEEDED"
+            run.finished_at = _utcnow()
+            run.locked_by = None
+            record_findings(session, tenant_id, dict(run.discrepancy_counts), run_id=str(run_id))
+    except Exception as exc:
+        log.exception("reconciliation run failed", extra={"run_id": str(run_id)})
+        session.rollback()
+        with session.begin():
+            run = _locked_run(session, run_id, worker_id)
+            if run is not None:
+                run.status = "FAILED"
+                run.error = str(exc)[:500]
+                run.finished_at = _utcnow()
+                run.locked_by = None
+        RECONCILIATION_RUNS_TOTAL.labels("failed").inc()
+        return "FAILED"
+
+    duration = _duration(run) or 0.0
+    RECONCILIATION_RUNS_TOTAL.labels("succeeded").inc()
+    RECONCILIATION_RUN_DURATION_SECONDS.observe(duration)
+    if duration:
+        RECONCILIATION_RUN_THROUGHPUT.labels(tenant_id).set(run.items_processed / duration)
+    return "SUCCEEDED"
@@ -0,0 +1,372 @@
+"""Refund worker pipeline: PENDING -> PROCESSING -> COMPLETED/FAILED.
+
+``claim_refunds`` takes due PENDING refunds (and PROCESSING ones whose worker went quiet) with
+``FOR UPDATE SKIP LOCKED`` and marks them PROCESSING, so concurrent workers never share one.
+``call_gateway`` then refunds them concurrently outside any transaction, at most
+``concurrency`` in flight and paced by the provider's ``RateLimiter``. ``finalize_refunds``
+commits all outcomes in one transaction: confirmed refunds post their ledger entry and
+``payment.refunded`` event, rejected ones hand their reserved amount back to the intent and
+emit ``payment.refund_failed``, and transient failures go back to PENDING with backoff.
+
+A refund the gateway accepted but has not settled yet (Stripe's ``pending`` or
+``requires_action``) is neither: it keeps its reservation, records the gateway's refund id and
+goes back to PENDING, and later claims confirm it with ``get_status`` on that id instead of
+refunding again. Only a definitive failure releases the reserved amount.
+
+The gateway gets ``refund:<id>`` as idempotency key, so a refund claimed again after a worker
+died mid-call is not paid out twice. An intent without a ``gateway_ref`` has no gateway payment
+to refund, so its refunds fail (and release their reservation) instead of completing unpaid.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.orm import Session
+
+from src.application.account_cache import resolve_account
+from src.application.gateway_status import RateLimiter
+from src.application.ledger_chain import lock_chain_head, next_link
+from src.application.ports.payment_gateway import (
+    GatewayResult,
+    GatewayStatus,
+    PaymentGatewayPort,
+)
+from src.infrastructure.db.models import (
+    LedgerEntry,
+    LedgerLine,
+    OutboxEvent,
+    PaymentIntent,
+    Refund,
+)
+from src.infrastructure.redis.response_cache import invalidate_tenant_cache
+from src.shared.correlation import get_correlation_id
+from src.shared.logging import get_logger
+from src.shared.metrics import (
+    GATEWAY_REQUEST_DURATION_SECONDS,
+    GATEWAY_REQUESTS_TOTAL,
+    REFUNDS_TOTAL,
+)
+
+log = get_logger(__name__)
+
+REFUND_CLAIM_BATCH_SIZE = 100
+# PROCESSING refunds not finalized for this long are assumed orphaned and claimed again.
+REFUND_LOCK_TIMEOUT_SECONDS = 300
+MAX_REFUND_ATTEMPTS = 5
+MISSING_GATEWAY_REF = GatewayResult(
+    success=False,
+    gateway_ref="",
+    status=GatewayStatus.FAILED,
+    error_code="missing_gateway_ref",
+    error_message="payment intent was not authorized through the gateway",
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(frozen=True)
+class ClaimedRefund:
+    id: uuid.UUID
+    tenant_id: str
+    payment_intent_id: uuid.UUID
+    amount: Decimal
+    currency: str
+    intent_gateway_ref: Optional[str]
+    attempts: int
+    # Set once the gateway accepted the refund; it is then confirmed, not submitted again.
+    gateway_ref: Optional[str] = None
+
+
+def claim_refunds(
+    session: Session,
+    worker_id: str,
+    limit: int = REFUND_CLAIM_BATCH_SIZE,
+    lock_timeout_seconds: int = REFUND_LOCK_TIMEOUT_SECONDS,
+) -> list[ClaimedRefund]:
+    now = _utcnow()
+    stale_before = now - timedelta(seconds=lock_timeout_seconds)
+    with session.begin():
+        rows = session.execute(
+            select(Refund, PaymentIntent.currency, PaymentIntent.gateway_ref)
+            .join(PaymentIntent, PaymentIntent.id == Refund.payment_intent_id)
+            .where(
+                or_(
+                    and_(Refund.status == "PENDING", Refund.available_at <= now),
+                    and_(Refund.status == "PROCESSING", Refund.locked_at < stale_before),
+                )
+            )
+            .order_by(Refund.available_at)
+            .with_for_update(skip_locked=True, of=Refund)
+            .limit(limit)
+        ).all()
+        for refund, _, _ in rows:
+            refund.status = "PROCESSING"
+            refund.locked_by = worker_id
+            refund.locked_at = now
+            refund.attempts += 1
+    return [
+        ClaimedRefund(
+            id=refund.id,
+            tenant_id=refund.tenant_id,
+            payment_intent_id=refund.payment_intent_id,
+            amount=Decimal(refund.amount),
+            currency=currency,
+            intent_gateway_ref=gateway_ref,
+            attempts=refund.attempts,
+            gateway_ref=refund.gateway_ref,
+        )
+        for refund, currency, gateway_ref in rows
+    ]
+
+
+async def call_gateway(
+    gateway: PaymentGatewayPort,
+    refunds: Sequence[ClaimedRefund],
+    concurrency: int,
+    limiter: Optional[RateLimiter] = None,
+) -> list[GatewayResult]:
+    """Gateway outcome per refund, in order."""
+    slots = asyncio.Semaphore(max(1, concurrency))
+    limiter = limiter or RateLimiter(0)
+
+    async def _refund(r: ClaimedRefund) -> GatewayResult:
+        if r.intent_gateway_ref is None:
+            return MISSING_GATEWAY_REF
+        operation = "get_status" if r.gateway_ref else "refund"
+        async with slots:
+            await limiter.acquire()
+            started = time.perf_counter()
+            try:
+                if r.gateway_ref:
+                    result = await gateway.get_status(r.gateway_ref)
+                else:
+                    result = await gateway.refund(r.intent_gateway_ref, r.amount, f"refund:{r.id}")
+            except Exception as exc:
+                log.warning(
+                    "gateway refund error", extra={"refund_id": str(r.id), "error": str(exc)}
+                )
+                result = GatewayResult(
+                    success=False,
+                    gateway_ref="",
+                    status=GatewayStatus.FAILED,
+                    error_code="gateway_error",
+                    error_message=str(exc),
+                    is_retryable=True,
+                )
+            finally:
+                GATEWAY_REQUEST_DURATION_SECONDS.labels(operation).observe(
+                    time.perf_counter() - started
+                )
+        GATEWAY_REQUESTS_TOTAL.labels(operation, "success" if result.success else "failed").inc()
+        return result
+
+    return list(await asyncio.gather(*(_refund(r) for r in refunds)))
+
+
+def _refund_status(pi: PaymentIntent) -> str:
+    """Intent status for the amount currently accepted for refund."""
+    if pi.refunded_amount >= pi.amount:
+        return "REFUNDED"
+    return "PARTIALLY_REFUNDED" if pi.refunded_amount > 0 else "SETTLED"
+
+
+def _outcome(result: GatewayResult) -> str:
+    """COMPLETED, IN_FLIGHT (accepted, not settled), RETRY (transient error) or FAILED."""
+    if result.status == GatewayStatus.PENDING:
+        return "IN_FLIGHT"
+    if result.success and result.status != GatewayStatus.FAILED:
+        return "COMPLETED"
+    return "RETRY" if result.is_retryable else "FAILED"
+
+
+def _retry_at(now: datetime, attempts: int) -> datetime:
+    return now + timedelta(seconds=min(60, 2 ** min(6, attempts)) + random.uniform(0, 1.0))
+
+
+def finalize_refunds(
+    session: Session,
+    worker_id: str,
+    outcomes: Sequence[tuple[ClaimedRefund, GatewayResult]],
+    max_attempts: int = MAX_REFUND_ATTEMPTS,
+) -> dict[str, int]:
+    """Commit the gateway outcomes of claimed refunds; returns counts per resulting status."""
+    now = _utcnow()
+    counts: dict[str, int] = {}
+    completed_tenants = sorted(
+        {c.tenant_id for c, result in outcomes if _outcome(result) == "COMPLETED"}
+    )
+    entry_rows: list[dict[str, Any]] = []
+    line_rows: list[dict[str, Any]] = []
+    event_rows: list[dict[str, Any]] = []
+    with session.begin():
+        # Same lock order as the API (intent, then chain head), intents in id order.
+        intents = {
+            pi.id: pi
+            for pi in session.execute(
+                select(PaymentIntent)
+                .where(PaymentIntent.id.in_(sorted({c.payment_intent_id for c, _ in outcomes})))
+                .order_by(PaymentIntent.id)
+                .with_for_update()
+            ).scalars()
+        }
+        refunds = {
+            r.id: r
+            for r in session.execute(
+                select(Refund)
+                .where(
+                    Refund.id.in_([c.id for c, _ in outcomes]),
+                    Refund.status == "PROCESSING",
+                    Refund.locked_by == worker_id,
+                )
+                .with_for_update()
+            ).scalars()
+        }
+        heads = {t: lock_chain_head(session, t) for t in completed_tenants}
+        accounts = {
+            t: (
+                resolve_account(session, t, "REFUND_EXPENSE"),
+                resolve_account(session, t, "CASH"),
+            )
+            for t in completed_tenants
+        }
+        correlation_id = get_correlation_id()
+
+        for claimed, result in outcomes:
+            refund = refunds.get(claimed.id)
+            if refund is None:
+                continue  # our claim went stale and another worker has it now
+            pi = intents[claimed.payment_intent_id]
+            refund.locked_by = None
+            refund.locked_at = None
+            payload = {
+                "payment_intent_id": str(pi.id),
+                "refund_id": str(refund.id),
+                "amount": str(refund.amount),
+                "currency": pi.currency,
+                "reason": refund.reason or "",
+                "correlation_id": correlation_id,
+            }
+
+            outcome = _outcome(result)
+            if outcome == "COMPLETED":
+                refund.status = "COMPLETED"
+                refund.gateway_ref = result.gateway_ref
+                refund.error = None
+                refund.finished_at = now
+                pi.status = _refund_status(pi)
+                pi.updated_at = now
+
+                entry_id = uuid.uuid4()
+                debit_account, credit_account = accounts[refund.tenant_id]
+                lines = [
+                    ("DEBIT", debit_account, Decimal(refund.amount), pi.currency),
+                    ("CREDIT", credit_account, Decimal(refund.amount), pi.currency),
+                ]
+                link = next_link(heads[refund.tenant_id], entry_id, now, pi.id, None, lines)
+                entry_rows.append(
+                    {
+                        "id": entry_id,
+                        "tenant_id": refund.tenant_id,
+                        "payment_intent_id": pi.id,
+                        "posted_at": now,
+                        "chain_seq": link.chain_seq,
+                        "prev_hash": link.prev_hash,
+                        "entry_hash": link.entry_hash,
+                    }
+                )
+                line_rows.extend(
+                    {
+                        "id": uuid.uuid4(),
+                        "tenant_id": refund.tenant_id,
+                        "entry_id": entry_id,
+                        "side": side,
+                        "account": account,
+                        "amount": amount,
+                        "currency": currency,
+                        "posted_at": now,
+                    }
+                    for side, account, amount, currency in lines
+                )
+                event_type = "payment.refunded"
+                payload["payment_status"] = pi.status
+            elif outcome == "IN_FLIGHT":
+                # Not final either way: keep the reservation and look the refund up later.
+                refund.status = "PENDING"
+                refund.gateway_ref = result.gateway_ref or refund.gateway_ref
+                refund.error = None
+                refund.available_at = _retry_at(now, refund.attempts)
+                counts["IN_FLIGHT"] = counts.get("IN_FLIGHT", 0) + 1
+                continue
+            elif outcome == "RETRY" and (refund.attempts < max_attempts or refund.gateway_ref):
+                # A refund the gateway already accepted is never failed over lookup errors.
+                refund.status = "PENDING"
+                refund.error = f"{result.error_code}: {result.error_message}"[:500]
+                refund.available_at = _retry_at(now, refund.attempts)
+                counts["RETRY"] = counts.get("RETRY", 0) + 1
+                continue
+            else:
+                refund.status = "FAILED"
+                refund.error = f"{result.error_code}: {result.error_message}"[:500]
+                refund.finished_at = now
+                # Give the reservation back so the amount can be refunded again.
+                pi.refunded_amount -= Decimal(refund.amount)
+                if pi.status in ("PARTIALLY_REFUNDED", "REFUNDED"):
+                    pi.status = _refund_status(pi)
+                pi.updated_at = now
+                event_type = "payment.refund_failed"
+                payload["payment_status"] = pi.status
+                payload["error_code"] = result.error_code
+
+            counts[refund.status] = counts.get(refund.status, 0) + 1
+            REFUNDS_TOTAL.labels(refund.tenant_id, refund.status).inc()
+            event_rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "tenant_id": refund.tenant_id,
+                    "event_type": event_type,
+                    "aggregate_type": "PaymentIntent",
+                    "aggregate_id": str(pi.id),
+                    "payload": payload,
+                }
+            )
+
+        # executemany over insert() is sent as multi-row INSERT ... VALUES pages.
+        if entry_rows:
+            session.execute(insert(LedgerEntry), entry_rows)
+            session.execute(insert(LedgerLine), line_rows)
+        if event_rows:
+            session.execute(insert(OutboxEvent), event_rows)
+
+    for tenant_id in {row["tenant_id"] for row in entry_rows}:
+        invalidate_tenant_cache(tenant_id)
+    return counts
+
+
+def process_refunds(
+    session: Session,
+    worker_id: str,
+    gateway: PaymentGatewayPort,
+    concurrency: int,
+    limiter: Optional[RateLimiter] = None,
+    batch_size: int = REFUND_CLAIM_BATCH_SIZE,
+) -> int:
+    """Claim, refund and finalize one batch; returns how many refunds were claimed."""
+    claimed = claim_refunds(session, worker_id, batch_size)
+    if not claimed:
+        return 0
+    results = asyncio.run(call_gateway(gateway, claimed, concurrency, limiter))
+    counts = finalize_refunds(session, worker_id, list(zip(claimed, results, strict=True)))
+    log.info("refund batch processed", extra={"worker_id": worker_id, **counts})
+    return len(claimed)
@@ -3,25 +3,28 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
+from typing import Any, Optional
 
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 
-from src.infrastructure.db.models import (
-    AccountConfig,
-    LedgerEntry,
-    LedgerLine,
-    OutboxEvent,
-    PaymentIntent,
-    Refund,
-)
-from src.shared.correlation import get_correlation_id
+from src.infrastructure.db.models import PaymentIntent, Refund
+from src.infrastructure.db.session import rowcount
 from src.shared.logging import get_logger
+from src.shared.metrics import REFUNDED_AMOUNT_MISMATCHES
 from src.shared.problem import http_problem
 
 log = get_logger(__name__)
 
+# Upper bound for POST /v1/refunds:batch; larger incidents are split client-side.
+REFUND_BATCH_MAX_ITEMS = 1000
+# Refunds that count against the intent's amount (and towards refunded_amount): a refund
+# reserves its amount when accepted and gives it back only if the gateway rejects it.
+COUNTED_REFUND_STATUSES = ("PENDING", "PROCESSING", "COMPLETED")
+BACKFILL_BATCH_SIZE = 5000
+MAX_REPORTED_MISMATCHES = 1000
+
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
@@ -35,16 +38,57 @@ class RefundDTO(BaseModel):
     status: str
     gateway_ref: str | None
     created_at: str
+    error: str | None = None
+
+
+class RefundItemInput(BaseModel):
+    payment_intent_id: uuid.UUID
+    amount: Decimal
+    reason: str | None = None
+
+
+class RefundBatchItemResult(BaseModel):
+    payment_intent_id: str
+    status: int
+    refund: RefundDTO | None = None
+    error: str | None = None
+
+
+class RefundBatchResultDTO(BaseModel):
+    accepted: int
+    rejected: int
+    items: list[RefundBatchItemResult]
+
+
+class RefundedAmountMismatchDTO(BaseModel):
+    payment_intent_id: str
+    tenant_id: str
+    refunded_amount: str
+    refunds_total: str
+
+
+class RefundedAmountReportDTO(BaseModel):
+    mismatch_count: int
+    mismatches: list[RefundedAmountMismatchDTO]
 
 
-def _resolve_account(session: Session, tenant_id: str, code: str, fallback: str) -> str:
-    cfg = session.execute(
-        select(AccountConfig).where(
-            AccountConfig.tenant_id == tenant_id,
-            AccountConfig.code == code,
+def _refund_problem(
+    pi: Optional[PaymentIntent], total_refunded: Decimal, amount: Decimal
+) -> Optional[tuple[int, str, str]]:
+    """(status, title, detail) when ``amount`` cannot be refunded from ``pi``."""
+    if not pi:
+        return 404, "Not Found", "payment intent not found"
+    if pi.status not in ("SETTLED", "PARTIALLY_REFUNDED"):
+        return 409, "Conflict", f"cannot refund payment with status {pi.status}"
+    if amount <= 0:
+        return 400, "Bad Request", "refund amount must be > 0"
+    if total_refunded + amount > pi.amount:
+        return (
+            422,
+            "Unprocessable Entity",
+            f"total refunds ({total_refunded + amount}) would exceed payment amount ({pi.amount})",
         )
-    ).scalar_one_or_none()
-    return cfg.code if cfg else fallback
+    return None
 
 
 def create_refund(
@@ -54,6 +98,11 @@ def create_refund(
     amount: Decimal,
     reason: str | None = None,
 ) -> RefundDTO:
+    """Accept a refund as PENDING and reserve its amount on the intent.
+
+    The gateway call, ledger posting and ``payment.refunded`` event happen later in the refund
+    worker (``src.application.refund_pipeline``), so the request never waits on the gateway.
+    """
     with session.begin():
         pi = session.execute(
             select(PaymentIntent)
@@ -64,105 +113,132 @@ def create_refund(
             .with_for_update()
         ).scalar_one_or_none()
 
-        if not pi:
-            raise http_problem(
-                404, "Not Found", "payment intent not found",
-                instance=f"/v1/payment-intents/{payment_intent_id}/refund",
-            )
-
-        if pi.status not in ("SETTLED", "PARTIALLY_REFUNDED"):
-            raise http_problem(
-                409, "Conflict",
-                f"cannot refund payment with status {pi.status}",
-                instance=f"/v1/payment-intents/{payment_intent_id}/refund",
-            )
-
-        if amount <= 0:
+        # Maintained under this row lock, so no SUM over the intent's refunds is needed.
+        total_refunded = Decimal(pi.refunded_amount or 0) if pi else Decimal(0)
+        problem = _refund_problem(pi, total_refunded, amount)
+        if problem:
             raise http_problem(
-                400, "Bad Request", "refund amount must be > 0",
-                instance=f"/v1/payment-intents/{payment_intent_id}/refund",
-            )
-
-        total_refunded = session.execute(
-            select(func.coalesce(func.sum(Refund.amount), Decimal(0))).where(
-                Refund.payment_intent_id == payment_intent_id,
-                Refund.tenant_id == tenant_id,
-                Refund.status.in_(("COMPLETED", "PENDING", "PROCESSING")),
-            )
-        ).scalar() or Decimal(0)
-
-        if total_refunded + amount > pi.amount:
-            raise http_problem(
-                422, "Unprocessable Entity",
-                f"total refunds ({total_refunded + amount}) would exceed payment amount ({pi.amount})",
-                instance=f"/v1/payment-intents/{payment_intent_id}/refund",
+                *problem, instance=f"/v1/payment-intents/{payment_intent_id}/refund"
             )
+        assert pi is not None  # a missing intent is a problem above
 
+        now = _utcnow()
         refund = Refund(
             tenant_id=tenant_id,
             payment_intent_id=payment_intent_id,
             amount=amount,
             reason=reason,
             status="PENDING",
-            created_at=_utcnow(),
+            available_at=now,
+            created_at=now,
         )
         session.add(refund)
+        pi.refunded_amount = total_refunded + amount
+        pi.updated_at = now
         session.flush()
 
-        debit_account = _resolve_account(session, tenant_id, "REFUND_EXPENSE", "REFUND_EXPENSE")
-        credit_account = _resolve_account(session, tenant_id, "CASH", "CASH")
+    return _to_dto(refund)
 
-        entry = LedgerEntry(
-            tenant_id=tenant_id,
-            payment_intent_id=payment_intent_id,
-            posted_at=_utcnow(),
+
+def create_refunds_batch(
+    session: Session, tenant_id: str, items: list[RefundItemInput]
+) -> RefundBatchResultDTO:
+    """Accept many refunds in one transaction, with a result per item in request order.
+
+    Items that cannot be refunded (unknown intent, wrong status, over-refund) are rejected
+    individually; the rest are queued together. Intents are locked in id order, so concurrent
+    batches touching the same intents queue up instead of deadlocking.
+    """
+    instance = "/v1/refunds:batch"
+    if not items:
+        raise http_problem(400, "Bad Request", "items must not be empty", instance=instance)
+    if len(items) > REFUND_BATCH_MAX_ITEMS:
+        raise http_problem(
+            400,
+            "Bad Request",
+            f"at most {REFUND_BATCH_MAX_ITEMS} items per batch",
+            instance=instance,
         )
-        entry.lines = [
-            LedgerLine(
-                tenant_id=tenant_id, side="DEBIT", account=debit_account,
-                amount=amount, currency=pi.currency,
-            ),
-            LedgerLine(
-                tenant_id=tenant_id, side="CREDIT", account=credit_account,
-                amount=amount, currency=pi.currency,
-            ),
-        ]
-        session.add(entry)
-
-        if total_refunded + amount >= pi.amount:
-            pi.status = "REFUNDED"
-        else:
-            pi.status = "PARTIALLY_REFUNDED"
-        pi.updated_at = _utcnow()
-
-        refund.status = "COMPLETED"
-
-        session.add(
-            OutboxEvent(
-                tenant_id=tenant_id,
-                event_type="payment.refunded",
-                aggregate_type="PaymentIntent",
-                aggregate_id=str(payment_intent_id),
-                payload={
-                    "payment_intent_id": str(payment_intent_id),
-                    "refund_id": str(refund.id),
-                    "amount": str(amount),
-                    "currency": pi.currency,
-                    "reason": reason or "",
-                    "payment_status": pi.status,
-                    "correlation_id": get_correlation_id(),
-                },
+
+    results: list[RefundBatchItemResult] = []
+    refund_rows: list[dict[str, Any]] = []
+    with session.begin():
+        ids = sorted({item.payment_intent_id for item in items})
+        intents = {
+            pi.id: pi
+            for pi in session.execute(
+                select(PaymentIntent)
+                .where(PaymentIntent.tenant_id == tenant_id, PaymentIntent.id.in_(ids))
+                .order_by(PaymentIntent.id)
+                .with_for_update()
+            ).scalars()
+        }
+
+        now = _utcnow()
+        for item in items:
+            pi = intents.get(item.payment_intent_id)
+            total_refunded = Decimal(pi.refunded_amount or 0) if pi else Decimal(0)
+            problem = _refund_problem(pi, total_refunded, item.amount)
+            if problem:
+                results.append(
+                    RefundBatchItemResult(
+                        payment_intent_id=str(item.payment_intent_id),
+                        status=problem[0],
+                        error=problem[2],
+                    )
+                )
+                continue
+            assert pi is not None  # a missing intent is a problem above
+
+            # Later items for the same intent see the amount reserved by earlier ones.
+            pi.refunded_amount = total_refunded + item.amount
+            pi.updated_at = now
+            refund = {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant_id,
+                "payment_intent_id": pi.id,
+                "amount": item.amount,
+                "reason": item.reason,
+                "status": "PENDING",
+                "available_at": now,
+                "created_at": now,
+            }
+            refund_rows.append(refund)
+            results.append(
+                RefundBatchItemResult(
+                    payment_intent_id=str(pi.id),
+                    status=202,
+                    refund=RefundDTO(
+                        id=str(refund["id"]),
+                        payment_intent_id=str(pi.id),
+                        amount=str(item.amount),
+                        reason=item.reason,
+                        status="PENDING",
+                        gateway_ref=None,
+                        created_at=now.isoformat(),
+                    ),
+                )
             )
-        )
 
+        if refund_rows:
+            # executemany over insert() is sent as multi-row INSERT ... VALUES pages.
+            session.execute(insert(Refund), refund_rows)
+
+    return RefundBatchResultDTO(
+        accepted=len(refund_rows), rejected=len(items) - len(refund_rows), items=results
+    )
+
+
+def _to_dto(r: Refund) -> RefundDTO:
     return RefundDTO(
-        id=str(refund.id),
-        payment_intent_id=str(refund.payment_intent_id),
-        amount=str(refund.amount),
-        reason=refund.reason,
-        status=refund.status,
-        gateway_ref=refund.gateway_ref,
-        created_at=refund.created_at.isoformat(),
+        id=str(r.id),
+        payment_intent_id=str(r.payment_intent_id),
+        amount=str(r.amount),
+        reason=r.reason,
+        status=r.status,
+        gateway_ref=r.gateway_ref,
+        created_at=r.created_at.isoformat(),
+        error=r.error,
     )
 
 
@@ -177,15 +253,91 @@ def list_refunds(
         )
         .order_by(Refund.created_at.desc())
     ).scalars().all()
-    return [
-        RefundDTO(
-            id=str(r.id),
-            payment_intent_id=str(r.payment_intent_id),
-            amount=str(r.amount),
-            reason=r.reason,
-            status=r.status,
-            gateway_ref=r.gateway_ref,
-            created_at=r.created_at.isoformat(),
+    return [_to_dto(r) for r in rows]
+
+
+def verify_refunded_amounts(
+    session: Session, tenant_ids: Optional[list[str]] = None
+) -> RefundedAmountReportDTO:
+    """Intents whose cached ``refunded_amount`` disagrees with their refunds."""
+    per_intent = (
+        select(Refund.payment_intent_id, func.sum(Refund.amount).label("total"))
+        .where(Refund.status.in_(COUNTED_REFUND_STATUSES))
+        .group_by(Refund.payment_intent_id)
+    )
+    if tenant_ids is not None:
+        per_intent = per_intent.where(Refund.tenant_id.in_(tenant_ids))
+    totals = per_intent.subquery()
+    actual = func.coalesce(totals.c.total, Decimal(0))
+    q = (
+        select(
+            PaymentIntent.id,
+            PaymentIntent.tenant_id,
+            PaymentIntent.refunded_amount,
+            actual.label("refunds_total"),
+            func.count().over().label("mismatch_count"),
         )
-        for r in rows
-    ]
+        .outerjoin(totals, totals.c.payment_intent_id == PaymentIntent.id)
+        .where(PaymentIntent.refunded_amount != actual)
+    )
+    if tenant_ids is not None:
+        q = q.where(PaymentIntent.tenant_id.in_(tenant_ids))
+    with session.begin():
+        rows = session.execute(
+            q.order_by(PaymentIntent.tenant_id, PaymentIntent.id).limit(MAX_REPORTED_MISMATCHES)
+        ).all()
+
+    count = rows[0].mismatch_count if rows else 0
+    REFUNDED_AMOUNT_MISMATCHES.set(count)
+    if count:
+        log.warning("refunded_amount mismatches", extra={"mismatch_count": count})
+    return RefundedAmountReportDTO(
+        mismatch_count=count,
+        mismatches=[
+            RefundedAmountMismatchDTO(
+                payment_intent_id=str(r.id),
+                tenant_id=r.tenant_id,
+                refunded_amount=str(r.refunded_amount),
+                refunds_total=str(r.refunds_total),
+            )
+            for r in rows
+        ],
+    )
+
+
+def backfill_refunded_amounts(
+    session: Session,
+    tenant_ids: Optional[list[str]] = None,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+) -> int:
+    """Recompute ``refunded_amount`` from refunds in id-ordered batches; returns rows fixed."""
+    fixed = 0
+    after: Optional[uuid.UUID] = None
+    while True:
+        with session.begin():
+            # Lock the batch first so refunds committed meanwhile are counted, not overwritten.
+            q = select(PaymentIntent.id).order_by(PaymentIntent.id).limit(batch_size)
+            if tenant_ids is not None:
+                q = q.where(PaymentIntent.tenant_id.in_(tenant_ids))
+            if after is not None:
+                q = q.where(PaymentIntent.id > after)
+            ids = list(session.execute(q.with_for_update()).scalars())
+            if not ids:
+                return fixed
+            total = (
+                select(func.coalesce(func.sum(Refund.amount), Decimal(0)))
+                .where(
+                    Refund.payment_intent_id == PaymentIntent.id,
+                    Refund.status.in_(COUNTED_REFUND_STATUSES),
+                )
+                .scalar_subquery()
+            )
+            fixed += rowcount(
+                session.execute(
+                    update(PaymentIntent)
+                    .where(PaymentIntent.id.in_(ids), PaymentIntent.refunded_amount != total)
+                    .values(refunded_amount=total)
+                    .execution_options(synchronize_session=False)
+                )
+            )
+            after = ids[-1]
@@ -0,0 +1,339 @@
+"""Asynchronous report jobs.
+
+A request whose estimated size is within its kind's inline threshold is computed right away
+and stored as a finished job; larger ones are queued and computed by the worker one UTC month
+at a time. Partial totals are additive, so chunk results are merged as they arrive; the job row
+carries progress and is re-read between chunks so cancellation takes effect promptly.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from src.application.reports import (
+    GRANULARITIES,
+    REVENUE_ACCOUNT,
+    Totals,
+    format_account_balances,
+    format_revenue,
+    ledger_totals,
+    merge_totals,
+)
+from src.infrastructure.db.models import LedgerEntry, ReportJob
+from src.infrastructure.db.partitions import add_months, month_start
+from src.shared.logging import get_logger
+from src.shared.metrics import (
+    REPORT_JOB_CHUNKS_TOTAL,
+    REPORT_JOB_DURATION_SECONDS,
+    REPORT_JOBS_TOTAL,
+)
+from src.shared.problem import http_problem
+
+log = get_logger(__name__)
+
+REPORT_KINDS = ("revenue", "account_balances")
+# Largest request computed inline: output buckets for revenue, days covered for balances.
+INLINE_MAX_SIZE = {"revenue": 400, "account_balances": 730}
+_BUCKET_DAYS = {"day": 1, "week": 7, "month": 30}
+# RUNNING jobs not touched for this long are assumed orphaned and restarted.
+STALE_JOB_SECONDS = 600
+
+ACTIVE_STATUSES = ("PENDING", "RUNNING")
+
+
+class ReportJobRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    kind: str
+    from_: Optional[datetime] = Field(default=None, alias="from")
+    to: Optional[datetime] = None
+    granularity: str = "month"
+
+
+class ReportJobDTO(BaseModel):
+    id: str
+    kind: str
+    status: str
+    params: dict[str, Any]
+    chunks_total: int
+    chunks_done: int
+    progress: float
+    result: list[dict[str, Any]] | None = None
+    error: str | None = None
+    created_at: str
+    finished_at: str | None = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _to_dto(job: ReportJob) -> ReportJobDTO:
+    return ReportJobDTO(
+        id=str(job.id),
+        kind=job.kind,
+        status=job.status,
+        params=job.params,
+        chunks_total=job.chunks_total,
+        chunks_done=job.chunks_done,
+        progress=round(job.chunks_done / job.chunks_total, 4) if job.chunks_total else 1.0,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at.isoformat(),
+        finished_at=job.finished_at.isoformat() if job.finished_at else None,
+    )
+
+
+def month_chunks(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """Split [start, end) at UTC month boundaries."""
+    chunks: list[tuple[datetime, datetime]] = []
+    current = start
+    while current < end:
+        nxt = add_months(month_start(current.astimezone(timezone.utc)), 1)
+        boundary = datetime(nxt.year, nxt.month, 1, tzinfo=timezone.utc)
+        chunks.append((current, min(boundary, end)))
+        current = boundary
+    return chunks
+
+
+def estimate_size(kind: str, start: datetime, end: datetime, granularity: str) -> int:
+    days = max(1, math.ceil((end - start) / timedelta(days=1)))
+    if kind == "revenue":
+        return math.ceil(days / _BUCKET_DAYS[granularity])
+    return days
+
+
+def _resolve_range(
+    session: Session, tenant_id: str, req: ReportJobRequest
+) -> tuple[datetime, datetime]:
+    def utc(value: datetime) -> datetime:
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+    now = _utcnow()
+    if req.from_ is not None:
+        start = utc(req.from_)
+    else:
+        first = session.execute(
+            select(LedgerEntry.posted_at)
+            .where(LedgerEntry.tenant_id == tenant_id)
+            .order_by(LedgerEntry.posted_at)
+            .limit(1)
+        ).scalar()
+        start = first or now
+    # The API's ``to`` is inclusive; jobs work on half-open ranges.
+    end = utc(req.to) + timedelta(microseconds=1) if req.to is not None else now
+    return start, max(start, end)
+
+
+def ensure_inline_size(
+    session: Session, tenant_id: str, req: ReportJobRequest, instance: str
+) -> None:
+    """Reject a synchronous report whose range is over ``INLINE_MAX_SIZE``.
+
+    The GET report endpoints share the inline bound of ``submit_report_job``; larger ranges
+    have to go through ``POST /v1/reports/jobs``.
+    """
+    start, end = _resolve_range(session, tenant_id, req)
+    size = estimate_size(req.kind, start, end, req.granularity)
+    if size > INLINE_MAX_SIZE[req.kind]:
+        raise http_problem(
+            422,
+            "Unprocessable Entity",
+            f"report size {size} exceeds the inline limit of {INLINE_MAX_SIZE[req.kind]}; "
+            "submit it with POST /v1/reports/jobs",
+            instance=instance,
+        )
+
+
+def _compute(
+    session: Session, job_kind: str, tenant_id: str, start: datetime, end: datetime, gran: str
+) -> Totals:
+    if job_kind == "revenue":
+        return ledger_totals(
+            session, tenant_id, start, end, gran, REVENUE_ACCOUNT, to_exclusive=True
+        )
+    return ledger_totals(session, tenant_id, start, end, to_exclusive=True)
+
+
+def _format(kind: str, totals: Totals) -> list[dict[str, Any]]:
+    items = format_revenue(totals) if kind == "revenue" else format_account_balances(totals)
+    return [i.model_dump() for i in items]
+
+
+def submit_report_job(
+    session: Session, tenant_id: str, req: ReportJobRequest
+) -> tuple[ReportJobDTO, bool]:
+    """Create a report job; returns (job, computed_inline)."""
+    instance = "/v1/reports/jobs"
+    if req.kind not in REPORT_KINDS:
+        raise http_problem(400, "Bad Request", f"unknown report kind {req.kind}", instance=instance)
+    if req.granularity not in GRANULARITIES:
+        raise http_problem(
+            400, "Bad Request", f"invalid granularity {req.granularity}", instance=instance
+        )
+
+    with session.begin():
+        start, end = _resolve_range(session, tenant_id, req)
+        chunks = month_chunks(start, end)
+        inline = estimate_size(req.kind, start, end, req.granularity) <= INLINE_MAX_SIZE[req.kind]
+        job = ReportJob(
+            tenant_id=tenant_id,
+            kind=req.kind,
+            params={
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "granularity": req.granularity,
+            },
+            chunks_total=max(1, len(chunks)),
+            chunks_done=0,
+            created_at=_utcnow(),
+        )
+        if inline:
+            totals = _compute(session, req.kind, tenant_id, start, end, req.granularity)
+            job.result = _format(req.kind, totals)
+            job.status = "SUCCEEDED"
+            job.chunks_done = job.chunks_total
+            job.finished_at = _utcnow()
+        else:
+            job.status = "PENDING"
+        session.add(job)
+        session.flush()
+
+    REPORT_JOBS_TOTAL.labels(req.kind, "inline" if inline else "queued").inc()
+    return _to_dto(job), inline
+
+
+def get_report_job(session: Session, tenant_id: str, job_id: uuid.UUID) -> ReportJobDTO:
+    job = session.execute(
+        select(ReportJob).where(ReportJob.tenant_id == tenant_id, ReportJob.id == job_id)
+    ).scalar_one_or_none()
+    if not job:
+        raise http_problem(
+            404, "Not Found", "report job not found", instance=f"/v1/reports/jobs/{job_id}"
+        )
+    return _to_dto(job)
+
+
+def cancel_report_job(session: Session, tenant_id: str, job_id: uuid.UUID) -> ReportJobDTO:
+    instance = f"/v1/reports/jobs/{job_id}/cancel"
+    with session.begin():
+        job = session.execute(
+            select(ReportJob)
+            .where(ReportJob.tenant_id == tenant_id, ReportJob.id == job_id)
+            .with_for_update()
+        ).scalar_one_or_none()
+        if not job:
+            raise http_problem(404, "Not Found", "report job not found", instance=instance)
+        if job.status not in ACTIVE_STATUSES:
+            raise http_problem(
+                409, "Conflict", f"report job is already {job.status}", instance=instance
+            )
+        job.status = "CANCELLED"
+        job.finished_at = _utcnow()
+        job.locked_by = None
+    REPORT_JOBS_TOTAL.labels(job.kind, "cancelled").inc()
+    return _to_dto(job)
+
+
+def claim_report_job(session: Session, worker_id: str) -> Optional[uuid.UUID]:
+    now = _utcnow()
+    stale_before = now - timedelta(seconds=STALE_JOB_SECONDS)
+    with session.begin():
+        job = session.execute(
+            select(ReportJob)
+            .where(
+                or_(
+                    ReportJob.status == "PENDING",
+                    and_(ReportJob.status == "RUNNING", ReportJob.locked_at < stale_before),
+                )
+            )
+            .order_by(ReportJob.created_at)
+            .with_for_update(skip_locked=True)
+            .limit(1)
+        ).scalar_one_or_none()
+        if not job:
+            return None
+        job.status = "RUNNING"
+        job.chunks_done = 0
+        job.locked_by = worker_id
+        job.locked_at = now
+        return job.id
+
+
+def _stopped_status(job: ReportJob, worker_id: str) -> Optional[str]:
+    """Why this worker must stop writing to ``job``, or None while it still holds the claim.
+
+    A job reclaimed as stale is RUNNING under another worker; the original one stops without
+    touching it so the two never interleave chunk progress or results.
+    """
+    if job.status != "RUNNING":
+        return job.status
+    if job.locked_by != worker_id:
+        return "RECLAIMED"
+    return None
+
+
+def run_report_job(session: Session, job_id: uuid.UUID, worker_id: str) -> str:
+    """Compute a job claimed by ``worker_id`` chunk by chunk; returns its final status."""
+    started = time.monotonic()
+    with session.begin():
+        job = session.get(ReportJob, job_id)
+        if job is None:
+            return "MISSING"
+        kind, tenant_id, params = job.kind, job.tenant_id, dict(job.params)
+    start = datetime.fromisoformat(params["from"])
+    end = datetime.fromisoformat(params["to"])
+    granularity = params.get("granularity", "month")
+
+    totals: Totals = {}
+    try:
+        for done, (chunk_start, chunk_end) in enumerate(month_chunks(start, end), start=1):
+            with session.begin():
+                merge_totals(
+                    totals, _compute(session, kind, tenant_id, chunk_start, chunk_end, granularity)
+                )
+                job = session.get(ReportJob, job_id, with_for_update=True, populate_existing=True)
+                stopped = "MISSING" if job is None else _stopped_status(job, worker_id)
+                if job is None or stopped is not None:
+                    log.info("report job stopped", extra={"job_id": str(job_id), "status": stopped})
+                    return stopped or "MISSING"
+                job.chunks_done = done
+                job.locked_at = _utcnow()
+            REPORT_JOB_CHUNKS_TOTAL.labels(kind).inc()
+
+        with session.begin():
+            job = session.get(ReportJob, job_id, with_for_update=True, populate_existing=True)
+            if job is None:
+                return "MISSING"
+            stopped = _stopped_status(job, worker_id)
+            if stopped is not None:
+                return stopped
+            job.result = _format(kind, totals)
+            job.status = "SUCCEEDED"
+            job.chunks_done = job.chunks_total
+            job.finished_at = _utcnow()
+            job.locked_by = None
+    except Exception as exc:
+        log.exception("report job failed", extra={"job_id": str(job_id)})
+        session.rollback()
+        with session.begin():
+            job = session.get(ReportJob, job_id, with_for_update=True, populate_existing=True)
+            if job is not None and _stopped_status(job, worker_id) is None:
+                job.status = "FAILED"
+                job.error = str(exc)[:500]
+                job.finished_at = _utcnow()
+                job.locked_by = None
+        REPORT_JOBS_TOTAL.labels(kind, "failed").inc()
+        return "FAILED"
+
+    REPORT_JOBS_TOTAL.labels(kind, "succeeded").inc()
+    REPORT_JOB_DURATION_SECONDS.labels(kind).observe(time.monotonic() - started)
+    return "SUCCEEDED"
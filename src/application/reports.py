@@ -0,0 +1,772 @@
+"""Ledger reports served from daily rollups.
+
+``ledger_daily_rollups`` holds per-day debit/credit totals for every line whose entry has
+``chain_seq`` at or below the tenant's watermark. Chain numbers are assigned under the chain
+head lock, so they commit in order and make a safe high-water mark. A report reads rollups for
+the whole UTC days it covers, and raw lines only for the partial days at its edges and for
+entries posted after the watermark; the three parts are disjoint and run as one statement so
+they share a snapshot with the watermark.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Optional
+
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    DateTime,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.application.fx import FxRateMissing, convert_minor, get_fx_cache, to_micros
+from src.application.ledger_integrity import list_units
+from src.infrastructure.db.models import (
+    LedgerChainHead,
+    LedgerDailyRollup,
+    LedgerEntry,
+    LedgerLine,
+    LedgerRollupWatermark,
+    TenantRevenueTotal,
+)
+from src.infrastructure.db.partitions import add_months
+from src.shared.config import Settings
+from src.shared.logging import get_logger
+from src.shared.metrics import LEDGER_ROLLUP_ENTRIES_FOLDED_TOTAL
+from src.shared.problem import http_problem
+
+log = get_logger(__name__)
+
+REVENUE_ACCOUNT = "REVENUE"
+GRANULARITIES = ("day", "week", "month")
+
+
+class RevenueReportItem(BaseModel):
+    period: str
+    currency: str
+    total: str
+
+
+class TenantRevenueItem(BaseModel):
+    tenant_id: str
+    currency: str
+    total: str
+    updated_at: str
+
+
+class AccountBalanceReportItem(BaseModel):
+    account: str
+    currency: str
+    debits_total: str
+    credits_total: str
+    balance: str
+
+
+class RollupBackfillDTO(BaseModel):
+    tenants: int
+    chunks: int
+    elapsed_seconds: float
+
+
+@dataclass(frozen=True)
+class _Window:
+    """Whole UTC days [first_day, end_day) inside a report range; None means unbounded."""
+
+    first_day: date | None
+    end_day: date | None
+
+    @property
+    def empty(self) -> bool:
+        return (
+            self.first_day is not None
+            and self.end_day is not None
+            and self.first_day >= self.end_day
+        )
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, dtime.min, tzinfo=timezone.utc)
+
+
+def day_window(from_dt: Optional[datetime], to_dt: Optional[datetime]) -> _Window:
+    first = end = None
+    if from_dt is not None:
+        start = from_dt.astimezone(timezone.utc)
+        first = start.date() if start == _midnight(start.date()) else start.date() + timedelta(1)
+    if to_dt is not None:
+        # to is inclusive; lines on its own day (up to to_dt) are read from the ledger.
+        end = to_dt.astimezone(timezone.utc).date()
+    return _Window(first, end)
+
+
+def _utc_day(col: Any) -> Any:
+    return cast(func.timezone("UTC", col), Date)
+
+
+def _sums() -> tuple[Any, Any]:
+    debits = func.coalesce(
+        func.sum(case((LedgerLine.side == "DEBIT", LedgerLine.amount), else_=Decimal(0))),
+        Decimal(0),
+    )
+    credits = func.coalesce(
+        func.sum(case((LedgerLine.side == "CREDIT", LedgerLine.amount), else_=Decimal(0))),
+        Decimal(0),
+    )
+    return debits, credits
+
+
+Totals = dict[tuple[Optional[datetime], str, str], list[Decimal]]
+
+
+def ledger_totals(
+    session: Session,
+    tenant_id: str,
+    from_dt: Optional[datetime],
+    to_dt: Optional[datetime],
+    granularity: Optional[str] = None,
+    account: Optional[str] = None,
+    to_exclusive: bool = False,
+) -> Totals:
+    """Debit/credit totals keyed by (period, account, currency).
+
+    ``period`` is the UTC ``date_trunc`` bucket when ``granularity`` is given, else None.
+    ``to_dt`` is inclusive unless ``to_exclusive``, which lets callers tile a range.
+    """
+    if granularity is not None and granularity not in GRANULARITIES:
+        raise ValueError(f"unsupported granularity {granularity}")
+    from_dt, to_dt = _as_utc(from_dt), _as_utc(to_dt)
+    window = day_window(from_dt, to_dt)
+
+    def grouped(q: Any, ts: Any, account_col: Any, currency_col: Any, *sums: Any) -> Any:
+        keys = [account_col, currency_col]
+        period: ColumnElement[Any]
+        if granularity:
+            # Granularity is validated above; inlined so SELECT and GROUP BY match textually.
+            period = func.date_trunc(literal_column(f"'{granularity}'"), ts)
+            keys.insert(0, period)
+        else:
+            period = null()
+        return q.add_columns(period.label("period"), account_col, currency_col, *sums).group_by(
+            *keys
+        )
+
+    def line_part(*filters: Any, join_entries: bool = False) -> Any:
+        debits, credits = _sums()
+        q = select()
+        if join_entries:
+            q = q.select_from(LedgerLine).join(
+                LedgerEntry,
+                and_(
+                    LedgerEntry.id == LedgerLine.entry_id,
+                    LedgerEntry.posted_at == LedgerLine.posted_at,
+                ),
+            )
+        q = q.where(LedgerLine.tenant_id == tenant_id, *filters)
+        if account:
+            q = q.where(LedgerLine.account == account)
+        if from_dt:
+            q = q.where(LedgerLine.posted_at >= from_dt)
+        if to_dt:
+            before = LedgerLine.posted_at < to_dt
+            q = q.where(before if to_exclusive else LedgerLine.posted_at <= to_dt)
+        return grouped(
+            q,
+            func.timezone("UTC", LedgerLine.posted_at),
+            LedgerLine.account,
+            LedgerLine.currency,
+            debits.label("debits"),
+            credits.label("credits"),
+        )
+
+    if window.empty:
+        # No whole day inside the range: read it straight from the ledger.
+        parts = [line_part()]
+    else:
+        outside: list[Any] = []
+        full_days: list[Any] = []
+        rollup_days: list[Any] = []
+        if window.first_day is not None:
+            outside.append(LedgerLine.posted_at < _midnight(window.first_day))
+            full_days.append(LedgerLine.posted_at >= _midnight(window.first_day))
+            rollup_days.append(LedgerDailyRollup.day >= window.first_day)
+        if window.end_day is not None:
+            outside.append(LedgerLine.posted_at >= _midnight(window.end_day))
+            full_days.append(LedgerLine.posted_at < _midnight(window.end_day))
+            rollup_days.append(LedgerDailyRollup.day < window.end_day)
+        watermark = (
+            select(LedgerRollupWatermark.last_chain_seq)
+            .where(LedgerRollupWatermark.tenant_id == tenant_id)
+            .scalar_subquery()
+        )
+        rollups = select().where(LedgerDailyRollup.tenant_id == tenant_id, *rollup_days)
+        if account:
+            rollups = rollups.where(LedgerDailyRollup.account == account)
+        parts = [
+            # Whole days: rollups, plus entries posted after the watermark.
+            grouped(
+                rollups,
+                cast(LedgerDailyRollup.day, DateTime()),
+                LedgerDailyRollup.account,
+                LedgerDailyRollup.currency,
+                func.sum(LedgerDailyRollup.debits_total).label("debits"),
+                func.sum(LedgerDailyRollup.credits_total).label("credits"),
+            ),
+            line_part(
+                *full_days,
+                LedgerEntry.tenant_id == tenant_id,
+                LedgerEntry.chain_seq > func.coalesce(watermark, 0),
+                join_entries=True,
+            ),
+        ]
+        if outside:
+            # Partial days at the edges of the range.
+            parts.append(line_part(or_(*outside)))
+
+    totals: Totals = {}
+    for row in session.execute(union_all(*parts)).all():
+        bucket = row.period.replace(tzinfo=timezone.utc) if row.period else None
+        acc = totals.setdefault((bucket, row.account, row.currency), [Decimal(0), Decimal(0)])
+        acc[0] += row.debits
+        acc[1] += row.credits
+    return totals
+
+
+def merge_totals(into: Totals, other: Totals) -> Totals:
+    for key, (debits, credits) in other.items():
+        acc = into.setdefault(key, [Decimal(0), Decimal(0)])
+        acc[0] += debits
+        acc[1] += credits
+    return into
+
+
+def format_revenue(totals: Totals) -> list[RevenueReportItem]:
+    by_period: dict[tuple[datetime, str], Decimal] = {}
+    for (period, _, currency), (_, credits) in totals.items():
+        if period is not None:
+            by_period[(period, currency)] = by_period.get((period, currency), Decimal(0)) + credits
+    return [
+        RevenueReportItem(period=period.isoformat(), currency=currency, total=str(total))
+        for (period, currency), total in sorted(by_period.items())
+        if total
+    ]
+
+
+def format_account_balances(totals: Totals) -> list[AccountBalanceReportItem]:
+    return [
+        AccountBalanceReportItem(
+            account=account,
+            currency=currency,
+            debits_total=str(debits),
+            credits_total=str(credits),
+            balance=str(credits - debits),
+        )
+        for (_, account, currency), (debits, credits) in sorted(
+            totals.items(), key=lambda kv: kv[0][1:]
+        )
+    ]
+
+
+_DAY_US = 86_400_000_000
+
+
+def _minor(values: list[Decimal]) -> np.ndarray:
+    return np.array([int(v.scaleb(2)) for v in values], dtype=np.int64)
+
+
+def _from_minor(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+def _truncate(day: datetime, granularity: Optional[str]) -> Optional[datetime]:
+    if granularity is None:
+        return None
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def convert_day_totals(
+    session: Session,
+    tenant_id: str,
+    days: Totals,
+    target: str,
+    granularity: Optional[str],
+    account: Optional[str],
+    from_dt: Optional[datetime],
+    to_dt: Optional[datetime],
+) -> Totals:
+    """Convert per-day totals into ``target`` and regroup them by ``granularity``.
+
+    A day total is converted at the rate in effect at the start of its day. Days on which a
+    pair's rate changes are re-read line by line and each line is converted at its own
+    ``posted_at``, so every amount uses the rate effective when it was posted.
+    """
+    out: Totals = {}
+
+    def add(day: datetime, acc: str, debits: Any, credits: Any) -> None:
+        merge_totals(out, {(_truncate(day, granularity), acc, target): [debits, credits]})
+
+    foreign: dict[str, list[tuple[datetime, str, Decimal, Decimal]]] = {}
+    for (day, acc, currency), (debits, credits) in days.items():
+        if day is None:
+            raise ValueError("convert_day_totals needs day buckets")
+        if currency == target:
+            add(day, acc, debits, credits)
+        else:
+            foreign.setdefault(currency, []).append((day, acc, debits, credits))
+
+    for currency, rows in foreign.items():
+        starts = np.fromiter((to_micros(r[0]) for r in rows), dtype=np.int64, count=len(rows))
+        changes = get_fx_cache().change_points(
+            session, currency, target, int(starts.min()), int(starts.max()) + _DAY_US
+        )
+        # Rates taking effect at midnight apply to whole days; only intra-day changes split.
+        intraday = changes[changes % _DAY_US != 0]
+        split_days = np.unique(intraday - intraday % _DAY_US)
+        whole = ~np.isin(starts, split_days)
+        kept = [r for r, keep in zip(rows, whole.tolist()) if keep]
+        at = starts[whole]
+        debit_minor = convert_minor(session, currency, target, at, _minor([r[2] for r in kept]))
+        credit_minor = convert_minor(session, currency, target, at, _minor([r[3] for r in kept]))
+        for (day, acc, _, _), d, c in zip(kept, debit_minor.tolist(), credit_minor.tolist()):
+            add(day, acc, _from_minor(d), _from_minor(c))
+
+        for start in split_days.tolist():
+            day = datetime.fromtimestamp(start / 1_000_000, timezone.utc)
+            lo = max(day, from_dt) if from_dt else day
+            hi = day + timedelta(days=1)
+            q = select(
+                LedgerLine.posted_at, LedgerLine.account, LedgerLine.side, LedgerLine.amount
+            ).where(
+                LedgerLine.tenant_id == tenant_id,
+                LedgerLine.currency == currency,
+                LedgerLine.posted_at >= lo,
+                LedgerLine.posted_at < hi,
+            )
+            if to_dt is not None:
+                q = q.where(LedgerLine.posted_at <= to_dt)
+            if account:
+                q = q.where(LedgerLine.account == account)
+            lines = session.execute(q).all()
+            if not lines:
+                continue
+            line_at = np.fromiter(
+                (to_micros(r.posted_at) for r in lines), dtype=np.int64, count=len(lines)
+            )
+            converted = convert_minor(
+                session, currency, target, line_at, _minor([r.amount for r in lines])
+            )
+            for r, amount in zip(lines, converted.tolist()):
+                value = _from_minor(amount)
+                if r.side == "DEBIT":
+                    add(day, r.account, value, Decimal(0))
+                else:
+                    add(day, r.account, Decimal(0), value)
+    return out
+
+
+def _converted_totals(
+    session: Session,
+    tenant_id: str,
+    from_dt: Optional[datetime],
+    to_dt: Optional[datetime],
+    granularity: Optional[str],
+    account: Optional[str],
+    target_currency: str,
+    instance: str,
+) -> Totals:
+    from_dt, to_dt = _as_utc(from_dt), _as_utc(to_dt)
+    days = ledger_totals(session, tenant_id, from_dt, to_dt, "day", account)
+    try:
+        return convert_day_totals(
+            session, tenant_id, days, target_currency.upper(), granularity, account, from_dt, to_dt
+        )
+    except FxRateMissing as exc:
+        raise http_problem(422, "Unprocessable Entity", str(exc), instance=instance)
+
+
+def revenue_report(
+    session: Session,
+    tenant_id: str,
+    from_dt: Optional[datetime],
+    to_dt: Optional[datetime],
+    granularity: str = "month",
+    target_currency: Optional[str] = None,
+) -> list[RevenueReportItem]:
+    if target_currency:
+        return format_revenue(
+            _converted_totals(
+                session,
+                tenant_id,
+                from_dt,
+                to_dt,
+                granularity,
+                REVENUE_ACCOUNT,
+                target_currency,
+                "/v1/reports/revenue",
+            )
+        )
+    return format_revenue(
+        ledger_totals(session, tenant_id, from_dt, to_dt, granularity, REVENUE_ACCOUNT)
+    )
+
+
+def account_balances_report(
+    session: Session,
+    tenant_id: str,
+    from_dt: Optional[datetime],
+    to_dt: Optional[datetime],
+    target_currency: Optional[str] = None,
+) -> list[AccountBalanceReportItem]:
+    if target_currency:
+        return format_account_balances(
+            _converted_totals(
+                session,
+                tenant_id,
+                from_dt,
+                to_dt,
+                None,
+                None,
+                target_currency,
+                "/v1/reports/account-balances",
+            )
+        )
+    return format_account_balances(ledger_totals(session, tenant_id, from_dt, to_dt))
+
+
+def _lock_key(tenant_id: str) -> Any:
+    return func.hashtext(f"ledger-rollup:{tenant_id}")
+
+
+def _rollup_select(tenant_id: str, *filters: Any) -> Any:
+    day = _utc_day(LedgerLine.posted_at)
+    debits, credits = _sums()
+    return (
+        select(
+            literal(tenant_id),
+            day,
+            LedgerLine.account,
+            LedgerLine.currency,
+            debits,
+            credits,
+        )
+        .join(
+            LedgerEntry,
+            and_(
+                LedgerEntry.id == LedgerLine.entry_id,
+                LedgerEntry.posted_at == LedgerLine.posted_at,
+            ),
+        )
+        .where(LedgerLine.tenant_id == tenant_id, LedgerEntry.tenant_id == tenant_id, *filters)
+        .group_by(day, LedgerLine.account, LedgerLine.currency)
+    )
+
+
+_ROLLUP_COLUMNS = ["tenant_id", "day", "account", "currency", "debits_total", "credits_total"]
+
+
+def refresh_rollups(session: Session, tenant_id: str) -> int:
+    """Fold entries posted since the tenant's watermark into the rollups.
+
+    Returns how many entries were folded; 0 when up to date or a backfill holds the tenant.
+    """
+    with session.begin():
+        locked = session.execute(select(func.pg_try_advisory_xact_lock(_lock_key(tenant_id))))
+        if not locked.scalar():
+            return 0
+        head = (
+            session.execute(
+                select(LedgerChainHead.last_seq).where(LedgerChainHead.tenant_id == tenant_id)
+            ).scalar()
+            or 0
+        )
+        mark = session.execute(
+            select(LedgerRollupWatermark.last_chain_seq).where(
+                LedgerRollupWatermark.tenant_id == tenant_id
+            )
+        ).scalar()
+        if (
+            mark is None
+            and session.execute(
+                select(LedgerDailyRollup.day)
+                .where(LedgerDailyRollup.tenant_id == tenant_id)
+                .limit(1)
+            ).first()
+        ):
+            # Left behind by an interrupted backfill; folding from 0 would count twice.
+            log.warning(
+                "ledger rollups without watermark, rerun backfill", extra={"tenant_id": tenant_id}
+            )
+            return 0
+        mark = mark or 0
+        if head <= mark:
+            return 0
+
+        stmt = pg_insert(LedgerDailyRollup).from_select(
+            _ROLLUP_COLUMNS,
+            _rollup_select(tenant_id, LedgerEntry.chain_seq > mark, LedgerEntry.chain_seq <= head),
+        )
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["tenant_id", "day", "account", "currency"],
+                set_={
+                    "debits_total": LedgerDailyRollup.debits_total + stmt.excluded.debits_total,
+                    "credits_total": LedgerDailyRollup.credits_total + stmt.excluded.credits_total,
+                },
+            )
+        )
+        _fold_tenant_revenue(session, tenant_id, mark, head)
+        _set_watermark(session, tenant_id, head)
+
+    LEDGER_ROLLUP_ENTRIES_FOLDED_TOTAL.inc(head - mark)
+    return head - mark
+
+
+def refresh_all_rollups(session: Session) -> int:
+    with session.begin():
+        tenant_ids = list(session.execute(select(LedgerChainHead.tenant_id)).scalars())
+    folded = sum(refresh_rollups(session, t) for t in tenant_ids)
+    if folded:
+        log.info("ledger rollups refreshed", extra={"entries": folded})
+    return folded
+
+
+def rebuild_rollup_chunk(session: Session, tenant_id: str, month: date, max_seq: int) -> None:
+    """Recompute one (tenant, month) of rollups up to ``max_seq`` in the caller's transaction."""
+    start, end = _midnight(month), _midnight(add_months(month, 1))
+    session.execute(
+        delete(LedgerDailyRollup).where(
+            LedgerDailyRollup.tenant_id == tenant_id,
+            LedgerDailyRollup.day >= month,
+            LedgerDailyRollup.day < add_months(month, 1),
+        )
+    )
+    session.execute(
+        pg_insert(LedgerDailyRollup).from_select(
+            _ROLLUP_COLUMNS,
+            _rollup_select(
+                tenant_id,
+                LedgerLine.posted_at >= start,
+                LedgerLine.posted_at < end,
+                LedgerEntry.posted_at >= start,
+                LedgerEntry.posted_at < end,
+                LedgerEntry.chain_seq <= max_seq,
+            ),
+        )
+    )
+
+
+def _rebuild_chunk_in_worker(tenant_id: str, month: date, max_seq: int) -> None:
+    from src.infrastructure.db.session import session_scope
+
+    with session_scope() as session, session.begin():
+        rebuild_rollup_chunk(session, tenant_id, month, max_seq)
+
+
+def _init_worker(settings: Settings) -> None:
+    from src.infrastructure.db.session import init_db
+
+    init_db(settings)
+
+
+def backfill_rollups(
+    session: Session,
+    settings: Settings,
+    tenant_ids: list[str] | None = None,
+    workers: int = 1,
+    from_month: date | None = None,
+    to_month: date | None = None,
+) -> RollupBackfillDTO:
+    """Rebuild rollup history in (tenant, month) chunks, in-process or across ``workers``.
+
+    Chunks are rebuilt up to the tenant's current watermark, so the incremental refresh keeps
+    working from where it was. A tenant without a watermark is rebuilt in full up to its chain
+    head, whatever the requested months. Refreshes of the tenants skip while this runs.
+    """
+    started = time.monotonic()
+    with session.begin():
+        if tenant_ids is None:
+            tenant_ids = list(session.execute(select(LedgerChainHead.tenant_id)).scalars())
+        chunks: list[tuple[str, date, int]] = []
+        new_marks: dict[str, int] = {}
+        for tenant_id in sorted(tenant_ids):
+            session.execute(select(func.pg_advisory_xact_lock(_lock_key(tenant_id))))
+            mark = session.execute(
+                select(LedgerRollupWatermark.last_chain_seq).where(
+                    LedgerRollupWatermark.tenant_id == tenant_id
+                )
+            ).scalar()
+            if mark is None:
+                mark = (
+                    session.execute(
+                        select(LedgerChainHead.last_seq).where(
+                            LedgerChainHead.tenant_id == tenant_id
+                        )
+                    ).scalar()
+                    or 0
+                )
+                new_marks[tenant_id] = mark
+                units = list_units(session, [tenant_id])
+            else:
+                units = list_units(session, [tenant_id], from_month, to_month)
+            chunks.extend((t, m, mark) for t, m in units)
+
+        if workers <= 1 or not chunks:
+            for tenant_id, month, max_seq in chunks:
+                rebuild_rollup_chunk(session, tenant_id, month, max_seq)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(settings,)
+            ) as pool:
+                list(pool.map(_rebuild_chunk_in_worker, *zip(*chunks)))
+        for tenant_id, mark in new_marks.items():
+            _set_watermark(session, tenant_id, mark)
+        for tenant_id in {t for t, _, _ in chunks}:
+            _rebuild_tenant_revenue(session, tenant_id)
+
+    elapsed = time.monotonic() - started
+    log.info(
+        "ledger rollups backfilled",
+        extra={"tenants": len(tenant_ids), "chunks": len(chunks), "elapsed": round(elapsed, 1)},
+    )
+    return RollupBackfillDTO(
+        tenants=len(tenant_ids), chunks=len(chunks), elapsed_seconds=round(elapsed, 3)
+    )
+
+
+def _set_watermark(session: Session, tenant_id: str, seq: int) -> None:
+    stmt = pg_insert(LedgerRollupWatermark).values(
+        tenant_id=tenant_id, last_chain_seq=seq, refreshed_at=datetime.now(timezone.utc)
+    )
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["tenant_id"],
+            set_={
+                "last_chain_seq": stmt.excluded.last_chain_seq,
+                "refreshed_at": stmt.excluded.refreshed_at,
+            },
+        )
+    )
+
+
+def _fold_tenant_revenue(session: Session, tenant_id: str, from_seq: int, to_seq: int) -> None:
+    """Add revenue of entries in (from_seq, to_seq] to the tenant's all-time totals."""
+    stmt = pg_insert(TenantRevenueTotal).from_select(
+        ["tenant_id", "currency", "total", "updated_at"],
+        select(literal(tenant_id), LedgerLine.currency, func.sum(LedgerLine.amount), func.now())
+        .join(
+            LedgerEntry,
+            and_(
+                LedgerEntry.id == LedgerLine.entry_id,
+                LedgerEntry.posted_at == LedgerLine.posted_at,
+            ),
+        )
+        .where(
+            LedgerLine.tenant_id == tenant_id,
+            LedgerLine.account == REVENUE_ACCOUNT,
+            LedgerLine.side == "CREDIT",
+            LedgerEntry.tenant_id == tenant_id,
+            LedgerEntry.chain_seq > from_seq,
+            LedgerEntry.chain_seq <= to_seq,
+        )
+        .group_by(LedgerLine.currency),
+    )
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "currency"],
+            set_={
+                "total": TenantRevenueTotal.total + stmt.excluded.total,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    )
+
+
+def _rebuild_tenant_revenue(session: Session, tenant_id: str) -> None:
+    """Recompute the tenant's totals from its rollups, e.g. after a backfill."""
+    session.execute(delete(TenantRevenueTotal).where(TenantRevenueTotal.tenant_id == tenant_id))
+    session.execute(
+        pg_insert(TenantRevenueTotal).from_select(
+            ["tenant_id", "currency", "total", "updated_at"],
+            select(
+                literal(tenant_id),
+                LedgerDailyRollup.currency,
+                func.sum(LedgerDailyRollup.credits_total),
+                func.now(),
+            )
+            .where(
+                LedgerDailyRollup.tenant_id == tenant_id,
+                LedgerDailyRollup.account == REVENUE_ACCOUNT,
+            )
+            .group_by(LedgerDailyRollup.currency),
+        )
+    )
+
+
+TENANT_REVENUE_SORTS = {
+    "-total": (
+        TenantRevenueTotal.total.desc(),
+        TenantRevenueTotal.tenant_id,
+        TenantRevenueTotal.currency,
+    ),
+    "total": (TenantRevenueTotal.total, TenantRevenueTotal.tenant_id, TenantRevenueTotal.currency),
+    "tenant_id": (TenantRevenueTotal.tenant_id, TenantRevenueTotal.currency),
+}
+
+
+def tenant_revenue_report(
+    session: Session,
+    currency: Optional[str] = None,
+    sort: str = "-total",
+    limit: int = 100,
+    offset: int = 0,
+) -> list[TenantRevenueItem]:
+    """All-time revenue per tenant and currency, as of each tenant's last rollup refresh.
+
+    Reads only ``tenant_revenue_totals``; with a currency filter the sort by total is served by
+    the (currency, total) index.
+    """
+    if sort not in TENANT_REVENUE_SORTS:
+        raise ValueError(f"unsupported sort {sort}")
+    q = select(TenantRevenueTotal)
+    if currency:
+        q = q.where(TenantRevenueTotal.currency == currency)
+    rows = session.execute(
+        q.order_by(*TENANT_REVENUE_SORTS[sort]).limit(limit).offset(offset)
+    ).scalars()
+    return [
+        TenantRevenueItem(
+            tenant_id=r.tenant_id,
+            currency=r.currency,
+            total=str(r.total),
+            updated_at=r.updated_at.isoformat(),
+        )
+        for r in rows
+    ]
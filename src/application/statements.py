@@ -0,0 +1,198 @@
+"""Account statements: every line of one account with its running balance.
+
+The opening balance at ``from`` comes from the daily rollups (see ``reports.ledger_totals``),
+so the first page never scans the account's history. Running balances within a page are a
+window ``SUM`` in Postgres, added to the page's opening balance. Pages are keyed on
+``(posted_at, line id)`` and the cursor carries the balance at that position, so fetching page N
+reads the same number of rows as page 1. Since that balance is trusted on the next request, the
+cursor is HMAC-signed with the application secret and rejected when the signature does not match.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, case, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from src.application.reports import ledger_totals
+from src.infrastructure.db.models import LedgerEntry, LedgerLine
+from src.shared.problem import http_problem
+
+STATEMENT_PAGE_SIZE = 100
+STATEMENT_MAX_PAGE_SIZE = 1000
+
+
+class StatementLineDTO(BaseModel):
+    line_id: str
+    entry_id: str
+    posted_at: str
+    side: str
+    amount: str
+    description: str | None
+    balance: str
+
+
+class AccountStatementDTO(BaseModel):
+    account: str
+    currency: str
+    opening_balance: str
+    closing_balance: str
+    lines: list[StatementLineDTO]
+    next_cursor: str | None
+
+
+def _sign(secret: str, payload: bytes) -> str:
+    digest = hmac.new(secret.encode(), payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode((value + "=" * (-len(value) % 4)).encode("ascii"))
+
+
+def encode_cursor(
+    secret: str, account: str, currency: str, posted_at: datetime, line_id: str, balance: Decimal
+) -> str:
+    raw = json.dumps(
+        {"a": account, "c": currency, "p": posted_at.isoformat(), "i": line_id, "b": str(balance)},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    payload = base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+    return f"{payload}.{_sign(secret, raw)}"
+
+
+def decode_cursor(secret: str, cursor: str, account: str, currency: str) -> dict[str, Any]:
+    try:
+        payload, signature = cursor.split(".")
+        raw = _b64decode(payload)
+        signed = hmac.compare_digest(signature, _sign(secret, raw))
+        data = json.loads(raw)
+        decoded = {
+            "posted_at": datetime.fromisoformat(data["p"]),
+            "line_id": uuid.UUID(data["i"]),
+            "balance": Decimal(data["b"]),
+        }
+        matches = signed and (data["a"], data["c"]) == (account, currency)
+    except (ValueError, KeyError, TypeError, binascii.Error, ArithmeticError):
+        matches = False
+    if not matches:
+        raise http_problem(
+            400,
+            "Bad Request",
+            "invalid cursor",
+            instance=f"/v1/accounts/{account}/statement",
+        )
+    return decoded
+
+
+def _opening_balance(
+    session: Session, tenant_id: str, account: str, currency: str, from_dt: Optional[datetime]
+) -> Decimal:
+    if from_dt is None:
+        return Decimal(0)
+    totals = ledger_totals(session, tenant_id, None, from_dt, account=account, to_exclusive=True)
+    debits, credits = totals.get((None, account, currency), (Decimal(0), Decimal(0)))
+    return credits - debits
+
+
+def account_statement(
+    session: Session,
+    tenant_id: str,
+    account: str,
+    currency: str,
+    from_dt: Optional[datetime],
+    to_dt: Optional[datetime],
+    cursor_secret: str,
+    limit: int = STATEMENT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> AccountStatementDTO:
+    """One page of the account's statement, oldest line first.
+
+    Balances follow the credits-minus-debits convention of the balance reports.
+    ``cursor_secret`` signs the returned cursor and verifies the one passed in.
+    """
+    if from_dt is not None and from_dt.tzinfo is None:
+        from_dt = from_dt.replace(tzinfo=timezone.utc)
+    if to_dt is not None and to_dt.tzinfo is None:
+        to_dt = to_dt.replace(tzinfo=timezone.utc)
+
+    q = select(
+        LedgerLine.id,
+        LedgerLine.entry_id,
+        LedgerLine.posted_at,
+        LedgerLine.side,
+        LedgerLine.amount,
+        LedgerEntry.description,
+    )
+    if cursor:
+        position = decode_cursor(cursor_secret, cursor, account, currency)
+        opening = position["balance"]
+        q = q.where(
+            tuple_(LedgerLine.posted_at, LedgerLine.id)
+            > tuple_(position["posted_at"], position["line_id"])
+        )
+    else:
+        opening = _opening_balance(session, tenant_id, account, currency, from_dt)
+
+    signed = case((LedgerLine.side == "CREDIT", LedgerLine.amount), else_=-LedgerLine.amount)
+    running = func.sum(signed).over(order_by=(LedgerLine.posted_at, LedgerLine.id), rows=(None, 0))
+    q = (
+        q.add_columns(running.label("running"))
+        .join(
+            LedgerEntry,
+            and_(
+                LedgerEntry.id == LedgerLine.entry_id,
+                LedgerEntry.posted_at == LedgerLine.posted_at,
+            ),
+        )
+        .where(
+            LedgerLine.tenant_id == tenant_id,
+            LedgerLine.account == account,
+            LedgerLine.currency == currency,
+        )
+    )
+    if from_dt is not None:
+        q = q.where(LedgerLine.posted_at >= from_dt)
+    if to_dt is not None:
+        q = q.where(LedgerLine.posted_at <= to_dt)
+
+    rows = session.execute(q.order_by(LedgerLine.posted_at, LedgerLine.id).limit(limit + 1)).all()
+    page, more = rows[:limit], len(rows) > limit
+    lines = [
+        StatementLineDTO(
+            line_id=str(r.id),
+            entry_id=str(r.entry_id),
+            posted_at=r.posted_at.isoformat(),
+            side=r.side,
+            amount=str(r.amount),
+            description=r.description,
+            balance=str(opening + r.running),
+        )
+        for r in page
+    ]
+    closing = opening + page[-1].running if page else opening
+    next_cursor = (
+        encode_cursor(
+            cursor_secret, account, currency, page[-1].posted_at, str(page[-1].id), closing
+        )
+        if more
+        else None
+    )
+    return AccountStatementDTO(
+        account=account,
+        currency=currency,
+        opening_balance=str(opening),
+        closing_balance=str(closing),
+        lines=lines,
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,52 @@
+"""Canonical hashing for the per-tenant ledger hash chain.
+
+Each entry hashes its own content together with the previous entry's hash, so editing,
+inserting or deleting any posted entry changes every hash after it. The encoding below is
+part of the stored data: changing it invalidates every existing chain.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+GENESIS_HASH = "0" * 64
+
+# (side, account, amount, currency)
+LineTuple = tuple[str, str, Decimal, str]
+
+
+def compute_entry_hash(
+    prev_hash: str,
+    tenant_id: str,
+    chain_seq: int,
+    entry_id: uuid.UUID,
+    posted_at: datetime,
+    payment_intent_id: Optional[uuid.UUID],
+    description: Optional[str],
+    lines: Iterable[LineTuple],
+) -> str:
+    # Lines are sorted so the hash does not depend on insertion or fetch order; amounts are
+    # fixed to two decimals and timestamps to UTC so values survive a database round-trip.
+    canonical_lines = sorted(
+        f"{side}|{account}|{Decimal(amount):.2f}|{currency}"
+        for side, account, amount, currency in lines
+    )
+    parts = [
+        prev_hash,
+        tenant_id,
+        str(chain_seq),
+        str(entry_id),
+        posted_at.astimezone(timezone.utc).isoformat(),
+        str(payment_intent_id) if payment_intent_id else "",
+        description or "",
+        *canonical_lines,
+    ]
+    # JSON keeps field boundaries unambiguous even when a description contains separators.
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,12 @@
+"""Currencies and amount precision shared by payment intents and the ledger."""
+
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+
+SUPPORTED_CURRENCIES = ("BRL", "USD", "EUR")
+
+
+def quantize_amount(amount: Decimal) -> Decimal:
+    """``amount`` at the two decimal places ``Numeric(18, 2)`` stores, rounded as Postgres does."""
+    return amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
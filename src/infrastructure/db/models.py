@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from decimal import Decimal
 from typing import Any, Optional
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
+    ForeignKeyConstraint,
+    Index,
     Integer,
     Numeric,
     String,
@@ -133,6 +138,12 @@ class FeatureFlag(Base):
 
 class PaymentIntent(Base):
     __tablename__ = "payment_intents"
+    __table_args__ = (
+        # Reconciliation looks intents up by the gateway's reference in bulk...
+        Index("ix_payment_intents_tenant_gateway_ref", "tenant_id", "gateway_ref"),
+        # ...and incremental runs select the ones changed since the last run's watermark.
+        Index("ix_payment_intents_tenant_updated_at", "tenant_id", "updated_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[str] = mapped_column(
@@ -143,6 +154,8 @@ class PaymentIntent(Base):
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="CREATED", index=True)
     customer_ref: Mapped[str] = mapped_column(String(128), nullable=False)
     gateway_ref: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # Sum of the intent's non-failed refunds, kept in step by create_refund under the row lock.
+    refunded_amount: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False, default=0)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=utcnow, nullable=False
     )
@@ -153,17 +166,28 @@ class PaymentIntent(Base):
 
 class LedgerEntry(Base):
     __tablename__ = "ledger_entries"
+    # Range-partitioned by month; partitions are managed by src/infrastructure/db/partitions.py.
+    __table_args__ = (
+        Index("ix_ledger_entries_tenant_chain_seq", "tenant_id", "chain_seq"),
+        {"postgresql_partition_by": "RANGE (posted_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[str] = mapped_column(
         String(64), ForeignKey("tenants.id"), nullable=False, index=True
     )
-    payment_intent_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("payment_intents.id"), nullable=False
+    # NULL for manual journal entries (adjustments, migrations) posted through the batch API.
+    payment_intent_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("payment_intents.id"), nullable=True
     )
+    description: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     posted_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=utcnow, nullable=False
+        DateTime(timezone=True), primary_key=True, default=utcnow, nullable=False
     )
+    # Per-tenant hash chain (see src/domain/ledger_hash.py), assigned under the chain head lock.
+    chain_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    prev_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    entry_hash: Mapped[str] = mapped_column(String(64), nullable=False)
 
     lines: Mapped[list["LedgerLine"]] = relationship(
         back_populates="entry", cascade="all, delete-orphan"
@@ -172,22 +196,128 @@ class LedgerEntry(Base):
 
 class LedgerLine(Base):
     __tablename__ = "ledger_lines"
+    # Partitioned like ledger_entries; (entry_id, posted_at) references the entry's partition key.
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["entry_id", "posted_at"],
+            ["ledger_entries.id", "ledger_entries.posted_at"],
+            name="fk_ledger_lines_entry",
+        ),
+        Index(
+            "ix_ledger_lines_tenant_account_currency_posted",
+            "tenant_id",
+            "account",
+            "currency",
+            "posted_at",
+            postgresql_include=["side", "amount"],
+        ),
+        {"postgresql_partition_by": "RANGE (posted_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[str] = mapped_column(
         String(64), ForeignKey("tenants.id"), nullable=False, index=True
     )
-    entry_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("ledger_entries.id"), nullable=False, index=True
-    )
+    entry_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
     side: Mapped[str] = mapped_column(String(16), nullable=False)
     account: Mapped[str] = mapped_column(String(64), nullable=False)
     amount: Mapped[float] = mapped_column(Numeric(18, 2), nullable=False)
     currency: Mapped[str] = mapped_column(String(3), nullable=False, default="BRL")
+    # Copy of LedgerEntry.posted_at so balance/revenue aggregates never need the join.
+    posted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, default=utcnow, nullable=False
+    )
 
     entry: Mapped["LedgerEntry"] = relationship(back_populates="lines")
 
 
+class LedgerChainHead(Base):
+    """Tip of a tenant's ledger hash chain; locked FOR UPDATE by every posting."""
+
+    __tablename__ = "ledger_chain_heads"
+
+    tenant_id: Mapped[str] = mapped_column(String(64), ForeignKey("tenants.id"), primary_key=True)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+
+class LedgerChainCheckpoint(Base):
+    """Last chain position proven intact; verification resumes after it."""
+
+    __tablename__ = "ledger_chain_checkpoints"
+
+    tenant_id: Mapped[str] = mapped_column(String(64), ForeignKey("tenants.id"), primary_key=True)
+    chain_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    entry_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    verified_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+
+class LedgerDailyRollup(Base):
+    """Per-day debit/credit totals of ledger lines, maintained by the worker's rollup refresh."""
+
+    __tablename__ = "ledger_daily_rollups"
+
+    tenant_id: Mapped[str] = mapped_column(String(64), ForeignKey("tenants.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    account: Mapped[str] = mapped_column(String(64), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    debits_total: Mapped[float] = mapped_column(Numeric(18, 2), nullable=False, default=0)
+    credits_total: Mapped[float] = mapped_column(Numeric(18, 2), nullable=False, default=0)
+
+
+class LedgerRollupWatermark(Base):
+    """Highest chain_seq folded into ledger_daily_rollups for a tenant."""
+
+    __tablename__ = "ledger_rollup_watermarks"
+
+    tenant_id: Mapped[str] = mapped_column(String(64), ForeignKey("tenants.id"), primary_key=True)
+    last_chain_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+
+class TenantRevenueTotal(Base):
+    """All-time revenue per tenant and currency, folded in alongside ledger_daily_rollups."""
+
+    __tablename__ = "tenant_revenue_totals"
+    __table_args__ = (Index("ix_tenant_revenue_totals_currency_total", "currency", "total"),)
+
+    tenant_id: Mapped[str] = mapped_column(String(64), ForeignKey("tenants.id"), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    total: Mapped[float] = mapped_column(Numeric(20, 2), nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("tenants.id"), nullable=False, index=True
+    )
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    params: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="PENDING", index=True)
+    chunks_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    chunks_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    result: Mapped[Optional[list[Any]]] = mapped_column(JSONB, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class OutboxEvent(Base):
     __tablename__ = "outbox_events"
     __table_args__ = (UniqueConstraint("tenant_id", "id", name="uq_outbox_tenant_id"),)
@@ -260,6 +390,8 @@ class ExchangeRate(Base):
 
 class Refund(Base):
     __tablename__ = "refunds"
+    # The refund worker claims PENDING rows that are due (SKIP LOCKED).
+    __table_args__ = (Index("ix_refunds_status_available_at", "status", "available_at"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[str] = mapped_column(
@@ -272,13 +404,38 @@ class Refund(Base):
     reason: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="PENDING")
     gateway_ref: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+    locked_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=utcnow, nullable=False
     )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
 class ReconciliationDiscrepancy(Base):
     __tablename__ = "reconciliation_discrepancies"
+    __table_args__ = (
+        # One row per finding; re-observations bump last_seen_at/occurrences (ON CONFLICT).
+        Index(
+            "uq_reconciliation_discrepancies_key",
+            "tenant_id",
+            "gateway_ref",
+            "discrepancy_type",
+            unique=True,
+        ),
+        Index("ix_reconciliation_discrepancies_tenant_created", "tenant_id", "created_at", "id"),
+        Index(
+            "ix_reconciliation_discrepancies_tenant_type_resolved",
+            "tenant_id",
+            "discrepancy_type",
+            "resolved",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[str] = mapped_column(
@@ -298,6 +455,41 @@ class ReconciliationDiscrepancy(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=utcnow, nullable=False
     )
+    last_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+    occurrences: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+
+class ReconciliationRun(Base):
+    __tablename__ = "reconciliation_runs"
+    __table_args__ = (Index("ix_reconciliation_runs_tenant_created", "tenant_id", "created_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[str] = mapped_column(String(64), ForeignKey("tenants.id"), nullable=False)
+    trigger: Mapped[str] = mapped_column(String(16), nullable=False, default="scheduled")
+    # "full" checks every intent with a gateway_ref; "incremental" only those updated in
+    # (since, watermark], where since trails the last successful run's watermark.
+    mode: Mapped[str] = mapped_column(String(16), nullable=False, default="full")
+    since: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    watermark: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="PENDING", index=True)
+    # Last gateway_ref reconciled; a resumed run continues after it.
+    checkpoint: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # "intents" checks local intents with get_status, then "transactions" pages through the
+    # gateway's transactions in the window (from gateway_cursor) for MISSING_LOCAL; "done" after.
+    phase: Mapped[str] = mapped_column(String(16), nullable=False, default="intents")
+    gateway_cursor: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    items_processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    discrepancy_counts: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
 class WebhookEndpoint(Base):
@@ -0,0 +1,233 @@
+"""Monthly range partitions for the append-only ledger tables.
+
+ledger_entries and ledger_lines are partitioned by RANGE (posted_at), one partition per calendar
+month (UTC), named ``<table>_YYYY_MM``. The worker keeps partitions created ahead of time; old
+months can be detached (lines first, since they reference entries) and archived.
+
+A DEFAULT partition (``<table>_default``) takes postings for months that have no partition yet,
+so a late or stalled maintenance loop never fails a posting. When a month is created later, its
+rows are moved out of the default partition into the new one.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, text
+from sqlalchemy.orm import Session
+
+from src.shared.logging import get_logger
+
+log = get_logger(__name__)
+
+# Order matters: entries are created before lines, and detached after them.
+LEDGER_PARTITIONED_TABLES = ("ledger_entries", "ledger_lines")
+
+
+@dataclass(frozen=True)
+class MonthPartition:
+    table: str
+    start: date
+    end: date
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_{self.start:%Y_%m}"
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    idx = value.year * 12 + (value.month - 1) + months
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def month_partition(table: str, value: date | datetime) -> MonthPartition:
+    start = month_start(value)
+    return MonthPartition(table=table, start=start, end=add_months(start, 1))
+
+
+def partitions_between(table: str, first: date, last: date) -> list[MonthPartition]:
+    """Partitions covering every month from ``first`` to ``last`` inclusive."""
+    out: list[MonthPartition] = []
+    current = month_start(first)
+    while current <= month_start(last):
+        out.append(month_partition(table, current))
+        current = add_months(current, 1)
+    return out
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def create_default_partition_sql(table: str) -> str:
+    name = default_partition_name(table)
+    return f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} DEFAULT"
+
+
+def _range_sql(p: MonthPartition) -> str:
+    return (
+        f"FOR VALUES FROM ('{p.start.isoformat()} 00:00:00+00') "
+        f"TO ('{p.end.isoformat()} 00:00:00+00')"
+    )
+
+
+def create_partition_sql(p: MonthPartition) -> str:
+    return f"CREATE TABLE IF NOT EXISTS {p.name} PARTITION OF {p.table} {_range_sql(p)}"
+
+
+def ensure_ledger_partitions(
+    session: Session, months_ahead: int = 3, now: datetime | None = None
+) -> list[str]:
+    """Create missing partitions from the current month up to ``months_ahead`` months ahead."""
+    current = month_start(now or datetime.now(timezone.utc))
+    last = add_months(current, months_ahead)
+    months = {p.start for p in partitions_between(LEDGER_PARTITIONED_TABLES[0], current, last)}
+    with session.begin():
+        return ensure_partitions_for_months(session, months)
+
+
+def ensure_partitions_for_months(session: Session, months: set[date]) -> list[str]:
+    """Create any missing ledger partitions for ``months`` inside the caller's transaction.
+
+    The DEFAULT partitions are created too when missing.
+    """
+    existing = _attached_partitions(session)
+    for table in LEDGER_PARTITIONED_TABLES:
+        if default_partition_name(table) not in existing:
+            session.execute(text(create_default_partition_sql(table)))
+    created: list[str] = []
+    for start in sorted(months):
+        missing = [
+            month_partition(table, start)
+            for table in LEDGER_PARTITIONED_TABLES
+            if month_partition(table, start).name not in existing
+        ]
+        if not missing:
+            continue
+        if _default_has_rows(session, missing[0]):
+            _split_from_default(session, missing)
+        else:
+            for p in missing:
+                session.execute(text(create_partition_sql(p)))
+        created.extend(p.name for p in missing)
+    if created:
+        log.info("ledger partitions created", extra={"partitions": created})
+    return created
+
+
+def _default_has_rows(session: Session, p: MonthPartition) -> bool:
+    return bool(
+        session.execute(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {default_partition_name(p.table)} "
+                "WHERE posted_at >= :start AND posted_at < :end)"
+            ),
+            {"start": p.start, "end": p.end},
+        ).scalar()
+    )
+
+
+def _split_from_default(session: Session, partitions: list[MonthPartition]) -> None:
+    """Create month partitions whose rows already landed in the DEFAULT partitions.
+
+    Postgres refuses to add a partition while the default one holds rows of its range, so the
+    rows are moved into standalone tables which are then attached. Lines are moved before
+    entries because they reference them; entries are attached first so the lines' foreign key
+    validates on attach.
+    """
+    by_table = sorted(partitions, key=lambda p: LEDGER_PARTITIONED_TABLES.index(p.table))
+    for p in reversed(by_table):
+        session.execute(
+            text(f"CREATE TABLE {p.name} (LIKE {p.table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        )
+        moved = cast(
+            CursorResult[Any],
+            session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {default_partition_name(p.table)} "
+                    "WHERE posted_at >= :start AND posted_at < :end RETURNING *) "
+                    f"INSERT INTO {p.name} SELECT * FROM moved"
+                ),
+                {"start": p.start, "end": p.end},
+            ),
+        )
+        log.warning(
+            "ledger rows moved out of default partition",
+            extra={"partition": p.name, "rows": moved.rowcount},
+        )
+    for p in by_table:
+        session.execute(text(f"ALTER TABLE {p.table} ATTACH PARTITION {p.name} {_range_sql(p)}"))
+
+
+def detach_ledger_partitions(session: Session, before: date) -> list[str]:
+    """Detach every month partition that ends on or before ``before`` (first of a month).
+
+    Detached tables keep their data and can be dumped/archived and dropped independently.
+    """
+    cutoff = month_start(before)
+    detached: list[str] = []
+    with session.begin():
+        existing = _attached_partitions(session)
+        for table in reversed(LEDGER_PARTITIONED_TABLES):
+            for name in sorted(existing):
+                p = _parse_partition_name(table, name)
+                if p is None or p.end > cutoff:
+                    continue
+                session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                detached.append(name)
+    if detached:
+        log.info("ledger partitions detached", extra={"partitions": detached})
+    return detached
+
+
+def first_open_month(session: Session) -> date | None:
+    """First month still open for postings: the one after the newest detached partition.
+
+    Rows for a detached (archived) month would land in the DEFAULT partition and block
+    re-attaching it, so those months are closed. ``None`` when nothing was detached.
+    """
+    table = LEDGER_PARTITIONED_TABLES[0]
+    rows = session.execute(
+        text("""
+            SELECT c.relname
+            FROM pg_class c
+            WHERE c.relkind = 'r'
+              AND c.relname LIKE :pattern
+              AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+            """),
+        {"pattern": f"{table}\\_%"},
+    ).all()
+    detached = [p for p in (_parse_partition_name(table, r[0]) for r in rows) if p is not None]
+    return max(p.end for p in detached) if detached else None
+
+
+def _attached_partitions(session: Session) -> set[str]:
+    rows = session.execute(
+        text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = ANY(:tables)
+            """),
+        {"tables": list(LEDGER_PARTITIONED_TABLES)},
+    ).all()
+    return {r[0] for r in rows}
+
+
+def _parse_partition_name(table: str, name: str) -> MonthPartition | None:
+    prefix = f"{table}_"
+    suffix = name.removeprefix(prefix)
+    if suffix == name or len(suffix) != 7:
+        return None
+    try:
+        year, month = int(suffix[:4]), int(suffix[5:])
+        return month_partition(table, date(year, month, 1))
+    except ValueError:
+        return None
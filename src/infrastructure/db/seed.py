@@ -6,6 +6,7 @@ from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from src.application.account_cache import publish_account_change
 from src.application.accounts import seed_default_accounts
 from src.infrastructure.db.models import (
     AuditLog,
@@ -166,7 +167,7 @@ def seed(session: Session) -> None:
         _upsert_policies(session)
         _upsert_users(session)
         _upsert_flags(session)
-        seed_default_accounts(session, "tenant_demo")
+        seeded = seed_default_accounts(session, "tenant_demo")
         session.add(
             AuditLog(
                 tenant_id=None,
@@ -177,15 +178,20 @@ def seed(session: Session) -> None:
                 correlation_id=cid,
             )
         )
+    if seeded:
+        publish_account_change("tenant_demo")
     log.info("seed completed", extra={"correlation_id": cid})
 
 
 def main() -> None:
     from src.shared.config import load_settings
     from src.infrastructure.db.session import init_db, session_scope
+    from src.infrastructure.redis.client import init_redis
 
     settings = load_settings()
     init_db(settings)
+    # Running API and worker processes drop their cached accounts for the seeded tenant.
+    init_redis(settings)
     with session_scope() as session:
         seed(session)
 
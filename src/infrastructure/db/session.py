@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from collections.abc import Generator
 from contextlib import contextmanager
+from typing import Any, cast
 
-from sqlalchemy import create_engine
+from sqlalchemy import CursorResult, Result, create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from src.shared.config import Settings
@@ -46,3 +47,12 @@ def session_scope() -> Generator[Session, None, None]:
         raise
     finally:
         session.close()
+
+
+def rowcount(result: Result[Any]) -> int:
+    """Rows matched by an INSERT/UPDATE/DELETE run through ``Session.execute``.
+
+    The session types its results as plain ``Result``; DML statements return a
+    ``CursorResult``, which carries the count.
+    """
+    return int(cast(CursorResult[Any], result).rowcount or 0)
@@ -1,24 +1,47 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
+from datetime import datetime, timezone
 from decimal import Decimal
+from typing import Optional
 
-from src.application.ports.payment_gateway import GatewayResult, GatewayStatus
+from src.application.ports.payment_gateway import (
+    GatewayResult,
+    GatewayStatus,
+    GatewayTransaction,
+    GatewayTransactionPage,
+)
 from src.shared.logging import get_logger
 
 log = get_logger(__name__)
 
 
 class FakeGatewayAdapter:
-    """Simulates a payment gateway for local development and testing."""
+    """Simulates a payment gateway for local development and testing.
 
-    def __init__(self, fail_rate: float = 0.0) -> None:
+    Like a real provider, a repeated idempotency key returns the first call's result.
+    """
+
+    def __init__(
+        self, fail_rate: float = 0.0, latency: float = 0.0, page_size: int = 100
+    ) -> None:
         self._fail_rate = fail_rate
+        self._latency = latency
         self._store: dict[str, dict] = {}
+        self._replies: dict[str, GatewayResult] = {}
+        self._page_size = page_size
 
     async def authorize(
         self, tenant_id: str, amount: Decimal, currency: str, customer_ref: str, idempotency_key: str
     ) -> GatewayResult:
+        if idempotency_key in self._replies:
+            return self._replies[idempotency_key]
+        result = self._authorize(tenant_id, amount, currency)
+        self._replies[idempotency_key] = result
+        return result
+
+    def _authorize(self, tenant_id: str, amount: Decimal, currency: str) -> GatewayResult:
         import random
         if random.random() < self._fail_rate:
             return GatewayResult(
@@ -32,6 +55,8 @@ class FakeGatewayAdapter:
 
         ref = f"fake_{uuid.uuid4().hex[:16]}"
         self._store[ref] = {
+            "tenant_id": tenant_id,
+            "created_at": datetime.now(timezone.utc),
             "status": GatewayStatus.AUTHORIZED,
             "amount": amount,
             "currency": currency,
@@ -58,6 +83,8 @@ class FakeGatewayAdapter:
     async def refund(
         self, gateway_ref: str, amount: Decimal, idempotency_key: str
     ) -> GatewayResult:
+        if idempotency_key in self._replies:
+            return self._replies[idempotency_key]
         entry = self._store.get(gateway_ref)
         if not entry:
             return GatewayResult(
@@ -70,9 +97,13 @@ class FakeGatewayAdapter:
         else:
             entry["status"] = GatewayStatus.PARTIALLY_REFUNDED
         log.info("fake refund", extra={"gateway_ref": gateway_ref, "amount": str(amount)})
-        return GatewayResult(success=True, gateway_ref=gateway_ref, status=entry["status"])
+        result = GatewayResult(success=True, gateway_ref=gateway_ref, status=entry["status"])
+        self._replies[idempotency_key] = result
+        return result
 
     async def get_status(self, gateway_ref: str) -> GatewayResult:
+        if self._latency:
+            await asyncio.sleep(self._latency)  # simulated network round trip
         entry = self._store.get(gateway_ref)
         if not entry:
             return GatewayResult(
@@ -80,3 +111,35 @@ class FakeGatewayAdapter:
                 error_code="not_found", error_message="Gateway ref not found",
             )
         return GatewayResult(success=True, gateway_ref=gateway_ref, status=entry["status"])
+
+    async def list_transactions(
+        self,
+        tenant_id: str,
+        since: Optional[datetime],
+        until: datetime,
+        cursor: Optional[str] = None,
+    ) -> GatewayTransactionPage:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        refs = sorted(
+            ref
+            for ref, entry in self._store.items()
+            if entry["tenant_id"] == tenant_id
+            and (since is None or entry["created_at"] > since)
+            and entry["created_at"] <= until
+            and (cursor is None or ref > cursor)
+        )
+        page = refs[: self._page_size]
+        return GatewayTransactionPage(
+            transactions=[
+                GatewayTransaction(
+                    gateway_ref=ref,
+                    amount=self._store[ref]["amount"],
+                    currency=self._store[ref]["currency"],
+                    status=self._store[ref]["status"],
+                    created_at=self._store[ref]["created_at"],
+                )
+                for ref in page
+            ],
+            next_cursor=page[-1] if len(refs) > self._page_size else None,
+        )
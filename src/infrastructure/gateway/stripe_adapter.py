@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import time
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any
-
-from src.application.ports.payment_gateway import GatewayResult, GatewayStatus
+from typing import Any, Optional
+
+from src.application.ports.payment_gateway import (
+    GatewayResult,
+    GatewayStatus,
+    GatewayTransaction,
+    GatewayTransactionPage,
+)
 from src.shared.logging import get_logger
 
 log = get_logger(__name__)
@@ -13,6 +20,21 @@ RETRYABLE_ERRORS = {"rate_limit", "api_connection_error", "api_error", "timeout"
 CURRENCY_MULTIPLIERS: dict[str, int] = {
     "BRL": 100, "USD": 100, "EUR": 100, "JPY": 1,
 }
+# Stripe refunds may stay pending for days; only "succeeded" and "failed"/"canceled" are final.
+REFUND_STATUS_MAP: dict[str, GatewayStatus] = {
+    "succeeded": GatewayStatus.REFUNDED,
+    "pending": GatewayStatus.PENDING,
+    "requires_action": GatewayStatus.PENDING,
+    "failed": GatewayStatus.FAILED,
+    "canceled": GatewayStatus.FAILED,
+}
+PAYMENT_INTENT_STATUS_MAP: dict[str, GatewayStatus] = {
+    "requires_capture": GatewayStatus.AUTHORIZED,
+    "succeeded": GatewayStatus.CAPTURED,
+    "canceled": GatewayStatus.FAILED,
+}
+# Stripe caps search pages at 100 results.
+SEARCH_PAGE_SIZE = 100
 
 
 class CircuitBreaker:
@@ -63,8 +85,10 @@ class StripeAdapter:
         multiplier = CURRENCY_MULTIPLIERS.get(currency.upper(), 100)
         return int(amount * multiplier)
 
+    def _from_minor_units(self, amount: int, currency: str) -> Decimal:
+        return Decimal(amount) / CURRENCY_MULTIPLIERS.get(currency.upper(), 100)
+
     async def _call_with_retry(self, operation: str, func: Any, *args: Any, **kwargs: Any) -> Any:
-        import asyncio
         import random
 
         if self._circuit.is_open:
@@ -170,14 +194,15 @@ class StripeAdapter:
         stripe.api_key = self._api_key
 
         async def _do_refund() -> GatewayResult:
-            refund = stripe.Refund.create(
+            refund = await asyncio.to_thread(
+                stripe.Refund.create,
                 payment_intent=gateway_ref,
                 amount=self._to_minor_units(amount, "BRL"),
                 idempotency_key=idempotency_key,
             )
-            status = GatewayStatus.REFUNDED if refund["status"] == "succeeded" else GatewayStatus.FAILED
+            status = REFUND_STATUS_MAP.get(refund["status"], GatewayStatus.FAILED)
             return GatewayResult(
-                success=refund["status"] == "succeeded",
+                success=status == GatewayStatus.REFUNDED,
                 gateway_ref=refund["id"],
                 status=status,
             )
@@ -185,6 +210,7 @@ class StripeAdapter:
         return await self._call_with_retry("refund", _do_refund)
 
     async def get_status(self, gateway_ref: str) -> GatewayResult:
+        """Status of a PaymentIntent, or of a refund when given a refund id (``re_...``)."""
         try:
             import stripe
         except ImportError:
@@ -194,18 +220,69 @@ class StripeAdapter:
             )
 
         stripe.api_key = self._api_key
+
+        async def _do_get_status() -> GatewayResult:
+            # The SDK call blocks; run it in a thread so concurrent lookups overlap.
+            is_refund = gateway_ref.startswith("re_")
+            kind = "Refund" if is_refund else "PaymentIntent"
+            retrieve: Any = stripe.Refund.retrieve if is_refund else stripe.PaymentIntent.retrieve
+            try:
+                obj = await asyncio.to_thread(retrieve, gateway_ref)
+            except stripe.error.InvalidRequestError:
+                return GatewayResult(
+                    success=False, gateway_ref=gateway_ref, status=GatewayStatus.NOT_FOUND,
+                    error_code="not_found", error_message=f"{kind} not found in Stripe",
+                )
+            if is_refund:
+                refund_status = REFUND_STATUS_MAP.get(obj["status"], GatewayStatus.FAILED)
+                return GatewayResult(success=True, gateway_ref=gateway_ref, status=refund_status)
+
+            gw_status = PAYMENT_INTENT_STATUS_MAP.get(obj["status"], GatewayStatus.FAILED)
+            return GatewayResult(success=True, gateway_ref=gateway_ref, status=gw_status)
+
+        result: GatewayResult = await self._call_with_retry("get_status", _do_get_status)
+        return result
+
+    async def list_transactions(
+        self,
+        tenant_id: str,
+        since: Optional[datetime],
+        until: datetime,
+        cursor: Optional[str] = None,
+    ) -> GatewayTransactionPage:
+        """PaymentIntents tagged with the tenant, found with Stripe's search API."""
         try:
-            pi = stripe.PaymentIntent.retrieve(gateway_ref)
-        except stripe.error.InvalidRequestError:
-            return GatewayResult(
-                success=False, gateway_ref=gateway_ref, status=GatewayStatus.NOT_FOUND,
-                error_code="not_found", error_message="PaymentIntent not found in Stripe",
+            import stripe
+        except ImportError:
+            raise RuntimeError("stripe SDK not installed") from None
+
+        stripe.api_key = self._api_key
+        query = f"metadata['tenant_id']:'{tenant_id}' AND created<={int(until.timestamp())}"
+        if since is not None:
+            query += f" AND created>{int(since.timestamp())}"
+
+        async def _do_search() -> GatewayTransactionPage:
+            search: Any = stripe.PaymentIntent.search
+            kwargs: dict[str, Any] = {"query": query, "limit": SEARCH_PAGE_SIZE}
+            if cursor:
+                kwargs["page"] = cursor
+            found = await asyncio.to_thread(search, **kwargs)
+            return GatewayTransactionPage(
+                transactions=[
+                    GatewayTransaction(
+                        gateway_ref=pi["id"],
+                        amount=self._from_minor_units(pi["amount"], pi["currency"]),
+                        currency=pi["currency"].upper(),
+                        status=PAYMENT_INTENT_STATUS_MAP.get(pi["status"], GatewayStatus.FAILED),
+                        created_at=datetime.fromtimestamp(pi["created"], timezone.utc),
+                    )
+                    for pi in found["data"]
+                ],
+                next_cursor=found.get("next_page") if found.get("has_more") else None,
             )
 
-        status_map = {
-            "requires_capture": GatewayStatus.AUTHORIZED,
-            "succeeded": GatewayStatus.CAPTURED,
-            "canceled": GatewayStatus.FAILED,
-        }
-        gw_status = status_map.get(pi["status"], GatewayStatus.FAILED)
-        return GatewayResult(success=True, gateway_ref=gateway_ref, status=gw_status)
+        result = await self._call_with_retry("list_transactions", _do_search)
+        if isinstance(result, GatewayResult):
+            raise RuntimeError(f"stripe search failed: {result.error_code}")
+        page: GatewayTransactionPage = result
+        return page
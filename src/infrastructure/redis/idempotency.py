@@ -18,8 +18,8 @@ class IdempotencyStore:
         self._redis = redis
         self._ttl = ttl_seconds
 
-    def get(self, key: str) -> IdempotencyHit:
-        raw = self._redis.get(key)
+    @staticmethod
+    def _decode(raw: Any) -> IdempotencyHit:
         if not raw:
             return IdempotencyHit(hit=False, value=None)
         try:
@@ -27,5 +27,23 @@ class IdempotencyStore:
         except Exception:
             return IdempotencyHit(hit=True, value=None)
 
+    def get(self, key: str) -> IdempotencyHit:
+        return self._decode(self._redis.get(key))
+
+    def get_many(self, keys: list[str]) -> list[IdempotencyHit]:
+        """One MGET round trip for all keys, hits in the same order."""
+        if not keys:
+            return []
+        return [self._decode(raw) for raw in self._redis.mget(keys)]
+
     def set(self, key: str, value: dict[str, Any]) -> None:
         self._redis.setex(key, self._ttl, json.dumps(value, ensure_ascii=False))
+
+    def set_many(self, values: dict[str, dict[str, Any]]) -> None:
+        """Store all values in one pipelined round trip."""
+        if not values:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.setex(key, self._ttl, json.dumps(value, ensure_ascii=False))
+        pipe.execute()
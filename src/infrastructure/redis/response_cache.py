@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from src.infrastructure.redis.client import get_redis
+from src.shared.logging import get_logger
+from src.shared.metrics import RESPONSE_CACHE_REQUESTS_TOTAL
+
+log = get_logger(__name__)
+
+
+class ResponseCache:
+    """Read-through cache for tenant-scoped GET responses.
+
+    Keys embed the tenant's generation counter, which ledger postings bump after commit, so a
+    response computed before a posting is never served after it; old keys just expire. Misses
+    for the same key are coalesced: one caller holds a short SET NX lock and computes, the rest
+    poll for its result and only fall back to computing themselves when the wait runs out.
+
+    Redis is an optimization here, not a dependency: when it errors, responses are computed
+    directly (counted as ``bypass``) and failed writes are only logged.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl_seconds: int = 300,
+        lock_ttl_seconds: int = 30,
+        wait_seconds: float = 5.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self._redis = redis
+        self._ttl = ttl_seconds
+        self._lock_ttl = lock_ttl_seconds
+        self._wait = wait_seconds
+        self._poll = poll_interval
+
+    @staticmethod
+    def generation_key(tenant_id: str) -> str:
+        return f"cache:gen:{tenant_id}"
+
+    def bump(self, tenant_id: str) -> None:
+        self._redis.incr(self.generation_key(tenant_id))
+
+    def key(self, tenant_id: str, name: str, params: dict[str, Any]) -> str:
+        generation = int(self._redis.get(self.generation_key(tenant_id)) or 0)
+        normalized = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+        return f"cache:{tenant_id}:{name}:{generation}:{digest}"
+
+    def get_or_compute(
+        self, tenant_id: str, name: str, params: dict[str, Any], compute: Callable[[], Any]
+    ) -> Any:
+        try:
+            key = self.key(tenant_id, name, params)
+            raw = self._redis.get(key)
+            if raw is not None:
+                RESPONSE_CACHE_REQUESTS_TOTAL.labels(name, "hit").inc()
+                return json.loads(raw)
+            lock_key = f"{key}:lock"
+            owns_lock = bool(self._redis.set(lock_key, "1", nx=True, ex=self._lock_ttl))
+            if not owns_lock:
+                raw = self._wait_for(key)
+                if raw is not None:
+                    RESPONSE_CACHE_REQUESTS_TOTAL.labels(name, "coalesced").inc()
+                    return json.loads(raw)
+        except RedisError:
+            log.warning("response cache unavailable", extra={"cache_name": name})
+            RESPONSE_CACHE_REQUESTS_TOTAL.labels(name, "bypass").inc()
+            return compute()
+
+        RESPONSE_CACHE_REQUESTS_TOTAL.labels(name, "miss").inc()
+        try:
+            value = compute()
+            try:
+                self._redis.setex(key, self._ttl, json.dumps(value, ensure_ascii=False))
+            except RedisError:
+                log.warning("response cache write failed", extra={"cache_key": key})
+            return value
+        finally:
+            if owns_lock:
+                try:
+                    self._redis.delete(lock_key)
+                except RedisError:
+                    log.warning("response cache unlock failed", extra={"cache_key": key})
+
+    def _wait_for(self, key: str) -> Any:
+        """Poll for the lock holder's result; None when the wait runs out."""
+        deadline = time.monotonic() + self._wait
+        while time.monotonic() < deadline:
+            time.sleep(self._poll)
+            raw = self._redis.get(key)
+            if raw is not None:
+                return raw
+        log.warning("response cache wait timed out", extra={"cache_key": key})
+        return None
+
+
+def invalidate_tenant_cache(tenant_id: str) -> None:
+    """Bump the tenant's generation after a ledger posting commits.
+
+    Failures are logged, not raised: the posting already committed and cached responses
+    still expire after their TTL.
+    """
+    try:
+        ResponseCache(get_redis()).bump(tenant_id)
+    except Exception:
+        log.warning("response cache invalidation failed", extra={"tenant_id": tenant_id})
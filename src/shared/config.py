@@ -49,6 +49,9 @@ class Settings:
     gateway_max_retries: int
     gateway_retry_base_delay: float
     gateway_retry_max_delay: float
+    gateway_status_concurrency: int
+    gateway_rate_limit_per_second: float
+    gateway_refund_concurrency: int
 
     saas_integration_enabled: bool
     saas_exchange: str
@@ -57,7 +60,13 @@ class Settings:
 
     webhook_delivery_enabled: bool
     reconciliation_interval_minutes: int
+    reconciliation_max_concurrency: int
+    reconciliation_full_sweep_days: int
     report_refresh_interval_minutes: int
+    ledger_partition_months_ahead: int
+    report_cache_ttl_seconds: int
+    account_cache_ttl_seconds: int
+    account_cache_max_tenants: int
 
 
 def load_settings() -> Settings:
@@ -98,6 +107,9 @@ def load_settings() -> Settings:
         gateway_max_retries=int(_getenv("GATEWAY_MAX_RETRIES", "3")),
         gateway_retry_base_delay=float(_getenv("GATEWAY_RETRY_BASE_DELAY", "1.0")),
         gateway_retry_max_delay=float(_getenv("GATEWAY_RETRY_MAX_DELAY", "30.0")),
+        gateway_status_concurrency=int(_getenv("GATEWAY_STATUS_CONCURRENCY", "16")),
+        gateway_rate_limit_per_second=float(_getenv("GATEWAY_RATE_LIMIT_PER_SECOND", "25")),
+        gateway_refund_concurrency=int(_getenv("GATEWAY_REFUND_CONCURRENCY", "8")),
         saas_integration_enabled=_getenv("SAAS_INTEGRATION_ENABLED", "false").lower() == "true",
         saas_exchange=_getenv("SAAS_EXCHANGE", "saas.x"),
         saas_queue=_getenv("SAAS_QUEUE", "payments.saas.events"),
@@ -110,5 +122,11 @@ def load_settings() -> Settings:
         ],
         webhook_delivery_enabled=_getenv("WEBHOOK_DELIVERY_ENABLED", "false").lower() == "true",
         reconciliation_interval_minutes=int(_getenv("RECONCILIATION_INTERVAL_MINUTES", "60")),
+        reconciliation_max_concurrency=int(_getenv("RECONCILIATION_MAX_CONCURRENCY", "4")),
+        reconciliation_full_sweep_days=int(_getenv("RECONCILIATION_FULL_SWEEP_DAYS", "7")),
         report_refresh_interval_minutes=int(_getenv("REPORT_REFRESH_INTERVAL_MINUTES", "15")),
+        ledger_partition_months_ahead=int(_getenv("LEDGER_PARTITION_MONTHS_AHEAD", "3")),
+        report_cache_ttl_seconds=int(_getenv("REPORT_CACHE_TTL_SECONDS", "300")),
+        account_cache_ttl_seconds=int(_getenv("ACCOUNT_CACHE_TTL_SECONDS", "60")),
+        account_cache_max_tenants=int(_getenv("ACCOUNT_CACHE_MAX_TENANTS", "10000")),
     )
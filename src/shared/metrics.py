@@ -61,6 +61,30 @@ RECONCILIATION_DISCREPANCIES_TOTAL = Counter(
     ["tenant_id", "type"],
 )
 
+RECONCILIATION_RUNS_TOTAL = Counter(
+    "reconciliation_runs_total",
+    "Reconciliation runs by outcome (scheduled, manual, resumed, succeeded, failed)",
+    ["outcome"],
+)
+
+RECONCILIATION_RUN_ITEMS_TOTAL = Counter(
+    "reconciliation_run_items_total",
+    "Payment intents checked by reconciliation runs",
+    ["tenant_id"],
+)
+
+RECONCILIATION_RUN_DURATION_SECONDS = Histogram(
+    "reconciliation_run_duration_seconds",
+    "Wall time of reconciliation runs, from first start to finish",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+RECONCILIATION_RUN_THROUGHPUT = Gauge(
+    "reconciliation_run_throughput_items_per_second",
+    "Items per second of the tenant's last finished reconciliation run",
+    ["tenant_id"],
+)
+
 GATEWAY_REQUESTS_TOTAL = Counter(
     "gateway_requests_total",
     "Total gateway requests",
@@ -72,3 +96,72 @@ GATEWAY_REQUEST_DURATION_SECONDS = Histogram(
     "Gateway request duration in seconds",
     ["operation"],
 )
+
+REFUNDED_AMOUNT_MISMATCHES = Gauge(
+    "refunded_amount_mismatches",
+    "Payment intents whose refunded_amount disagreed with their refunds at the last check",
+)
+
+LEDGER_VERIFY_LINES_PER_SECOND = Gauge(
+    "ledger_verify_lines_per_second",
+    "Throughput of the last full-ledger integrity verification",
+)
+
+LEDGER_VERIFY_VIOLATIONS_TOTAL = Counter(
+    "ledger_verify_violations_total",
+    "Ledger integrity violations found by the verifier",
+    ["kind"],
+)
+
+LEDGER_CHAIN_ENTRIES_VERIFIED_TOTAL = Counter(
+    "ledger_chain_entries_verified_total",
+    "Ledger entries rehashed by the incremental hash-chain verifier",
+)
+
+LEDGER_CHAIN_BREAKS_TOTAL = Counter(
+    "ledger_chain_breaks_total",
+    "Hash-chain verifications that found a broken link",
+    ["tenant_id"],
+)
+
+LEDGER_ROLLUP_ENTRIES_FOLDED_TOTAL = Counter(
+    "ledger_rollup_entries_folded_total",
+    "Ledger entries folded into the daily rollups by the incremental refresh",
+)
+
+LEDGER_EXPORT_ROWS_TOTAL = Counter(
+    "ledger_export_rows_total",
+    "Rows written by the columnar ledger export",
+    ["table"],
+)
+
+RESPONSE_CACHE_REQUESTS_TOTAL = Counter(
+    "response_cache_requests_total",
+    "Cached report/balance lookups by outcome (hit, coalesced, miss)",
+    ["endpoint", "result"],
+)
+
+ACCOUNT_CACHE_REQUESTS_TOTAL = Counter(
+    "account_cache_requests_total",
+    "Tenant account config lookups on posting paths by outcome (hit, miss)",
+    ["result"],
+)
+
+REPORT_JOBS_TOTAL = Counter(
+    "report_jobs_total",
+    "Report jobs by kind and outcome (inline, queued, succeeded, failed, cancelled)",
+    ["kind", "outcome"],
+)
+
+REPORT_JOB_CHUNKS_TOTAL = Counter(
+    "report_job_chunks_total",
+    "Month chunks computed by asynchronous report jobs",
+    ["kind"],
+)
+
+REPORT_JOB_DURATION_SECONDS = Histogram(
+    "report_job_duration_seconds",
+    "Wall time of asynchronous report jobs",
+    ["kind"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800),
+)
@@ -8,7 +8,13 @@ from typing import Any
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from src.application.payments import post_ledger_for_authorized_payment
+from src.application.payments import (
+    GatewayUnavailableError,
+    authorize_payment,
+    payment_failed_event,
+    post_ledger_for_authorized_payment,
+)
+from src.application.ports.payment_gateway import PaymentGatewayPort
 from src.infrastructure.db.models import OutboxEvent, PaymentIntent
 from src.shared.correlation import get_correlation_id, set_correlation_id
 from src.shared.logging import get_logger
@@ -21,12 +27,14 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def handle_event(session: Session, routing_key: str, payload: dict[str, Any]) -> None:
+def handle_event(
+    session: Session, routing_key: str, payload: dict[str, Any], gateway: PaymentGatewayPort
+) -> None:
     if routing_key == "payment.authorized":
         pid_raw = payload.get("payment_intent_id") or payload.get("paymentIntentId")
         pid = uuid.UUID(str(pid_raw))
         tenant_id = str(payload.get("tenant_id") or payload.get("tenantId") or "")
-        post_ledger_for_authorized_payment(session, tenant_id, pid)
+        post_ledger_for_authorized_payment(session, tenant_id, pid, gateway)
         log.info(
             "ledger posted",
             extra={
@@ -37,10 +45,12 @@ def handle_event(session: Session, routing_key: str, payload: dict[str, Any]) ->
         )
 
     elif routing_key in ("payment.charge_requested", "order.confirmed"):
-        handle_charge_request(session, payload)
+        handle_charge_request(session, payload, gateway)
 
 
-def handle_charge_request(session: Session, payload: dict[str, Any]) -> None:
+def handle_charge_request(
+    session: Session, payload: dict[str, Any], gateway: PaymentGatewayPort
+) -> None:
     parsed = parse_charge_payload(payload)
     order_id = parsed["order_id"]
     tenant_id = parsed["tenant_id"]
@@ -75,35 +85,48 @@ def handle_charge_request(session: Session, payload: dict[str, Any]) -> None:
             )
             return
 
+        # Keyed by order, so a redelivered charge request reuses the same authorization.
+        result = authorize_payment(
+            gateway, tenant_id, amount, currency, customer_ref, f"order:{tenant_id}:{order_id}"
+        )
+        if not result.success and result.is_retryable:
+            raise GatewayUnavailableError(
+                f"authorize for order {order_id} failed: {result.error_code}"
+            )
+
         now = _utcnow()
         pi = PaymentIntent(
             tenant_id=tenant_id,
             amount=amount,
             currency=currency,
-            status="AUTHORIZED",
+            status="AUTHORIZED" if result.success else "FAILED",
             customer_ref=f"order:{order_id}",
+            gateway_ref=result.gateway_ref or None,
             created_at=now,
             updated_at=now,
         )
         session.add(pi)
         session.flush()
 
-        session.add(
-            OutboxEvent(
-                tenant_id=tenant_id,
-                event_type="payment.authorized",
-                aggregate_type="PaymentIntent",
-                aggregate_id=str(pi.id),
-                payload={
-                    "payment_intent_id": str(pi.id),
-                    "amount": str(amount),
-                    "currency": currency,
-                    "order_id": order_id,
-                    "customer_ref": pi.customer_ref,
-                    "correlation_id": parsed["correlation_id"] or get_correlation_id(),
-                },
+        if not result.success:
+            session.add(payment_failed_event(pi, result))
+        else:
+            session.add(
+                OutboxEvent(
+                    tenant_id=tenant_id,
+                    event_type="payment.authorized",
+                    aggregate_type="PaymentIntent",
+                    aggregate_id=str(pi.id),
+                    payload={
+                        "payment_intent_id": str(pi.id),
+                        "amount": str(amount),
+                        "currency": currency,
+                        "order_id": order_id,
+                        "customer_ref": pi.customer_ref,
+                        "correlation_id": parsed["correlation_id"] or get_correlation_id(),
+                    },
+                )
             )
-        )
 
     log.info(
         "payment intent created from charge request",
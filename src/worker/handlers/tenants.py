@@ -5,6 +5,7 @@ from typing import Any
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from src.application.account_cache import publish_account_change
 from src.application.accounts import seed_default_accounts
 from src.infrastructure.db.models import Tenant
 from src.shared.logging import get_logger
@@ -39,8 +40,10 @@ def _handle_created(session: Session, tenant_id: str, payload: dict[str, Any]) -
 
         session.add(Tenant(id=tenant_id, name=name, plan=plan, region=region))
         session.flush()
-        seed_default_accounts(session, tenant_id)
+        seeded = seed_default_accounts(session, tenant_id)
 
+    if seeded:
+        publish_account_change(tenant_id)
     log.info("tenant created from event", extra={"tenant_id": tenant_id})
 
 
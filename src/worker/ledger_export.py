@@ -0,0 +1,60 @@
+"""Columnar ledger export command.
+
+    python -m src.worker.ledger_export --out DIR [--tenant ID ...] [--format parquet|arrow]
+                                       [--from YYYY-MM] [--to YYYY-MM] [--batch-size N]
+
+Exports every tenant (or the given ones) from where the previous run into DIR stopped and
+prints one JSON line per tenant. Requires the optional ``export`` extra (pyarrow).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlalchemy import select
+
+from src.application.ledger_export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, export_ledger
+from src.infrastructure.db.models import Tenant
+from src.infrastructure.db.session import init_db, session_scope
+from src.shared.config import load_settings
+from src.shared.logging import configure_logging
+from src.worker.partitions import parse_month
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="src.worker.ledger_export")
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--tenant", action="append", dest="tenants", default=None)
+    parser.add_argument("--format", dest="fmt", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--from", dest="from_month", type=parse_month, default=None)
+    parser.add_argument("--to", dest="to_month", type=parse_month, default=None)
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    configure_logging("INFO")
+    init_db(settings)
+
+    tenant_ids = args.tenants
+    if tenant_ids is None:
+        with session_scope() as session:
+            tenant_ids = list(session.execute(select(Tenant.id).order_by(Tenant.id)).scalars())
+    for tenant_id in tenant_ids:
+        with session_scope() as session:
+            result = export_ledger(
+                session,
+                tenant_id,
+                args.out,
+                fmt=args.fmt,
+                from_month=args.from_month,
+                to_month=args.to_month,
+                batch_size=args.batch_size,
+            )
+        print(result.model_dump_json())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
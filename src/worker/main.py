@@ -6,9 +6,19 @@ import time
 import uuid
 from typing import Any
 
+from src.application.account_cache import init_account_cache
+from src.application.gateway_status import RateLimiter, StatusFetcher, get_rate_limiter
 from src.application.outbox import claim_events, mark_failed, mark_sent
+from src.application.ports.payment_gateway import PaymentGatewayPort
+from src.application.reconciliation_runs import claim_run, run_reconciliation, schedule_due_runs
+from src.application.refund_pipeline import process_refunds
+from src.application.report_jobs import claim_report_job, run_report_job
+from src.application.reports import refresh_all_rollups
+from src.infrastructure.db.partitions import ensure_ledger_partitions
 from src.infrastructure.db.session import init_db, session_scope
+from src.infrastructure.gateway.factory import create_gateway
 from src.infrastructure.mq.rabbit import Rabbit, RabbitConfig
+from src.infrastructure.redis.client import init_redis
 from src.shared.config import Settings, load_settings
 from src.shared.correlation import set_correlation_id, set_subject, set_tenant_id
 from src.shared.logging import configure_logging, get_logger
@@ -62,16 +72,118 @@ def dispatch_loop(rabbit: Rabbit, worker_id: str) -> None:
         time.sleep(1.0)
 
 
-def consume_loop(rabbit: Rabbit, queue: str | None = None) -> None:
+def partition_maintenance_loop(settings: Settings, interval_seconds: float = 3600.0) -> None:
+    log.info(
+        "ledger partition maintenance started",
+        extra={"months_ahead": settings.ledger_partition_months_ahead},
+    )
+    while True:
+        try:
+            with session_scope() as session:
+                ensure_ledger_partitions(session, settings.ledger_partition_months_ahead)
+        except Exception:
+            log.exception("partition maintenance error")
+        time.sleep(interval_seconds)
+
+
+def report_refresh_loop(settings: Settings) -> None:
+    interval = settings.report_refresh_interval_minutes * 60
+    log.info("ledger rollup refresh started", extra={"interval_seconds": interval})
+    while True:
+        try:
+            with session_scope() as session:
+                refresh_all_rollups(session)
+        except Exception:
+            log.exception("ledger rollup refresh error")
+        time.sleep(interval)
+
+
+def report_jobs_loop(worker_id: str, idle_seconds: float = 2.0) -> None:
+    log.info("report job runner started", extra={"worker_id": worker_id})
+    while True:
+        job_id = None
+        try:
+            with session_scope() as session:
+                job_id = claim_report_job(session, worker_id)
+                if job_id is not None:
+                    status = run_report_job(session, job_id, worker_id)
+                    log.info("report job finished", extra={"job_id": str(job_id), "status": status})
+        except Exception:
+            log.exception("report job loop error")
+        if job_id is None:
+            time.sleep(idle_seconds)
+
+
+def refund_pipeline_loop(
+    settings: Settings,
+    worker_id: str,
+    gateway: PaymentGatewayPort,
+    limiter: RateLimiter,
+    idle_seconds: float = 1.0,
+) -> None:
+    log.info("refund pipeline started", extra={"worker_id": worker_id})
+    while True:
+        claimed = 0
+        try:
+            with session_scope() as session:
+                claimed = process_refunds(
+                    session, worker_id, gateway, settings.gateway_refund_concurrency, limiter
+                )
+        except Exception:
+            log.exception("refund pipeline error")
+        if not claimed:
+            time.sleep(idle_seconds)
+
+
+def reconciliation_scheduler_loop(settings: Settings, tick_seconds: float = 60.0) -> None:
+    log.info(
+        "reconciliation scheduler started",
+        extra={"interval_minutes": settings.reconciliation_interval_minutes},
+    )
+    while True:
+        try:
+            with session_scope() as session:
+                schedule_due_runs(
+                    session,
+                    settings.reconciliation_interval_minutes,
+                    settings.reconciliation_full_sweep_days,
+                )
+        except Exception:
+            log.exception("reconciliation scheduler error")
+        time.sleep(tick_seconds)
+
+
+def reconciliation_runs_loop(
+    settings: Settings, worker_id: str, fetcher: StatusFetcher, idle_seconds: float = 5.0
+) -> None:
+    log.info("reconciliation runner started", extra={"worker_id": worker_id})
+    while True:
+        run_id = None
+        try:
+            with session_scope() as session:
+                run_id = claim_run(session, worker_id, settings.reconciliation_max_concurrency)
+                if run_id is not None:
+                    status = run_reconciliation(session, run_id, worker_id, fetcher)
+                    log.info(
+                        "reconciliation run finished",
+                        extra={"run_id": str(run_id), "status": status},
+                    )
+        except Exception:
+            log.exception("reconciliation runner error")
+        if run_id is None:
+            time.sleep(idle_seconds)
+
+
+def consume_loop(rabbit: Rabbit, gateway: PaymentGatewayPort, queue: str | None = None) -> None:
     def handler(routing_key: str, payload: dict[str, Any], headers: dict[str, Any]) -> None:
         _set_context(headers, payload)
         with session_scope() as session:
-            handle_event(session, routing_key, payload)
+            handle_event(session, routing_key, payload, gateway)
 
     rabbit.consume(handler, prefetch=10, queue=queue)
 
 
-def _start_orders_consumer(settings: Settings) -> Rabbit | None:
+def _start_orders_consumer(settings: Settings, gateway: PaymentGatewayPort) -> Rabbit | None:
     if not settings.orders_integration_enabled:
         return None
 
@@ -95,7 +207,7 @@ def _start_orders_consumer(settings: Settings) -> Rabbit | None:
 
     t = threading.Thread(
         target=consume_loop,
-        args=(rabbit_orders, settings.orders_queue),
+        args=(rabbit_orders, gateway, settings.orders_queue),
         daemon=True,
     )
     t.start()
@@ -146,6 +258,9 @@ def main() -> None:
     settings = load_settings()
     configure_logging("INFO")
     init_db(settings)
+    # Ledger postings made by the worker bump the report cache generation.
+    init_redis(settings)
+    init_account_cache(settings)
 
     cfg = RabbitConfig(url=settings.rabbitmq_url)
     rabbit_dispatch = Rabbit(cfg)
@@ -156,12 +271,34 @@ def main() -> None:
     worker_id = _worker_id()
     t = threading.Thread(target=dispatch_loop, args=(rabbit_dispatch, worker_id), daemon=True)
     t.start()
-
-    rabbit_orders = _start_orders_consumer(settings)
+    threading.Thread(target=partition_maintenance_loop, args=(settings,), daemon=True).start()
+    threading.Thread(target=report_refresh_loop, args=(settings,), daemon=True).start()
+    threading.Thread(target=report_jobs_loop, args=(worker_id,), daemon=True).start()
+    threading.Thread(target=reconciliation_scheduler_loop, args=(settings,), daemon=True).start()
+    # Refunds and reconciliation runners share one rate limiter for the provider.
+    gateway = create_gateway(settings)
+    limiter = get_rate_limiter(settings.gateway_provider, settings.gateway_rate_limit_per_second)
+    threading.Thread(
+        target=refund_pipeline_loop,
+        args=(settings, f"{worker_id}:refunds", gateway, limiter),
+        daemon=True,
+    ).start()
+    # Runs for different tenants proceed in parallel; claim_run enforces the global cap.
+    fetcher = StatusFetcher(
+        gateway, concurrency=settings.gateway_status_concurrency, limiter=limiter
+    )
+    for n in range(settings.reconciliation_max_concurrency):
+        threading.Thread(
+            target=reconciliation_runs_loop,
+            args=(settings, f"{worker_id}:recon-{n}", fetcher),
+            daemon=True,
+        ).start()
+
+    rabbit_orders = _start_orders_consumer(settings, gateway)
     rabbit_saas = _start_saas_consumer(settings)
 
     try:
-        consume_loop(rabbit_consume)
+        consume_loop(rabbit_consume, gateway)
     finally:
         rabbit_dispatch.close()
         rabbit_consume.close()
@@ -0,0 +1,49 @@
+"""Ledger partition maintenance commands.
+
+python -m src.worker.partitions ensure [--months-ahead N]
+python -m src.worker.partitions detach --before YYYY-MM
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date
+
+from src.infrastructure.db.partitions import detach_ledger_partitions, ensure_ledger_partitions
+from src.infrastructure.db.session import init_db, session_scope
+from src.shared.config import load_settings
+from src.shared.logging import configure_logging
+
+
+def parse_month(value: str) -> date:
+    year, month = value.split("-", 1)
+    return date(int(year), int(month), 1)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="src.worker.partitions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ensure = sub.add_parser("ensure", help="create partitions ahead of time")
+    ensure.add_argument("--months-ahead", type=int, default=None)
+    detach = sub.add_parser("detach", help="detach month partitions for archiving")
+    detach.add_argument("--before", type=parse_month, required=True, help="first month to keep")
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    configure_logging("INFO")
+    init_db(settings)
+
+    with session_scope() as session:
+        if args.command == "ensure":
+            months = args.months_ahead or settings.ledger_partition_months_ahead
+            names = ensure_ledger_partitions(session, months)
+        else:
+            names = detach_ledger_partitions(session, args.before)
+    for name in names:
+        print(name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Settlement file reconciliation command.
+
+    python -m src.worker.reconcile --tenant ID FILE [--format csv|ndjson] [--chunk-size N]
+
+Streams the gateway's settlement file (CSV with a header row, or NDJSON; columns
+gateway_ref, amount, status) through the reconciliation pipeline and prints a JSON summary.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.application.reconciliation import FILE_CHUNK_SIZE, reconcile_file
+from src.infrastructure.db.session import init_db, session_scope
+from src.shared.config import load_settings
+from src.shared.logging import configure_logging
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="src.worker.reconcile")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--tenant", required=True)
+    parser.add_argument("--format", dest="fmt", choices=["csv", "ndjson"], default=None)
+    parser.add_argument("--chunk-size", type=int, default=FILE_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    configure_logging("INFO")
+    init_db(settings)
+
+    with session_scope() as session:
+        summary = reconcile_file(session, args.tenant, args.file, args.fmt, args.chunk_size)
+    print(summary.model_dump_json())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
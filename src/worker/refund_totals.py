@@ -0,0 +1,49 @@
+"""payment_intents.refunded_amount maintenance commands.
+
+    python -m src.worker.refund_totals verify [--tenant ID ...]
+    python -m src.worker.refund_totals backfill [--tenant ID ...] [--batch-size N]
+
+``verify`` prints the JSON report and exits non-zero when any intent's cached total disagrees
+with its refunds; ``backfill`` recomputes the column from the refunds table.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from src.application.refunds import (
+    BACKFILL_BATCH_SIZE,
+    backfill_refunded_amounts,
+    verify_refunded_amounts,
+)
+from src.infrastructure.db.session import init_db, session_scope
+from src.shared.config import load_settings
+from src.shared.logging import configure_logging
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="src.worker.refund_totals")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify", help="compare refunded_amount with the refunds table")
+    verify.add_argument("--tenant", action="append", dest="tenants", default=None)
+    backfill = sub.add_parser("backfill", help="recompute refunded_amount from refunds")
+    backfill.add_argument("--tenant", action="append", dest="tenants", default=None)
+    backfill.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    configure_logging("INFO")
+    init_db(settings)
+
+    with session_scope() as session:
+        if args.command == "verify":
+            report = verify_refunded_amounts(session, args.tenants)
+            print(report.model_dump_json(indent=2))
+            return 1 if report.mismatch_count else 0
+        print(backfill_refunded_amounts(session, args.tenants, args.batch_size))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
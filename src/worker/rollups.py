@@ -0,0 +1,53 @@
+"""Ledger daily rollup commands.
+
+python -m src.worker.rollups refresh
+python -m src.worker.rollups backfill [--tenant ID ...] [--workers N]
+                                      [--from YYYY-MM] [--to YYYY-MM]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+from src.application.reports import backfill_rollups, refresh_all_rollups
+from src.infrastructure.db.session import init_db, session_scope
+from src.shared.config import load_settings
+from src.shared.logging import configure_logging
+from src.worker.partitions import parse_month
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="src.worker.rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("refresh", help="fold entries posted since the watermark")
+    backfill = sub.add_parser("backfill", help="rebuild rollup history in parallel chunks")
+    backfill.add_argument("--tenant", action="append", dest="tenants", default=None)
+    backfill.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    backfill.add_argument("--from", dest="from_month", type=parse_month, default=None)
+    backfill.add_argument("--to", dest="to_month", type=parse_month, default=None)
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    configure_logging("INFO")
+    init_db(settings)
+
+    with session_scope() as session:
+        if args.command == "refresh":
+            print(refresh_all_rollups(session))
+        else:
+            report = backfill_rollups(
+                session,
+                settings,
+                tenant_ids=args.tenants,
+                workers=args.workers,
+                from_month=args.from_month,
+                to_month=args.to_month,
+            )
+            print(report.model_dump_json(indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
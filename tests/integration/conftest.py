@@ -0,0 +1,112 @@
+"""Integration fixtures: a throwaway Postgres per module (tests skip when Docker is missing).
+
+The schema is built by the Alembic migrations, as in production, not from the ORM metadata.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Generator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Engine, create_engine, make_url, text
+from sqlalchemy.orm import sessionmaker
+
+from src.application.ledger_chain import lock_chain_head, seal_entry
+from src.infrastructure.db.models import LedgerEntry, LedgerLine, PaymentIntent, Tenant
+from src.infrastructure.db.partitions import ensure_ledger_partitions
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+def alembic_upgrade(url: str, revision: str = "head") -> None:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    # migrations/env.py reads the target database from DATABASE_URL.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", url)
+        command.upgrade(config, revision)
+
+
+@pytest.fixture(scope="module")
+def postgres_url() -> Generator[str, None, None]:
+    postgres = pytest.importorskip("testcontainers.postgres")
+    try:
+        container = postgres.PostgresContainer("postgres:16-alpine", driver="psycopg")
+        container.start()
+    except Exception as exc:  # docker not available
+        pytest.skip(f"postgres container unavailable: {exc}")
+    try:
+        yield container.get_connection_url()
+    finally:
+        container.stop()
+
+
+@dataclass(frozen=True)
+class BlankDatabase:
+    url: str
+
+    def upgrade(self, revision: str = "head") -> None:
+        alembic_upgrade(self.url, revision)
+
+
+@pytest.fixture
+def blank_database(postgres_url: str) -> Generator[BlankDatabase, None, None]:
+    """A new, empty database in the module's container, for migrating step by step."""
+    name = f"migrations_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(postgres_url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'CREATE DATABASE "{name}"'))
+    try:
+        url = make_url(postgres_url).set(database=name)
+        yield BlankDatabase(url.render_as_string(hide_password=False))
+    finally:
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE "{name}" WITH (FORCE)'))
+        admin.dispose()
+
+
+@pytest.fixture(scope="module")
+def engine(postgres_url: str) -> Generator[Engine, None, None]:
+    alembic_upgrade(postgres_url)
+    eng = create_engine(postgres_url)
+    try:
+        factory = sessionmaker(bind=eng, expire_on_commit=False)
+        with factory() as session:
+            ensure_ledger_partitions(session, months_ahead=5, now=datetime(2026, 1, 1))
+        with factory() as session, session.begin():
+            session.add(Tenant(id="t1", name="T1"))
+            session.flush()
+            pi = PaymentIntent(
+                tenant_id="t1", amount=Decimal("10"), currency="BRL", customer_ref="c"
+            )
+            session.add(pi)
+            session.flush()
+            head = lock_chain_head(session, "t1")
+            for month in (1, 2, 3, 4):
+                posted = datetime(2026, month, 10, tzinfo=timezone.utc)
+                entry = LedgerEntry(
+                    id=uuid.uuid4(), tenant_id="t1", payment_intent_id=pi.id, posted_at=posted
+                )
+                entry.lines = [
+                    LedgerLine(
+                        tenant_id="t1",
+                        side=side,
+                        account=acc,
+                        amount=Decimal("10"),
+                        currency="BRL",
+                        posted_at=posted,
+                    )
+                    for side, acc in (("DEBIT", "CASH"), ("CREDIT", "REVENUE"))
+                ]
+                seal_entry(head, entry)
+                session.add(entry)
+        yield eng
+    finally:
+        eng.dispose()
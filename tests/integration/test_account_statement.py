@@ -0,0 +1,33 @@
+"""Statement running balances must chain across pages and start from the rollup snapshot."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from src.application.reports import refresh_rollups
+from src.application.statements import account_statement
+
+SECRET = "statement-secret"
+
+
+def test_statement_pages_chain_running_balances(engine: Engine) -> None:
+    with Session(engine) as session:
+        first = account_statement(session, "t1", "REVENUE", "BRL", None, None, SECRET, limit=3)
+        second = account_statement(
+            session, "t1", "REVENUE", "BRL", None, None, SECRET, limit=3, cursor=first.next_cursor
+        )
+    assert [line.balance for line in first.lines] == ["10.00", "20.00", "30.00"]
+    assert [line.balance for line in second.lines] == ["40.00"]
+    assert second.next_cursor is None
+
+
+def test_statement_opening_balance_uses_rollups(engine: Engine) -> None:
+    with Session(engine) as session:
+        refresh_rollups(session, "t1")
+        from_dt = datetime(2026, 2, 15, tzinfo=timezone.utc)
+        page = account_statement(session, "t1", "REVENUE", "BRL", from_dt, None, SECRET)
+    assert page.opening_balance == "20.00"
+    assert [line.balance for line in page.lines] == ["30.00", "40.00"]
@@ -0,0 +1,33 @@
+"""Hash-chain verification against a real Postgres."""
+
+from __future__ import annotations
+
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session
+
+from src.application.ledger_chain import verify_chain
+
+
+def test_verifier_resumes_from_checkpoint_and_detects_tampering(engine: Engine) -> None:
+    with Session(engine) as session:
+        first = verify_chain(session, "t1")
+    assert first.intact and (first.from_seq, first.to_seq) == (0, 4)
+
+    with Session(engine) as session:
+        again = verify_chain(session, "t1")
+    assert again.intact and again.entries_verified == 0 and again.from_seq == 4
+
+    with Session(engine) as session, session.begin():
+        session.execute(
+            text(
+                "UPDATE ledger_lines SET amount = 11 "
+                "WHERE posted_at < '2026-02-01' AND side = 'DEBIT'"
+            )
+        )
+    with Session(engine) as session:
+        incremental = verify_chain(session, "t1")
+    # Entries below the checkpoint are only rehashed by a full pass.
+    assert incremental.intact
+    with Session(engine) as session:
+        full = verify_chain(session, "t1", full=True)
+    assert not full.intact and full.broken_at_seq == 1
@@ -0,0 +1,26 @@
+"""The columnar export must write every ledger row once and resume from its state file."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from src.application.ledger_export import export_ledger
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_export_partitions_by_month_and_resumes(engine: Engine, tmp_path: Path) -> None:
+    with Session(engine) as session:
+        first = export_ledger(session, "t1", tmp_path, batch_size=3)
+        again = export_ledger(session, "t1", tmp_path)
+
+    assert (first.entries, first.lines, first.to_seq) == (4, 8, 4)
+    assert (again.entries, again.files) == (0, [])
+    months = sorted(p.name for p in (tmp_path / "tenant_id=t1" / "ledger_lines").iterdir())
+    assert months == ["month=2026-01", "month=2026-02", "month=2026-03", "month=2026-04"]
+    lines = pq.read_table(tmp_path / "tenant_id=t1" / "ledger_lines")
+    assert lines.num_rows == 8
@@ -0,0 +1,100 @@
+"""Partition pruning checks for ledger queries."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session
+
+from src.application.ledger import get_ledger_balances, list_ledger_entries
+from src.application.ledger_chain import lock_chain_head, seal_entry
+from src.infrastructure.db.models import LedgerEntry, LedgerLine
+from src.infrastructure.db.partitions import ensure_ledger_partitions
+
+MARCH = datetime(2026, 3, 10, tzinfo=timezone.utc)
+
+
+class _ExplainingSession:
+    """Records every statement a query function executes, then runs it for real."""
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+        self.statements: list[Any] = []
+
+    def execute(self, stmt: Any, *args: Any, **kwargs: Any) -> Any:
+        self.statements.append(stmt)
+        return self._session.execute(stmt, *args, **kwargs)
+
+
+def _explain(session: Session, stmt: Any) -> str:
+    conn = session.connection()
+    compiled = stmt.compile(dialect=conn.dialect)
+    rows = conn.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).all()
+    return "\n".join(r[0] for r in rows)
+
+
+def test_balances_prune_to_requested_month(engine: Engine) -> None:
+    with Session(engine) as session:
+        spy = _ExplainingSession(session)
+        get_ledger_balances(
+            spy,
+            "t1",
+            datetime(2026, 3, 1, tzinfo=timezone.utc),
+            datetime(2026, 3, 31, tzinfo=timezone.utc),
+        )  # type: ignore[arg-type]
+        plan = _explain(session, spy.statements[0])
+    assert "ledger_lines_2026_03" in plan
+    assert "ledger_lines_2026_01" not in plan
+    assert "ledger_lines_2026_04" not in plan
+
+
+def test_entry_listing_prunes_line_partitions(engine: Engine) -> None:
+    with Session(engine) as session:
+        spy = _ExplainingSession(session)
+        out = list_ledger_entries(spy, "t1", MARCH, MARCH)  # type: ignore[arg-type]
+        entries_plan = _explain(session, spy.statements[0])
+        lines_plan = _explain(session, spy.statements[1])
+    assert len(out) == 1 and len(out[0].lines) == 2
+    assert "ledger_entries_2026_03" in entries_plan
+    assert "ledger_entries_2026_02" not in entries_plan
+    assert "ledger_lines_2026_03" in lines_plan
+    assert "ledger_lines_2026_02" not in lines_plan
+    assert uuid.UUID(out[0].id)
+
+
+def test_unpartitioned_month_lands_in_default_and_moves_on_creation(engine: Engine) -> None:
+    posted = datetime(2026, 9, 15, tzinfo=timezone.utc)
+    with Session(engine) as session, session.begin():
+        entry = LedgerEntry(id=uuid.uuid4(), tenant_id="t1", posted_at=posted)
+        entry.lines = [
+            LedgerLine(
+                tenant_id="t1",
+                side=side,
+                account=acc,
+                amount=Decimal("5"),
+                currency="BRL",
+                posted_at=posted,
+            )
+            for side, acc in (("DEBIT", "CASH"), ("CREDIT", "REVENUE"))
+        ]
+        seal_entry(lock_chain_head(session, "t1"), entry)
+        session.add(entry)
+
+    def _count(session: Session, table: str) -> int:
+        return int(session.execute(text(f"SELECT count(*) FROM {table}")).scalar_one())
+
+    with Session(engine) as session:
+        assert _count(session, "ledger_entries_default") == 1
+        assert _count(session, "ledger_lines_default") == 2
+        created = ensure_ledger_partitions(session, months_ahead=0, now=posted)
+    assert created == ["ledger_entries_2026_09", "ledger_lines_2026_09"]
+    with Session(engine) as session:
+        assert _count(session, "ledger_entries_default") == 0
+        assert _count(session, "ledger_lines_default") == 0
+        assert _count(session, "ledger_lines_2026_09") == 2
+        out = list_ledger_entries(session, "t1", posted, posted)
+    assert len(out) == 1 and len(out[0].lines) == 2
@@ -0,0 +1,91 @@
+"""Rollup-backed reports must match a direct aggregate over the ledger."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Engine, delete, update
+from sqlalchemy.orm import Session
+
+from src.application.ledger_integrity import verify_ledger
+from src.application.reports import (
+    account_balances_report,
+    backfill_rollups,
+    refresh_rollups,
+    revenue_report,
+    tenant_revenue_report,
+)
+from src.infrastructure.db.models import (
+    LedgerDailyRollup,
+    LedgerRollupWatermark,
+    TenantRevenueTotal,
+)
+
+
+def _reports(session: Session) -> tuple[list, list]:
+    partial_from = datetime(2026, 2, 10, 12, tzinfo=timezone.utc)
+    return (
+        revenue_report(session, "t1", partial_from, None, "week"),
+        account_balances_report(session, "t1", None, None),
+    )
+
+
+def test_refresh_and_backfill_agree_with_the_ledger(engine: Engine) -> None:
+    with Session(engine) as session:
+        before = _reports(session)  # no watermark yet: served from the ledger
+        session.rollback()
+        assert refresh_rollups(session, "t1") == 4
+        assert refresh_rollups(session, "t1") == 0
+        assert _reports(session) == before
+        session.rollback()
+
+        with session.begin():
+            session.execute(delete(LedgerDailyRollup))
+            session.execute(delete(LedgerRollupWatermark))
+        out = backfill_rollups(session, settings=None, tenant_ids=["t1"])  # type: ignore[arg-type]
+        assert out.chunks >= 4
+        assert _reports(session) == before
+
+
+def test_tenant_revenue_totals_follow_refresh_and_backfill(engine: Engine) -> None:
+    with Session(engine) as session:
+        with session.begin():
+            session.execute(delete(LedgerDailyRollup))
+            session.execute(delete(LedgerRollupWatermark))
+            session.execute(delete(TenantRevenueTotal))
+        assert refresh_rollups(session, "t1") == 4
+        (item,) = tenant_revenue_report(session, currency="BRL")
+        assert (item.tenant_id, item.total) == ("t1", "40.00")
+        session.rollback()
+
+        with session.begin():
+            session.execute(delete(TenantRevenueTotal))
+        backfill_rollups(session, settings=None, tenant_ids=["t1"])  # type: ignore[arg-type]
+        assert [i.total for i in tenant_revenue_report(session)] == ["40.00"]
+
+
+def test_verify_reports_rollups_and_totals_that_drift_from_the_ledger(engine: Engine) -> None:
+    with Session(engine) as session:
+        refresh_rollups(session, "t1")
+        clean = verify_ledger(session, settings=None, tenant_ids=["t1"])  # type: ignore[arg-type]
+        assert clean.violation_count == 0
+        session.rollback()
+
+        with session.begin():
+            session.execute(
+                update(LedgerDailyRollup)
+                .where(LedgerDailyRollup.account == "REVENUE")
+                .values(credits_total=LedgerDailyRollup.credits_total + 1)
+            )
+            session.execute(update(TenantRevenueTotal).values(total=TenantRevenueTotal.total - 5))
+        report = verify_ledger(session, settings=None, tenant_ids=["t1"])  # type: ignore[arg-type]
+        session.rollback()
+
+        with session.begin():
+            session.execute(delete(LedgerDailyRollup))
+            session.execute(delete(LedgerRollupWatermark))
+            session.execute(delete(TenantRevenueTotal))
+
+    # Four drifted REVENUE days, and a total that matches neither the rollups nor the lines.
+    assert report.violations_by_kind == {"ROLLUP_MISMATCH": 4, "TENANT_TOTAL_MISMATCH": 1}
+    assert report.lines_checked == 8
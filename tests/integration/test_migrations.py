@@ -0,0 +1,128 @@
+"""Data migrations run against a database seeded at the revision before them."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Connection, create_engine, text
+from sqlalchemy.orm import Session
+
+from src.application.ledger_chain import verify_chain
+from src.domain.ledger_hash import GENESIS_HASH, compute_entry_hash
+
+if TYPE_CHECKING:
+    from tests.integration.conftest import BlankDatabase
+
+JAN = datetime(2026, 1, 10, tzinfo=timezone.utc)
+FEB = datetime(2026, 2, 10, tzinfo=timezone.utc)
+
+
+def _seed_entries(conn: Connection, with_description: bool = False) -> list[uuid.UUID]:
+    """Tenant m1 with one intent and a balanced entry in January and February."""
+    conn.execute(text("INSERT INTO tenants (id, name) VALUES ('m1', 'M1')"))
+    pi = conn.execute(
+        text(
+            "INSERT INTO payment_intents (tenant_id, amount, currency, customer_ref) "
+            "VALUES ('m1', 10, 'BRL', 'c') RETURNING id"
+        )
+    ).scalar_one()
+    ids = []
+    for posted in (JAN, FEB):
+        entry_id = uuid.uuid4()
+        columns, values = "id, tenant_id, payment_intent_id, posted_at", ":id, 'm1', :pi, :p"
+        if with_description:
+            columns, values = f"{columns}, description", f"{values}, 'sale'"
+        conn.execute(
+            text(f"INSERT INTO ledger_entries ({columns}) VALUES ({values})"),
+            {"id": entry_id, "pi": pi, "p": posted},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO ledger_lines "
+                "(tenant_id, entry_id, side, account, amount, currency, posted_at) "
+                "VALUES ('m1', :e, 'DEBIT', 'CASH', 10, 'BRL', :p), "
+                "('m1', :e, 'CREDIT', 'REVENUE', 10, 'BRL', :p)"
+            ),
+            {"e": entry_id, "p": posted},
+        )
+        ids.append(entry_id)
+    return ids
+
+
+def test_0004_moves_existing_rows_into_monthly_partitions(blank_database: BlankDatabase) -> None:
+    blank_database.upgrade("0003_ledger_lines_posted_at")
+    eng = create_engine(blank_database.url)
+    try:
+        with eng.begin() as conn:
+            ids = _seed_entries(conn)
+
+        blank_database.upgrade("0004_ledger_partitioning")
+        with eng.connect() as conn:
+            partitioned = conn.execute(
+                text(
+                    "SELECT count(*) FROM pg_partitioned_table "
+                    "WHERE partrelid IN ('ledger_entries'::regclass, 'ledger_lines'::regclass)"
+                )
+            ).scalar_one()
+            entries = conn.execute(
+                text("SELECT tableoid::regclass::text, id FROM ledger_entries ORDER BY posted_at")
+            ).all()
+            lines = conn.execute(
+                text(
+                    "SELECT tableoid::regclass::text, sum(amount) FROM ledger_lines "
+                    "GROUP BY 1 ORDER BY 1"
+                )
+            ).all()
+    finally:
+        eng.dispose()
+
+    assert partitioned == 2
+    assert entries == [("ledger_entries_2026_01", ids[0]), ("ledger_entries_2026_02", ids[1])]
+    assert lines == [
+        ("ledger_lines_2026_01", Decimal("20.00")),
+        ("ledger_lines_2026_02", Decimal("20.00")),
+    ]
+
+
+def test_0006_chains_existing_entries_and_head_verifies(blank_database: BlankDatabase) -> None:
+    blank_database.upgrade("0005_manual_journal_entries")
+    eng = create_engine(blank_database.url)
+    try:
+        with eng.begin() as conn:
+            ids = _seed_entries(conn, with_description=True)
+
+        blank_database.upgrade("0006_ledger_hash_chain")
+        with eng.connect() as conn:
+            chained = conn.execute(
+                text(
+                    "SELECT id, posted_at, payment_intent_id, chain_seq, prev_hash, entry_hash "
+                    "FROM ledger_entries ORDER BY chain_seq"
+                )
+            ).all()
+            head = conn.execute(
+                text("SELECT last_seq, last_hash FROM ledger_chain_heads WHERE tenant_id = 'm1'")
+            ).one()
+
+        blank_database.upgrade()
+        with Session(eng) as session:
+            report = verify_chain(session, "m1", full=True)
+    finally:
+        eng.dispose()
+
+    assert [(e.id, e.chain_seq) for e in chained] == [(ids[0], 1), (ids[1], 2)]
+    lines = [
+        ("CREDIT", "REVENUE", Decimal("10.00"), "BRL"),
+        ("DEBIT", "CASH", Decimal("10.00"), "BRL"),
+    ]
+    prev = GENESIS_HASH
+    for e in chained:
+        assert e.prev_hash == prev
+        assert e.entry_hash == compute_entry_hash(
+            prev, "m1", e.chain_seq, e.id, e.posted_at, e.payment_intent_id, "sale", lines
+        )
+        prev = e.entry_hash
+    assert tuple(head) == (2, prev)
+    assert (report.intact, report.entries_verified) == (True, 2)
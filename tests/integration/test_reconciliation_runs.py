@@ -0,0 +1,309 @@
+"""Reconciliation runs: scheduling, the concurrency cap and resuming from a checkpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from src.application.gateway_status import StatusFetcher
+from src.application.payments import confirm_payment_intent, create_payment_intent
+from src.application.ports.payment_gateway import (
+    GatewayResult,
+    GatewayStatus,
+    GatewayTransactionPage,
+)
+from src.application.reconciliation_runs import (
+    STALE_RUN_SECONDS,
+    claim_run,
+    run_reconciliation,
+    schedule_due_runs,
+)
+from src.infrastructure.db.models import (
+    PaymentIntent,
+    ReconciliationDiscrepancy,
+    ReconciliationRun,
+    Tenant,
+)
+from src.infrastructure.gateway.fake import FakeGatewayAdapter
+
+
+class _Gateway:
+    def __init__(self, statuses: dict[str, GatewayStatus]) -> None:
+        self.statuses = statuses
+        self.calls: list[str] = []
+
+    async def get_status(self, gateway_ref: str) -> GatewayResult:
+        self.calls.append(gateway_ref)
+        status = self.statuses.get(gateway_ref, GatewayStatus.NOT_FOUND)
+        return GatewayResult(
+            success=status != GatewayStatus.NOT_FOUND, gateway_ref=gateway_ref, status=status
+        )
+
+    async def list_transactions(
+        self,
+        tenant_id: str,
+        since: Optional[datetime],
+        until: datetime,
+        cursor: Optional[str] = None,
+    ) -> GatewayTransactionPage:
+        return GatewayTransactionPage([])
+
+
+def test_scheduled_run_resumes_from_checkpoint(engine: Engine) -> None:
+    with Session(engine) as session, session.begin():
+        session.add(Tenant(id="runs", name="Runs"))
+        session.flush()
+        for n in range(5):
+            session.add(
+                PaymentIntent(
+                    tenant_id="runs",
+                    amount=Decimal("10.00"),
+                    currency="BRL",
+                    customer_ref="c",
+                    status="SETTLED",
+                    gateway_ref=f"g{n}",
+                )
+            )
+    gateway = _Gateway({f"g{n}": GatewayStatus.CAPTURED for n in range(4)})
+
+    with Session(engine) as session:
+        assert schedule_due_runs(session, 60) >= 1
+        assert schedule_due_runs(session, 60) == 0  # runs are already pending
+        with session.begin():
+            run = session.execute(
+                select(ReconciliationRun).where(ReconciliationRun.tenant_id == "runs")
+            ).scalar_one()
+            # Simulate a worker that died after checkpointing g1.
+            run.status = "RUNNING"
+            run.checkpoint = "g1"
+            run.items_processed = 2
+            run.started_at = datetime.now(timezone.utc)
+            run.locked_at = datetime.now(timezone.utc) - timedelta(seconds=STALE_RUN_SECONDS + 1)
+            session.execute(
+                ReconciliationRun.__table__.update()
+                .where(ReconciliationRun.tenant_id != "runs")
+                .values(status="SUCCEEDED")
+            )
+        run_id = run.id
+
+        assert claim_run(session, "w1", max_concurrency=0) is None
+        assert claim_run(session, "w1", max_concurrency=2) == run_id
+        status = run_reconciliation(session, run_id, "w1", StatusFetcher(gateway), batch_size=2)
+        assert status == "SUCCEEDED"
+        run = session.get(ReconciliationRun, run_id, populate_existing=True)
+
+    assert gateway.calls == ["g2", "g3", "g4"]
+    assert run.items_processed == 5
+    assert run.checkpoint == "g4"
+    assert run.discrepancy_counts == {"MISSING_REMOTE": 1}
+
+
+def test_incremental_run_only_checks_intents_updated_since_last_watermark(engine: Engine) -> None:
+    hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    with Session(engine) as session, session.begin():
+        session.add(Tenant(id="incr", name="Incr"))
+        session.flush()
+        for ref in ("i1", "i2", "i3"):
+            session.add(
+                PaymentIntent(
+                    tenant_id="incr",
+                    amount=Decimal("1.00"),
+                    currency="BRL",
+                    customer_ref="c",
+                    status="SETTLED",
+                    gateway_ref=ref,
+                    updated_at=hour_ago,
+                )
+            )
+        session.add(
+            ReconciliationRun(
+                tenant_id="incr",
+                mode="full",
+                status="SUCCEEDED",
+                items_processed=3,
+                discrepancy_counts={},
+                created_at=hour_ago,
+                watermark=hour_ago + timedelta(minutes=30),
+            )
+        )
+    with Session(engine) as session, session.begin():
+        session.execute(
+            PaymentIntent.__table__.update()
+            .where(PaymentIntent.gateway_ref == "i2")
+            .values(updated_at=datetime.now(timezone.utc))
+        )
+        session.execute(
+            ReconciliationRun.__table__.update()
+            .where(ReconciliationRun.status != "SUCCEEDED")
+            .values(status="SUCCEEDED")
+        )
+
+    gateway = _Gateway({ref: GatewayStatus.CAPTURED for ref in ("i1", "i2", "i3")})
+    with Session(engine) as session:
+        schedule_due_runs(session, interval_minutes=0, full_sweep_days=7)
+        run = session.execute(
+            select(ReconciliationRun).where(
+                ReconciliationRun.tenant_id == "incr", ReconciliationRun.status == "PENDING"
+            )
+        ).scalar_one()
+        assert run.mode == "incremental"
+        with session.begin():
+            session.execute(
+                ReconciliationRun.__table__.update()
+                .where(ReconciliationRun.tenant_id != "incr", ReconciliationRun.status == "PENDING")
+                .values(status="SUCCEEDED")
+            )
+        assert claim_run(session, "w1", max_concurrency=4) == run.id
+        assert run_reconciliation(session, run.id, "w1", StatusFetcher(gateway)) == "SUCCEEDED"
+
+    assert gateway.calls == ["i2"]
+
+
+def test_reclaimed_run_stops_its_original_worker(engine: Engine) -> None:
+    with Session(engine) as session, session.begin():
+        session.add(Tenant(id="reclaim", name="Reclaim"))
+        session.flush()
+        for ref in ("r0", "r1"):
+            session.add(
+                PaymentIntent(
+                    tenant_id="reclaim",
+                    amount=Decimal("1.00"),
+                    currency="BRL",
+                    customer_ref="c",
+                    status="SETTLED",
+                    gateway_ref=ref,
+                )
+            )
+        session.execute(
+            ReconciliationRun.__table__.update()
+            .where(ReconciliationRun.status.in_(("PENDING", "RUNNING")))
+            .values(status="SUCCEEDED")
+        )
+        session.add(
+            ReconciliationRun(
+                tenant_id="reclaim",
+                mode="full",
+                status="PENDING",
+                items_processed=0,
+                discrepancy_counts={},
+            )
+        )
+
+    class _SlowGateway(_Gateway):
+        async def get_status(self, gateway_ref: str) -> GatewayResult:
+            if not self.calls:
+                # w1's batch outlives the stale timeout and w2 reclaims the run meanwhile.
+                with Session(engine) as other, other.begin():
+                    other.execute(
+                        ReconciliationRun.__table__.update()
+                        .where(ReconciliationRun.tenant_id == "reclaim")
+                        .values(
+                            locked_at=datetime.now(timezone.utc)
+                            - timedelta(seconds=STALE_RUN_SECONDS + 1)
+                        )
+                    )
+                with Session(engine) as other:
+                    assert claim_run(other, "w2", max_concurrency=4) is not None
+            return await super().get_status(gateway_ref)
+
+    gateway = _SlowGateway({"r0": GatewayStatus.CAPTURED, "r1": GatewayStatus.CAPTURED})
+    with Session(engine) as session:
+        run_id = claim_run(session, "w1", max_concurrency=4)
+        assert run_id is not None
+        assert run_reconciliation(session, run_id, "w1", StatusFetcher(gateway)) == "STOPPED"
+        run = session.get(ReconciliationRun, run_id, populate_existing=True)
+
+    assert (run.status, run.locked_by) == ("RUNNING", "w2")
+    assert run.checkpoint is None and run.items_processed == 0
+
+
+def test_run_flags_gateway_transactions_missing_locally(engine: Engine) -> None:
+    gateway = FakeGatewayAdapter(page_size=2)
+
+    async def _authorize(n: int) -> str:
+        result = await gateway.authorize("gw", Decimal("5.00"), "BRL", "c", f"authorize:{n}")
+        return result.gateway_ref
+
+    refs = [asyncio.run(_authorize(n)) for n in range(4)]
+    with Session(engine) as session, session.begin():
+        session.add(Tenant(id="gw", name="Gateway listing"))
+        session.flush()
+        # Only the first two authorizations were recorded locally.
+        for ref in refs[:2]:
+            session.add(
+                PaymentIntent(
+                    tenant_id="gw",
+                    amount=Decimal("5.00"),
+                    currency="BRL",
+                    customer_ref="c",
+                    status="AUTHORIZED",
+                    gateway_ref=ref,
+                )
+            )
+        session.execute(
+            ReconciliationRun.__table__.update()
+            .where(ReconciliationRun.status.in_(("PENDING", "RUNNING")))
+            .values(status="SUCCEEDED")
+        )
+        session.add(
+            ReconciliationRun(
+                tenant_id="gw",
+                mode="full",
+                status="PENDING",
+                items_processed=0,
+                discrepancy_counts={},
+            )
+        )
+
+    with Session(engine) as session:
+        run_id = claim_run(session, "w1", max_concurrency=4)
+        assert run_id is not None
+        assert run_reconciliation(session, run_id, "w1", StatusFetcher(gateway)) == "SUCCEEDED"
+        run = session.get(ReconciliationRun, run_id, populate_existing=True)
+        d = ReconciliationDiscrepancy
+        found = session.execute(
+            select(d.gateway_ref, d.discrepancy_type).where(d.tenant_id == "gw")
+        ).all()
+
+    assert sorted(found) == sorted((ref, "MISSING_LOCAL") for ref in refs[2:])
+    assert (run.phase, run.gateway_cursor, run.items_processed) == ("done", None, 6)
+    assert run.discrepancy_counts == {"MISSING_LOCAL": 2}
+
+
+def test_scheduled_run_checks_intents_confirmed_through_the_gateway(engine: Engine) -> None:
+    gateway = FakeGatewayAdapter()
+    with Session(engine) as session:
+        with session.begin():
+            session.add(Tenant(id="confirmed", name="Confirmed"))
+            session.execute(
+                ReconciliationRun.__table__.update()
+                .where(ReconciliationRun.status.in_(("PENDING", "RUNNING")))
+                .values(status="SUCCEEDED")
+            )
+        for _ in range(3):
+            pid = uuid.UUID(create_payment_intent(session, "confirmed", 7.0, "BRL", "c").id)
+            assert confirm_payment_intent(session, "confirmed", pid, gateway).gateway_ref
+
+        assert schedule_due_runs(session, 60) >= 1
+        with session.begin():
+            session.execute(
+                ReconciliationRun.__table__.update()
+                .where(
+                    ReconciliationRun.tenant_id != "confirmed",
+                    ReconciliationRun.status == "PENDING",
+                )
+                .values(status="SUCCEEDED")
+            )
+        run_id = claim_run(session, "w1", max_concurrency=4)
+        assert run_id is not None
+        assert run_reconciliation(session, run_id, "w1", StatusFetcher(gateway)) == "SUCCEEDED"
+        run = session.get(ReconciliationRun, run_id, populate_existing=True)
+
+    # Three intents checked with get_status, then the same three listed by the gateway.
+    assert (run.items_processed, run.discrepancy_counts) == (6, {})
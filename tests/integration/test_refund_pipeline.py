@@ -0,0 +1,151 @@
+"""Refund pipeline against a real Postgres: claim with SKIP LOCKED, gateway, ledger, outbox."""
+
+from __future__ import annotations
+
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from src.application.ledger_chain import verify_chain
+from src.application.payments import (
+    confirm_payment_intent,
+    create_payment_intent,
+    post_ledger_for_authorized_payment,
+)
+from src.application.ports.payment_gateway import GatewayResult, GatewayStatus
+from src.application.refund_pipeline import claim_refunds, process_refunds
+from src.application.refunds import create_refund, verify_refunded_amounts
+from src.infrastructure.db.models import OutboxEvent, PaymentIntent, Refund, Tenant
+from src.infrastructure.gateway.fake import FakeGatewayAdapter
+
+
+class _Gateway:
+    def __init__(self, outcomes: dict[str, GatewayResult]) -> None:
+        self.outcomes = outcomes
+
+    async def refund(
+        self, gateway_ref: str, amount: Decimal, idempotency_key: str
+    ) -> GatewayResult:
+        return self.outcomes[gateway_ref]
+
+
+def _result(ok: bool, retryable: bool = False) -> GatewayResult:
+    return GatewayResult(
+        success=ok,
+        gateway_ref="re_1" if ok else "",
+        status=GatewayStatus.REFUNDED if ok else GatewayStatus.FAILED,
+        error_code="" if ok else "declined",
+        is_retryable=retryable,
+    )
+
+
+def test_refunds_complete_fail_or_retry_by_gateway_outcome(engine: Engine) -> None:
+    with Session(engine) as session, session.begin():
+        session.add(Tenant(id="rp", name="Refund pipeline"))
+        session.flush()
+        intents = [
+            PaymentIntent(
+                tenant_id="rp",
+                amount=Decimal("10.00"),
+                currency="BRL",
+                customer_ref="c",
+                status="SETTLED",
+                gateway_ref=ref,
+            )
+            for ref in ("ok", "declined", "flaky")
+        ]
+        session.add_all(intents)
+        session.flush()
+        ids = {pi.gateway_ref: pi.id for pi in intents}
+
+    with Session(engine) as session:
+        for pid in ids.values():
+            assert create_refund(session, "rp", pid, Decimal("10.00")).status == "PENDING"
+
+        gateway = _Gateway(
+            {"ok": _result(True), "declined": _result(False), "flaky": _result(False, True)}
+        )
+        assert process_refunds(session, "w1", gateway, concurrency=2) == 3
+        # The flaky one is back to PENDING but not due before its backoff expires.
+        assert claim_refunds(session, "w2") == []
+
+        with session.begin():
+            status = dict(
+                session.execute(
+                    select(PaymentIntent.gateway_ref, Refund.status).join(
+                        PaymentIntent, PaymentIntent.id == Refund.payment_intent_id
+                    )
+                ).all()
+            )
+            events = list(
+                session.execute(
+                    select(OutboxEvent.event_type).where(OutboxEvent.tenant_id == "rp")
+                ).scalars()
+            )
+            intents_after = {
+                pi.gateway_ref: (pi.status, pi.refunded_amount)
+                for pi in session.execute(
+                    select(PaymentIntent).where(PaymentIntent.tenant_id == "rp")
+                ).scalars()
+            }
+
+        assert status == {"ok": "COMPLETED", "declined": "FAILED", "flaky": "PENDING"}
+        assert sorted(events) == ["payment.refund_failed", "payment.refunded"]
+        assert intents_after["ok"] == ("REFUNDED", Decimal("10.00"))
+        assert intents_after["declined"] == ("SETTLED", Decimal("0.00"))
+        assert intents_after["flaky"] == ("SETTLED", Decimal("10.00"))  # still reserved
+        assert verify_refunded_amounts(session, ["rp"]).mismatch_count == 0
+        assert verify_chain(session, "rp", full=True).intact
+
+
+def test_refund_reaches_the_fake_gateway_end_to_end(engine: Engine) -> None:
+    gateway = FakeGatewayAdapter()
+    with Session(engine) as session:
+        with session.begin():
+            session.add(Tenant(id="e2e", name="End to end"))
+        pid = uuid.UUID(create_payment_intent(session, "e2e", 20.0, "BRL", "c").id)
+        ref = confirm_payment_intent(session, "e2e", pid, gateway).gateway_ref
+        assert ref is not None
+        post_ledger_for_authorized_payment(session, "e2e", pid, gateway)
+        assert gateway._store[ref]["captured_amount"] == Decimal("20.00")
+
+        create_refund(session, "e2e", pid, Decimal("20.00"))
+        assert process_refunds(session, "w1", gateway, concurrency=1) == 1
+
+        with session.begin():
+            refund = session.execute(
+                select(Refund).where(Refund.payment_intent_id == pid)
+            ).scalar_one()
+            pi = session.get(PaymentIntent, pid)
+            assert pi is not None
+            assert (refund.status, pi.status) == ("COMPLETED", "REFUNDED")
+        assert gateway._store[ref]["status"] == GatewayStatus.REFUNDED
+        assert gateway._store[ref]["refunded_amount"] == Decimal("20.00")
+
+
+def test_refund_of_an_intent_without_gateway_ref_fails(engine: Engine) -> None:
+    with Session(engine) as session:
+        with session.begin():
+            session.add(Tenant(id="noref", name="No gateway ref"))
+            session.flush()
+            pi = PaymentIntent(
+                tenant_id="noref",
+                amount=Decimal("10.00"),
+                currency="BRL",
+                customer_ref="c",
+                status="SETTLED",
+            )
+            session.add(pi)
+        create_refund(session, "noref", pi.id, Decimal("10.00"))
+        assert process_refunds(session, "w1", FakeGatewayAdapter(), concurrency=1) == 1
+
+        with session.begin():
+            refund = session.execute(
+                select(Refund).where(Refund.payment_intent_id == pi.id)
+            ).scalar_one()
+            session.refresh(pi)
+            assert refund.status == "FAILED"
+            assert refund.error is not None and refund.error.startswith("missing_gateway_ref")
+            assert (pi.status, pi.refunded_amount) == ("SETTLED", Decimal("0.00"))
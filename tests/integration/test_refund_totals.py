@@ -0,0 +1,85 @@
+"""refunded_amount: maintained by single and batch refunds, checked and repaired."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from sqlalchemy import Engine, update
+from sqlalchemy.orm import Session
+
+from src.application.ledger_chain import verify_chain
+from src.application.refunds import (
+    RefundItemInput,
+    backfill_refunded_amounts,
+    create_refund,
+    create_refunds_batch,
+    verify_refunded_amounts,
+)
+from src.infrastructure.db.models import PaymentIntent, Refund, Tenant
+
+
+def test_verify_flags_drift_and_backfill_repairs_it(engine: Engine) -> None:
+    with Session(engine) as session, session.begin():
+        session.add(Tenant(id="refunds", name="Refunds"))
+        session.flush()
+        pi = PaymentIntent(
+            tenant_id="refunds",
+            amount=Decimal("100.00"),
+            currency="BRL",
+            customer_ref="c",
+            status="SETTLED",
+        )
+        session.add(pi)
+        session.flush()
+        # Failed refunds never count towards the total.
+        session.add(
+            Refund(
+                tenant_id="refunds",
+                payment_intent_id=pi.id,
+                amount=Decimal("5.00"),
+                status="FAILED",
+            )
+        )
+        pi_id = pi.id
+    with Session(engine) as session:
+        create_refund(session, "refunds", pi_id, Decimal("30.00"))
+        assert verify_refunded_amounts(session, ["refunds"]).mismatch_count == 0
+
+    with Session(engine) as session, session.begin():
+        session.execute(
+            update(PaymentIntent).where(PaymentIntent.id == pi_id).values(refunded_amount=0)
+        )
+    with Session(engine) as session:
+        report = verify_refunded_amounts(session, ["refunds"])
+        assert [(m.refunded_amount, m.refunds_total) for m in report.mismatches] == [
+            ("0.00", "30.00")
+        ]
+        assert backfill_refunded_amounts(session, ["refunds"], batch_size=1) == 1
+        assert verify_refunded_amounts(session, ["refunds"]).mismatch_count == 0
+
+
+def test_batch_refunds_commit_valid_items_together(engine: Engine) -> None:
+    with Session(engine) as session, session.begin():
+        session.add(Tenant(id="batch", name="Batch"))
+        session.flush()
+        intents = [
+            PaymentIntent(
+                tenant_id="batch",
+                amount=Decimal("10.00"),
+                currency="BRL",
+                customer_ref="c",
+                status="SETTLED",
+            )
+            for _ in range(3)
+        ]
+        session.add_all(intents)
+        session.flush()
+        ids = [pi.id for pi in intents]
+
+    items = [RefundItemInput(payment_intent_id=i, amount=Decimal("4.00")) for i in ids]
+    items.append(RefundItemInput(payment_intent_id=ids[0], amount=Decimal("7.00")))
+    with Session(engine) as session:
+        out = create_refunds_batch(session, "batch", items)
+        assert [i.status for i in out.items] == [202, 202, 202, 422]
+        assert verify_refunded_amounts(session, ["batch"]).mismatch_count == 0
+        assert verify_chain(session, "batch", full=True).intact
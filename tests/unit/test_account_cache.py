@@ -0,0 +1,133 @@
+"""Unit tests for the per-tenant account config cache."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.application import account_cache
+from src.application.account_cache import (
+    INVALIDATION_CHANNEL,
+    AccountConfigCache,
+    listen_for_account_changes,
+    publish_account_change,
+)
+
+
+def _session(*codes: str) -> MagicMock:
+    session = MagicMock()
+    session.execute.return_value.scalars.return_value = list(codes)
+    return session
+
+
+def test_loads_a_tenant_once_and_resolves_from_memory() -> None:
+    cache = AccountConfigCache()
+    session = _session("CASH", "REVENUE")
+    assert cache.resolve(session, "t1", "CASH") == "CASH"
+    assert cache.resolve(session, "t1", "REVENUE") == "REVENUE"
+    assert cache.resolve(session, "t1", "REFUND_EXPENSE") == "REFUND_EXPENSE"
+    assert session.execute.call_count == 1
+
+
+def test_entries_expire_after_the_ttl() -> None:
+    cache = AccountConfigCache(ttl_seconds=30)
+    session = _session("CASH")
+    with patch("src.application.account_cache.time.monotonic", side_effect=[0.0, 10.0, 31.0]):
+        for _ in range(3):
+            cache.resolve(session, "t1", "CASH")
+    assert session.execute.call_count == 2
+
+
+def test_least_recently_used_tenant_is_evicted() -> None:
+    cache = AccountConfigCache(max_tenants=2)
+    session = _session("CASH")
+    for tenant_id in ("t1", "t2", "t1", "t3"):
+        cache.resolve(session, tenant_id, "CASH")
+    assert session.execute.call_count == 3
+    cache.resolve(session, "t1", "CASH")
+    assert session.execute.call_count == 3
+    cache.resolve(session, "t2", "CASH")
+    assert session.execute.call_count == 4
+
+
+def test_invalidate_drops_one_tenant_or_all() -> None:
+    cache = AccountConfigCache()
+    session = _session("CASH")
+    cache.resolve(session, "t1", "CASH")
+    cache.resolve(session, "t2", "CASH")
+    cache.invalidate("t1")
+    cache.resolve(session, "t1", "CASH")
+    cache.resolve(session, "t2", "CASH")
+    assert session.execute.call_count == 3
+    cache.invalidate()
+    cache.resolve(session, "t2", "CASH")
+    assert session.execute.call_count == 4
+
+
+def test_load_racing_with_an_invalidation_is_not_stored() -> None:
+    cache = AccountConfigCache()
+    session = MagicMock()
+
+    def _load(*_: object) -> MagicMock:
+        cache.invalidate("t1")
+        return MagicMock(scalars=MagicMock(return_value=["CASH"]))
+
+    session.execute.side_effect = _load
+    cache.resolve(session, "t1", "CASH")
+    cache.resolve(session, "t1", "CASH")
+    assert session.execute.call_count == 2
+
+
+def test_publish_drops_the_local_entry_and_broadcasts() -> None:
+    cache = AccountConfigCache()
+    session = _session("CASH")
+    cache.resolve(session, "t1", "CASH")
+    redis = MagicMock()
+    with (
+        patch.object(account_cache, "_cache", cache),
+        patch.object(account_cache, "get_redis", return_value=redis),
+    ):
+        publish_account_change("t1")
+    redis.publish.assert_called_once_with(INVALIDATION_CHANNEL, "t1")
+    cache.resolve(session, "t1", "CASH")
+    assert session.execute.call_count == 2
+
+
+def test_publish_failure_is_logged_not_raised() -> None:
+    with patch.object(account_cache, "get_redis", side_effect=RuntimeError("down")):
+        publish_account_change("t1")
+
+
+def test_listener_applies_published_invalidations() -> None:
+    cache = AccountConfigCache()
+    session = _session("CASH")
+    cache.resolve(session, "t0", "CASH")
+
+    def _messages():
+        # Loaded after subscribing, so only the published message can drop them.
+        for tenant_id in ("t1", "t2"):
+            cache.resolve(session, tenant_id, "CASH")
+        yield {"type": "message", "data": "t1"}
+        yield {"type": "message", "data": ""}
+
+    redis = MagicMock()
+    redis.pubsub.return_value.listen.side_effect = _messages
+
+    class _Stop(Exception):
+        pass
+
+    with (
+        patch.object(account_cache, "_cache", cache),
+        patch.object(account_cache, "get_redis", return_value=redis),
+        patch.object(account_cache.time, "sleep", side_effect=_Stop),
+        pytest.raises(_Stop),
+    ):
+        listen_for_account_changes()
+
+    redis.pubsub.return_value.subscribe.assert_called_once_with(INVALIDATION_CHANNEL)
+    assert session.execute.call_count == 3
+    for tenant_id in ("t0", "t1", "t2"):
+        cache.resolve(session, tenant_id, "CASH")
+    # t0 was cleared on subscribe and t1 by its message; t2 is still cached.
+    assert session.execute.call_count == 5
@@ -0,0 +1,82 @@
+"""Unit tests for as-of FX conversion."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.application.fx import FxRateCache, FxRateMissing, to_micros
+from src.application.reports import convert_day_totals
+
+D1 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+D2 = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+
+def _cache(pairs: dict[tuple[str, str], list[tuple[datetime, float]]]) -> FxRateCache:
+    cache = FxRateCache()
+    cache._fingerprint = (1, D1)
+    cache._checked_at = time.monotonic()
+    for pair, history in pairs.items():
+        cache._histories[pair] = (
+            np.array([to_micros(t) for t, _ in history], dtype=np.int64),
+            np.array([r for _, r in history], dtype=np.float64),
+        )
+    return cache
+
+
+def test_rates_at_uses_latest_rate_not_after_each_timestamp() -> None:
+    cache = _cache({("USD", "BRL"): [(D1, 5.0), (D1.replace(hour=12), 5.5)]})
+    at = np.array([to_micros(t) for t in (D1, D1.replace(hour=11), D1.replace(hour=12), D2)])
+    assert cache.rates_at(MagicMock(), "USD", "BRL", at).tolist() == [5.0, 5.0, 5.5, 5.5]
+    with pytest.raises(FxRateMissing):
+        cache.rates_at(MagicMock(), "USD", "BRL", np.array([to_micros(D1) - 1]))
+
+
+def test_history_inverts_the_opposite_pair_and_reloads_on_change() -> None:
+    session = MagicMock()
+    session.execute.return_value.one.return_value = (1, D1)
+    session.execute.return_value.all.return_value = [
+        SimpleNamespace(from_currency="BRL", effective_at=D1, rate=Decimal("0.2"))
+    ]
+    cache = FxRateCache(check_interval=0)
+    times, rates = cache.history(session, "USD", "BRL")
+    assert times.tolist() == [to_micros(D1)] and rates.tolist() == [pytest.approx(5.0)]
+
+    session.execute.return_value.one.return_value = (2, D2)
+    session.execute.return_value.all.return_value = []
+    with pytest.raises(FxRateMissing):
+        cache.history(session, "USD", "BRL")
+
+
+def test_convert_day_totals_rereads_days_with_intraday_rate_changes() -> None:
+    noon = D2.replace(hour=12)
+    cache = _cache({("USD", "BRL"): [(D1, 5.0), (noon, 6.0)]})
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [
+        SimpleNamespace(
+            posted_at=D2.replace(hour=9), account="REVENUE", side="CREDIT", amount=Decimal("1.00")
+        ),
+        SimpleNamespace(
+            posted_at=D2.replace(hour=15), account="REVENUE", side="CREDIT", amount=Decimal("2.00")
+        ),
+    ]
+    days = {
+        (D1, "REVENUE", "USD"): [Decimal(0), Decimal("10.01")],
+        (D2, "REVENUE", "USD"): [Decimal(0), Decimal("3.00")],
+        (D1, "REVENUE", "BRL"): [Decimal(0), Decimal("1.00")],
+    }
+    with (
+        patch("src.application.reports.get_fx_cache", return_value=cache),
+        patch("src.application.fx.get_fx_cache", return_value=cache),
+    ):
+        out = convert_day_totals(session, "t1", days, "BRL", "month", "REVENUE", None, None)
+
+    # 10.01 USD * 5 + 1.00 BRL on day 1; 1.00 * 5 + 2.00 * 6 on day 2 (line by line).
+    assert out == {(D1, "REVENUE", "BRL"): [Decimal(0), Decimal("68.05")]}
+    assert session.execute.call_count == 1
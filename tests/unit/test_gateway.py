@@ -6,9 +6,10 @@ from decimal import Decimal
 
 import pytest
 
+from src.application.gateway_status import StatusFetcher
 from src.application.ports.payment_gateway import GatewayResult, GatewayStatus
 from src.infrastructure.gateway.fake import FakeGatewayAdapter
-from src.infrastructure.gateway.stripe_adapter import CircuitBreaker
+from src.infrastructure.gateway.stripe_adapter import CircuitBreaker, StripeAdapter
 
 
 class TestFakeGatewayAdapter:
@@ -109,6 +110,43 @@ class TestCircuitBreaker:
         assert cb.is_open is False
 
 
+class _ConnectionError(Exception):
+    code = "api_connection_error"
+
+
+class TestStripeAdapter:
+    def test_status_lookups_run_off_the_event_loop(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        stripe = pytest.importorskip("stripe")
+
+        def retrieve(ref: str) -> dict[str, str]:
+            time.sleep(0.05)  # the SDK blocks on the HTTP round trip
+            return {"id": ref, "status": "succeeded"}
+
+        monkeypatch.setattr(stripe.PaymentIntent, "retrieve", retrieve)
+        refs = [f"pi_{n}" for n in range(20)]
+        started = time.perf_counter()
+        results = StatusFetcher(StripeAdapter("sk_test"), concurrency=20).fetch_sync(refs)
+        # 20 blocking calls in a row would take 1s; in threads they overlap.
+        assert time.perf_counter() - started < 0.5
+        assert {r.status for r in results} == {GatewayStatus.CAPTURED}
+
+    def test_status_lookup_retries_transient_errors(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        stripe = pytest.importorskip("stripe")
+        calls: list[str] = []
+
+        def retrieve(ref: str) -> dict[str, str]:
+            calls.append(ref)
+            if len(calls) == 1:
+                raise _ConnectionError("reset")
+            return {"id": ref, "status": "requires_capture"}
+
+        monkeypatch.setattr(stripe.PaymentIntent, "retrieve", retrieve)
+        adapter = StripeAdapter("sk_test", base_delay=0.001, max_delay=0.01)
+        (result,) = StatusFetcher(adapter).fetch_sync(["pi_1"])
+        assert result.status == GatewayStatus.AUTHORIZED
+        assert calls == ["pi_1", "pi_1"]
+
+
 class TestGatewayResult:
     def test_success_result(self) -> None:
         r = GatewayResult(success=True, gateway_ref="pi_123", status=GatewayStatus.AUTHORIZED)
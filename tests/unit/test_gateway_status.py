@@ -0,0 +1,85 @@
+"""Unit tests for the concurrent gateway status fetcher."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from src.application.gateway_status import RateLimiter, StatusFetcher
+from src.application.ports.payment_gateway import GatewayResult, GatewayStatus
+from src.infrastructure.gateway.fake import FakeGatewayAdapter
+
+
+class _Gateway:
+    def __init__(self, failures: dict[str, list[GatewayResult | Exception]] | None = None) -> None:
+        self.failures = failures or {}
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_status(self, gateway_ref: str) -> GatewayResult:
+        self.calls.append(gateway_ref)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            pending = self.failures.get(gateway_ref)
+            if pending:
+                outcome = pending.pop(0)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            return GatewayResult(
+                success=True, gateway_ref=gateway_ref, status=GatewayStatus.CAPTURED
+            )
+        finally:
+            self.in_flight -= 1
+
+
+def _failed(ref: str, retryable: bool) -> GatewayResult:
+    return GatewayResult(
+        success=False,
+        gateway_ref=ref,
+        status=GatewayStatus.FAILED,
+        error_code="rate_limit" if retryable else "invalid_request",
+        is_retryable=retryable,
+    )
+
+
+def test_fetch_keeps_input_order_and_caps_concurrency() -> None:
+    gateway = _Gateway()
+    refs = [f"g{n}" for n in range(20)]
+    results = StatusFetcher(gateway, concurrency=4).fetch_sync(refs)
+    assert [r.gateway_ref for r in results] == refs
+    assert gateway.max_in_flight == 4
+
+
+def test_failures_are_returned_without_retrying() -> None:
+    # Retries belong to the gateway adapter; the fetcher must not stack its own on top.
+    gateway = _Gateway({"a": [_failed("a", True)], "b": [ConnectionError("reset")]})
+    fetcher = StatusFetcher(gateway)
+    (a,) = fetcher.fetch_sync(["a"])
+    assert not a.success and a.is_retryable and gateway.calls == ["a"]
+    with pytest.raises(ConnectionError):
+        fetcher.fetch_sync(["b"])
+    assert gateway.calls == ["a", "b"]
+
+
+def test_rate_limiter_spaces_requests_after_the_burst() -> None:
+    limiter = RateLimiter(rate_per_second=100, burst=2)
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.01, abs=0.005)
+    assert limiter.reserve() == pytest.approx(0.02, abs=0.005)
+    assert RateLimiter(0).reserve() == 0.0
+
+
+def test_fan_out_against_a_slow_fake_gateway() -> None:
+    gateway = FakeGatewayAdapter(latency=0.05)
+    refs = [f"missing_{n}" for n in range(40)]
+    started = time.perf_counter()
+    results = StatusFetcher(gateway, concurrency=20).fetch_sync(refs)
+    # 40 calls of 50ms one by one would take 2s; two waves of 20 take ~0.1s.
+    assert time.perf_counter() - started < 1.0
+    assert {r.status for r in results} == {GatewayStatus.NOT_FOUND}
@@ -34,13 +34,22 @@ def test_decode_and_build_principal() -> None:
         gateway_max_retries=3,
         gateway_retry_base_delay=1.0,
         gateway_retry_max_delay=30.0,
+        gateway_status_concurrency=16,
+        gateway_rate_limit_per_second=25.0,
+        gateway_refund_concurrency=8,
         saas_integration_enabled=False,
         saas_exchange="saas.x",
         saas_queue="payments.saas.events",
         saas_routing_keys=["tenant.created", "tenant.updated", "tenant.deleted"],
         webhook_delivery_enabled=False,
         reconciliation_interval_minutes=60,
+        reconciliation_max_concurrency=4,
+        reconciliation_full_sweep_days=7,
         report_refresh_interval_minutes=15,
+        ledger_partition_months_ahead=3,
+        report_cache_ttl_seconds=300,
+        account_cache_ttl_seconds=60,
+        account_cache_max_tenants=10000,
     )
 
     import jwt
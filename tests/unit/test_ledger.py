@@ -0,0 +1,193 @@
+"""Unit tests for ledger listing."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.application.ledger import (
+    JournalEntryInput,
+    JournalLineInput,
+    get_ledger_balances,
+    list_ledger_entries,
+    post_journal_entries,
+    validate_journal_entries,
+)
+
+
+def _result(rows: list[SimpleNamespace]) -> MagicMock:
+    r = MagicMock()
+    r.all.return_value = rows
+    return r
+
+
+def test_list_ledger_entries_groups_lines_by_entry() -> None:
+    e1, e2 = uuid.uuid4(), uuid.uuid4()
+    pi = uuid.uuid4()
+    posted = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    entries = [
+        SimpleNamespace(id=e1, payment_intent_id=pi, posted_at=posted, description=None),
+        SimpleNamespace(id=e2, payment_intent_id=None, posted_at=posted, description="fx"),
+    ]
+    lines = [
+        SimpleNamespace(
+            entry_id=e2, side="DEBIT", account="CASH", amount=Decimal("5.00"), currency="BRL"
+        ),
+        SimpleNamespace(
+            entry_id=e1, side="DEBIT", account="CASH", amount=Decimal("10.00"), currency="BRL"
+        ),
+        SimpleNamespace(
+            entry_id=e1, side="CREDIT", account="REVENUE", amount=Decimal("10.00"), currency="BRL"
+        ),
+    ]
+    session = MagicMock()
+    session.execute.side_effect = [_result(entries), _result(lines)]
+
+    out = list_ledger_entries(session, "t1", None, None)
+
+    assert [dto.id for dto in out] == [str(e1), str(e2)]
+    assert [(line.side, line.amount) for line in out[0].lines] == [
+        ("DEBIT", "10.00"),
+        ("CREDIT", "10.00"),
+    ]
+    assert len(out[1].lines) == 1
+    assert out[1].payment_intent_id is None
+    assert session.execute.call_count == 2
+
+
+def test_list_ledger_entries_empty_skips_lines_query() -> None:
+    session = MagicMock()
+    session.execute.return_value = _result([])
+
+    assert list_ledger_entries(session, "t1", None, None) == []
+    assert session.execute.call_count == 1
+
+
+def test_get_ledger_balances_reads_only_ledger_lines() -> None:
+    session = MagicMock()
+    session.execute.return_value = _result([])
+
+    get_ledger_balances(session, "t1", datetime(2026, 1, 1, tzinfo=timezone.utc), None)
+
+    sql = str(session.execute.call_args.args[0])
+    assert "ledger_entries" not in sql
+    assert "ledger_lines.posted_at >=" in sql
+
+
+def _entry(*lines: tuple[str, str, str, str]) -> JournalEntryInput:
+    return JournalEntryInput(
+        lines=[
+            JournalLineInput(side=side, account=acc, amount=Decimal(amount), currency=cur)
+            for side, acc, amount, cur in lines
+        ]
+    )
+
+
+class TestValidateJournalEntries:
+    def test_balanced_multi_line_entry_passes(self) -> None:
+        entry = _entry(
+            ("DEBIT", "CASH", "100.00", "BRL"),
+            ("CREDIT", "REVENUE", "90.00", "BRL"),
+            ("CREDIT", "TAX_PAYABLE", "10.00", "BRL"),
+        )
+        assert validate_journal_entries([entry]) == []
+
+    def test_balance_is_checked_per_currency(self) -> None:
+        entry = _entry(
+            ("DEBIT", "CASH", "10.00", "BRL"),
+            ("CREDIT", "REVENUE", "10.00", "USD"),
+        )
+        errors = validate_journal_entries([entry])
+        assert "entry 0: debits != credits for BRL" in errors
+        assert "entry 0: debits != credits for USD" in errors
+
+    def test_rejects_bad_lines(self) -> None:
+        ok = _entry(("DEBIT", "CASH", "1.00", "BRL"), ("CREDIT", "REVENUE", "1.00", "BRL"))
+        bad = _entry(("DEBIT", "CASH", "1.001", "BRL"), ("SIDEWAYS", "REVENUE", "1.00", "BRL"))
+        errors = validate_journal_entries([ok, bad, _entry(("DEBIT", "CASH", "1.00", "BRL"))])
+        assert any(e.startswith("entry 1: amount") for e in errors)
+        assert "entry 1: invalid side SIDEWAYS" in errors
+        assert "entry 2: at least two lines are required" in errors
+        assert not any(e.startswith("entry 0") for e in errors)
+
+
+class TestPostJournalEntries:
+    def _session(self) -> MagicMock:
+        session = MagicMock()
+        session.begin.return_value.__enter__ = MagicMock(return_value=session)
+        session.begin.return_value.__exit__ = MagicMock(return_value=None)
+        return session
+
+    def test_unbalanced_batch_raises_422_without_writing(self) -> None:
+        session = self._session()
+        entry = _entry(("DEBIT", "CASH", "10.00", "BRL"), ("CREDIT", "REVENUE", "9.00", "BRL"))
+        with pytest.raises(Exception) as exc_info:
+            post_journal_entries(session, "t1", [entry])
+        assert exc_info.value.status_code == 422
+        session.begin.assert_not_called()
+
+    def test_inserts_entries_and_lines_in_two_statements(self) -> None:
+        session = self._session()
+        entries = [
+            _entry(("DEBIT", "CASH", "10.00", "BRL"), ("CREDIT", "REVENUE", "10.00", "BRL"))
+            for _ in range(3)
+        ]
+        head = SimpleNamespace(tenant_id="t1", last_seq=41, last_hash="a" * 64, updated_at=None)
+        with (
+            patch("src.application.ledger.first_open_month", return_value=None),
+            patch("src.application.ledger.lock_chain_head", return_value=head),
+        ):
+            out = post_journal_entries(session, "t1", entries)
+        assert out.entries_posted == 3
+        assert out.lines_posted == 6
+        inserts = session.execute.call_args_list
+        assert len(inserts) == 2
+        assert len(inserts[0].args[1]) == 3
+        assert len(inserts[1].args[1]) == 6
+
+    def test_entries_are_chained_in_request_order(self) -> None:
+        session = self._session()
+        entries = [
+            _entry(("DEBIT", "CASH", "10.00", "BRL"), ("CREDIT", "REVENUE", "10.00", "BRL"))
+            for _ in range(3)
+        ]
+        head = SimpleNamespace(tenant_id="t1", last_seq=41, last_hash="a" * 64, updated_at=None)
+        with (
+            patch("src.application.ledger.first_open_month", return_value=None),
+            patch("src.application.ledger.lock_chain_head", return_value=head),
+        ):
+            post_journal_entries(session, "t1", entries)
+        rows = session.execute.call_args_list[0].args[1]
+        assert [r["chain_seq"] for r in rows] == [42, 43, 44]
+        assert rows[0]["prev_hash"] == "a" * 64
+        assert rows[1]["prev_hash"] == rows[0]["entry_hash"]
+        assert (head.last_seq, head.last_hash) == (44, rows[2]["entry_hash"])
+
+    def test_archived_months_and_foreign_intents_raise_422(self) -> None:
+        session = self._session()
+        own, foreign = uuid.uuid4(), uuid.uuid4()
+        session.execute.return_value.scalars.return_value = [own]
+        entries = [
+            _entry(("DEBIT", "CASH", "10.00", "BRL"), ("CREDIT", "REVENUE", "10.00", "BRL"))
+            for _ in range(3)
+        ]
+        entries[0].posted_at = datetime(2025, 12, 31, tzinfo=timezone.utc)
+        entries[1].payment_intent_id = own
+        entries[2].payment_intent_id = foreign
+        with (
+            patch("src.application.ledger.first_open_month", return_value=date(2026, 1, 1)),
+            patch("src.application.ledger.lock_chain_head") as lock,
+            pytest.raises(Exception) as exc_info,
+        ):
+            post_journal_entries(session, "t1", entries)
+        assert exc_info.value.status_code == 422
+        detail = exc_info.value.detail["detail"]
+        assert "entry 0: month 2025-12 is archived" in detail
+        assert f"entry 2: payment intent {foreign} not found" in detail
+        assert "entry 1" not in detail
+        lock.assert_not_called()
@@ -0,0 +1,161 @@
+"""Unit tests for the vectorized ledger analytics."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.application.ledger_analytics import (
+    LedgerFrame,
+    account_balances,
+    currency_mix,
+    from_minor,
+    group_sum,
+    load_snapshot,
+    refund_ratio_by_period,
+    revenue_by_customer_prefix,
+    revenue_by_period,
+    running_balance,
+    time_bucket,
+)
+from src.application.ledger_export import (
+    ENTRY_COLUMNS,
+    LINE_COLUMNS,
+    _MonthWriters,
+    group_by_month,
+)
+
+
+def _us(*args: int) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1_000_000)
+
+
+def _frame() -> LedgerFrame:
+    # (posted_at, side, amount, account, currency, customer_ref)
+    rows = [
+        (_us(2026, 1, 5), 1, 1000, "CASH", "BRL", "acme-1"),
+        (_us(2026, 1, 5), -1, 1000, "REVENUE", "BRL", "acme-1"),
+        (_us(2026, 1, 20), 1, 500, "CASH", "USD", "beta-9"),
+        (_us(2026, 1, 20), -1, 500, "REVENUE", "USD", "beta-9"),
+        (_us(2026, 2, 2), 1, 250, "REFUND_EXPENSE", "BRL", "acme-1"),
+        (_us(2026, 2, 2), -1, 250, "CASH", "BRL", "acme-1"),
+        (_us(2026, 2, 3), 1, 3000, "CASH", "BRL", "acme-2"),
+        (_us(2026, 2, 3), -1, 3000, "REVENUE", "BRL", "acme-2"),
+    ]
+    accounts = ("CASH", "REVENUE", "REFUND_EXPENSE")
+    currencies = ("BRL", "USD")
+    customers = ("acme-1", "beta-9", "acme-2")
+    return LedgerFrame(
+        posted_at=np.array([r[0] for r in rows], dtype=np.int64),
+        chain_seq=np.repeat(np.arange(1, 5, dtype=np.int64), 2),
+        sign=np.array([r[1] for r in rows], dtype=np.int8),
+        amount=np.array([r[2] for r in rows], dtype=np.int64),
+        account=np.array([accounts.index(r[3]) for r in rows], dtype=np.int32),
+        currency=np.array([currencies.index(r[4]) for r in rows], dtype=np.int32),
+        customer_ref=np.array([customers.index(r[5]) for r in rows], dtype=np.int32),
+        accounts=accounts,
+        currencies=currencies,
+        customer_refs=customers,
+    )
+
+
+def test_time_bucket_matches_postgres_date_trunc() -> None:
+    ts = np.array([_us(2026, 1, 1, 12), _us(2026, 1, 7, 23)], dtype=np.int64)  # Thu, Wed
+    weeks = time_bucket(ts, "week").astype("datetime64[D]").astype(str).tolist()
+    assert weeks == ["2025-12-29", "2026-01-05"]
+    months = time_bucket(ts, "month").astype("datetime64[D]").astype(str).tolist()
+    assert months == ["2026-01-01", "2026-01-01"]
+    with pytest.raises(ValueError):
+        time_bucket(ts, "year")
+
+
+def test_group_sum_combines_keys_exactly() -> None:
+    big = 2**60
+    (a, b), sums = group_sum(
+        [np.array([2, 1, 2, 1]), np.array([0, 0, 0, 1])], np.array([big, 1, 3, 4])
+    )
+    assert a.tolist() == [1, 1, 2] and b.tolist() == [0, 1, 0]
+    assert sums.tolist() == [1, 4, big + 3]
+
+
+def test_revenue_and_balances() -> None:
+    frame = _frame()
+    assert revenue_by_period(frame, "month") == [
+        {"period": datetime(2026, 1, 1, tzinfo=timezone.utc), "currency": "BRL", "total": 1000},
+        {"period": datetime(2026, 1, 1, tzinfo=timezone.utc), "currency": "USD", "total": 500},
+        {"period": datetime(2026, 2, 1, tzinfo=timezone.utc), "currency": "BRL", "total": 3000},
+    ]
+    cash_brl = next(
+        r for r in account_balances(frame) if (r["account"], r["currency"]) == ("CASH", "BRL")
+    )
+    assert cash_brl == {
+        "account": "CASH",
+        "currency": "BRL",
+        "debits": 4000,
+        "credits": 250,
+        "balance": -3750,
+    }
+    assert from_minor(cash_brl["balance"]) == Decimal("-37.50")
+
+
+def test_prefix_refund_ratio_mix_and_running_balance() -> None:
+    frame = _frame()
+    assert revenue_by_customer_prefix(frame, 4) == [
+        {"prefix": "acme", "currency": "BRL", "total": 4000},
+        {"prefix": "beta", "currency": "USD", "total": 500},
+    ]
+    feb = [r for r in refund_ratio_by_period(frame, "month") if r["period"].month == 2]
+    assert feb == [
+        {
+            "period": datetime(2026, 2, 1, tzinfo=timezone.utc),
+            "currency": "BRL",
+            "captured": 3000,
+            "refunded": 250,
+            "ratio": round(250 / 3000, 6),
+        }
+    ]
+    mix = {r["currency"]: r["line_share"] for r in currency_mix(frame)}
+    assert mix == {"BRL": round(2 / 3, 6), "USD": round(1 / 3, 6)}
+    assert [r["balance"] for r in running_balance(frame, "REVENUE", "BRL", "month")] == [
+        1000,
+        4000,
+    ]
+
+
+def test_load_snapshot_reads_an_export(tmp_path: Path) -> None:
+    pa = pytest.importorskip("pyarrow")
+
+    def ts(day: int) -> datetime:
+        return datetime(2026, 1, day, tzinfo=timezone.utc)
+
+    entries = [
+        ("e1", 1, ts(5), "pi1", "acme-1", None, "0" * 64, "a" * 64),
+        ("e2", 2, ts(6), None, None, "manual", "a" * 64, "b" * 64),
+    ]
+    lines = [
+        ("l1", "e1", 1, ts(5), "DEBIT", "CASH", Decimal("10.05"), "BRL"),
+        ("l2", "e1", 1, ts(5), "CREDIT", "REVENUE", Decimal("10.05"), "BRL"),
+        ("l3", "e2", 2, ts(6), "DEBIT", "CASH", Decimal("1.00"), "BRL"),
+        ("l4", "e2", 2, ts(6), "CREDIT", "REVENUE", Decimal("1.00"), "BRL"),
+    ]
+    root = tmp_path / "tenant_id=t1"
+    for table, rows, columns in (
+        ("ledger_entries", entries, ENTRY_COLUMNS),
+        ("ledger_lines", lines, LINE_COLUMNS),
+    ):
+        writers = _MonthWriters(pa, root, table, "parquet", 1, 2)
+        for month, cols in group_by_month(rows, columns).items():
+            writers.write(month, cols)
+        writers.close()
+
+    frame = load_snapshot(tmp_path, "t1")
+    assert frame.amount.tolist() == [1005, 1005, 100, 100]
+    assert frame.sign.tolist() == [1, -1, 1, -1]
+    assert revenue_by_customer_prefix(frame, 4) == [
+        {"prefix": "", "currency": "BRL", "total": 100},
+        {"prefix": "acme", "currency": "BRL", "total": 1005},
+    ]
@@ -0,0 +1,84 @@
+"""Unit tests for the ledger hash chain walk."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from src.application.ledger_chain import check_chain, next_link
+from src.domain.ledger_hash import GENESIS_HASH, compute_entry_hash
+
+POSTED = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+LINES = [("DEBIT", "CASH", Decimal("10.00"), "BRL"), ("CREDIT", "REVENUE", Decimal("10.00"), "BRL")]
+
+
+def _chain(n: int) -> list[SimpleNamespace]:
+    """Rows as the verifier query returns them: one per line, ordered by chain_seq."""
+    head = SimpleNamespace(tenant_id="t1", last_seq=0, last_hash=GENESIS_HASH, updated_at=None)
+    rows = []
+    for _ in range(n):
+        entry_id = uuid.uuid4()
+        link = next_link(head, entry_id, POSTED, None, None, LINES)
+        rows.extend(
+            SimpleNamespace(
+                chain_seq=link.chain_seq,
+                id=entry_id,
+                posted_at=POSTED,
+                payment_intent_id=None,
+                description=None,
+                prev_hash=link.prev_hash,
+                entry_hash=link.entry_hash,
+                side=side,
+                account=account,
+                amount=amount,
+                currency=currency,
+            )
+            for side, account, amount, currency in reversed(LINES)
+        )
+    return rows
+
+
+def test_hash_ignores_line_order_and_amount_scale() -> None:
+    entry_id = uuid.uuid4()
+    a = compute_entry_hash(GENESIS_HASH, "t1", 1, entry_id, POSTED, None, None, LINES)
+    b = compute_entry_hash(
+        GENESIS_HASH,
+        "t1",
+        1,
+        entry_id,
+        POSTED,
+        None,
+        None,
+        [("CREDIT", "REVENUE", Decimal("10"), "BRL"), ("DEBIT", "CASH", Decimal("10.0"), "BRL")],
+    )
+    assert a == b
+
+
+def test_intact_chain_verifies_to_the_last_entry() -> None:
+    rows = _chain(3)
+    out = check_chain("t1", 0, GENESIS_HASH, rows)
+    assert out.intact and out.entries == 3 and out.last_seq == 3
+    assert out.last_hash == rows[-1].entry_hash
+
+
+def test_resumes_from_checkpoint() -> None:
+    rows = _chain(3)
+    out = check_chain("t1", 1, rows[0].entry_hash, rows[2:])
+    assert out.intact and out.entries == 2 and out.last_seq == 3
+
+
+def test_detects_edited_line() -> None:
+    rows = _chain(3)
+    rows[2].amount = Decimal("10.01")
+    out = check_chain("t1", 0, GENESIS_HASH, rows)
+    assert not out.intact and out.broken_at_seq == 2 and out.last_seq == 1
+    assert out.reason == "entry content does not match its hash"
+
+
+def test_detects_deleted_entry() -> None:
+    rows = _chain(3)
+    out = check_chain("t1", 0, GENESIS_HASH, rows[:2] + rows[4:])
+    assert not out.intact and out.broken_at_seq == 3
+    assert out.reason == "expected seq 2, found 3"
@@ -0,0 +1,81 @@
+"""Unit tests for the columnar ledger export helpers."""
+
+from __future__ import annotations
+
+import sys
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.application.ledger_export import (
+    LINE_COLUMNS,
+    export_ledger,
+    group_by_month,
+    read_state,
+    write_state,
+)
+
+
+def test_group_by_month_pivots_rows_and_stringifies_ids() -> None:
+    line_id, entry_id = uuid.UUID(int=1), uuid.UUID(int=2)
+    rows = [
+        (
+            line_id,
+            entry_id,
+            1,
+            datetime(2026, 1, 31, 23, tzinfo=timezone.utc),
+            "DEBIT",
+            "CASH",
+            Decimal("1.00"),
+            "BRL",
+        ),
+        (
+            line_id,
+            entry_id,
+            2,
+            datetime(2026, 2, 1, tzinfo=timezone.utc),
+            "CREDIT",
+            "REVENUE",
+            Decimal("1.00"),
+            "BRL",
+        ),
+        (
+            line_id,
+            entry_id,
+            3,
+            datetime(2026, 2, 2, tzinfo=timezone.utc),
+            "CREDIT",
+            "REVENUE",
+            Decimal("2.00"),
+            "BRL",
+        ),
+    ]
+    months = group_by_month(rows, LINE_COLUMNS)
+    assert sorted(months) == ["2026-01", "2026-02"]
+    assert months["2026-02"]["chain_seq"] == [2, 3]
+    assert months["2026-01"]["entry_id"] == [str(entry_id)]
+    assert months["2026-01"]["amount"] == [Decimal("1.00")]
+
+
+def test_state_round_trip_defaults_to_start(tmp_path: Path) -> None:
+    assert read_state(tmp_path)["last_chain_seq"] == 0
+    write_state(tmp_path / "tenant_id=t1", {"last_chain_seq": 42, "from": None, "to": None})
+    assert read_state(tmp_path / "tenant_id=t1")["last_chain_seq"] == 42
+    assert not list((tmp_path / "tenant_id=t1").glob("*.tmp"))
+
+
+def test_export_rejects_unknown_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        export_ledger(MagicMock(), "t1", tmp_path, fmt="csv")
+
+
+def test_export_without_pyarrow_explains_the_extra(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(RuntimeError, match="pip install"):
+        export_ledger(MagicMock(), "t1", tmp_path)
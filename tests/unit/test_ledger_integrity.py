@@ -0,0 +1,104 @@
+"""Unit tests for the ledger integrity checker."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from src.application.ledger_integrity import (
+    MAX_REPORTED_VIOLATIONS,
+    _UnitResult,
+    check_entries,
+    check_rollups,
+    check_tenant_totals,
+    list_units,
+)
+
+
+def test_balanced_entries_have_no_violations() -> None:
+    e1, e2 = uuid.UUID(int=1), uuid.UUID(int=2)
+    rows = [
+        (e1, "DEBIT", Decimal("10.00"), "BRL"),
+        (e1, "CREDIT", Decimal("10.00"), "BRL"),
+        (e2, "DEBIT", Decimal("5.00"), "USD"),
+        (e2, "CREDIT", Decimal("2.00"), "USD"),
+        (e2, "CREDIT", Decimal("3.00"), "USD"),
+    ]
+    result = check_entries("t1", rows)
+    assert (result.entries, result.lines, result.violation_count) == (2, 5, 0)
+
+
+def test_reports_unbalanced_empty_and_invalid_entries() -> None:
+    e1, e2, e3 = uuid.UUID(int=1), uuid.UUID(int=2), uuid.UUID(int=3)
+    rows = [
+        (e1, "DEBIT", Decimal("10.00"), "BRL"),
+        (e1, "CREDIT", Decimal("9.99"), "BRL"),
+        (e2, None, None, None),
+        (e3, "DEBIT", Decimal("-1.00"), "BRL"),
+    ]
+    result = check_entries("t1", rows)
+    assert result.entries == 3
+    assert result.by_kind == {"UNBALANCED_ENTRY": 1, "EMPTY_ENTRY": 1, "INVALID_LINE": 1}
+    assert result.violations[0].entry_id == str(e1)
+    assert result.violations[0].detail == "BRL debits-credits=0.01"
+
+
+def test_merge_caps_reported_violations_but_keeps_counts() -> None:
+    rows = [(uuid.UUID(int=i), None, None, None) for i in range(MAX_REPORTED_VIOLATIONS)]
+    merged = _UnitResult()
+    merged.merge(check_entries("t1", rows))
+    merged.merge(check_entries("t2", rows[:10]))
+    assert merged.violation_count == MAX_REPORTED_VIOLATIONS + 10
+    assert merged.by_kind == {"EMPTY_ENTRY": MAX_REPORTED_VIOLATIONS + 10}
+    assert len(merged.violations) == MAX_REPORTED_VIOLATIONS
+
+
+def _at(year: int, month: int, day: int) -> datetime:
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def test_units_span_each_tenants_own_posting_months() -> None:
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [
+        ("t1", _at(2026, 1, 5), _at(2026, 3, 1)),
+        # Future-dated journal entries extend the tenant's range past the current month.
+        ("t2", _at(2026, 3, 9), _at(2031, 4, 1)),
+    ]
+    units = list_units(session, None)
+    assert [(t, m) for t, m in units if t == "t1"] == [
+        ("t1", date(2026, 1, 1)),
+        ("t1", date(2026, 2, 1)),
+        ("t1", date(2026, 3, 1)),
+    ]
+    t2 = [m for t, m in units if t == "t2"]
+    assert (t2[0], t2[-1], len(t2)) == (date(2026, 3, 1), date(2031, 4, 1), 62)
+
+    clipped = list_units(session, ["t1", "t2"], date(2026, 2, 1), date(2026, 3, 1))
+    assert clipped == [("t1", date(2026, 2, 1)), ("t1", date(2026, 3, 1)), ("t2", date(2026, 3, 1))]
+
+
+def test_rollup_and_tenant_total_mismatches_are_reported() -> None:
+    session = MagicMock()
+    session.execute.return_value.scalar.return_value = 12
+    session.execute.return_value.all.return_value = [
+        (date(2026, 2, 10), "REVENUE", "BRL", Decimal(0), Decimal("10"), Decimal(0), Decimal("7"))
+    ]
+    rollups = check_rollups(session, "t1", date(2026, 2, 1))
+    assert rollups.by_kind == {"ROLLUP_MISMATCH": 1}
+    assert rollups.violations[0].detail == (
+        "2026-02-10 REVENUE BRL rollup debits=0 credits=7, lines debits=0 credits=10"
+    )
+
+    session.execute.return_value.all.return_value = [("BRL", Decimal("40"), Decimal("37"))]
+    totals = check_tenant_totals(session, "t1")
+    assert totals.by_kind == {"TENANT_TOTAL_MISMATCH": 1}
+    assert totals.violations[0].detail == "BRL tenant total=37, rollups=40"
+
+
+def test_rollups_are_not_checked_before_they_are_built() -> None:
+    session = MagicMock()
+    session.execute.return_value.scalar.return_value = None
+    assert check_rollups(session, "t1", date(2026, 2, 1)).violation_count == 0
+    assert session.execute.call_count == 1
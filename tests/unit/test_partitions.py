@@ -0,0 +1,90 @@
+"""Unit tests for ledger month-partition helpers."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock
+
+from src.infrastructure.db.partitions import (
+    _parse_partition_name,
+    add_months,
+    create_default_partition_sql,
+    create_partition_sql,
+    ensure_partitions_for_months,
+    month_partition,
+    partitions_between,
+)
+
+
+def test_add_months_rolls_over_year() -> None:
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_month_partition_bounds_and_name() -> None:
+    p = month_partition("ledger_lines", datetime(2026, 12, 31, 23, 59, tzinfo=timezone.utc))
+    assert p.name == "ledger_lines_2026_12"
+    assert (p.start, p.end) == (date(2026, 12, 1), date(2027, 1, 1))
+    assert create_partition_sql(p) == (
+        "CREATE TABLE IF NOT EXISTS ledger_lines_2026_12 PARTITION OF ledger_lines "
+        "FOR VALUES FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')"
+    )
+
+
+def test_partitions_between_is_inclusive() -> None:
+    names = [
+        p.name for p in partitions_between("ledger_entries", date(2026, 2, 15), date(2026, 4, 2))
+    ]
+    assert names == ["ledger_entries_2026_02", "ledger_entries_2026_03", "ledger_entries_2026_04"]
+
+
+def test_parse_partition_name_ignores_foreign_tables() -> None:
+    assert _parse_partition_name("ledger_entries", "ledger_entries_2026_03") == month_partition(
+        "ledger_entries", date(2026, 3, 1)
+    )
+    assert _parse_partition_name("ledger_entries", "ledger_lines_2026_03") is None
+    assert _parse_partition_name("ledger_entries", "ledger_entries_legacy") is None
+
+
+def test_default_partition_sql_and_name_is_not_a_month() -> None:
+    assert create_default_partition_sql("ledger_lines") == (
+        "CREATE TABLE IF NOT EXISTS ledger_lines_default PARTITION OF ledger_lines DEFAULT"
+    )
+    assert _parse_partition_name("ledger_lines", "ledger_lines_default") is None
+
+
+def _session(attached: list[str], default_has_rows: bool) -> MagicMock:
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [(name,) for name in attached]
+    session.execute.return_value.scalar.return_value = default_has_rows
+    return session
+
+
+def _statements(session: MagicMock) -> list[str]:
+    return [str(c.args[0]) for c in session.execute.call_args_list]
+
+
+def test_month_with_rows_in_default_is_split_out_and_attached() -> None:
+    session = _session(["ledger_entries_default", "ledger_lines_default"], True)
+    created = ensure_partitions_for_months(session, {date(2026, 9, 1)})
+    assert created == ["ledger_entries_2026_09", "ledger_lines_2026_09"]
+    ddl = [s for s in _statements(session) if s.startswith(("CREATE", "ALTER", "WITH"))]
+    expected = [
+        "CREATE TABLE ledger_lines_2026_09 (LIKE ledger_lines",
+        "WITH moved AS (DELETE FROM ledger_lines_default",
+        "CREATE TABLE ledger_entries_2026_09 (LIKE ledger_entries",
+        "WITH moved AS (DELETE FROM ledger_entries_default",
+        "ALTER TABLE ledger_entries ATTACH PARTITION ledger_entries_2026_09",
+        "ALTER TABLE ledger_lines ATTACH PARTITION ledger_lines_2026_09",
+    ]
+    assert len(ddl) == len(expected)
+    assert all(stmt.startswith(prefix) for stmt, prefix in zip(ddl, expected))
+
+
+def test_missing_default_partitions_are_created() -> None:
+    session = _session(["ledger_entries_2026_09", "ledger_lines_2026_09"], False)
+    assert ensure_partitions_for_months(session, {date(2026, 9, 1)}) == []
+    assert _statements(session)[1:] == [
+        create_default_partition_sql("ledger_entries"),
+        create_default_partition_sql("ledger_lines"),
+    ]
@@ -6,13 +6,16 @@ from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import pytest
+from fastapi import HTTPException
 
 from src.application.payments import (
     PaymentIntentDTO,
     confirm_payment_intent,
     create_payment_intent,
 )
+from src.application.ports.payment_gateway import GatewayResult
 from src.infrastructure.db.models import PaymentIntent
+from src.infrastructure.gateway.fake import FakeGatewayAdapter
 
 
 def _mock_pi(
@@ -77,9 +80,113 @@ def test_confirm_payment_intent_updates_status(mock_session: MagicMock) -> None:
     mock_session.begin.return_value.__enter__ = MagicMock(return_value=mock_session)
     mock_session.begin.return_value.__exit__ = MagicMock(return_value=None)
 
+    gateway = FakeGatewayAdapter()
     with patch("src.application.payments.OutboxEvent"):
         dto = confirm_payment_intent(
-            mock_session, "tenant_demo", uuid.UUID(pi.id)
+            mock_session, "tenant_demo", uuid.UUID(pi.id), gateway
         )
     assert dto.status == "AUTHORIZED"
+    assert dto.gateway_ref is not None and dto.gateway_ref in gateway._store
 
+
+def test_confirm_payment_intent_records_a_gateway_decline(mock_session: MagicMock) -> None:
+    import uuid
+
+    pi = _mock_pi(status="CREATED")
+    mock_session.execute.return_value.scalar_one_or_none.return_value = pi
+
+    with patch("src.application.payments.OutboxEvent") as event:
+        dto = confirm_payment_intent(
+            mock_session, "tenant_demo", uuid.UUID(pi.id), FakeGatewayAdapter(fail_rate=1.0)
+        )
+    assert (dto.status, dto.gateway_ref) == ("FAILED", None)
+    assert event.call_args.kwargs["event_type"] == "payment.failed"
+
+
+def test_confirm_payment_intent_leaves_intent_created_when_gateway_is_down(
+    mock_session: MagicMock,
+) -> None:
+    import uuid
+
+    class _Down:
+        async def authorize(self, *args: object) -> GatewayResult:
+            raise ConnectionError("reset")
+
+    pi = _mock_pi(status="CREATED")
+    mock_session.execute.return_value.scalar_one_or_none.return_value = pi
+
+    with pytest.raises(HTTPException) as exc:
+        confirm_payment_intent(mock_session, "tenant_demo", uuid.UUID(pi.id), _Down())
+    assert exc.value.status_code == 502
+    assert pi.status == "CREATED"
+
+
+
+def test_create_batch_inserts_once_and_replays_duplicate_keys(mock_session: MagicMock) -> None:
+    from src.application.payments import PaymentIntentItemInput, create_payment_intents_batch
+
+    earlier = PaymentIntentDTO(
+        id="x",
+        amount="1.00",
+        currency="BRL",
+        status="CREATED",
+        customer_ref="c",
+        created_at="2026-01-01T00:00:00",
+        updated_at="2026-01-01T00:00:00",
+    )
+
+    def item(key: str, amount: str = "10.00", currency: str = "BRL") -> PaymentIntentItemInput:
+        return PaymentIntentItemInput(
+            idempotency_key=key, amount=Decimal(amount), currency=currency, customer_ref="c"
+        )
+
+    out = create_payment_intents_batch(
+        mock_session,
+        "tenant_demo",
+        [item("a"), item("b"), item("a"), item("old"), item("bad", currency="XXX")],
+        replayed={"old": earlier},
+    )
+
+    assert [i.status for i in out.items] == [201, 201, 200, 200, 400]
+    assert out.items[2].payment_intent == out.items[0].payment_intent
+    assert out.items[3].payment_intent == earlier
+    assert (out.created, out.replayed, out.rejected) == (2, 2, 1)
+    intents, events = (c.args[1] for c in mock_session.execute.call_args_list)
+    assert len(intents) == len(events) == 2
+    assert [e["aggregate_id"] for e in events] == [str(r["id"]) for r in intents]
+
+
+def test_create_batch_returns_amounts_as_stored(mock_session: MagicMock) -> None:
+    from src.application.payments import PaymentIntentItemInput, create_payment_intents_batch
+
+    out = create_payment_intents_batch(
+        mock_session,
+        "tenant_demo",
+        [
+            PaymentIntentItemInput(
+                idempotency_key="a", amount=Decimal("10.5"), currency="BRL", customer_ref="c"
+            )
+        ],
+        replayed={},
+    )
+
+    assert out.items[0].payment_intent.amount == "10.50"
+    intents, events = (c.args[1] for c in mock_session.execute.call_args_list)
+    assert intents[0]["amount"] == Decimal("10.50")
+    assert events[0]["payload"]["amount"] == "10.50"
+
+
+def test_idempotency_store_uses_one_round_trip_per_batch() -> None:
+    from src.infrastructure.redis.idempotency import IdempotencyStore
+
+    redis = MagicMock()
+    redis.mget.return_value = [b'{"id": "1"}', None]
+    store = IdempotencyStore(redis, ttl_seconds=60)
+
+    hits = store.get_many(["k1", "k2"])
+    store.set_many({"k2": {"id": "2"}, "k3": {"id": "3"}})
+
+    assert [(h.hit, h.value) for h in hits] == [(True, {"id": "1"}), (False, None)]
+    redis.mget.assert_called_once_with(["k1", "k2"])
+    pipe = redis.pipeline.return_value
+    assert pipe.setex.call_count == 2 and pipe.execute.call_count == 1
@@ -1,8 +1,29 @@
 from __future__ import annotations
 
+import json
 import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
-from src.application.reconciliation import DiscrepancyDTO
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy.dialects import postgresql
+
+from src.api.routers.reconciliation import list_ as list_route
+from src.application.reconciliation import (
+    DiscrepancyDTO,
+    compare_transactions,
+    discrepancy_row,
+    list_discrepancies,
+    read_settlement_file,
+    reconcile_stream,
+    reconcile_transactions,
+    upsert_discrepancies,
+)
+from src.infrastructure.db.models import ReconciliationDiscrepancy
 
 
 class TestDiscrepancyDTO:
@@ -39,3 +60,167 @@ class TestDiscrepancyDTO:
                 created_at="2026-02-23T10:00:00+00:00",
             )
             assert dto.discrepancy_type == dtype
+
+
+def _pi(ref: str, amount: str, status: str) -> SimpleNamespace:
+    return SimpleNamespace(id=uuid.uuid4(), gateway_ref=ref, amount=Decimal(amount), status=status)
+
+
+class TestCompareTransactions:
+    def test_hash_join_flags_each_kind_of_mismatch(self) -> None:
+        local = {
+            "g1": _pi("g1", "10.00", "SETTLED"),
+            "g2": _pi("g2", "20.00", "SETTLED"),
+            "g3": _pi("g3", "30.00", "SETTLED"),
+        }
+        rows = compare_transactions(
+            "t1",
+            [
+                {"gateway_ref": "g1", "amount": "10.00", "status": "succeeded"},
+                {"gateway_ref": "g2", "amount": "21.00", "status": "succeeded"},
+                {"gateway_ref": "g3", "amount": 30, "status": "canceled"},
+                {"gateway_ref": "g4", "amount": "5.00", "status": "succeeded"},
+            ],
+            local,
+        )
+        assert [(r["gateway_ref"], r["discrepancy_type"]) for r in rows] == [
+            ("g2", "AMOUNT_MISMATCH"),
+            ("g3", "STATUS_MISMATCH"),
+            ("g4", "MISSING_LOCAL"),
+        ]
+        assert rows[0]["payment_intent_id"] == local["g2"].id
+        assert rows[2]["actual_amount"] == Decimal("5.00")
+
+
+class TestReconcileTransactions:
+    def test_bulk_lookup_and_single_upsert(self) -> None:
+        session = MagicMock()
+        session.execute.return_value.all.return_value = [_pi("g1", "10.00", "SETTLED")]
+        session.execute.return_value.__iter__.return_value = iter(
+            [_pi("g1", "10.00", "SETTLED"), _pi("g9", "9.00", "SETTLED")]
+        )
+        transactions = [
+            {"gateway_ref": f"g{i}", "amount": "10.00", "status": "succeeded"} for i in range(1, 6)
+        ]
+
+        with patch(
+            "src.application.reconciliation.upsert_discrepancies",
+            side_effect=lambda _s, rows, returning: [ReconciliationDiscrepancy(**r) for r in rows],
+        ) as upsert:
+            result = reconcile_transactions(session, "t1", transactions)
+
+        # lookup, local scan for MISSING_REMOTE, one upsert: independent of the file size.
+        assert session.execute.call_count == 2
+        written = upsert.call_args.args[1]
+        assert sorted(r["gateway_ref"] for r in written) == ["g2", "g3", "g4", "g5", "g9"]
+        assert {d.discrepancy_type for d in result} == {"MISSING_LOCAL", "MISSING_REMOTE"}
+        session.add.assert_called_once()
+
+
+class TestUpsertDiscrepancies:
+    def test_folds_repeated_keys_and_bumps_on_conflict(self) -> None:
+        session = MagicMock()
+        rows = [
+            discrepancy_row("t1", "MISSING_LOCAL", gateway_ref="g1"),
+            discrepancy_row("t1", "MISSING_LOCAL", gateway_ref="g1"),
+            discrepancy_row("t1", "AMOUNT_MISMATCH", gateway_ref="g1"),
+        ]
+
+        upsert_discrepancies(session, rows)
+
+        stmt = session.execute.call_args.args[0]
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        assert "ON CONFLICT (tenant_id, gateway_ref, discrepancy_type) DO UPDATE" in sql
+        bump = "occurrences = (reconciliation_discrepancies.occurrences + excluded.occurrences)"
+        assert bump in sql
+        occurrences = [v for k, v in compiled.params.items() if k.startswith("occurrences")]
+        assert sorted(occurrences) == [1, 2]
+
+
+class TestListDiscrepancies:
+    def test_keyset_page_and_cursor(self) -> None:
+        created = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        discs = [
+            ReconciliationDiscrepancy(**discrepancy_row("t1", "MISSING_LOCAL", gateway_ref=f"g{n}"))
+            for n in range(3)
+        ]
+        for n, d in enumerate(discs):
+            d.created_at = created.replace(hour=3 - n)
+        session = MagicMock()
+        session.execute.return_value.scalars.return_value.all.return_value = discs
+
+        page = list_discrepancies(session, "t1", limit=2)
+
+        assert [i.gateway_ref for i in page.items] == ["g0", "g1"]
+        assert page.next_cursor is not None
+        list_discrepancies(session, "t1", limit=2, cursor=page.next_cursor)
+        sql = str(session.execute.call_args.args[0])
+        assert "reconciliation_discrepancies.id) < (:param_1, :param_2)" in sql
+        with pytest.raises(HTTPException):
+            list_discrepancies(session, "t1", cursor="garbage")
+
+    def test_route_returns_a_list_with_the_cursor_in_a_header(self) -> None:
+        discs = [
+            ReconciliationDiscrepancy(**discrepancy_row("t1", "MISSING_LOCAL", gateway_ref=f"g{n}"))
+            for n in range(3)
+        ]
+        for n, d in enumerate(discs):
+            d.created_at = datetime(2026, 5, 1, 3 - n, tzinfo=timezone.utc)
+        session = MagicMock()
+        session.execute.return_value.scalars.return_value.all.return_value = discs
+
+        response = Response()
+        items = list_route(response, None, 2, None, session, "t1")
+        assert [i.gateway_ref for i in items] == ["g0", "g1"]
+        assert response.headers["X-Next-Cursor"]
+
+        response = Response()
+        list_route(response, None, 3, None, session, "t1")
+        assert "X-Next-Cursor" not in response.headers
+
+
+class TestSettlementFile:
+    def test_reads_csv_and_ndjson_in_chunks(self, tmp_path: Path) -> None:
+        csv_file = tmp_path / "settlement.csv"
+        csv_file.write_text(
+            "gateway_ref,amount,currency,status\n"
+            "g1,10.00,BRL,succeeded\ng2,5.50,BRL,succeeded\ng3,1.00,BRL,canceled\n"
+        )
+        chunks = list(read_settlement_file(csv_file, chunk_size=2))
+        assert [[t["gateway_ref"] for t in c] for c in chunks] == [["g1", "g2"], ["g3"]]
+
+        ndjson = tmp_path / "settlement.ndjson"
+        ndjson.write_text(
+            json.dumps({"gateway_ref": "g1", "amount": 10, "status": "succeeded"}) + "\n\n"
+        )
+        assert list(read_settlement_file(ndjson)) == [
+            [{"gateway_ref": "g1", "amount": 10, "status": "succeeded"}]
+        ]
+
+    def test_rejects_unknown_format_and_incomplete_records(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            list(read_settlement_file(tmp_path / "settlement.xlsx"))
+        bad = tmp_path / "bad.csv"
+        bad.write_text("gateway_ref,amount,status\ng1,,succeeded\n")
+        with pytest.raises(ValueError, match="record 1 is missing amount"):
+            list(read_settlement_file(bad))
+
+
+class TestReconcileStream:
+    def test_chunks_are_staged_and_missing_remote_is_one_anti_join(self) -> None:
+        session = MagicMock()
+        session.execute.return_value.all.return_value = []
+        session.execute.return_value.rowcount = 2
+        chunks = [
+            [{"gateway_ref": "g1", "amount": "1.00", "status": "succeeded"}],
+            [{"gateway_ref": "g2", "amount": "2.00", "status": "succeeded"}],
+        ]
+
+        summary = reconcile_stream(session, "t1", iter(chunks))
+
+        assert summary.transactions == 2
+        assert summary.by_type == {"MISSING_LOCAL": 2, "MISSING_REMOTE": 2}
+        # temp table, 2 x (stage, lookup, insert), analyze, anti-join insert
+        assert session.execute.call_count == 9
+        assert "NOT (EXISTS" in str(session.execute.call_args_list[-1].args[0])
@@ -0,0 +1,204 @@
+"""Unit tests for scheduled reconciliation runs."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.application.ports.payment_gateway import (
+    GatewayResult,
+    GatewayStatus,
+    GatewayTransaction,
+    GatewayTransactionPage,
+)
+from src.application.reconciliation_runs import (
+    WATERMARK_OVERLAP,
+    GatewayStatusError,
+    _fix_window,
+    _to_dto,
+    compare_gateway_statuses,
+    compare_gateway_transactions,
+    run_reconciliation,
+)
+from src.infrastructure.db.models import ReconciliationRun
+
+
+def _pi(ref: str, status: str) -> SimpleNamespace:
+    return SimpleNamespace(id=uuid.uuid4(), gateway_ref=ref, amount=Decimal("10.00"), status=status)
+
+
+def _result(ref: str, status: GatewayStatus, success: bool = True) -> GatewayResult:
+    return GatewayResult(success=success, gateway_ref=ref, status=status)
+
+
+def test_compare_gateway_statuses() -> None:
+    intents = [
+        _pi("g1", "SETTLED"),
+        _pi("g2", "SETTLED"),
+        _pi("g3", "AUTHORIZED"),
+        _pi("g4", "CREATED"),
+    ]
+    rows = compare_gateway_statuses(
+        "t1",
+        intents,
+        [
+            _result("g1", GatewayStatus.CAPTURED),
+            _result("g2", GatewayStatus.REFUNDED),
+            _result("g3", GatewayStatus.NOT_FOUND, success=False),
+            _result("g4", GatewayStatus.AUTHORIZED),
+        ],
+    )
+    assert [(r["gateway_ref"], r["discrepancy_type"]) for r in rows] == [
+        ("g2", "STATUS_MISMATCH"),
+        ("g3", "MISSING_REMOTE"),
+    ]
+    assert rows[0]["actual_status"] == "REFUNDED"
+
+
+def test_gateway_errors_fail_the_batch() -> None:
+    with pytest.raises(GatewayStatusError):
+        compare_gateway_statuses(
+            "t1", [_pi("g1", "SETTLED")], [_result("g1", GatewayStatus.FAILED, success=False)]
+        )
+
+
+def _tx(ref: str, amount: str = "10.00") -> GatewayTransaction:
+    return GatewayTransaction(
+        gateway_ref=ref,
+        amount=Decimal(amount),
+        currency="BRL",
+        status=GatewayStatus.CAPTURED,
+        created_at=datetime(2026, 4, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_compare_gateway_transactions() -> None:
+    local = {"g1": _pi("g1", "SETTLED"), "g2": _pi("g2", "SETTLED")}
+    rows = compare_gateway_transactions("t1", [_tx("g1"), _tx("g2", "12.00"), _tx("g3")], local)
+    assert [(r["gateway_ref"], r["discrepancy_type"]) for r in rows] == [
+        ("g2", "AMOUNT_MISMATCH"),
+        ("g3", "MISSING_LOCAL"),
+    ]
+    assert (rows[1]["actual_amount"], rows[1]["actual_status"]) == (Decimal("10.00"), "CAPTURED")
+
+
+def test_run_pages_through_gateway_transactions_after_the_intents() -> None:
+    watermark = datetime(2026, 5, 1, tzinfo=timezone.utc)
+    run = ReconciliationRun(
+        id=uuid.uuid4(),
+        tenant_id="t1",
+        mode="full",
+        status="RUNNING",
+        phase="intents",
+        locked_by="w1",
+        checkpoint=None,
+        gateway_cursor=None,
+        watermark=watermark,
+        items_processed=0,
+        discrepancy_counts={},
+    )
+    session = MagicMock()
+    session.get.return_value = run
+    fetcher = MagicMock()
+    fetcher.list_transactions_sync.side_effect = [
+        GatewayTransactionPage([_tx("g1"), _tx("g2")], next_cursor="g2"),
+        GatewayTransactionPage([_tx("g3")]),
+    ]
+    local = {"g1": _pi("g1", "SETTLED"), "g3": _pi("g3", "SETTLED")}
+    with (
+        patch("src.application.reconciliation_runs._next_batch", return_value=[]),
+        patch("src.application.reconciliation_runs.load_local_intents", return_value=local),
+        patch("src.application.reconciliation_runs.upsert_discrepancies") as upsert,
+        patch("src.application.reconciliation_runs.record_findings"),
+    ):
+        assert run_reconciliation(session, run.id, "w1", fetcher) == "SUCCEEDED"
+
+    assert [c.args[1:] for c in fetcher.list_transactions_sync.call_args_list] == [
+        (None, watermark, None),
+        (None, watermark, "g2"),
+    ]
+    missing = [r for c in upsert.call_args_list for r in c.args[1]]
+    assert [(r["gateway_ref"], r["discrepancy_type"]) for r in missing] == [("g2", "MISSING_LOCAL")]
+    assert (run.phase, run.gateway_cursor, run.items_processed) == ("done", None, 3)
+    assert run.discrepancy_counts == {"MISSING_LOCAL": 1}
+
+
+def test_run_dto_reports_duration_and_throughput() -> None:
+    started = datetime(2026, 4, 1, tzinfo=timezone.utc)
+    run = ReconciliationRun(
+        id=uuid.uuid4(),
+        tenant_id="t1",
+        trigger="scheduled",
+        mode="full",
+        status="SUCCEEDED",
+        phase="done",
+        checkpoint="g9",
+        items_processed=1000,
+        discrepancy_counts={"MISSING_REMOTE": 2, "STATUS_MISMATCH": 1},
+        created_at=started,
+        started_at=started,
+        finished_at=started + timedelta(seconds=4),
+    )
+    dto = _to_dto(run)
+    assert dto.duration_seconds == 4.0
+    assert dto.throughput_per_second == 250.0
+    assert dto.discrepancies_found == 3
+
+
+def test_incremental_window_trails_previous_watermark() -> None:
+    now = datetime(2026, 5, 1, 12, tzinfo=timezone.utc)
+    previous = now - timedelta(hours=1)
+    session = MagicMock()
+    session.execute.return_value.scalar.return_value = previous
+    run = ReconciliationRun(tenant_id="t1", mode="incremental")
+    _fix_window(session, run, now)
+    assert run.mode == "incremental"
+    assert (run.since, run.watermark) == (previous - WATERMARK_OVERLAP, now)
+
+    session.execute.return_value.scalar.return_value = None
+    first = ReconciliationRun(tenant_id="t1", mode="incremental")
+    _fix_window(session, first, now)
+    assert (first.mode, first.since, first.watermark) == ("full", None, now)
+
+
+def test_worker_stops_once_its_run_is_reclaimed() -> None:
+    run = ReconciliationRun(
+        id=uuid.uuid4(),
+        tenant_id="t1",
+        mode="full",
+        status="RUNNING",
+        phase="intents",
+        locked_by="w1",
+        checkpoint=None,
+        items_processed=0,
+        discrepancy_counts={},
+    )
+    session = MagicMock()
+    session.get.return_value = run
+    fetcher = MagicMock()
+
+    def fetch_sync(refs: list[str]) -> list[GatewayResult]:
+        # The batch outlived the stale timeout and another worker took the run over.
+        run.locked_by = "w2"
+        return [_result(ref, GatewayStatus.NOT_FOUND, success=False) for ref in refs]
+
+    fetcher.fetch_sync.side_effect = fetch_sync
+    with (
+        patch(
+            "src.application.reconciliation_runs._next_batch", return_value=[_pi("g1", "SETTLED")]
+        ),
+        patch("src.application.reconciliation_runs.upsert_discrepancies") as upsert,
+    ):
+        assert run_reconciliation(session, run.id, "w1", fetcher) == "STOPPED"
+    upsert.assert_not_called()
+    assert (run.status, run.locked_by, run.checkpoint, run.items_processed) == (
+        "RUNNING",
+        "w2",
+        None,
+        0,
+    )
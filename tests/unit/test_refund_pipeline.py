@@ -0,0 +1,176 @@
+"""Unit tests for the refund worker pipeline's gateway fan-out."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.application.ports.payment_gateway import GatewayResult, GatewayStatus
+from src.application.refund_pipeline import (
+    ClaimedRefund,
+    _refund_status,
+    call_gateway,
+    finalize_refunds,
+)
+from src.infrastructure.gateway.fake import FakeGatewayAdapter
+from src.infrastructure.gateway.stripe_adapter import StripeAdapter
+
+
+def _claimed(gateway_ref: str | None, refund_ref: str | None = None) -> ClaimedRefund:
+    return ClaimedRefund(
+        id=uuid.uuid4(),
+        tenant_id="t1",
+        payment_intent_id=uuid.uuid4(),
+        amount=Decimal("5.00"),
+        currency="BRL",
+        intent_gateway_ref=gateway_ref,
+        attempts=1,
+        gateway_ref=refund_ref,
+    )
+
+
+class _Gateway:
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+        self.lookups: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def refund(
+        self, gateway_ref: str, amount: Decimal, idempotency_key: str
+    ) -> GatewayResult:
+        self.keys.append(idempotency_key)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if gateway_ref == "boom":
+                raise ConnectionError("reset")
+            return GatewayResult(
+                success=True, gateway_ref=f"re_{gateway_ref}", status=GatewayStatus.REFUNDED
+            )
+        finally:
+            self.in_flight -= 1
+
+    async def get_status(self, gateway_ref: str) -> GatewayResult:
+        self.lookups.append(gateway_ref)
+        return GatewayResult(success=True, gateway_ref=gateway_ref, status=GatewayStatus.REFUNDED)
+
+
+def test_call_gateway_bounds_concurrency_and_keys_by_refund() -> None:
+    gateway = _Gateway()
+    refunds = [_claimed(f"pi_{n}") for n in range(10)] + [_claimed(None), _claimed("boom")]
+    results = asyncio.run(call_gateway(gateway, refunds, concurrency=3))
+
+    assert gateway.max_in_flight == 3
+    assert sorted(gateway.keys) == sorted(f"refund:{r.id}" for r in refunds if r.intent_gateway_ref)
+    assert [r.gateway_ref for r in results[:2]] == ["re_pi_0", "re_pi_1"]
+    assert results[10].error_code == "missing_gateway_ref" and not results[10].is_retryable
+    assert not results[11].success and results[11].is_retryable
+
+
+def test_refund_status_follows_the_accepted_amount() -> None:
+    def pi(refunded: str) -> SimpleNamespace:
+        return SimpleNamespace(amount=Decimal("10.00"), refunded_amount=Decimal(refunded))
+
+    assert [_refund_status(pi(v)) for v in ("10.00", "4.00", "0.00")] == [
+        "REFUNDED",
+        "PARTIALLY_REFUNDED",
+        "SETTLED",
+    ]
+
+
+def test_refunds_accepted_by_the_gateway_are_looked_up_not_resubmitted() -> None:
+    gateway = _Gateway()
+    (result,) = asyncio.run(call_gateway(gateway, [_claimed("pi_1", "re_1")], concurrency=1))
+    assert gateway.keys == [] and gateway.lookups == ["re_1"]
+    assert result.success and result.status == GatewayStatus.REFUNDED
+
+
+def test_refunds_go_through_the_fake_gateway_once() -> None:
+    gateway = FakeGatewayAdapter()
+
+    async def _settle() -> str:
+        auth = await gateway.authorize("t1", Decimal("5.00"), "BRL", "c", "authorize:1")
+        await gateway.capture(auth.gateway_ref, Decimal("5.00"), "capture:1")
+        return auth.gateway_ref
+
+    ref = asyncio.run(_settle())
+    claimed = _claimed(ref)
+    (first,) = asyncio.run(call_gateway(gateway, [claimed], concurrency=1))
+    # Claimed again after a worker died mid-call: the idempotency key replays the refund.
+    (again,) = asyncio.run(call_gateway(gateway, [claimed], concurrency=1))
+
+    assert first.success and first.status == GatewayStatus.REFUNDED
+    assert again == first
+    assert gateway._store[ref]["refunded_amount"] == Decimal("5.00")
+
+
+def test_pending_gateway_refund_keeps_its_reservation() -> None:
+    claimed = _claimed("pi_1")
+    pi = SimpleNamespace(
+        id=claimed.payment_intent_id,
+        amount=Decimal("10.00"),
+        refunded_amount=Decimal("5.00"),
+        currency="BRL",
+        status="PARTIALLY_REFUNDED",
+    )
+    refund = SimpleNamespace(
+        id=claimed.id,
+        tenant_id="t1",
+        amount=Decimal("5.00"),
+        reason=None,
+        status="PROCESSING",
+        gateway_ref=None,
+        attempts=1,
+        error=None,
+        locked_by="w1",
+        locked_at=None,
+        available_at=None,
+    )
+    session = MagicMock()
+    session.execute.side_effect = [
+        MagicMock(scalars=MagicMock(return_value=[pi])),
+        MagicMock(scalars=MagicMock(return_value=[refund])),
+    ]
+    pending = GatewayResult(success=False, gateway_ref="re_1", status=GatewayStatus.PENDING)
+
+    counts = finalize_refunds(session, "w1", [(claimed, pending)], max_attempts=1)
+
+    assert counts == {"IN_FLIGHT": 1}
+    assert (refund.status, refund.gateway_ref) == ("PENDING", "re_1")
+    assert refund.available_at is not None
+    assert (pi.refunded_amount, pi.status) == (Decimal("5.00"), "PARTIALLY_REFUNDED")
+    assert session.execute.call_count == 2  # no ledger entry and no outbox event
+
+
+def test_stripe_refunds_run_off_the_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    stripe = pytest.importorskip("stripe")
+
+    def create(**kwargs: object) -> dict[str, str]:
+        time.sleep(0.05)  # the SDK blocks on the HTTP round trip
+        return {"id": f"re_{kwargs['idempotency_key']}", "status": "succeeded"}
+
+    monkeypatch.setattr(stripe.Refund, "create", create)
+    refunds = [_claimed(f"pi_{n}") for n in range(20)]
+    started = time.perf_counter()
+    results = asyncio.run(call_gateway(StripeAdapter("sk_test"), refunds, concurrency=20))
+    # 20 blocking calls in a row would take 1s; in threads they overlap.
+    assert time.perf_counter() - started < 0.5
+    assert all(r is not None and r.status == GatewayStatus.REFUNDED for r in results)
+
+
+def test_pending_stripe_refund_is_not_reported_as_failed(monkeypatch: pytest.MonkeyPatch) -> None:
+    stripe = pytest.importorskip("stripe")
+    monkeypatch.setattr(
+        stripe.Refund, "create", lambda **kwargs: {"id": "re_1", "status": "pending"}
+    )
+    result = asyncio.run(StripeAdapter("sk_test").refund("pi_1", Decimal("5.00"), "refund:1"))
+    assert not result.success and not result.is_retryable
+    assert (result.status, result.gateway_ref) == (GatewayStatus.PENDING, "re_1")
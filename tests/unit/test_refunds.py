@@ -22,6 +22,7 @@ def _make_pi(
     pi.status = status
     pi.customer_ref = "test"
     pi.gateway_ref = None
+    pi.refunded_amount = Decimal("0.00")
     pi.created_at = datetime.now(timezone.utc)
     pi.updated_at = datetime.now(timezone.utc)
     return pi
@@ -63,6 +64,35 @@ class TestCreateRefund:
             create_refund(session, "t1", pi.id, Decimal("-10.00"))
         assert exc_info.value.status_code == 400
 
+    def test_refund_over_cached_total_raises_422_without_summing(self) -> None:
+        pi = _make_pi(status="PARTIALLY_REFUNDED")
+        pi.refunded_amount = Decimal("95.00")
+        session = MagicMock()
+        session.execute.return_value.scalar_one_or_none.return_value = pi
+        session.begin.return_value.__enter__ = MagicMock(return_value=None)
+        session.begin.return_value.__exit__ = MagicMock(return_value=False)
+
+        from src.application.refunds import create_refund
+        with pytest.raises(Exception) as exc_info:
+            create_refund(session, "t1", pi.id, Decimal("10.00"))
+        assert exc_info.value.status_code == 422
+        assert session.execute.call_count == 1  # only the locked intent read
+
+    def test_refund_is_queued_and_reserves_its_amount(self) -> None:
+        pi = _make_pi(status="PARTIALLY_REFUNDED")
+        pi.refunded_amount = Decimal("40.00")
+        session = MagicMock()
+        session.execute.return_value.scalar_one_or_none.return_value = pi
+        session.begin.return_value.__enter__ = MagicMock(return_value=None)
+        session.begin.return_value.__exit__ = MagicMock(return_value=False)
+
+        from src.application.refunds import create_refund
+        dto = create_refund(session, "t1", pi.id, Decimal("60.00"))
+        assert dto.status == "PENDING"
+        assert pi.refunded_amount == Decimal("100.00")
+        assert pi.status == "PARTIALLY_REFUNDED"  # changes once the gateway confirms
+        assert session.execute.call_count == 1
+
 
 class TestRefundDTO:
     def test_refund_dto_fields(self) -> None:
@@ -79,3 +109,38 @@ class TestRefundDTO:
         assert dto.amount == "50.00"
         assert dto.status == "COMPLETED"
         assert dto.reason == "test"
+
+
+class TestCreateRefundsBatch:
+    def test_items_are_checked_in_order_against_locked_intents(self) -> None:
+        from sqlalchemy.dialects import postgresql
+
+        from src.application.refunds import RefundItemInput, create_refunds_batch
+
+        pi1, pi2 = _make_pi(), _make_pi(amount=Decimal("20.00"))
+        locked = MagicMock()
+        locked.scalars.return_value = [pi1, pi2]
+        session = MagicMock()
+        session.execute.side_effect = [locked, MagicMock()]
+        session.begin.return_value.__enter__ = MagicMock(return_value=None)
+        session.begin.return_value.__exit__ = MagicMock(return_value=False)
+
+        items = [
+            RefundItemInput(payment_intent_id=pi1.id, amount=Decimal("60.00")),
+            RefundItemInput(payment_intent_id=pi1.id, amount=Decimal("50.00")),
+            RefundItemInput(payment_intent_id=pi2.id, amount=Decimal("20.00"), reason="dup"),
+            RefundItemInput(payment_intent_id=uuid.uuid4(), amount=Decimal("1.00")),
+        ]
+        out = create_refunds_batch(session, "t1", items)
+
+        assert [i.status for i in out.items] == [202, 422, 202, 404]
+        assert (out.accepted, out.rejected) == (2, 2)
+        assert (pi1.refunded_amount, pi2.refunded_amount) == (Decimal("60.00"), Decimal("20.00"))
+
+        lock_stmt = session.execute.call_args_list[0].args[0]
+        lock_sql = str(lock_stmt.compile(dialect=postgresql.dialect()))
+        assert "ORDER BY payment_intents.id" in lock_sql and "FOR UPDATE" in lock_sql
+        refund_rows = session.execute.call_args_list[1].args[1]
+        assert [r["amount"] for r in refund_rows] == [Decimal("60.00"), Decimal("20.00")]
+        assert {r["status"] for r in refund_rows} == {"PENDING"}
+        assert session.execute.call_count == 2  # one lock, one bulk insert
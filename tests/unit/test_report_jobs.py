@@ -0,0 +1,208 @@
+"""Unit tests for asynchronous report jobs."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.application.report_jobs import (
+    ReportJobRequest,
+    ensure_inline_size,
+    estimate_size,
+    month_chunks,
+    run_report_job,
+    submit_report_job,
+)
+
+UTC = timezone.utc
+
+
+def _session() -> MagicMock:
+    session = MagicMock()
+    session.begin.return_value.__enter__ = MagicMock(return_value=session)
+    session.begin.return_value.__exit__ = MagicMock(return_value=None)
+    return session
+
+
+def test_month_chunks_tile_the_range() -> None:
+    start = datetime(2026, 1, 20, 8, tzinfo=UTC)
+    end = datetime(2026, 3, 5, tzinfo=UTC)
+    assert month_chunks(start, end) == [
+        (start, datetime(2026, 2, 1, tzinfo=UTC)),
+        (datetime(2026, 2, 1, tzinfo=UTC), datetime(2026, 3, 1, tzinfo=UTC)),
+        (datetime(2026, 3, 1, tzinfo=UTC), end),
+    ]
+
+
+def test_size_counts_output_buckets_for_revenue() -> None:
+    start, end = datetime(2024, 1, 1, tzinfo=UTC), datetime(2026, 1, 1, tzinfo=UTC)
+    assert estimate_size("revenue", start, end, "day") == 731
+    assert estimate_size("revenue", start, end, "month") == 25
+    assert estimate_size("account_balances", start, end, "month") == 731
+
+
+def test_small_request_is_computed_inline() -> None:
+    session = _session()
+    req = ReportJobRequest.model_validate(
+        {"kind": "revenue", "from": "2026-03-01T00:00:00+00:00", "to": "2026-03-31T23:59:59+00:00"}
+    )
+    totals = {(datetime(2026, 3, 1, tzinfo=UTC), "REVENUE", "BRL"): [Decimal(0), Decimal("9.00")]}
+    with patch("src.application.report_jobs.ledger_totals", return_value=totals):
+        job, inline = submit_report_job(session, "t1", req)
+    assert inline and job.status == "SUCCEEDED" and job.progress == 1.0
+    assert job.result == [
+        {"period": "2026-03-01T00:00:00+00:00", "currency": "BRL", "total": "9.00"}
+    ]
+
+
+def test_large_request_is_queued() -> None:
+    session = _session()
+    req = ReportJobRequest.model_validate(
+        {
+            "kind": "revenue",
+            "from": "2020-01-01T00:00:00",
+            "to": "2025-12-31T00:00:00",
+            "granularity": "day",
+        }
+    )
+    with patch("src.application.report_jobs.ledger_totals") as totals:
+        job, inline = submit_report_job(session, "t1", req)
+    totals.assert_not_called()
+    assert not inline and job.status == "PENDING"
+    assert (job.chunks_total, job.chunks_done) == (72, 0)
+
+
+def test_synchronous_report_over_the_inline_size_points_to_jobs() -> None:
+    small = ReportJobRequest.model_validate(
+        {"kind": "account_balances", "from": "2026-01-01T00:00:00", "to": "2026-03-31T00:00:00"}
+    )
+    ensure_inline_size(_session(), "t1", small, "/v1/reports/account-balances")
+
+    large = ReportJobRequest.model_validate(
+        {
+            "kind": "revenue",
+            "from": "2020-01-01T00:00:00",
+            "to": "2025-12-31T00:00:00",
+            "granularity": "day",
+        }
+    )
+    with pytest.raises(Exception) as exc_info:
+        ensure_inline_size(_session(), "t1", large, "/v1/reports/revenue")
+    assert exc_info.value.status_code == 422
+    assert "/v1/reports/jobs" in exc_info.value.detail["detail"]
+
+
+def test_unknown_kind_is_rejected() -> None:
+    with pytest.raises(Exception) as exc_info:
+        submit_report_job(_session(), "t1", ReportJobRequest(kind="pnl"))
+    assert exc_info.value.status_code == 400
+
+
+def test_runner_merges_chunks_and_stops_when_cancelled() -> None:
+    job = SimpleNamespace(
+        id=uuid.uuid4(),
+        kind="account_balances",
+        tenant_id="t1",
+        status="RUNNING",
+        locked_by="w1",
+        params={"from": "2026-01-01T00:00:00+00:00", "to": "2026-04-01T00:00:00+00:00"},
+        chunks_total=3,
+        chunks_done=0,
+    )
+    session = _session()
+    session.get.return_value = job
+    calls = []
+
+    def chunk_totals(*args, **kwargs):
+        calls.append(args[2])
+        if len(calls) == 2:
+            job.status = "CANCELLED"
+        return {(None, "CASH", "BRL"): [Decimal("1.00"), Decimal(0)]}
+
+    with patch("src.application.report_jobs.ledger_totals", side_effect=chunk_totals):
+        assert run_report_job(session, job.id, "w1") == "CANCELLED"
+    assert len(calls) == 2 and job.chunks_done == 1
+
+
+def test_runner_stores_merged_result() -> None:
+    job = SimpleNamespace(
+        id=uuid.uuid4(),
+        kind="account_balances",
+        tenant_id="t1",
+        status="RUNNING",
+        locked_by="w1",
+        params={"from": "2026-01-01T00:00:00+00:00", "to": "2026-04-01T00:00:00+00:00"},
+        chunks_total=3,
+        chunks_done=0,
+        result=None,
+    )
+    session = _session()
+    session.get.return_value = job
+
+    def chunk_totals(*args, **kwargs):
+        return {(None, "CASH", "BRL"): [Decimal("1.00"), Decimal(0)]}
+
+    with patch("src.application.report_jobs.ledger_totals", side_effect=chunk_totals):
+        assert run_report_job(session, job.id, "w1") == "SUCCEEDED"
+    assert job.result == [
+        {
+            "account": "CASH",
+            "currency": "BRL",
+            "debits_total": "3.00",
+            "credits_total": "0",
+            "balance": "-3.00",
+        }
+    ]
+
+
+def test_runner_stops_without_writing_once_the_job_is_reclaimed() -> None:
+    job = SimpleNamespace(
+        id=uuid.uuid4(),
+        kind="account_balances",
+        tenant_id="t1",
+        status="RUNNING",
+        locked_by="w1",
+        params={"from": "2026-01-01T00:00:00+00:00", "to": "2026-04-01T00:00:00+00:00"},
+        chunks_total=3,
+        chunks_done=0,
+        result=None,
+    )
+    session = _session()
+    session.get.return_value = job
+    calls = []
+
+    def chunk_totals(*args, **kwargs):
+        calls.append(args[2])
+        if len(calls) == 2:
+            # Stale claim taken over by another worker, which restarts the job from chunk 0.
+            job.locked_by, job.chunks_done = "w2", 0
+        return {(None, "CASH", "BRL"): [Decimal("1.00"), Decimal(0)]}
+
+    with patch("src.application.report_jobs.ledger_totals", side_effect=chunk_totals):
+        assert run_report_job(session, job.id, "w1") == "RECLAIMED"
+    assert len(calls) == 2
+    assert (job.status, job.locked_by, job.chunks_done, job.result) == ("RUNNING", "w2", 0, None)
+
+
+def test_failure_does_not_fail_a_job_reclaimed_by_another_worker() -> None:
+    job = SimpleNamespace(
+        id=uuid.uuid4(),
+        kind="account_balances",
+        tenant_id="t1",
+        status="RUNNING",
+        locked_by="w2",
+        params={"from": "2026-01-01T00:00:00+00:00", "to": "2026-02-01T00:00:00+00:00"},
+        chunks_total=1,
+        chunks_done=0,
+    )
+    session = _session()
+    session.get.return_value = job
+
+    with patch("src.application.report_jobs.ledger_totals", side_effect=RuntimeError("boom")):
+        assert run_report_job(session, job.id, "w1") == "FAILED"
+    assert (job.status, job.locked_by) == ("RUNNING", "w2")
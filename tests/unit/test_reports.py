@@ -0,0 +1,121 @@
+"""Unit tests for rollup-backed reports."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.api.deps.auth import require_global_admin
+from src.application.reports import (
+    account_balances_report,
+    day_window,
+    revenue_report,
+    tenant_revenue_report,
+)
+from src.application.security import Principal
+
+MARCH = datetime(2026, 3, 1)
+
+
+def _session(rows: list[SimpleNamespace]) -> MagicMock:
+    session = MagicMock()
+    session.execute.return_value.all.return_value = rows
+    return session
+
+
+def _row(period: datetime | None, account: str, debits: str, credits: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        period=period,
+        account=account,
+        currency="BRL",
+        debits=Decimal(debits),
+        credits=Decimal(credits),
+    )
+
+
+@pytest.mark.parametrize(
+    ("from_dt", "to_dt", "expected"),
+    [
+        (None, None, (None, None)),
+        (datetime(2026, 3, 1, tzinfo=timezone.utc), None, (date(2026, 3, 1), None)),
+        (datetime(2026, 3, 1, 9, tzinfo=timezone.utc), None, (date(2026, 3, 2), None)),
+        (None, datetime(2026, 3, 5, 23, 59, tzinfo=timezone.utc), (None, date(2026, 3, 5))),
+    ],
+)
+def test_day_window_keeps_only_whole_days(from_dt, to_dt, expected) -> None:
+    window = day_window(from_dt, to_dt)
+    assert (window.first_day, window.end_day) == expected
+
+
+def test_day_window_within_a_single_day_is_empty() -> None:
+    start = datetime(2026, 3, 1, 9, tzinfo=timezone.utc)
+    assert day_window(start, start.replace(hour=18)).empty
+
+
+def test_revenue_merges_rollup_tail_and_edge_parts() -> None:
+    rows = [
+        _row(MARCH, "REVENUE", "0", "100.00"),  # rollups
+        _row(MARCH, "REVENUE", "0", "5.50"),  # entries after the watermark
+        _row(datetime(2026, 4, 1), "REVENUE", "0", "7.00"),  # partial edge day
+    ]
+    out = revenue_report(_session(rows), "t1", None, None, "month")
+    assert [(i.period, i.total) for i in out] == [
+        ("2026-03-01T00:00:00+00:00", "105.50"),
+        ("2026-04-01T00:00:00+00:00", "7.00"),
+    ]
+
+
+def test_account_balances_sum_parts_per_account() -> None:
+    rows = [
+        _row(None, "CASH", "10.00", "0"),
+        _row(None, "REVENUE", "0", "10.00"),
+        _row(None, "CASH", "2.00", "1.00"),
+    ]
+    out = account_balances_report(_session(rows), "t1", None, None)
+    assert [(i.account, i.debits_total, i.credits_total, i.balance) for i in out] == [
+        ("CASH", "12.00", "1.00", "-11.00"),
+        ("REVENUE", "0", "10.00", "10.00"),
+    ]
+
+
+def test_rejects_unknown_granularity() -> None:
+    with pytest.raises(ValueError):
+        revenue_report(_session([]), "t1", None, None, "year")
+
+
+def test_tenant_revenue_report_formats_rows_and_rejects_unknown_sort() -> None:
+    session = MagicMock()
+    session.execute.return_value.scalars.return_value = [
+        SimpleNamespace(
+            tenant_id="t2",
+            currency="BRL",
+            total=Decimal("99.00"),
+            updated_at=datetime(2026, 3, 2, tzinfo=timezone.utc),
+        )
+    ]
+    items = tenant_revenue_report(session, "BRL", "-total", limit=10)
+    assert [(i.tenant_id, i.total) for i in items] == [("t2", "99.00")]
+    with pytest.raises(ValueError):
+        tenant_revenue_report(session, sort="revenue")
+
+
+@pytest.mark.parametrize(
+    ("tid", "roles", "allowed"),
+    [("*", ["admin"], True), ("t1", ["admin"], False), ("*", ["viewer"], False)],
+)
+def test_cross_tenant_reports_require_global_admin(
+    tid: str, roles: list[str], allowed: bool
+) -> None:
+    principal = Principal(
+        sub="u", tid=tid, roles=roles, perms=[], plan="free", region="r", jti="j", ctx={}
+    )
+    if allowed:
+        assert require_global_admin(principal) is principal
+    else:
+        with pytest.raises(Exception) as exc:
+            require_global_admin(principal)
+        assert exc.value.status_code == 403
@@ -0,0 +1,120 @@
+"""Unit tests for the Redis response cache."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.infrastructure.redis.response_cache import ResponseCache
+from src.shared.metrics import RESPONSE_CACHE_REQUESTS_TOTAL
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    def get(self, key: str) -> str | None:
+        return self.data.get(key)
+
+    def set(self, key: str, value: Any, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.data:
+            return False
+        self.data[key] = str(value)
+        return True
+
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        self.data[key] = value
+
+    def incr(self, key: str) -> int:
+        self.data[key] = str(int(self.data.get(key, "0")) + 1)
+        return int(self.data[key])
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+def test_second_identical_request_is_served_from_cache() -> None:
+    cache = ResponseCache(_FakeRedis())  # type: ignore[arg-type]
+    calls = []
+
+    def compute() -> list[dict[str, str]]:
+        calls.append(1)
+        return [{"total": "10.00"}]
+
+    params = {"from": None, "granularity": "month"}
+    assert cache.get_or_compute("t1", "revenue", params, compute) == [{"total": "10.00"}]
+    assert cache.get_or_compute("t1", "revenue", dict(reversed(params.items())), compute) == [
+        {"total": "10.00"}
+    ]
+    assert len(calls) == 1
+
+
+def test_generation_bump_invalidates_only_that_tenant() -> None:
+    cache = ResponseCache(_FakeRedis())  # type: ignore[arg-type]
+    t1_before = cache.key("t1", "revenue", {})
+    t2_before = cache.key("t2", "revenue", {})
+    cache.bump("t1")
+    assert cache.key("t1", "revenue", {}) != t1_before
+    assert cache.key("t2", "revenue", {}) == t2_before
+
+
+def test_concurrent_miss_waits_for_the_lock_holder() -> None:
+    redis = _FakeRedis()
+    cache = ResponseCache(redis, wait_seconds=1.0, poll_interval=0)  # type: ignore[arg-type]
+    key = cache.key("t1", "revenue", {})
+    redis.set(f"{key}:lock", "1")
+
+    polls = []
+    original_get = redis.get
+
+    def get(k: str) -> str | None:
+        if k == key:
+            polls.append(k)
+            if len(polls) == 3:
+                redis.data[key] = '["from the holder"]'
+        return original_get(k)
+
+    redis.get = get  # type: ignore[method-assign]
+    out = cache.get_or_compute("t1", "revenue", {}, lambda: ["recomputed"])
+    assert out == ["from the holder"]
+
+
+def test_wait_timeout_computes_without_releasing_foreign_lock() -> None:
+    redis = _FakeRedis()
+    cache = ResponseCache(redis, wait_seconds=0, poll_interval=0)  # type: ignore[arg-type]
+    key = cache.key("t1", "revenue", {})
+    redis.set(f"{key}:lock", "1")
+    assert cache.get_or_compute("t1", "revenue", {}, lambda: ["fresh"]) == ["fresh"]
+    assert f"{key}:lock" in redis.data
+
+
+class _DownRedis(_FakeRedis):
+    def __init__(self, down: set[str]) -> None:
+        super().__init__()
+        self.down = down
+
+    def get(self, key: str) -> str | None:
+        if "get" in self.down:
+            raise RedisConnectionError("connection refused")
+        return super().get(key)
+
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        if "setex" in self.down:
+            raise RedisConnectionError("connection refused")
+        super().setex(key, ttl, value)
+
+
+def test_redis_outage_computes_directly() -> None:
+    bypass = RESPONSE_CACHE_REQUESTS_TOTAL.labels("revenue", "bypass")
+    before = bypass._value.get()
+    cache = ResponseCache(_DownRedis({"get"}))  # type: ignore[arg-type]
+    assert cache.get_or_compute("t1", "revenue", {}, lambda: ["fresh"]) == ["fresh"]
+    assert bypass._value.get() == before + 1
+
+
+def test_failed_cache_write_still_returns_the_response() -> None:
+    redis = _DownRedis({"setex"})
+    cache = ResponseCache(redis)  # type: ignore[arg-type]
+    assert cache.get_or_compute("t1", "revenue", {}, lambda: ["fresh"]) == ["fresh"]
+    assert not any(k.endswith(":lock") for k in redis.data)
@@ -0,0 +1,87 @@
+"""Unit tests for account statements."""
+
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.application.statements import account_statement, decode_cursor, encode_cursor
+
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+SECRET = "statement-secret"
+
+
+def _row(n: int, running: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.UUID(int=n),
+        entry_id=uuid.UUID(int=100 + n),
+        posted_at=T0.replace(day=n),
+        side="CREDIT",
+        amount=Decimal("10.00"),
+        description=None,
+        running=Decimal(running),
+    )
+
+
+def test_cursor_round_trip_and_rejects_other_accounts() -> None:
+    line_id = str(uuid.UUID(int=7))
+    cursor = encode_cursor(SECRET, "REVENUE", "BRL", T0, line_id, Decimal("12.50"))
+    position = decode_cursor(SECRET, cursor, "REVENUE", "BRL")
+    assert position == {
+        "posted_at": T0,
+        "line_id": uuid.UUID(line_id),
+        "balance": Decimal("12.50"),
+    }
+    for bad, account in ((cursor, "CASH"), ("not-a-cursor", "REVENUE")):
+        with pytest.raises(Exception) as exc_info:
+            decode_cursor(SECRET, bad, account, "BRL")
+        assert exc_info.value.status_code == 400
+
+
+def test_cursor_with_a_forged_balance_is_rejected() -> None:
+    cursor = encode_cursor(SECRET, "REVENUE", "BRL", T0, str(uuid.UUID(int=7)), Decimal("12.50"))
+    payload, signature = cursor.split(".")
+    data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    data["b"] = "1000000.00"
+    forged = base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+    for bad, secret in ((f"{forged}.{signature}", SECRET), (cursor, "other-secret")):
+        with pytest.raises(Exception) as exc_info:
+            decode_cursor(secret, bad, "REVENUE", "BRL")
+        assert exc_info.value.status_code == 400
+
+
+def test_first_page_starts_from_the_snapshot_balance() -> None:
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [
+        _row(1, "10.00"),
+        _row(2, "20.00"),
+        _row(3, "30.00"),
+    ]
+    totals = {(None, "REVENUE", "BRL"): [Decimal("1.00"), Decimal("6.00")]}
+    with patch("src.application.statements.ledger_totals", return_value=totals):
+        page = account_statement(session, "t1", "REVENUE", "BRL", T0, None, SECRET, limit=2)
+    assert page.opening_balance == "5.00"
+    assert [line.balance for line in page.lines] == ["15.00", "25.00"]
+    assert page.closing_balance == "25.00"
+
+    position = decode_cursor(SECRET, page.next_cursor or "", "REVENUE", "BRL")
+    assert (position["line_id"], position["balance"]) == (uuid.UUID(int=2), Decimal("25.00"))
+
+
+def test_next_page_continues_from_the_cursor_balance() -> None:
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [_row(3, "10.00")]
+    cursor = encode_cursor(SECRET, "REVENUE", "BRL", T0, str(uuid.UUID(int=2)), Decimal("25.00"))
+    with patch("src.application.statements.ledger_totals") as totals:
+        page = account_statement(session, "t1", "REVENUE", "BRL", None, None, SECRET, cursor=cursor)
+    totals.assert_not_called()
+    assert page.opening_balance == "25.00"
+    assert [line.balance for line in page.lines] == ["35.00"]
+    assert page.next_cursor is None
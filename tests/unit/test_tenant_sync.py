@@ -19,8 +19,9 @@ class TestHandleTenantEvent:
         handle_tenant_event(session, "tenant.created", {})
         session.add.assert_not_called()
 
+    @patch("src.worker.handlers.tenants.publish_account_change")
     @patch("src.worker.handlers.tenants.seed_default_accounts")
-    def test_tenant_created(self, mock_seed: MagicMock) -> None:
+    def test_tenant_created(self, mock_seed: MagicMock, mock_publish: MagicMock) -> None:
         session = self._make_session(existing_tenant=None)
         handle_tenant_event(session, "tenant.created", {
             "tenant_id": "t_new",
@@ -30,6 +31,7 @@ class TestHandleTenantEvent:
         })
         session.add.assert_called()
         mock_seed.assert_called_once_with(session, "t_new")
+        mock_publish.assert_called_once_with("t_new")
 
     def test_tenant_created_already_exists(self) -> None:
         existing = MagicMock()